@@ -1,74 +1,113 @@
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
-from backend.trading.strategies.base_strategy import BaseStrategy
-from backend.trading.portfolio_manager import PortfolioManager
+from backend.data.candle_store import CandleStore
+from backend.trading.strategies.base_strategy import BaseStrategy, SIGNAL_BUY
 from backend.trading.risk_manager import RiskManager
 from backend.utils.logger import setup_logger
 
 logger = setup_logger("backtester")
 
 class Backtester:
-    def __init__(self, initial_capital: float, strategy: BaseStrategy, risk_manager: RiskManager, data: pd.DataFrame):
+    """Runs a strategy's vectorized generate_signals over a whole history in one pass.
+
+    Positions follow the live rules: long-only, one position at a time, a buy
+    signal opens a fixed-size position when flat and a sell signal closes it.
+    """
+
+    def __init__(self, initial_capital: float, strategy: BaseStrategy, risk_manager: RiskManager, data: pd.DataFrame,
+                 amount_usd: float = 5.0):
         self.initial_capital = initial_capital
         self.strategy = strategy
         self.risk_manager = risk_manager
-        self.data = data.sort_values(by='timestamp')
-        self.portfolio_manager = PortfolioManager(initial_capital)
+        self.data = data.sort_values(by='timestamp').reset_index(drop=True)
+        self.amount_usd = amount_usd # Fixed amount for small accounts
+        self.current_capital = initial_capital
         self.trades: List[Dict[str, Any]] = []
 
+    @classmethod
+    def from_candle_store(cls, store: CandleStore, symbol: str, timeframe: str, initial_capital: float,
+                          strategy: BaseStrategy, risk_manager: RiskManager,
+                          start: datetime = None, end: datetime = None) -> "Backtester":
+        """Build a backtester over bars read straight from the local memory-mapped candle store."""
+        start_ms = int(start.timestamp() * 1000) if start else None
+        end_ms = int(end.timestamp() * 1000) if end else None
+        bars = store.read(symbol, timeframe, start_ms, end_ms)
+        data = pd.DataFrame({
+            'timestamp': pd.to_datetime(bars['timestamp'], unit='ms'),
+            'open': bars['open'],
+            'high': bars['high'],
+            'low': bars['low'],
+            'close': bars['close'],
+            'volume': bars['volume'],
+        })
+        logger.info(f"Załadowano {len(data)} świec {symbol} {timeframe} z lokalnego magazynu")
+        return cls(initial_capital, strategy, risk_manager, data)
+
+    @staticmethod
+    def positions_from_signals(signals: np.ndarray) -> np.ndarray:
+        """Bars spent long: each bar carries the most recent non-hold signal forward"""
+        signals = np.asarray(signals)
+        last = np.where(signals != 0, np.arange(len(signals)), -1)
+        np.maximum.accumulate(last, out=last)
+        return (last >= 0) & (signals[np.maximum(last, 0)] == SIGNAL_BUY)
+
+    def _round_trips(self, close: np.ndarray, long: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        changes = np.diff(long.astype(np.int8), prepend=np.int8(0))
+        entries = np.flatnonzero(changes == 1)
+        exits = np.flatnonzero(changes == -1)
+        # Capital only moves on exits; once it can no longer fund a position no further trades happen
+        pnl = self.amount_usd * (close[exits] / close[entries[:len(exits)]] - 1)
+        capital_before = self.initial_capital + np.concatenate(([0.0], np.cumsum(pnl)))[:len(entries)]
+        affordable = capital_before >= self.amount_usd
+        if not affordable.all():
+            stop = int(np.argmin(affordable))
+            entries, exits = entries[:stop], exits[:stop]
+        return entries, exits
+
     def run_backtest(self):
         logger.info(f"Rozpoczynanie backtestu z kapitałem początkowym: {self.initial_capital}")
-        for index, row in self.data.iterrows():
-            timestamp = row['timestamp']
-            current_price = row['close']
-
-            # Update portfolio with current price
-            self.portfolio_manager.update_current_price(current_price)
-
-            # Get signal from strategy
-            signal = self.strategy.generate_signal(row)
-
-            if signal == 'buy':
-                # Check risk manager for buy permission
-                if self.risk_manager.can_open_position(self.portfolio_manager.current_capital, current_price):
-                    # Calculate amount to buy (e.g., 5 USD as per initial bot description)
-                    amount_usd = 5.0 # Fixed amount for small accounts
-                    amount_crypto = amount_usd / current_price
-
-                    # Execute trade
-                    trade = self.portfolio_manager.open_position(current_price, amount_crypto)
-                    if trade:
-                        self.trades.append({
-                            'timestamp': timestamp,
-                            'type': 'buy',
-                            'price': current_price,
-                            'amount_crypto': amount_crypto,
-                            'amount_usd': amount_usd,
-                            'capital_after_trade': self.portfolio_manager.current_capital
-                        })
-                        logger.info(f"Kupiono {amount_crypto:.4f} BTC po {current_price:.2f} USD w {timestamp}")
-
-            elif signal == 'sell':
-                # Check risk manager for sell permission and if there are open positions
-                if self.portfolio_manager.has_open_positions() and self.risk_manager.can_close_position(self.portfolio_manager.current_capital, current_price):
-                    # Close all open positions for simplicity in backtest
-                    closed_trade = self.portfolio_manager.close_all_positions(current_price)
-                    if closed_trade:
-                        self.trades.append({
-                            'timestamp': timestamp,
-                            'type': 'sell',
-                            'price': current_price,
-                            'amount_crypto': closed_trade['amount_crypto'],
-                            'amount_usd': closed_trade['amount_usd'],
-                            'profit_loss_usd': closed_trade['profit_loss_usd'],
-                            'capital_after_trade': self.portfolio_manager.current_capital
-                        })
-                        logger.info(f"Sprzedano {closed_trade['amount_crypto']:.4f} BTC po {current_price:.2f} USD w {timestamp}. Zysk/Strata: {closed_trade['profit_loss_usd']:.2f} USD")
-
-        logger.info("Backtest zakończony.")
-        return self.trades, self.portfolio_manager.current_capital
+        close = self.data['close'].to_numpy(dtype=float)
+        timestamps = self.data['timestamp']
+
+        # The same pure signal logic live trading runs, over every bar at once
+        signals = self.strategy.generate_signals(self.data)
+        entries, exits = self._round_trips(close, self.positions_from_signals(signals))
+
+        amounts_crypto = self.amount_usd / close[entries]
+        pnl = amounts_crypto[:len(exits)] * close[exits] - self.amount_usd
+        realized = self.initial_capital + np.cumsum(pnl)
+
+        self.trades = []
+        for i, entry in enumerate(entries):
+            capital = realized[i - 1] if i else self.initial_capital
+            self.trades.append({
+                'timestamp': timestamps.iat[entry],
+                'type': 'buy',
+                'price': float(close[entry]),
+                'amount_crypto': float(amounts_crypto[i]),
+                'amount_usd': self.amount_usd,
+                'capital_after_trade': float(capital - self.amount_usd)
+            })
+            if i < len(exits):
+                self.trades.append({
+                    'timestamp': timestamps.iat[exits[i]],
+                    'type': 'sell',
+                    'price': float(close[exits[i]]),
+                    'amount_crypto': float(amounts_crypto[i]),
+                    'amount_usd': float(amounts_crypto[i] * close[exits[i]]),
+                    'profit_loss_usd': float(pnl[i]),
+                    'capital_after_trade': float(realized[i])
+                })
+
+        self.current_capital = float(realized[-1]) if len(exits) else self.initial_capital
+        if len(entries) > len(exits):
+            # Still open at the end: mark to the last close
+            self.current_capital += float(amounts_crypto[-1] * close[-1]) - self.amount_usd
+        logger.info(f"Backtest zakończony: {len(close)} świec, {len(entries)} pozycji.")
+        return self.trades, self.current_capital
 
     def get_performance_metrics(self, trades: List[Dict[str, Any]], final_capital: float):
         total_profit_loss = final_capital - self.initial_capital
@@ -103,19 +142,16 @@ if __name__ == '__main__':
     # Mock Strategy
     class MockStrategy(BaseStrategy):
         def __init__(self):
-            super().__init__('MockStrategy')
-            self.buy_signal_count = 0
-            self.sell_signal_count = 0
+            super().__init__(None, None, None, None, None)
 
-        def generate_signal(self, data: pd.Series) -> str:
+        def generate_signals(self, frame) -> np.ndarray:
             # Simple mock: buy on first data point, sell on second, then no more signals
-            if self.buy_signal_count == 0:
-                self.buy_signal_count += 1
-                return 'buy'
-            elif self.sell_signal_count == 0 and self.buy_signal_count == 1:
-                self.sell_signal_count += 1
-                return 'sell'
-            return 'hold'
+            signals = np.zeros(len(frame['close']), dtype=np.int8)
+            signals[:2] = [1, -1]
+            return signals
+
+        async def execute_symbol(self, symbol: str):
+            pass
 
     # Mock Data (simplified OHLCV data)
     mock_data = pd.DataFrame([
@@ -126,10 +162,9 @@ if __name__ == '__main__':
         {'timestamp': datetime(2025, 1, 1, 10, 4, 0), 'open': 107, 'high': 109, 'low': 105, 'close': 106, 'volume': 900},
     ])
 
-    mock_risk_manager = RiskManager(max_risk_per_trade=0.01, max_risk_per_portfolio=0.05)
     mock_strategy = MockStrategy()
 
-    backtester = Backtester(initial_capital=1000, strategy=mock_strategy, risk_manager=mock_risk_manager, data=mock_data)
+    backtester = Backtester(initial_capital=1000, strategy=mock_strategy, risk_manager=None, data=mock_data)
     trades, final_capital = backtester.run_backtest()
     performance = backtester.get_performance_metrics(trades, final_capital)
 
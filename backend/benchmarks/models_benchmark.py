@@ -0,0 +1,52 @@
+"""Compare dict payloads with the slotted exchange models.
+
+Run with: python -m backend.benchmarks.models_benchmark [count]
+"""
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from ..exchanges.models import Order
+from ..utils.helpers import safe_float
+
+def ccxt_orders(count: int):
+    return [{
+        'id': str(i), 'symbol': 'BTC/USDT', 'type': 'market', 'side': 'buy', 'amount': '0.001',
+        'price': '50000.0', 'filled': '0.001', 'remaining': '0', 'status': 'closed', 'timestamp': 1700000000000 + i,
+    } for i in range(count)]
+
+def as_dict(order):
+    """The per-order dict the exchange layer used to build"""
+    return {
+        'id': order['id'],
+        'symbol': order['symbol'],
+        'type': order['type'],
+        'side': order['side'],
+        'amount': safe_float(order['amount']),
+        'price': safe_float(order['price']),
+        'filled': safe_float(order['filled']),
+        'remaining': safe_float(order['remaining']),
+        'status': order['status'].lower(),
+        'timestamp': datetime.utcnow().isoformat()
+    }
+
+def measure(label: str, build, payloads):
+    started = time.perf_counter()
+    build(payloads)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    objects = build(payloads)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(objects)
+    print(f"{label:<8} {elapsed / count * 1e9:8.0f} ns/object {size / count:8.0f} bytes/object")
+
+def main(count: int = 100_000):
+    payloads = ccxt_orders(count)
+    print(f"Building {count} orders from ccxt payloads")
+    measure("dict", lambda rows: [as_dict(o) for o in rows], payloads)
+    measure("Order", lambda rows: [Order.from_ccxt(o) for o in rows], payloads)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,125 @@
+import os
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+from ..utils.logger import setup_logger
+from ..utils.config import config
+
+logger = setup_logger("candle_store")
+
+# Fixed-width record: one closed bar, timestamp in epoch milliseconds (same as ccxt OHLCV rows)
+CANDLE_DTYPE = np.dtype([
+    ("timestamp", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+class CandleStore:
+    """Append-only, memory-mapped candle files, one per (symbol, timeframe).
+
+    Records are strictly increasing by timestamp, so range lookups are a binary
+    search over the memory-mapped timestamp column and reads return views into
+    the mapping rather than copies.
+    """
+
+    def __init__(self, base_dir: Optional[str] = None):
+        self.base_dir = base_dir or config.get("market_data.candle_store.path", "data/candles")
+        os.makedirs(self.base_dir, exist_ok=True)
+        self._last_timestamps: Dict[Tuple[str, str], int] = {}
+        self._maps: Dict[Tuple[str, str], Tuple[int, np.memmap]] = {}
+
+    def _path(self, symbol: str, timeframe: str) -> str:
+        safe_symbol = symbol.replace("/", "_").replace(":", "_")
+        return os.path.join(self.base_dir, f"{safe_symbol}_{timeframe}.bin")
+
+    def _record_count(self, path: str) -> int:
+        """Number of complete records, truncating a torn trailing write if present"""
+        if not os.path.exists(path):
+            return 0
+        size = os.path.getsize(path)
+        remainder = size % CANDLE_DTYPE.itemsize
+        if remainder:
+            logger.warning(f"Truncating {remainder} trailing bytes from partially written {path}")
+            with open(path, "r+b") as f:
+                f.truncate(size - remainder)
+            size -= remainder
+        return size // CANDLE_DTYPE.itemsize
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        """Timestamp (ms) of the newest stored bar, or None if the file is empty"""
+        key = (symbol, timeframe)
+        if key not in self._last_timestamps:
+            path = self._path(symbol, timeframe)
+            count = self._record_count(path)
+            if count == 0:
+                return None
+            with open(path, "rb") as f:
+                f.seek((count - 1) * CANDLE_DTYPE.itemsize)
+                record = np.frombuffer(f.read(CANDLE_DTYPE.itemsize), dtype=CANDLE_DTYPE)
+            self._last_timestamps[key] = int(record["timestamp"][0])
+        return self._last_timestamps[key]
+
+    def append(self, symbol: str, timeframe: str, candle: Sequence[float]) -> bool:
+        """Append one closed bar ([timestamp_ms, open, high, low, close, volume]).
+
+        Bars at or before the newest stored timestamp are ignored so repeated
+        polling of the same closed bar is harmless.
+        """
+        return self.append_many(symbol, timeframe, [candle]) == 1
+
+    def append_many(self, symbol: str, timeframe: str, candles: Sequence[Sequence[float]]) -> int:
+        """Append closed bars in timestamp order. Returns the number of bars written."""
+        last_ts = self.last_timestamp(symbol, timeframe)
+        fresh = []
+        for candle in candles:
+            ts = int(candle[0])
+            if last_ts is not None and ts <= last_ts:
+                continue
+            fresh.append((ts, *(float(v) for v in candle[1:6])))
+            last_ts = ts
+        if not fresh:
+            return 0
+
+        records = np.array(fresh, dtype=CANDLE_DTYPE)
+        with open(self._path(symbol, timeframe), "ab") as f:
+            f.write(records.tobytes())
+        self._last_timestamps[(symbol, timeframe)] = last_ts
+        return len(fresh)
+
+    def _memmap(self, symbol: str, timeframe: str) -> Optional[np.memmap]:
+        key = (symbol, timeframe)
+        path = self._path(symbol, timeframe)
+        count = self._record_count(path)
+        if count == 0:
+            return None
+        cached = self._maps.get(key)
+        if cached and cached[0] == count:
+            return cached[1]
+        # File grew since the last mapping; remap to cover the new records
+        mapping = np.memmap(path, dtype=CANDLE_DTYPE, mode="r", shape=(count,))
+        self._maps[key] = (count, mapping)
+        return mapping
+
+    def read(self, symbol: str, timeframe: str, start_ms: Optional[int] = None,
+             end_ms: Optional[int] = None) -> np.ndarray:
+        """Bars with start_ms <= timestamp <= end_ms as a zero-copy view of the mapping"""
+        mapping = self._memmap(symbol, timeframe)
+        if mapping is None:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        timestamps = mapping["timestamp"]
+        lo = 0 if start_ms is None else int(np.searchsorted(timestamps, start_ms, side="left"))
+        hi = len(mapping) if end_ms is None else int(np.searchsorted(timestamps, end_ms, side="right"))
+        return mapping[lo:hi]
+
+    def tail(self, symbol: str, timeframe: str, count: int) -> np.ndarray:
+        """The newest `count` bars as a zero-copy view"""
+        mapping = self._memmap(symbol, timeframe)
+        if mapping is None or count <= 0:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        return mapping[-count:]
+
+    def close(self):
+        """Drop cached mappings"""
+        self._maps.clear()
@@ -1,13 +1,69 @@
-from sqlalchemy import create_engine
+import base64
+import binascii
+import json
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from sqlalchemy import create_engine, select, and_, or_, inspect, text
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import SQLAlchemyError
-from backend.data.database_models import Base, Trade, MarketData
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from backend.data.database_models import Base, Trade, MarketData, PnlRollup, trade_delta
 from backend.utils.logger import setup_logger
 from backend.utils.config import config
-from datetime import datetime
+from datetime import datetime, date
 
 logger = setup_logger("database_manager")
 
+TRADE_COLUMNS = (
+    Trade.id, Trade.timestamp, Trade.symbol, Trade.side, Trade.entry_price,
+    Trade.exit_price, Trade.amount, Trade.profit_loss_usd, Trade.is_open
+)
+MARKET_DATA_COLUMNS = (
+    MarketData.id, MarketData.timestamp, MarketData.symbol, MarketData.open_price,
+    MarketData.high_price, MarketData.low_price, MarketData.close_price, MarketData.volume
+)
+
+def encode_cursor(*values) -> str:
+    """Encode keyset values into an opaque, URL-safe cursor string"""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor produced by encode_cursor. Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, binascii.Error, json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(values, list):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return values
+
+def trade_row_to_dict(row) -> Dict[str, Any]:
+    """Serialize a trades row tuple (in TRADE_COLUMNS order)"""
+    return {
+        "id": row[0],
+        "timestamp": row[1].isoformat() if row[1] else None,
+        "symbol": row[2],
+        "side": row[3],
+        "entry_price": row[4],
+        "exit_price": row[5],
+        "amount": row[6],
+        "profit_loss_usd": row[7],
+        "is_open": row[8]
+    }
+
+def market_data_row_to_dict(row) -> Dict[str, Any]:
+    """Serialize a market_data row tuple (in MARKET_DATA_COLUMNS order)"""
+    return {
+        "id": row[0],
+        "timestamp": row[1].isoformat() if row[1] else None,
+        "symbol": row[2],
+        "open": row[3],
+        "high": row[4],
+        "low": row[5],
+        "close": row[6],
+        "volume": row[7]
+    }
+
 class DatabaseManager:
     def __init__(self):
         self.engine = None
@@ -23,11 +79,22 @@ class DatabaseManager:
         try:
             self.engine = create_engine(db_url)
             Base.metadata.create_all(self.engine) # Create tables if they don't exist
+            self._migrate()
             self.Session = sessionmaker(bind=self.engine)
             logger.info("Database initialized successfully.")
         except SQLAlchemyError as e:
             logger.error(f"Error initializing database: {e}")
 
+    def _migrate(self):
+        """Add columns introduced after a table was first created (create_all only creates missing tables)"""
+        columns = {column["name"] for column in inspect(self.engine).get_columns(Trade.__tablename__)}
+        if "trade_ref" in columns:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE trades ADD COLUMN trade_ref VARCHAR"))
+            conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_trades_trade_ref ON trades (trade_ref)"))
+        logger.info("Added trades.trade_ref column to existing database.")
+
     def get_session(self):
         if self.Session:
             return self.Session()
@@ -129,6 +196,209 @@ class DatabaseManager:
         finally:
             session.close()
 
+    @staticmethod
+    def _increment_rollup(session, day: date, symbol: str, delta: Dict[str, Any]):
+        rollup = session.query(PnlRollup).filter_by(day=day, symbol=symbol).with_for_update().first()
+        if rollup is None:
+            rollup = PnlRollup(day=day, symbol=symbol, trade_count=0, win_count=0, loss_count=0,
+                               gross_profit=0.0, gross_loss=0.0, realized_pnl=0.0)
+            session.add(rollup)
+            session.flush()
+        for field in ("trade_count", "win_count", "loss_count", "gross_profit", "gross_loss", "realized_pnl"):
+            setattr(rollup, field, getattr(rollup, field) + delta.get(field, 0))
+
+    def apply_trade_to_rollup(self, day: date, symbol: str, delta: Dict[str, Any]) -> bool:
+        """Incrementally add a closed trade's contribution to its (day, symbol) rollup row"""
+        for attempt in range(2):
+            session = self.get_session()
+            if not session: return False
+            try:
+                self._increment_rollup(session, day, symbol, delta)
+                session.commit()
+                return True
+            except IntegrityError:
+                # Another writer inserted the bucket first; retry as an update
+                session.rollback()
+            except SQLAlchemyError as e:
+                session.rollback()
+                logger.error(f"Error updating PnL rollup for {symbol} on {day}: {e}")
+                return False
+            finally:
+                session.close()
+        return False
+
+    def add_trades(self, trades: List[Dict[str, Any]]) -> bool:
+        """Insert closed trades and their PnL rollup increments in a single transaction.
+
+        Trades whose trade_ref is already stored are skipped, so a batch that is
+        retried or replayed from the journal spool is never double-counted.
+        Raises SQLAlchemyError on failure so the caller can retry or spool.
+        """
+        session = self.get_session()
+        if not session:
+            raise SQLAlchemyError("Database session not initialized")
+        try:
+            refs = [str(t["id"]) for t in trades if t.get("id") is not None]
+            existing = set()
+            if refs:
+                existing = set(session.scalars(select(Trade.trade_ref).where(Trade.trade_ref.in_(refs))))
+
+            for trade_data in trades:
+                ref = str(trade_data["id"]) if trade_data.get("id") is not None else None
+                if ref is not None and ref in existing:
+                    continue
+                existing.add(ref)
+                timestamp = trade_data.get("timestamp")
+                if isinstance(timestamp, str):
+                    timestamp = datetime.fromisoformat(timestamp)
+                timestamp = timestamp or datetime.utcnow()
+                realized_pnl = trade_data.get("realized_pnl", trade_data.get("profit_loss_usd")) or 0.0
+                session.add(Trade(
+                    trade_ref=ref,
+                    timestamp=timestamp,
+                    symbol=trade_data.get("symbol"),
+                    side=trade_data.get("side"),
+                    entry_price=trade_data.get("entry_price"),
+                    exit_price=trade_data.get("exit_price"),
+                    amount=trade_data.get("amount"),
+                    profit_loss_usd=realized_pnl,
+                    is_open=False
+                ))
+                self._increment_rollup(session, timestamp.date(), trade_data.get("symbol"), trade_delta(realized_pnl))
+            session.commit()
+            logger.debug(f"Journaled {len(trades)} trades to DB")
+            return True
+        except SQLAlchemyError:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def get_pnl_rollups(self, symbol: str = None, start_day: date = None, end_day: date = None) -> List[Dict[str, Any]]:
+        """Fetch persisted (day, symbol) PnL rollup rows"""
+        if not self.engine:
+            return []
+        stmt = select(PnlRollup.day, PnlRollup.symbol, PnlRollup.trade_count, PnlRollup.win_count,
+                      PnlRollup.loss_count, PnlRollup.gross_profit, PnlRollup.gross_loss, PnlRollup.realized_pnl)
+        if symbol: stmt = stmt.where(PnlRollup.symbol == symbol)
+        if start_day: stmt = stmt.where(PnlRollup.day >= start_day)
+        if end_day: stmt = stmt.where(PnlRollup.day <= end_day)
+        try:
+            with self.engine.connect() as conn:
+                return [dict(row._mapping) for row in conn.execute(stmt.order_by(PnlRollup.day, PnlRollup.symbol))]
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching PnL rollups from DB: {e}")
+            return []
+
+    def _trades_select(self, symbol: str = None, is_open: bool = None, after_id: int = None):
+        stmt = select(*TRADE_COLUMNS)
+        if symbol: stmt = stmt.where(Trade.symbol == symbol)
+        if is_open is not None: stmt = stmt.where(Trade.is_open == is_open)
+        if after_id is not None: stmt = stmt.where(Trade.id > after_id)
+        return stmt.order_by(Trade.id)
+
+    def _market_data_select(self, symbol: str = None, start_date: datetime = None, end_date: datetime = None,
+                            after: Optional[Tuple[datetime, int]] = None):
+        stmt = select(*MARKET_DATA_COLUMNS)
+        if symbol: stmt = stmt.where(MarketData.symbol == symbol)
+        if start_date: stmt = stmt.where(MarketData.timestamp >= start_date)
+        if end_date: stmt = stmt.where(MarketData.timestamp <= end_date)
+        if after is not None:
+            after_ts, after_id = after
+            stmt = stmt.where(or_(
+                MarketData.timestamp > after_ts,
+                and_(MarketData.timestamp == after_ts, MarketData.id > after_id)
+            ))
+        return stmt.order_by(MarketData.timestamp, MarketData.id)
+
+    @staticmethod
+    def _decode_trade_cursor(cursor: str = None) -> Optional[int]:
+        if not cursor:
+            return None
+        values = decode_cursor(cursor)
+        try:
+            return int(values[0])
+        except (IndexError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    @staticmethod
+    def _decode_market_data_cursor(cursor: str = None) -> Optional[Tuple[datetime, int]]:
+        if not cursor:
+            return None
+        values = decode_cursor(cursor)
+        if len(values) != 2:
+            raise ValueError(f"Invalid cursor: {cursor}")
+        try:
+            return datetime.fromisoformat(values[0]), int(values[1])
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    def get_trades_page(self, symbol: str = None, is_open: bool = None, cursor: str = None,
+                        limit: int = 100) -> Dict[str, Any]:
+        """Keyset-paginated trades ordered by id. Returns items and the cursor for the next page."""
+        if not self.engine:
+            return {"items": [], "next_cursor": None}
+        after_id = self._decode_trade_cursor(cursor)
+        stmt = self._trades_select(symbol, is_open, after_id).limit(limit)
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(stmt).all()
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching trades page from DB: {e}")
+            return {"items": [], "next_cursor": None}
+
+        next_cursor = encode_cursor(rows[-1][0]) if len(rows) == limit else None
+        return {"items": [trade_row_to_dict(row) for row in rows], "next_cursor": next_cursor}
+
+    def stream_trades(self, symbol: str = None, is_open: bool = None, cursor: str = None,
+                      batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Stream trades in id order without materializing the full result set.
+
+        The cursor is decoded eagerly so a malformed cursor raises ValueError here,
+        before the caller starts sending a response.
+        """
+        after_id = self._decode_trade_cursor(cursor)
+        stmt = self._trades_select(symbol, is_open, after_id)
+        return self._stream_rows(stmt, trade_row_to_dict, batch_size, "trades")
+
+    def get_market_data_page(self, symbol: str = None, start_date: datetime = None, end_date: datetime = None,
+                             cursor: str = None, limit: int = 500) -> Dict[str, Any]:
+        """Keyset-paginated candles ordered by (timestamp, id)"""
+        if not self.engine:
+            return {"items": [], "next_cursor": None}
+        after = self._decode_market_data_cursor(cursor)
+        stmt = self._market_data_select(symbol, start_date, end_date, after).limit(limit)
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(stmt).all()
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching market data page from DB: {e}")
+            return {"items": [], "next_cursor": None}
+
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0]) if len(rows) == limit else None
+        return {"items": [market_data_row_to_dict(row) for row in rows], "next_cursor": next_cursor}
+
+    def stream_market_data(self, symbol: str = None, start_date: datetime = None, end_date: datetime = None,
+                           cursor: str = None, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Stream candles in (timestamp, id) order without materializing the full result set"""
+        after = self._decode_market_data_cursor(cursor)
+        stmt = self._market_data_select(symbol, start_date, end_date, after)
+        return self._stream_rows(stmt, market_data_row_to_dict, batch_size, "market data")
+
+    def _stream_rows(self, stmt, row_to_dict, batch_size: int, label: str) -> Iterator[Dict[str, Any]]:
+        """Yield rows as dicts. A database error part-way is logged and re-raised, never passed off as the end."""
+        if not self.engine:
+            return
+        try:
+            with self.engine.connect() as conn:
+                # yield_per enables server-side cursors and fetches in fixed-size partitions
+                result = conn.execution_options(yield_per=batch_size).execute(stmt)
+                for row in result:
+                    yield row_to_dict(row)
+        except SQLAlchemyError as e:
+            logger.error(f"Error streaming {label} from DB: {e}")
+            raise
+
     def cleanup(self):
         if self.engine:
             self.engine.dispose()
@@ -1,7 +1,8 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, Date, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
+from typing import Dict, Any
 
 Base = declarative_base()
 
@@ -9,6 +10,7 @@ class Trade(Base):
     __tablename__ = 'trades'
 
     id = Column(Integer, primary_key=True)
+    trade_ref = Column(String, unique=True, nullable=True)  # Client-side trade id, makes journal writes idempotent
     timestamp = Column(DateTime, default=datetime.utcnow)
     symbol = Column(String, nullable=False)
     side = Column(String, nullable=False)  # 'buy' or 'sell'
@@ -36,4 +38,32 @@ class MarketData(Base):
     def __repr__(self):
         return f"<MarketData(id={self.id}, symbol='{self.symbol}', close_price={self.close_price})>"
 
+class PnlRollup(Base):
+    __tablename__ = 'pnl_rollups'
+    __table_args__ = (UniqueConstraint('day', 'symbol', name='uq_pnl_rollups_day_symbol'),)
 
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False, index=True)
+    symbol = Column(String, nullable=False)
+    trade_count = Column(Integer, nullable=False, default=0)
+    win_count = Column(Integer, nullable=False, default=0)
+    loss_count = Column(Integer, nullable=False, default=0)
+    gross_profit = Column(Float, nullable=False, default=0.0)
+    gross_loss = Column(Float, nullable=False, default=0.0)
+    realized_pnl = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<PnlRollup(day={self.day}, symbol='{self.symbol}', realized_pnl={self.realized_pnl})>"
+
+BUCKET_FIELDS = ("trade_count", "win_count", "loss_count", "gross_profit", "gross_loss", "realized_pnl")
+
+def trade_delta(realized_pnl: float) -> Dict[str, Any]:
+    """Bucket increments (PnlRollup columns) contributed by a single closed trade"""
+    return {
+        "trade_count": 1,
+        "win_count": 1 if realized_pnl > 0 else 0,
+        "loss_count": 1 if realized_pnl < 0 else 0,
+        "gross_profit": realized_pnl if realized_pnl > 0 else 0.0,
+        "gross_loss": -realized_pnl if realized_pnl < 0 else 0.0,
+        "realized_pnl": realized_pnl
+    }
@@ -0,0 +1,311 @@
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, Hashable, Iterable, List, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+from ..utils.logger import setup_logger
+
+logger = setup_logger("indicators")
+
+# --- Indicator functions ------------------------------------------------------
+# Each takes the close prices (oldest first) and returns the latest value(s), or None while
+# there is not enough history. Smoothing follows the usual conventions: EMA/RMA seeded with
+# the SMA of the first `length` values, population standard deviation for Bollinger Bands.
+
+def _ema_series(values: np.ndarray, length: int, alpha: Optional[float] = None) -> np.ndarray:
+    """EMA from index length-1 onwards, seeded with the SMA of the first `length` values"""
+    alpha = 2.0 / (length + 1) if alpha is None else alpha
+    seeded = values[length - 1:].astype(float)
+    seeded[0] = values[:length].mean()
+    return pd.Series(seeded).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+def _pad(values: np.ndarray, size: int) -> np.ndarray:
+    """Left-pad a warm-up-trimmed series with NaN back to `size` entries"""
+    out = np.full(size, np.nan)
+    if len(values):
+        out[size - len(values):] = values
+    return out
+
+# Whole-series variants (NaN during warm-up) for vectorized signal generation and backtests
+
+def sma_series(prices: np.ndarray, length: int) -> np.ndarray:
+    if len(prices) < length:
+        return np.full(len(prices), np.nan)
+    sums = np.cumsum(np.insert(prices.astype(float), 0, 0.0))
+    return _pad((sums[length:] - sums[:-length]) / length, len(prices))
+
+def ema_series(prices: np.ndarray, length: int) -> np.ndarray:
+    if len(prices) < length:
+        return np.full(len(prices), np.nan)
+    return _pad(_ema_series(prices, length), len(prices))
+
+def rsi_series(prices: np.ndarray, length: int) -> np.ndarray:
+    if len(prices) <= length:
+        return np.full(len(prices), np.nan)
+    deltas = np.diff(prices.astype(float))
+    # Wilder's smoothing is an EMA with alpha = 1/length
+    avg_gain = _ema_series(np.clip(deltas, 0, None), length, 1.0 / length)
+    avg_loss = _ema_series(np.clip(-deltas, 0, None), length, 1.0 / length)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = 100 - 100 / (1 + avg_gain / avg_loss)
+    values = np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, 50.0), values)
+    return _pad(values, len(prices))
+
+# Matrix variants: one row per symbol, every row the same length. Each row equals the matching
+# *_series call on it, so many symbols are evaluated with whole-array operations at once.
+
+def _ema_matrix(values: np.ndarray, length: int, alpha: Optional[float] = None) -> np.ndarray:
+    """Row-wise _ema_series (columns from length-1 onwards)"""
+    alpha = 2.0 / (length + 1) if alpha is None else alpha
+    # Bars as rows: the recursion is one vector operation per bar across all symbols
+    seeded = np.array(values[:, length - 1:].T, dtype=float, order="C")  # always a copy, even of one row
+    seeded[0] = values[:, :length].mean(axis=1)
+    for i in range(1, len(seeded)):
+        seeded[i] = (1 - alpha) * seeded[i - 1] + alpha * seeded[i]
+    return seeded.T
+
+def _pad_matrix(values: np.ndarray, size: int) -> np.ndarray:
+    out = np.full((values.shape[0], size), np.nan)
+    if values.shape[1]:
+        out[:, size - values.shape[1]:] = values
+    return out
+
+def sma_matrix(prices: np.ndarray, length: int) -> np.ndarray:
+    if prices.shape[1] < length:
+        return np.full(prices.shape, np.nan)
+    sums = np.cumsum(np.pad(prices.astype(float), ((0, 0), (1, 0))), axis=1)
+    return _pad_matrix((sums[:, length:] - sums[:, :-length]) / length, prices.shape[1])
+
+def ema_matrix(prices: np.ndarray, length: int) -> np.ndarray:
+    if prices.shape[1] < length:
+        return np.full(prices.shape, np.nan)
+    return _pad_matrix(_ema_matrix(prices, length), prices.shape[1])
+
+def rma_matrix(values: np.ndarray, length: int) -> np.ndarray:
+    """Wilder's smoothing (EMA with alpha = 1/length), as used by RSI and ATR"""
+    if values.shape[1] < length:
+        return np.full(values.shape, np.nan)
+    return _pad_matrix(_ema_matrix(values, length, 1.0 / length), values.shape[1])
+
+def rsi_matrix(prices: np.ndarray, length: int) -> np.ndarray:
+    if prices.shape[1] <= length:
+        return np.full(prices.shape, np.nan)
+    deltas = np.diff(prices.astype(float), axis=1)
+    avg_gain = _ema_matrix(np.clip(deltas, 0, None), length, 1.0 / length)
+    avg_loss = _ema_matrix(np.clip(-deltas, 0, None), length, 1.0 / length)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = 100 - 100 / (1 + avg_gain / avg_loss)
+    values = np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, 50.0), values)
+    return _pad_matrix(values, prices.shape[1])
+
+def macd_matrix(prices: np.ndarray, fast: int, slow: int, signal: int) -> Tuple[np.ndarray, np.ndarray]:
+    """MACD line and signal line"""
+    size = prices.shape[1]
+    if size < slow + signal - 1:
+        return np.full(prices.shape, np.nan), np.full(prices.shape, np.nan)
+    line = ema_matrix(prices, fast) - ema_matrix(prices, slow)
+    return line, _pad_matrix(_ema_matrix(line[:, slow - 1:], signal), size)
+
+def _rolling_reduce(values: np.ndarray, length: int, ufunc: np.ufunc) -> np.ndarray:
+    # One whole-matrix operation per lag instead of one reduction per window
+    size = values.shape[1]
+    if size < length:
+        return np.full(values.shape, np.nan)
+    out = values[:, length - 1:].astype(float)
+    for lag in range(1, length):
+        ufunc(out, values[:, length - 1 - lag:size - lag], out=out)
+    return _pad_matrix(out, size)
+
+def rolling_max_matrix(values: np.ndarray, length: int) -> np.ndarray:
+    return _rolling_reduce(values, length, np.maximum)
+
+def rolling_min_matrix(values: np.ndarray, length: int) -> np.ndarray:
+    return _rolling_reduce(values, length, np.minimum)
+
+def rolling_std_matrix(values: np.ndarray, length: int) -> np.ndarray:
+    """Population standard deviation over each trailing window, as in bbands"""
+    size = values.shape[1]
+    if size < length:
+        return np.full(values.shape, np.nan)
+    mean = sma_matrix(values, length)[:, length - 1:]
+    squares = np.zeros_like(mean)
+    for lag in range(length):
+        squares += (values[:, length - 1 - lag:size - lag] - mean) ** 2
+    return _pad_matrix(np.sqrt(squares / length), size)
+
+def sma(prices: np.ndarray, length: int) -> Optional[float]:
+    if len(prices) < length:
+        return None
+    return float(prices[-length:].mean())
+
+def ema(prices: np.ndarray, length: int) -> Optional[float]:
+    if len(prices) < length:
+        return None
+    return float(_ema_series(prices, length)[-1])
+
+def rsi(prices: np.ndarray, length: int) -> Optional[float]:
+    if len(prices) <= length:
+        return None
+    return float(rsi_series(prices, length)[-1])
+
+def macd(prices: np.ndarray, fast: int, slow: int, signal: int) -> Optional[Tuple[float, float, float]]:
+    if len(prices) < slow + signal - 1:
+        return None
+    fast_ema = _ema_series(prices, fast)[slow - fast:]
+    line = fast_ema - _ema_series(prices, slow)
+    signal_line = _ema_series(line, signal)[-1]
+    return float(line[-1]), float(signal_line), float(line[-1] - signal_line)
+
+def bbands(prices: np.ndarray, length: int, std: float) -> Optional[Tuple[float, float, float]]:
+    if len(prices) < length:
+        return None
+    window = prices[-length:]
+    middle = window.mean()
+    deviation = std * window.std()
+    return float(middle - deviation), float(middle), float(middle + deviation)
+
+@dataclass(frozen=True)
+class IndicatorDef:
+    """How to compute one indicator: defaults, history needed, and the market-data keys it fills."""
+    func: Callable[..., Any]
+    defaults: Dict[str, Any]
+    lookback: Callable[..., int]
+    outputs: Callable[..., Tuple[str, ...]]
+
+def _suffix(params: Dict[str, Any], defaults: Dict[str, Any]) -> str:
+    # Multi-output indicators keep their historical bare keys (macd, bb_upper, ...) at default params
+    if params == defaults:
+        return ""
+    return "_" + "_".join(f"{value:g}" if isinstance(value, float) else str(value) for value in params.values())
+
+INDICATORS: Dict[str, IndicatorDef] = {
+    "sma": IndicatorDef(sma, {"length": 20}, lambda length: length, lambda length: (f"sma_{length}",)),
+    "ema": IndicatorDef(ema, {"length": 20}, lambda length: length, lambda length: (f"ema_{length}",)),
+    "rsi": IndicatorDef(rsi, {"length": 14}, lambda length: length + 1, lambda length: (f"rsi_{length}",)),
+    "macd": IndicatorDef(
+        macd, {"fast": 12, "slow": 26, "signal": 9}, lambda fast, slow, signal: slow + signal - 1,
+        lambda **p: tuple(f"{key}{_suffix(p, INDICATORS['macd'].defaults)}" for key in ("macd", "macd_signal", "macd_hist"))),
+    "bbands": IndicatorDef(
+        bbands, {"length": 20, "std": 2.0}, lambda length, std: length,
+        lambda **p: tuple(f"{key}{_suffix(p, INDICATORS['bbands'].defaults)}" for key in ("bb_lower", "bb_middle", "bb_upper"))),
+}
+
+@dataclass(frozen=True)
+class IndicatorSpec:
+    """One indicator with fully resolved parameters; equal specs are computed once and shared."""
+    name: str
+    params: Tuple[Tuple[str, Any], ...] = field(default_factory=tuple)
+
+    @property
+    def definition(self) -> IndicatorDef:
+        return INDICATORS[self.name]
+
+    @property
+    def lookback(self) -> int:
+        return self.definition.lookback(**dict(self.params))
+
+    @property
+    def keys(self) -> Tuple[str, ...]:
+        return self.definition.outputs(**dict(self.params))
+
+    @property
+    def key(self) -> str:
+        return self.keys[0]
+
+    def compute(self, prices: np.ndarray) -> Dict[str, float]:
+        value = self.definition.func(prices, **dict(self.params))
+        if value is None:
+            return {}
+        values = value if isinstance(value, tuple) else (value,)
+        return dict(zip(self.keys, values))
+
+def indicator(name: str, **params) -> IndicatorSpec:
+    """Spec for `name` with defaults filled in, e.g. indicator("sma", length=7) or indicator("macd")"""
+    definition = INDICATORS.get(name)
+    if definition is None:
+        raise ValueError(f"Unknown indicator '{name}'")
+    unknown = set(params) - set(definition.defaults)
+    if unknown:
+        raise ValueError(f"Unknown parameters for {name}: {sorted(unknown)}")
+    resolved = {**definition.defaults, **params}
+    # Canonical parameter types so sma(length=20) and sma(length=20.0) share one computation
+    resolved = {key: type(definition.defaults[key])(value) for key, value in resolved.items()}
+    return IndicatorSpec(name, tuple(resolved.items()))
+
+def parse_specs(entries: Iterable[Any]) -> List[IndicatorSpec]:
+    """Specs from config entries: a bare name ("rsi") or a mapping ({name: sma, length: 5})"""
+    specs = []
+    for entry in entries or []:
+        if isinstance(entry, IndicatorSpec):
+            specs.append(entry)
+        elif isinstance(entry, str):
+            specs.append(indicator(entry))
+        else:
+            params = dict(entry)
+            specs.append(indicator(params.pop("name"), **params))
+    return specs
+
+class IndicatorGraph:
+    """Deduplicated indicator requirements per symbol, evaluated lazily once per tick.
+
+    Subscribers (strategies, the collector itself) declare which specs they need
+    on which symbols. Specs requested by several subscribers collapse into one
+    node. `values(symbol, prices, tick)` computes each node at most once per
+    tick; later calls for the same tick are served from the cache, and symbols
+    nobody subscribed to are never computed.
+    """
+
+    def __init__(self):
+        self.subscriptions: Dict[Hashable, Dict[str, Set[IndicatorSpec]]] = {}
+        self._nodes: Dict[str, Set[IndicatorSpec]] = {}
+        self._cache: Dict[Tuple[str, IndicatorSpec], Tuple[Any, Dict[str, float]]] = {}
+        self.stats = {"computed": 0, "cached": 0}
+
+    def subscribe(self, subscriber: Hashable, symbols: Iterable[str], specs: Iterable[IndicatorSpec]):
+        """Replace subscriber's requirements with specs on symbols"""
+        specs = set(specs)
+        self.subscriptions[subscriber] = {symbol: specs for symbol in symbols}
+        self._rebuild()
+
+    def unsubscribe(self, subscriber: Hashable):
+        self.subscriptions.pop(subscriber, None)
+        self._rebuild()
+
+    def _rebuild(self):
+        nodes: Dict[str, Set[IndicatorSpec]] = {}
+        for requirements in self.subscriptions.values():
+            for symbol, specs in requirements.items():
+                nodes.setdefault(symbol, set()).update(specs)
+        self._nodes = nodes
+        self._cache = {key: value for key, value in self._cache.items() if key[1] in nodes.get(key[0], ())}
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._nodes)
+
+    def specs_for(self, symbol: str) -> Set[IndicatorSpec]:
+        return self._nodes.get(symbol, set())
+
+    def lookback(self, symbol: Optional[str] = None) -> int:
+        """History length needed by the most demanding spec (on symbol, or on any symbol)"""
+        nodes = [self.specs_for(symbol)] if symbol else self._nodes.values()
+        return max((spec.lookback for specs in nodes for spec in specs), default=0)
+
+    def values(self, symbol: str, prices: np.ndarray, tick: Any,
+               specs: Optional[Iterable[IndicatorSpec]] = None) -> Dict[str, float]:
+        """Market-data keys for symbol's subscribed specs (or just `specs`) at this tick"""
+        result = {}
+        for spec in (self.specs_for(symbol) if specs is None else specs):
+            cached = self._cache.get((symbol, spec))
+            if cached is not None and cached[0] == tick:
+                self.stats["cached"] += 1
+                result.update(cached[1])
+                continue
+            try:
+                computed = spec.compute(prices)
+            except Exception as e:
+                logger.error(f"Error computing {spec.name}{dict(spec.params)} for {symbol}: {e}")
+                computed = {}
+            self.stats["computed"] += 1
+            self._cache[(symbol, spec)] = (tick, computed)
+            result.update(computed)
+        return result
@@ -1,29 +1,67 @@
 import asyncio
-from typing import Dict, Any, List
+import itertools
+import time
+from typing import Dict, Any, Hashable, Iterable, List
 from datetime import datetime
+import numpy as np
 from ..utils.logger import setup_logger
 from ..utils.helpers import safe_float
-import pandas as pd
-import pandas_ta as ta
+from ..exchanges.models import now_ms
+from .indicators import IndicatorGraph, IndicatorSpec, indicator
 
 logger = setup_logger("market_data_collector")
 
+# Published with every symbol's market data (Redis and the API); strategies subscribe to their own on top
+DEFAULT_INDICATORS = [
+    indicator("sma", length=5), indicator("sma", length=10), indicator("sma", length=20),
+    indicator("rsi", length=14), indicator("macd"), indicator("bbands"),
+]
+
 class MarketDataCollector:
     """Collects and manages market data for small account trading"""
     
-    def __init__(self, storage_manager, database_manager, exchange):
+    def __init__(self, storage_manager, database_manager, exchange, candle_store=None):
         self.storage_manager = storage_manager
         self.database_manager = database_manager
         self.exchange = exchange
+        self.candle_store = candle_store
         self.running = False
         
         # Symbols optimized for $5 account
         self.symbols = ["BTC/USDT", "ETH/USDT", "BNB/USDT"]
         self.update_interval = 30  # 30 seconds
         self.ohlcv_interval = "1m" # 1-minute OHLCV data
+        self.ohlcv_backfill_limit = 1000 # Most bars fetched per poll when catching up on missed ones
         
         self.market_data = {}
         self.price_history = {}
+        self.history_length = 50
+        # Requested indicators per symbol, deduplicated across subscribers and computed once per tick
+        self.indicator_graph = IndicatorGraph()
+        # Per-symbol input version: a global, monotonically increasing sequence number taken on every update
+        self.sequences: Dict[str, int] = {}
+        self._sequence = itertools.count(1)
+        self.history_needs: Dict[Hashable, int] = {}
+        self.subscribe("collector", self.symbols, DEFAULT_INDICATORS)
+
+    def subscribe(self, subscriber: Hashable, symbols: Iterable[str], specs: Iterable[IndicatorSpec], history: int = 0):
+        """Declare the indicators (and raw price history length) a subscriber, e.g. a strategy, needs on its symbols"""
+        symbols = list(symbols)
+        self.indicator_graph.subscribe(subscriber, symbols, specs)
+        self.history_needs[subscriber] = history
+        for symbol in symbols:
+            if symbol not in self.symbols:
+                self.symbols.append(symbol)
+        self._update_history_length()
+
+    def unsubscribe(self, subscriber: Hashable):
+        self.indicator_graph.unsubscribe(subscriber)
+        self.history_needs.pop(subscriber, None)
+        self._update_history_length()
+
+    def _update_history_length(self):
+        # Enough history for the longest lookback anyone asked for
+        self.history_length = max(50, self.indicator_graph.lookback(), *self.history_needs.values())
     
     async def initialize(self):
         """Initialize market data collector"""
@@ -116,9 +154,7 @@ class MarketDataCollector:
         try:
             for symbol in self.symbols:
                 try:
-                    ohlcv = await self.exchange.get_ohlcv(symbol, self.ohlcv_interval, limit=1) # Get latest candle
-                    if ohlcv and len(ohlcv) > 0:
-                        candle = ohlcv[0]
+                    for candle in await self._fetch_closed_bars(symbol):
                         data_to_save = {
                             "timestamp": datetime.fromtimestamp(candle[0] / 1000), # Convert ms to seconds
                             "symbol": symbol,
@@ -135,11 +171,30 @@ class MarketDataCollector:
         except Exception as e:
             logger.error(f"Error in OHLCV data collection: {e}")
     
+    async def _fetch_closed_bars(self, symbol: str) -> List[List[float]]:
+        """Closed bars not stored yet, oldest first, appended to the candle store.
+
+        With a stored history the fetch starts right after its newest bar, so
+        bars missed while polls were late or failing are backfilled instead of
+        skipped. The newest bar returned may still be forming and is left for
+        the next poll.
+        """
+        last_ts = self.candle_store.last_timestamp(symbol, self.ohlcv_interval) if self.candle_store else None
+        if last_ts is None:
+            ohlcv = await self.exchange.get_ohlcv(symbol, self.ohlcv_interval, limit=2)
+        else:
+            ohlcv = await self.exchange.get_ohlcv(symbol, self.ohlcv_interval, limit=self.ohlcv_backfill_limit,
+                                                  since=last_ts + 1)
+        closed = [candle for candle in (ohlcv or [])[:-1] if last_ts is None or candle[0] > last_ts]
+        if self.candle_store and closed:
+            self.candle_store.append_many(symbol, self.ohlcv_interval, closed)
+        return closed
+
     def _process_ticker_data(self, symbol: str, ticker: Dict[str, Any]) -> Dict[str, Any]:
         """Process raw ticker data"""
         current_price = safe_float(ticker.get("price"))
         
-        # Calculate additional metrics
+        # Calculate additional metrics. This dict is the serialized form sent to Redis and the API.
         processed = {
             "symbol": symbol,
             "price": current_price,
@@ -148,35 +203,17 @@ class MarketDataCollector:
             "volume": safe_float(ticker.get("volume")),
             "change": safe_float(ticker.get("change")),
             "percentage": safe_float(ticker.get("percentage")),
-            "timestamp": datetime.utcnow().isoformat(),
-            "last_update": datetime.utcnow().timestamp()
+            "timestamp": ticker.get("timestamp") or now_ms(),
+            "last_update": time.time()
         }
         
         # Add technical indicators for small account
         if symbol in self.price_history:
             history = self.price_history[symbol]
-            prices = pd.Series([item["price"] for item in history])
 
-            if len(prices) >= 20:
+            if len(history) >= 20:
                 processed.update(self._calculate_simple_indicators(history))
-            if len(prices) >= 14: # RSI typically uses 14 periods
-                rsi_data = ta.rsi(prices, length=14)
-                if not rsi_data.empty:
-                    processed["rsi_14"] = rsi_data.iloc[-1]
-            
-            if len(prices) >= 26: # MACD typically uses 12, 26, 9 periods
-                macd_data = ta.macd(prices, fast=12, slow=26, signal=9)
-                if not macd_data.empty:
-                    processed["macd"] = macd_data["MACD_12_26_9"].iloc[-1]
-                    processed["macd_hist"] = macd_data["MACDH_12_26_9"].iloc[-1]
-                    processed["macd_signal"] = macd_data["MACDS_12_26_9"].iloc[-1]
-
-            if len(prices) >= 20: # Bollinger Bands typically use 20 periods
-                bbands_data = ta.bbands(prices, length=20, std=2)
-                if not bbands_data.empty:
-                    processed["bb_lower"] = bbands_data["BBL_20_2.0"].iloc[-1]
-                    processed["bb_middle"] = bbands_data["BBM_20_2.0"].iloc[-1]
-                    processed["bb_upper"] = bbands_data["BBU_20_2.0"].iloc[-1]
+            processed.update(self.get_indicators(symbol))
 
         # Add trading recommendations for small account
         processed["small_account_info"] = self._get_small_account_info(symbol, current_price)
@@ -190,12 +227,30 @@ class MarketDataCollector:
         
         self.price_history[symbol].append({
             "price": price,
-            "timestamp": datetime.utcnow().timestamp()
+            "timestamp": time.time()
         })
         
-        # Keep only last 50 prices (for simple indicators and RSI)
-        if len(self.price_history[symbol]) > 50:
-            self.price_history[symbol] = self.price_history[symbol][-50:]
+        self.sequences[symbol] = next(self._sequence)
+
+        # Keep only as many prices as the subscribed indicators need (at least 50)
+        if len(self.price_history[symbol]) > self.history_length:
+            self.price_history[symbol] = self.price_history[symbol][-self.history_length:]
+
+    def get_indicators(self, symbol: str, specs: Iterable[IndicatorSpec] = None) -> Dict[str, float]:
+        """Indicator values for symbol at the current tick (all subscribed specs by default).
+
+        Values are computed on first request and shared with every later request
+        in the same tick, whichever subscriber makes it.
+        """
+        history = self.price_history.get(symbol)
+        if not history:
+            return {}
+        prices = np.fromiter((item["price"] for item in history), dtype=float, count=len(history))
+        return self.indicator_graph.values(symbol, prices, self.get_sequence(symbol), specs)
+
+    def get_sequence(self, symbol: str) -> int:
+        """Sequence number of symbol's latest market data update (0 before the first); unchanged means unchanged inputs"""
+        return self.sequences.get(symbol, 0)
     
     def _calculate_simple_indicators(self, history: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Calculate simple technical indicators"""
@@ -203,16 +258,6 @@ class MarketDataCollector:
         
         indicators = {}
         
-        # Simple Moving Averages
-        if len(prices) >= 5:
-            indicators["sma_5"] = sum(prices[-5:]) / 5
-        
-        if len(prices) >= 10:
-            indicators["sma_10"] = sum(prices[-10:]) / 10
-        
-        if len(prices) >= 20:
-            indicators["sma_20"] = sum(prices[-20:]) / 20
-        
         # Price trend (simple)
         if len(prices) >= 3:
             recent_avg = sum(prices[-3:]) / 3
@@ -0,0 +1,199 @@
+import asyncio
+import json
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from ..utils.logger import setup_logger
+from ..utils.config import config
+
+logger = setup_logger("trade_journal")
+
+class TradeJournal:
+    """Durable, non-blocking writer of closed trades to the trades table.
+
+    Trades are queued in memory and written by a background task in batches.
+    When the database is unavailable (or the queue is full) they are appended
+    to a local spool file which is replayed once writes succeed again, so the
+    caller never waits on a database commit. Spool file work runs on one
+    dedicated thread, so appends stay ordered and never block the event loop.
+    """
+
+    def __init__(self, database_manager, spool_path: Optional[str] = None, max_queue_size: int = None,
+                 batch_size: int = None, flush_interval: float = None, max_retries: int = None):
+        self.database_manager = database_manager
+        self.spool_path = spool_path or config.get("trading.journal.spool_path", "data/trade_journal.spool")
+        self.replay_path = self.spool_path + ".replay"
+        self.max_queue_size = max_queue_size or config.get("trading.journal.max_queue_size", 1000)
+        self.batch_size = batch_size or config.get("trading.journal.batch_size", 50)
+        self.flush_interval = flush_interval if flush_interval is not None else config.get("trading.journal.flush_interval", 1.0)
+        self.max_retries = max_retries or config.get("trading.journal.max_retries", 3)
+        self.retry_delay = 0.5
+
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self.running = False
+        self._writer_task: Optional[asyncio.Task] = None
+        self.stats = {"written": 0, "spooled": 0, "replayed": 0, "failed_batches": 0}
+        self._spool_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trade-journal-spool")
+
+        spool_dir = os.path.dirname(self.spool_path)
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+
+    async def start(self):
+        """Start the background writer"""
+        if self.running:
+            return
+        self.running = True
+        self._writer_task = asyncio.create_task(self._writer_loop())
+        logger.info(f"Trade journal started (spool: {self.spool_path})")
+
+    def submit(self, trade_data: Dict[str, Any]) -> bool:
+        """Enqueue a closed trade without blocking. Falls back to the spool if the queue is full."""
+        try:
+            self.queue.put_nowait(dict(trade_data))
+            return True
+        except asyncio.QueueFull:
+            logger.warning("Trade journal queue full, spooling trade to disk")
+            self._spool_later([dict(trade_data)])
+            return False
+
+    async def _writer_loop(self):
+        while self.running:
+            try:
+                batch = await self._next_batch()
+                if batch:
+                    await self._write_or_spool(batch)
+                if self._has_spool():
+                    await self._replay_spool()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in trade journal writer loop: {e}")
+                await asyncio.sleep(self.retry_delay)
+
+    async def _next_batch(self) -> List[Dict[str, Any]]:
+        """Wait for one trade, then collect more until the batch is full or flush_interval passes"""
+        try:
+            first = await asyncio.wait_for(self.queue.get(), timeout=self.flush_interval)
+        except asyncio.TimeoutError:
+            return []
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _write_batch(self, batch: List[Dict[str, Any]]) -> bool:
+        """Write a batch with exponential backoff. Returns False if every attempt failed."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries):
+            try:
+                await loop.run_in_executor(None, self.database_manager.add_trades, batch)
+                return True
+            except Exception as e:
+                if attempt < self.max_retries - 1:
+                    wait_time = self.retry_delay * (2 ** attempt)
+                    logger.warning(f"Trade journal write attempt {attempt + 1} failed: {e}. Retrying in {wait_time}s...")
+                    await asyncio.sleep(wait_time)
+                else:
+                    logger.error(f"Trade journal write failed after {self.max_retries} attempts: {e}")
+        self.stats["failed_batches"] += 1
+        return False
+
+    async def _write_or_spool(self, batch: List[Dict[str, Any]]):
+        try:
+            written = await self._write_batch(batch)
+        except asyncio.CancelledError:
+            # Shutting down mid-write: the spool is replayed idempotently on next start
+            self._spool_later(batch)
+            raise
+        if written:
+            self.stats["written"] += len(batch)
+        else:
+            await asyncio.wrap_future(self._spool_later(batch))
+
+    def _spool_later(self, trades: List[Dict[str, Any]]) -> Future:
+        """Queue an append on the spool thread; it runs after every earlier spool operation"""
+        return self._spool_executor.submit(self._spool, trades)
+
+    async def _on_spool_thread(self, func, *args):
+        return await asyncio.wrap_future(self._spool_executor.submit(func, *args))
+
+    def _spool(self, trades: List[Dict[str, Any]]):
+        """Append trades to the spool file and fsync so they survive a crash"""
+        try:
+            with open(self.spool_path, "a") as f:
+                for trade in trades:
+                    f.write(json.dumps(trade, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.stats["spooled"] += len(trades)
+        except OSError as e:
+            logger.critical(f"Could not spool {len(trades)} trades to {self.spool_path}: {e}")
+
+    def _has_spool(self) -> bool:
+        return any(os.path.exists(p) and os.path.getsize(p) > 0 for p in (self.replay_path, self.spool_path))
+
+    @staticmethod
+    def _read_spool_file(path: str) -> List[Dict[str, Any]]:
+        trades = []
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    trades.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write; everything before it is intact
+                    logger.warning(f"Skipping unreadable spool line in {path}")
+        return trades
+
+    async def _replay_spool(self):
+        """Move the spool aside atomically and write it to the database.
+
+        A leftover replay file from a crash during a previous replay is picked up
+        first; duplicates are harmless because add_trades skips known trade ids.
+        """
+        if not os.path.exists(self.replay_path):
+            if not os.path.exists(self.spool_path):
+                return
+            # Behind any queued append, so none can land in the file once it is being replayed
+            await self._on_spool_thread(os.replace, self.spool_path, self.replay_path)
+
+        trades = await self._on_spool_thread(self._read_spool_file, self.replay_path)
+        for start in range(0, len(trades), self.batch_size):
+            if not await self._write_batch(trades[start:start + self.batch_size]):
+                # Database still down; leave the replay file for the next attempt
+                return
+        os.remove(self.replay_path)
+        self.stats["replayed"] += len(trades)
+        if trades:
+            logger.info(f"Replayed {len(trades)} spooled trades into the database")
+
+    async def stop(self):
+        """Stop the writer, flushing queued trades to the database or the spool"""
+        self.running = False
+        if self._writer_task:
+            # Let the in-flight batch finish; wait_for cancels the writer if it overruns
+            try:
+                await asyncio.wait_for(self._writer_task, timeout=self.flush_interval + 10)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            self._writer_task = None
+
+        pending = []
+        while not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+        if pending:
+            await self._write_or_spool(pending)
+        # Spills from submit() may still be queued on the spool thread
+        await self._on_spool_thread(lambda: None)
+        logger.info(f"Trade journal stopped: {self.stats}")
@@ -1,11 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from enum import Enum
 import asyncio
 from ..utils.logger import setup_logger
 
 logger = setup_logger("base_exchange")
 
+# cancel_all() key reporting that the open orders to cancel could not even be listed
+ALL_SYMBOLS = "*"
+
 class OrderType(Enum):
     MARKET = "market"
     LIMIT = "limit"
@@ -30,6 +33,7 @@ class BaseExchange(ABC):
         self.api_key = api_key
         self.api_secret = api_secret
         self.testnet = testnet
+        self.name = type(self).__name__
         self.exchange = None
         self.connected = False
         
@@ -38,6 +42,11 @@ class BaseExchange(ABC):
         self.min_order_size = 0.5
         self.max_total_exposure = 5.0
     
+    @classmethod
+    def from_config(cls, name: str, settings: Dict[str, Any]) -> "BaseExchange":
+        """Build an instance from its `exchanges.<name>` config section"""
+        return cls(settings.get('api_key', ''), settings.get('api_secret', ''), settings.get('testnet', True))
+
     @abstractmethod
     async def initialize(self) -> bool:
         """Initialize exchange connection"""
@@ -55,8 +64,8 @@ class BaseExchange(ABC):
     
     @abstractmethod
     async def place_order(self, symbol: str, side: str, order_type: str, 
-                         amount: float, price: float = None) -> Dict[str, Any]:
-        """Place an order"""
+                         amount: float, price: float = None, client_order_id: str = None) -> Dict[str, Any]:
+        """Place an order, tagged with `client_order_id` if given so it can be found again by find_order"""
         pass
     
     @abstractmethod
@@ -69,6 +78,10 @@ class BaseExchange(ABC):
         """Get order status"""
         pass
     
+    async def find_order(self, client_order_id: str, symbol: str) -> Optional[Dict[str, Any]]:
+        """Order placed with `client_order_id`, or None if the exchange has none. Raises if it cannot tell."""
+        raise NotImplementedError(f"{self.name} cannot look orders up by client order id")
+
     @abstractmethod
     async def get_open_orders(self, symbol: str = None) -> List[Dict[str, Any]]:
         """Get open orders"""
@@ -80,10 +93,62 @@ class BaseExchange(ABC):
         pass
     
     @abstractmethod
-    async def get_ohlcv(self, symbol: str, timeframe: str = "1m", limit: int = 100) -> List[List[float]]:
-        """Get OHLCV data for symbol"""
+    async def get_ohlcv(self, symbol: str, timeframe: str = "1m", limit: int = 100,
+                        since: Optional[int] = None) -> List[List[float]]:
+        """Get OHLCV data for symbol: the latest `limit` bars, or up to `limit` bars from `since` (ms) on"""
         pass
     
+    async def place_orders(self, orders: List[Dict[str, Any]], max_concurrency: int = 5) -> List["Order"]:
+        """Place several orders concurrently.
+
+        Each entry holds place_order keyword arguments (symbol, side, order_type,
+        amount, price). Results are returned in input order, one per order; a
+        failed order yields a rejected result instead of failing the batch.
+        """
+        from .models import Order  # models builds on this module's enums
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def place(spec: Dict[str, Any]) -> Order:
+            async with semaphore:
+                try:
+                    return await self.place_order(**spec)
+                except Exception as e:
+                    logger.error(f"Error placing order {spec}: {e}")
+                    return Order.rejected(str(e), spec['symbol'])
+
+        return list(await asyncio.gather(*(place(spec) for spec in orders)))
+
+    async def cancel_orders(self, orders: List[Tuple[str, str]], max_concurrency: int = 5) -> List[bool]:
+        """Cancel several (order_id, symbol) pairs concurrently. Returns one flag per order, in input order."""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def cancel(order_id: str, symbol: str) -> bool:
+            async with semaphore:
+                try:
+                    return await self.cancel_order(order_id, symbol)
+                except Exception as e:
+                    logger.error(f"Error cancelling order {order_id} for {symbol}: {e}")
+                    return False
+
+        return list(await asyncio.gather(*(cancel(order_id, symbol) for order_id, symbol in orders)))
+
+    async def cancel_all(self, symbol: str = None) -> Dict[str, bool]:
+        """Cancel every open order (for one symbol or all). Returns per-symbol success.
+
+        Adapters that can tell a failed listing of the open orders from an empty
+        one report it as {symbol: False}, or {ALL_SYMBOLS: False} without a
+        symbol, rather than as an empty success.
+        """
+        return await self._cancel_each(symbol, await self.get_open_orders(symbol))
+
+    async def _cancel_each(self, symbol: Optional[str], open_orders: List[Dict[str, Any]]) -> Dict[str, bool]:
+        results = await self.cancel_orders([(o['id'], o['symbol']) for o in open_orders])
+        by_symbol: Dict[str, bool] = {symbol: True} if symbol else {}
+        for order, cancelled in zip(open_orders, results):
+            by_symbol[order['symbol']] = by_symbol.get(order['symbol'], True) and cancelled
+        return by_symbol
+
     def validate_order_size(self, amount_usd: float) -> bool:
         """Validate order size for $5 account"""
         if amount_usd < self.min_order_size:
@@ -0,0 +1,446 @@
+import asyncio
+import ccxt.async_support as ccxt
+from typing import Dict, Any, List, Optional, Tuple
+from .base_exchange import BaseExchange, OrderType, OrderSide, OrderStatus, ALL_SYMBOLS
+from .markets_cache import MarketsCache, markets_etag
+from .models import Ticker, Order, Position, now_ms
+from .request_coalescer import RequestCoalescer
+from .rate_limiter import WeightedRateLimiter, Priority
+from .resilience import ResilientCaller, CircuitOpenError
+from ..utils.logger import setup_logger
+from ..utils.config import config
+from ..utils.helpers import safe_float
+
+logger = setup_logger('ccxt_exchange')
+
+def order_outcome_unknown(error: Exception) -> bool:
+    """Whether an order request that failed with `error` may still have been executed.
+
+    The exchange refusing the order, throttling it (429/418) or the breaker
+    never sending it are definite; timeouts and dropped connections are not.
+    """
+    return not isinstance(error, (ccxt.ExchangeError, ccxt.DDoSProtection, CircuitOpenError))
+
+class CcxtExchange(BaseExchange):
+    """Generic adapter for any ccxt exchange, configured by its `exchanges.<name>` settings.
+
+    Reads go through the request coalescer and the resilience layer; orders
+    through the resilience layer only. A venue-specific rate limiter may be
+    supplied, otherwise ccxt's own throttle is used.
+    """
+
+    # Per-request limits of the venue's batch endpoints, when it has them
+    max_batch_orders = 5
+    max_batch_cancels = 10
+
+    def __init__(self, exchange_id: str, api_key: str = "", api_secret: str = "", testnet: bool = True,
+                 settings: Optional[Dict[str, Any]] = None, markets_cache: MarketsCache = None,
+                 rate_limiter: WeightedRateLimiter = None, resilience: ResilientCaller = None):
+        super().__init__(api_key, api_secret, testnet)
+        self.settings = settings or {}
+        self.name = self.settings.get('name', exchange_id)
+        self.exchange_id = exchange_id
+        self.exchange_class = getattr(ccxt, self.exchange_id)
+        self.exchange = None
+        self.quote_currency = self.settings.get('quote_currency', 'USDT')
+        self.markets_cache = markets_cache or MarketsCache(
+            self.settings.get('markets_cache_path', f"data/markets_cache_{exchange_id}.json"))
+        self.markets_etag = None
+        self._markets_refresh_task = None
+        # Read-only endpoints share in-flight requests and keep results for a short TTL (seconds)
+        self.coalescer = RequestCoalescer(self.settings.get("cache_ttl", {
+            "balance": 2.0,
+            "ticker": 1.0,
+            "ohlcv": 5.0,
+            "open_orders": 1.0,
+            "order": 0.0,
+        }))
+        self.rate_limiter = rate_limiter
+        # Deadlines, jittered retries, hedged reads and circuit breakers per endpoint
+        self.resilience = resilience or ResilientCaller(retryable=(ccxt.NetworkError,), throttled=(ccxt.DDoSProtection,),
+                                                         **self.settings.get("resilience", {}))
+
+    @classmethod
+    def from_config(cls, name: str, settings: Dict[str, Any]) -> "CcxtExchange":
+        return cls(settings.get('ccxt_id', name), settings.get('api_key', ''), settings.get('api_secret', ''),
+                   settings.get('testnet', True), settings={**settings, 'name': name})
+
+    def _ccxt_config(self) -> Dict[str, Any]:
+        return {
+            'apiKey': self.api_key,
+            'secret': self.api_secret,
+            'enableRateLimit': self.rate_limiter is None,
+            'options': self.settings.get('options', {}),
+        }
+
+    async def initialize(self) -> bool:
+        """Create the ccxt client and load markets (from the on-disk cache when possible)"""
+        try:
+            self.exchange = self.exchange_class(self._ccxt_config())
+
+            if self.testnet:
+                self.exchange.set_sandbox_mode(True)
+
+            cached = self.markets_cache.load(self._markets_version_key())
+            if cached:
+                # Serve precision/limits from disk immediately and refresh off the startup path
+                self.exchange.set_markets(cached["markets"], cached.get("currencies") or None)
+                self.markets_etag = cached.get("etag")
+                logger.info(f"Loaded {len(cached['markets'])} {self.name} markets from cache (fresh: {cached['is_fresh']})")
+            else:
+                await self._refresh_markets()
+
+            self._markets_refresh_task = asyncio.create_task(
+                self._markets_refresh_loop(refresh_now=bool(cached) and not cached["is_fresh"])
+            )
+            self.connected = True
+            logger.info(f"Connected to {self.name}: {self.exchange.id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to connect to {self.name}: {e}")
+            self.connected = False
+            return False
+
+    def _markets_version_key(self) -> str:
+        return MarketsCache.version_key(self.exchange_id, getattr(ccxt, '__version__', 'unknown'), self.testnet)
+
+    async def _refresh_markets(self) -> bool:
+        """Download markets and update the cache. Returns True if the payload changed."""
+        markets = await self._limited('load_markets', lambda: self.exchange.load_markets(reload=True))
+        version_key = self._markets_version_key()
+        etag = markets_etag(markets)
+        if etag == self.markets_etag:
+            self.markets_cache.touch(version_key)
+            return False
+        self.markets_cache.save(version_key, markets, getattr(self.exchange, 'currencies', None), etag)
+        self.markets_etag = etag
+        logger.info(f"Markets cache refreshed ({len(markets)} markets)")
+        return True
+
+    async def _markets_refresh_loop(self, refresh_now: bool = False):
+        """Keep cached markets current in the background"""
+        delay = 0 if refresh_now else self.markets_cache.ttl
+        while True:
+            try:
+                await asyncio.sleep(delay)
+                await self._refresh_markets()
+                delay = self.markets_cache.ttl
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning(f"Background markets refresh failed: {e}")
+                delay = min(self.markets_cache.ttl, 300)
+
+    def get_market_precision(self, symbol: str) -> Dict[str, Any]:
+        """Amount/price precision for symbol from cached markets metadata"""
+        market = (self.exchange.markets or {}).get(symbol) if self.exchange else None
+        return market.get('precision', {}) if market else {}
+
+    def get_market_limits(self, symbol: str) -> Dict[str, Any]:
+        """Amount/cost limits for symbol from cached markets metadata"""
+        market = (self.exchange.markets or {}).get(symbol) if self.exchange else None
+        return market.get('limits', {}) if market else {}
+
+    def _retry_after(self) -> Optional[float]:
+        headers = getattr(self.exchange, 'last_response_headers', None) or {}
+        for name, value in headers.items():
+            if str(name).lower() == 'retry-after':
+                return safe_float(value) or None
+        return None
+
+    async def _acquire(self, endpoint: str, priority: Priority = Priority.MARKET_DATA, weight: int = None,
+                       orders: int = 0, **weight_params):
+        """Wait until the weighted rate limiter, if there is one, admits the request"""
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(endpoint, weight, priority, orders, **weight_params)
+
+    async def _send(self, func):
+        """Run one exchange request, feeding its rate-limit response back to the limiter"""
+        if self.rate_limiter is None:
+            return await func()
+        try:
+            return await func()
+        except ccxt.DDoSProtection:
+            # 429/418 (RateLimitExceeded is a subclass); back off before anything else goes out
+            self.rate_limiter.on_rate_limit_error(self._retry_after())
+            raise
+        finally:
+            self.rate_limiter.update_from_headers(getattr(self.exchange, 'last_response_headers', None))
+
+    async def _limited(self, endpoint: str, func, priority: Priority = Priority.MARKET_DATA,
+                       weight: int = None, orders: int = 0, **weight_params):
+        """Run one exchange request under the weighted rate limiter, if there is one"""
+        await self._acquire(endpoint, priority, weight, orders, **weight_params)
+        return await self._send(func)
+
+    async def _read(self, endpoint: str, key, func, priority: Priority = Priority.MARKET_DATA, **weight_params):
+        """Run a read-only exchange call through the coalescer and rate limiter with retries.
+
+        Waiting on the rate limiter happens outside the call's breaker accounting.
+        """
+        return await self.coalescer.call(
+            endpoint, key, lambda: self.resilience.call(endpoint, lambda: self._send(func),
+                                                        acquire=lambda: self._acquire(endpoint, priority, **weight_params))
+        )
+
+    async def _write(self, endpoint: str, func, retry_on=(ccxt.DDoSProtection,), **limit_params):
+        """Run an order-path call. Never hedged; by default retried only when the exchange
+        throttled the request before executing it, since a timed-out order may have been placed."""
+        return await self.resilience.call(endpoint, lambda: self._send(func), idempotent=False, retry_on=retry_on,
+                                          acquire=lambda: self._acquire(endpoint, Priority.ORDER, **limit_params))
+
+    async def get_balance(self) -> Dict[str, float]:
+        """Get account balance"""
+        if not self.connected:
+            return {}
+
+        try:
+            balance = await self._read('balance', None, lambda: self.exchange.fetch_balance(), Priority.ACCOUNT)
+
+            # For a $5 account, we only care about the quote currency
+            free = safe_float(balance.get(self.quote_currency, {}).get('free', 0.0))
+            return {self.quote_currency: free, "total": free}
+
+        except Exception as e:
+            logger.error(f"Error getting balance from {self.name}: {e}")
+            return {}
+
+    async def get_ticker(self, symbol: str) -> Dict[str, Any]:
+        """Get ticker data for symbol"""
+        if not self.connected:
+            return {}
+
+        try:
+            ticker = await self._read('ticker', symbol, lambda: self.exchange.fetch_ticker(symbol))
+            return Ticker.from_ccxt(ticker)
+        except Exception as e:
+            logger.error(f"Error getting ticker for {symbol} from {self.name}: {e}")
+            return {}
+
+    async def place_order(self, symbol: str, side: str, order_type: str,
+                         amount: float, price: float = None, client_order_id: str = None) -> Order:
+        """Place an order.
+
+        Failures come back as rejections; one that may have happened after the
+        exchange accepted the order is flagged `outcome_unknown` (see find_order).
+        """
+        if not self.connected:
+            return Order.rejected("Not connected to exchange", symbol)
+
+        if not self.validate_order_size(amount * (price if price else 1)): # Validate USD value
+            return Order.rejected("Order size validation failed", symbol)
+
+        params = {'clientOrderId': client_order_id} if client_order_id else {}
+        try:
+            order = None
+            if order_type == OrderType.MARKET.value:
+                order = await self._write('create_order', lambda: self.exchange.create_market_order(symbol, side, amount,
+                                                                                                    params=params), orders=1)
+            elif order_type == OrderType.LIMIT.value and price:
+                order = await self._write('create_order', lambda: self.exchange.create_limit_order(symbol, side, amount, price,
+                                                                                                   params=params), orders=1)
+            else:
+                logger.warning(f"Unsupported order type or missing price for limit order: {order_type}")
+                return Order.rejected("Unsupported order type", symbol)
+
+            # Account state changed; do not serve balances or open orders from before this order
+            self.coalescer.invalidate('balance', 'open_orders')
+
+            return Order.from_ccxt(order)
+        except Exception as e:
+            logger.error(f"Error placing order on {self.name}: {e}")
+            return Order.rejected(str(e), symbol, outcome_unknown=order_outcome_unknown(e))
+
+    async def find_order(self, client_order_id: str, symbol: str) -> Optional[Order]:
+        """Order placed with `client_order_id`, or None if the exchange has none. Raises if it cannot tell."""
+        try:
+            order = await self._read('order', (client_order_id, symbol),
+                                     lambda: self.exchange.fetch_order(None, symbol, {'clientOrderId': client_order_id}),
+                                     Priority.ACCOUNT)
+        except ccxt.OrderNotFound:
+            return None
+        return Order.from_ccxt(order)
+
+    async def cancel_order(self, order_id: str, symbol: str) -> bool:
+        """Cancel an order"""
+        if not self.connected:
+            return False
+
+        try:
+            # Repeating a cancel is harmless, so network errors are retried too
+            await self._write('cancel_order', lambda: self.exchange.cancel_order(order_id, symbol), retry_on=(ccxt.NetworkError,))
+            self.coalescer.invalidate('balance', 'open_orders', 'order')
+            logger.info(f"Order {order_id} for {symbol} cancelled on {self.name}")
+            return True
+        except Exception as e:
+            logger.error(f"Error cancelling order {order_id} for {symbol} on {self.name}: {e}")
+            return False
+
+    async def place_orders(self, orders: List[Dict[str, Any]], max_concurrency: int = 5) -> List[Order]:
+        """Place several orders using the venue's batch endpoint, max_batch_orders per request.
+
+        Chunks are sent concurrently. Batches are not retried: a resend after a
+        timeout could duplicate legs that were accepted, so failures come back
+        as per-order rejections for the caller to reconcile.
+        """
+        if not self.connected:
+            return [Order.rejected("Not connected to exchange", spec['symbol']) for spec in orders]
+        if not self.exchange.has.get('createOrders'):
+            return await super().place_orders(orders, max_concurrency)
+
+        results: List[Optional[Order]] = [None] * len(orders)
+        batch = []
+        for index, spec in enumerate(orders):
+            order_type, price = spec.get('order_type'), spec.get('price')
+            if not self.validate_order_size(spec['amount'] * (price if price else 1)):
+                results[index] = Order.rejected("Order size validation failed", spec['symbol'])
+            elif order_type not in (OrderType.MARKET.value, OrderType.LIMIT.value) or (order_type == OrderType.LIMIT.value and not price):
+                results[index] = Order.rejected("Unsupported order type", spec['symbol'])
+            else:
+                batch.append((index, {'symbol': spec['symbol'], 'type': order_type, 'side': spec['side'],
+                                      'amount': spec['amount'], 'price': price}))
+
+        async def send(chunk: List[Tuple[int, Dict[str, Any]]]):
+            requests = [request for _, request in chunk]
+            try:
+                placed = await self._write('create_orders', lambda: self.exchange.create_orders(requests), orders=len(requests))
+            except Exception as e:
+                logger.error(f"Error placing batch of {len(requests)} orders on {self.name}: {e}")
+                for index, _ in chunk:
+                    results[index] = Order.rejected(str(e), orders[index]['symbol'], outcome_unknown=order_outcome_unknown(e))
+                return
+            for (index, _), order in zip(chunk, placed):
+                # Rejected legs come back without an id and carry the exchange error in 'info'
+                results[index] = Order.from_ccxt(order) if order.get('id') else Order.rejected(
+                    str(order.get('info')), orders[index]['symbol'])
+
+        chunks = [batch[i:i + self.max_batch_orders] for i in range(0, len(batch), self.max_batch_orders)]
+        await asyncio.gather(*(send(chunk) for chunk in chunks))
+        if batch:
+            self.coalescer.invalidate('balance', 'open_orders')
+        return results
+
+    async def cancel_orders(self, orders: List[Tuple[str, str]], max_concurrency: int = 5) -> List[bool]:
+        """Cancel several orders using the per-symbol batch cancel endpoint"""
+        if not self.connected:
+            return [False] * len(orders)
+        if not self.exchange.has.get('cancelOrders'):
+            return await super().cancel_orders(orders, max_concurrency)
+
+        results = [False] * len(orders)
+        by_symbol: Dict[str, List[int]] = {}
+        for index, (_, symbol) in enumerate(orders):
+            by_symbol.setdefault(symbol, []).append(index)
+
+        async def send(symbol: str, indices: List[int]):
+            ids = [orders[i][0] for i in indices]
+            try:
+                cancelled = await self._write('cancel_orders', lambda: self.exchange.cancel_orders(ids, symbol),
+                                              retry_on=(ccxt.NetworkError,))
+            except Exception as e:
+                logger.error(f"Error cancelling {len(ids)} orders for {symbol} on {self.name}: {e}")
+                return
+            cancelled_ids = {str(order.get('id')) for order in cancelled if order.get('id')}
+            for i in indices:
+                results[i] = str(orders[i][0]) in cancelled_ids
+
+        await asyncio.gather(*(send(symbol, indices[i:i + self.max_batch_cancels])
+                               for symbol, indices in by_symbol.items()
+                               for i in range(0, len(indices), self.max_batch_cancels)))
+        self.coalescer.invalidate('balance', 'open_orders', 'order')
+        return results
+
+    async def cancel_all(self, symbol: str = None) -> Dict[str, bool]:
+        """Cancel all open orders with one request per symbol"""
+        if not self.connected:
+            return {symbol or ALL_SYMBOLS: False}
+        batch_cancel = self.exchange.has.get('cancelAllOrders')
+        try:
+            open_orders = [] if symbol and batch_cancel else await self._fetch_open_orders(symbol)
+        except Exception as e:
+            logger.error(f"Error listing open orders to cancel on {self.name}: {e}")
+            return {symbol or ALL_SYMBOLS: False}
+        if not batch_cancel:
+            return await self._cancel_each(symbol, open_orders)
+        symbols = [symbol] if symbol else sorted({o['symbol'] for o in open_orders})
+
+        async def cancel_symbol(sym: str) -> bool:
+            try:
+                await self._write('cancel_all', lambda: self.exchange.cancel_all_orders(sym), retry_on=(ccxt.NetworkError,))
+                return True
+            except Exception as e:
+                logger.error(f"Error cancelling all orders for {sym} on {self.name}: {e}")
+                return False
+
+        results = await asyncio.gather(*(cancel_symbol(sym) for sym in symbols))
+        self.coalescer.invalidate('balance', 'open_orders', 'order')
+        return dict(zip(symbols, results))
+
+    async def get_order_status(self, order_id: str, symbol: str) -> Order:
+        """Get order status"""
+        if not self.connected:
+            return Order.rejected("Not connected to exchange", symbol)
+
+        try:
+            order = await self._read('order', (order_id, symbol), lambda: self.exchange.fetch_order(order_id, symbol), Priority.ACCOUNT)
+            return Order.from_ccxt(order)
+        except Exception as e:
+            logger.error(f"Error getting order status for {order_id} on {self.name}: {e}")
+            return Order.rejected(str(e), symbol)
+
+    async def get_open_orders(self, symbol: str = None) -> List[Order]:
+        """Get open orders"""
+        if not self.connected:
+            return []
+
+        try:
+            return await self._fetch_open_orders(symbol)
+        except Exception as e:
+            logger.error(f"Error getting open orders from {self.name}: {e}")
+            return []
+
+    async def _fetch_open_orders(self, symbol: Optional[str]) -> List[Order]:
+        orders = await self._read('open_orders', symbol, lambda: self.exchange.fetch_open_orders(symbol),
+                                  Priority.ACCOUNT, symbol=symbol)
+        return [Order.from_ccxt(order) for order in orders]
+
+    async def get_positions(self) -> List[Position]:
+        """Get open positions (derivatives venues only)"""
+        if not self.connected or not self.exchange.has.get('fetchPositions'):
+            return []
+
+        try:
+            positions = await self._read('positions', None, lambda: self.exchange.fetch_positions(), Priority.ACCOUNT)
+            return [Position(p['symbol'], p.get('side') or 'long', safe_float(p.get('contracts')),
+                             safe_float(p.get('entryPrice')), safe_float(p.get('markPrice')),
+                             safe_float(p.get('unrealizedPnl')), timestamp=p.get('timestamp') or now_ms())
+                    for p in positions if safe_float(p.get('contracts')) != 0]
+        except Exception as e:
+            logger.error(f"Error getting positions from {self.name}: {e}")
+            return []
+
+    async def get_ohlcv(self, symbol: str, timeframe: str = "1m", limit: int = 100,
+                        since: Optional[int] = None) -> List[List[float]]:
+        """Get OHLCV data for symbol: the latest `limit` bars, or up to `limit` bars from `since` (ms) on"""
+        if not self.connected:
+            return []
+
+        try:
+            ohlcv = await self._read('ohlcv', (symbol, timeframe, limit, since),
+                                     lambda: self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit),
+                                     limit=limit)
+            return ohlcv
+        except Exception as e:
+            logger.error(f"Error getting OHLCV data for {symbol} from {self.name}: {e}")
+            return []
+
+    async def cleanup(self):
+        """Cleanup resources"""
+        if self._markets_refresh_task:
+            self._markets_refresh_task.cancel()
+        if self.exchange:
+            await self.exchange.close()
+            logger.info(f"{self.name} connection closed")
+
+
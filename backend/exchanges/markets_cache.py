@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Any, Optional
+from ..utils.logger import setup_logger
+from ..utils.config import config
+
+logger = setup_logger("markets_cache")
+
+CACHE_FORMAT_VERSION = 1
+
+def markets_etag(markets: Dict[str, Any]) -> str:
+    """Content hash of a markets payload, used to detect whether a refresh changed anything"""
+    payload = json.dumps(markets, sort_keys=True, default=str).encode()
+    return hashlib.sha256(payload).hexdigest()
+
+class MarketsCache:
+    """On-disk cache of exchange markets/currencies metadata.
+
+    Entries carry a version key (cache format, ccxt version, exchange and
+    endpoint mode) and an etag of the markets payload. An entry with a
+    different version key is ignored; an entry older than the TTL is still
+    usable but reported as stale so the caller can refresh it in the background.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = None):
+        self.path = path or config.get("exchanges.markets_cache.path", "data/markets_cache.json")
+        self.ttl = ttl if ttl is not None else config.get("exchanges.markets_cache.ttl", 86400)
+        cache_dir = os.path.dirname(self.path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def version_key(exchange_id: str, ccxt_version: str, testnet: bool) -> str:
+        return f"{CACHE_FORMAT_VERSION}:{exchange_id}:{ccxt_version}:{'testnet' if testnet else 'live'}"
+
+    def load(self, version_key: str) -> Optional[Dict[str, Any]]:
+        """Load a cache entry matching version_key. Adds an 'is_fresh' flag; None if unusable."""
+        try:
+            with open(self.path) as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable markets cache {self.path}: {e}")
+            return None
+
+        if entry.get("version") != version_key or not entry.get("markets"):
+            logger.info("Markets cache version mismatch, ignoring cached markets")
+            return None
+
+        entry["is_fresh"] = (time.time() - entry.get("saved_at", 0)) < self.ttl
+        return entry
+
+    def save(self, version_key: str, markets: Dict[str, Any], currencies: Optional[Dict[str, Any]] = None,
+             etag: Optional[str] = None) -> str:
+        """Atomically write markets metadata. Returns the etag of the stored payload."""
+        etag = etag or markets_etag(markets)
+        entry = {
+            "version": version_key,
+            "saved_at": time.time(),
+            "etag": etag,
+            "markets": markets,
+            "currencies": currencies or {},
+        }
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f, default=str)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"Error writing markets cache {self.path}: {e}")
+        return etag
+
+    def touch(self, version_key: str) -> bool:
+        """Mark an unchanged entry as fresh without rewriting the payload"""
+        entry = self.load(version_key)
+        if not entry:
+            return False
+        entry.pop("is_fresh", None)
+        self.save(version_key, entry["markets"], entry.get("currencies"), entry.get("etag"))
+        return True
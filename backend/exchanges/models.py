@@ -0,0 +1,114 @@
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Any, Optional
+from .base_exchange import OrderStatus
+from ..utils.helpers import safe_float
+
+# ccxt unified order statuses mapped onto ours; ccxt reports a filled order as 'closed'
+CCXT_ORDER_STATUSES = {
+    "open": OrderStatus.OPEN.value,
+    "closed": OrderStatus.FILLED.value,
+    "canceled": OrderStatus.CANCELLED.value,
+    "expired": OrderStatus.CANCELLED.value,
+    "rejected": OrderStatus.REJECTED.value,
+}
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+class _Model:
+    """Read/write item access so call sites written against the old dict payloads keep working"""
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: Any):
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+@dataclass(slots=True)
+class Ticker(_Model):
+    symbol: str
+    price: float
+    bid: float
+    ask: float
+    volume: float
+    change: float
+    percentage: float
+    timestamp: int
+
+    @classmethod
+    def from_ccxt(cls, ticker: Dict[str, Any]) -> "Ticker":
+        return cls(ticker['symbol'], safe_float(ticker['last']), safe_float(ticker['bid']), safe_float(ticker['ask']),
+                   safe_float(ticker['quoteVolume']), safe_float(ticker['change']), safe_float(ticker['percentage']),
+                   ticker['timestamp'] or now_ms())
+
+@dataclass(slots=True)
+class Order(_Model):
+    id: Optional[str]
+    symbol: Optional[str]
+    type: Optional[str]
+    side: Optional[str]
+    amount: float
+    price: float
+    filled: float
+    remaining: float
+    status: str
+    timestamp: int
+    info: Optional[str] = None
+    # Set on a failure that may have happened after the exchange accepted the order (timeout, dropped connection)
+    outcome_unknown: bool = False
+
+    @classmethod
+    def from_ccxt(cls, order: Dict[str, Any]) -> "Order":
+        status = str(order['status'] or '').lower()
+        return cls(order['id'], order['symbol'], order['type'], order['side'], safe_float(order['amount']),
+                   safe_float(order['price']), safe_float(order['filled']), safe_float(order['remaining']),
+                   CCXT_ORDER_STATUSES.get(status, status), order['timestamp'] or now_ms())
+
+    @classmethod
+    def rejected(cls, info: str, symbol: Optional[str] = None, outcome_unknown: bool = False) -> "Order":
+        return cls(None, symbol, None, None, 0.0, 0.0, 0.0, 0.0, OrderStatus.REJECTED.value, now_ms(), info,
+                   outcome_unknown)
+
+@dataclass(slots=True)
+class Position(_Model):
+    symbol: str
+    side: str
+    amount: float
+    entry_price: float
+    current_price: float = 0.0
+    unrealized_pnl: float = 0.0
+    order_id: Optional[str] = None
+    timestamp: int = 0
+
+@dataclass(slots=True)
+class Trade(_Model):
+    id: str
+    symbol: str
+    side: str
+    amount: float
+    entry_price: float
+    exit_price: float
+    realized_pnl: float
+    timestamp: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Persisted trades (Redis, trades table, journal spool) keep ISO timestamps
+        data = _Model.to_dict(self)
+        data['timestamp'] = datetime.utcfromtimestamp(self.timestamp / 1000).isoformat()
+        return data
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from .base_exchange import BaseExchange, OrderSide
+from .models import Order
+from ..utils.logger import setup_logger
+from ..utils.helpers import safe_float
+
+logger = setup_logger("quote_aggregator")
+
+class QuoteAggregator:
+    """Consolidated top-of-book across venues, and routing to the best one.
+
+    `refresh` asks every venue for its ticker concurrently, each bounded by
+    `timeout`, and keeps the latest bid/ask per venue alongside an EWMA of how
+    long that venue takes to answer. Quotes older than `max_age` seconds are
+    ignored. A venue's effective price is its touch adjusted by its taker fee;
+    venues within `price_tolerance_bps` of the best effective price count as
+    equally good and the fastest of them wins.
+    """
+
+    def __init__(self, exchanges: Dict[str, BaseExchange], timeout: float = 2.0,
+                 fee_rates: Optional[Dict[str, float]] = None, price_tolerance_bps: float = 1.0,
+                 max_age: float = 5.0, latency_alpha: float = 0.2, default_fee: float = 0.001):
+        self.exchanges = exchanges
+        self.timeout = timeout
+        self.fee_rates = dict(fee_rates or {})
+        self.price_tolerance_bps = price_tolerance_bps
+        self.max_age = max_age
+        self.latency_alpha = latency_alpha
+        self.default_fee = default_fee
+        # symbol -> venue -> {"bid", "ask", "received_at"}
+        self.quotes: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self.latency_ms: Dict[str, float] = {}
+        self.errors: Dict[str, int] = {name: 0 for name in exchanges}
+        self._task: Optional[asyncio.Task] = None
+
+    def fee_rate(self, venue: str) -> float:
+        if venue in self.fee_rates:
+            return self.fee_rates[venue]
+        return getattr(self.exchanges[venue], 'taker_fee', self.default_fee)
+
+    def _observe_latency(self, venue: str, latency_ms: float):
+        previous = self.latency_ms.get(venue)
+        self.latency_ms[venue] = latency_ms if previous is None else \
+            previous + self.latency_alpha * (latency_ms - previous)
+
+    async def _fetch(self, venue: str, exchange: BaseExchange, symbol: str):
+        started = time.perf_counter()
+        try:
+            ticker = await asyncio.wait_for(exchange.get_ticker(symbol), self.timeout)
+        except Exception as e:
+            # A venue that times out or errors is as slow as the timeout for routing purposes
+            self._observe_latency(venue, self.timeout * 1000)
+            self.errors[venue] = self.errors.get(venue, 0) + 1
+            self.quotes.get(symbol, {}).pop(venue, None)
+            logger.warning(f"No quote for {symbol} from {venue}: {type(e).__name__}: {e}")
+            return
+        self._observe_latency(venue, (time.perf_counter() - started) * 1000)
+
+        bid, ask = safe_float(ticker.get('bid')), safe_float(ticker.get('ask'))
+        if bid <= 0 or ask <= 0:
+            self.quotes.get(symbol, {}).pop(venue, None)
+            return
+        self.quotes.setdefault(symbol, {})[venue] = {"bid": bid, "ask": ask, "received_at": time.monotonic()}
+
+    async def refresh(self, symbol: str) -> Dict[str, Any]:
+        """Fetch every venue's quote for symbol concurrently and return the consolidated book"""
+        await asyncio.gather(*(self._fetch(venue, exchange, symbol) for venue, exchange in self.exchanges.items()))
+        return self.top_of_book(symbol)
+
+    def _fresh_quotes(self, symbol: str) -> Dict[str, Dict[str, float]]:
+        cutoff = time.monotonic() - self.max_age
+        return {venue: quote for venue, quote in self.quotes.get(symbol, {}).items() if quote["received_at"] >= cutoff}
+
+    def top_of_book(self, symbol: str) -> Dict[str, Any]:
+        """Best bid and best ask across venues from the latest fresh quotes"""
+        quotes = self._fresh_quotes(symbol)
+        if not quotes:
+            return {}
+        bid_venue = max(quotes, key=lambda venue: quotes[venue]["bid"])
+        ask_venue = min(quotes, key=lambda venue: quotes[venue]["ask"])
+        bid, ask = quotes[bid_venue]["bid"], quotes[ask_venue]["ask"]
+        return {
+            "symbol": symbol,
+            "bid": bid,
+            "bid_venue": bid_venue,
+            "ask": ask,
+            "ask_venue": ask_venue,
+            "spread": ask - bid,
+            "venues": {venue: {"bid": q["bid"], "ask": q["ask"], "latency_ms": self.latency_ms.get(venue)}
+                       for venue, q in quotes.items()},
+        }
+
+    def rank_venues(self, symbol: str, side: str) -> List[Tuple[str, float]]:
+        """Venues ordered best first as (venue, fee-adjusted price); near-ties go to the faster venue"""
+        quotes = self._fresh_quotes(symbol)
+        if not quotes:
+            return []
+        buying = side == OrderSide.BUY.value
+        effective = {
+            venue: q["ask"] * (1 + self.fee_rate(venue)) if buying else q["bid"] * (1 - self.fee_rate(venue))
+            for venue, q in quotes.items()
+        }
+        best = min(effective.values()) if buying else max(effective.values())
+        tolerance = best * self.price_tolerance_bps / 10000
+
+        def sort_key(venue):
+            price = effective[venue]
+            within = abs(price - best) <= tolerance
+            # Venues within tolerance sort together by latency, the rest by price
+            return (not within, self.latency_ms.get(venue, float('inf')) if within else 0.0,
+                    price if buying else -price)
+
+        return [(venue, effective[venue]) for venue in sorted(effective, key=sort_key)]
+
+    def best_venue(self, symbol: str, side: str) -> Optional[str]:
+        ranked = self.rank_venues(symbol, side)
+        return ranked[0][0] if ranked else None
+
+    async def route_order(self, symbol: str, side: str, order_type: str, amount: float,
+                          price: float = None, client_order_id: str = None) -> Tuple[Optional[str], Order]:
+        """Place the order on the best venue for its side, refreshing quotes first if none are fresh"""
+        if not self._fresh_quotes(symbol):
+            await self.refresh(symbol)
+        venue = self.best_venue(symbol, side)
+        if venue is None:
+            return None, Order.rejected(f"No venue is quoting {symbol}", symbol)
+        logger.info(f"Routing {side} {amount} {symbol} to {venue}")
+        return venue, await self.exchanges[venue].place_order(symbol, side, order_type, amount, price,
+                                                              client_order_id=client_order_id)
+
+    async def run(self, symbols: List[str], interval: float = 1.0):
+        while True:
+            for symbol in symbols:
+                try:
+                    await self.refresh(symbol)
+                except Exception as e:
+                    logger.error(f"Error refreshing quotes for {symbol}: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self, symbols: List[str], interval: float = 1.0) -> asyncio.Task:
+        """Keep quotes for symbols refreshed in the background"""
+        self._task = asyncio.create_task(self.run(symbols, interval))
+        return self._task
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
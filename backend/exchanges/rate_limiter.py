@@ -0,0 +1,183 @@
+import asyncio
+import heapq
+import itertools
+import time
+from enum import IntEnum
+from typing import Dict, Any, Callable, List, Mapping, Optional, Union
+from ..utils.logger import setup_logger
+from ..utils.helpers import safe_float
+
+logger = setup_logger("rate_limiter")
+
+class Priority(IntEnum):
+    """Lower value is served first when the limiter is saturated"""
+    ORDER = 0
+    ACCOUNT = 1
+    MARKET_DATA = 2
+
+def _kline_weight(limit: int = 500) -> int:
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+# Request weights of the Binance USD-M futures REST endpoints we call
+ENDPOINT_WEIGHTS: Dict[str, Union[int, Callable[..., int]]] = {
+    "load_markets": 1,
+    "ticker": 1,
+    "ohlcv": _kline_weight,
+    "balance": 5,
+    "open_orders": lambda symbol=None: 1 if symbol else 40,
+    "order": 1,
+    "create_order": 1,
+    "create_orders": 5,
+    "cancel_order": 1,
+    "cancel_orders": 1,
+    "cancel_all": 1,
+    "listen_key": 1,
+}
+
+class TokenBucket:
+    """Token bucket refilled continuously at capacity / period"""
+
+    def __init__(self, capacity: float, period: float):
+        self.capacity = float(capacity)
+        self.refill_rate = self.capacity / period
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_rate
+
+    def take(self, amount: float, now: float):
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+
+    def sync_used(self, used: float, now: float):
+        """Align with the server's view of usage; only ever lowers the local allowance"""
+        self._refill(now)
+        self.tokens = min(self.tokens, self.capacity - used)
+
+class WeightedRateLimiter:
+    """Client-side limiter modelling exchange request weight and order-count limits.
+
+    Each call acquires its endpoint weight from the request-weight bucket and,
+    for order placement, one token from each order-count bucket. Waiters are
+    served strictly by priority then arrival, so orders overtake queued
+    market-data polling. Used-weight response headers tighten the local buckets
+    and 429/418 responses pause all traffic for the Retry-After period.
+    """
+
+    def __init__(self, request_weight_per_minute: int = 2400, orders_per_10s: int = 300,
+                 orders_per_minute: int = 1200, safety_margin: float = 0.9):
+        self.weight_bucket = TokenBucket(request_weight_per_minute * safety_margin, 60)
+        self.order_buckets = {
+            "10s": TokenBucket(orders_per_10s * safety_margin, 10),
+            "1m": TokenBucket(orders_per_minute * safety_margin, 60),
+        }
+        self._waiters: List = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self.blocked_until = 0.0
+        self.stats = {"acquired": 0, "waited": 0, "total_wait_seconds": 0.0, "rate_limit_errors": 0}
+
+    @staticmethod
+    def endpoint_weight(endpoint: str, **params) -> int:
+        weight = ENDPOINT_WEIGHTS.get(endpoint, 1)
+        return weight(**params) if callable(weight) else weight
+
+    def _delay_for(self, weight: float, orders: int, now: float) -> float:
+        delay = max(self.blocked_until - now, self.weight_bucket.time_until(weight, now))
+        if orders:
+            for bucket in self.order_buckets.values():
+                delay = max(delay, bucket.time_until(orders, now))
+        return delay
+
+    def _pump(self):
+        """Grant queued waiters in priority order while capacity allows"""
+        self._wakeup = None
+        now = time.monotonic()
+        while self._waiters:
+            _, _, weight, orders, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._delay_for(weight, orders, now)
+            if delay > 0:
+                # Head-of-line waits so lower-priority calls cannot starve it
+                self._wakeup = asyncio.get_running_loop().call_later(delay, self._pump)
+                return
+            heapq.heappop(self._waiters)
+            self.weight_bucket.take(weight, now)
+            if orders:
+                for bucket in self.order_buckets.values():
+                    bucket.take(orders, now)
+            future.set_result(None)
+
+    async def acquire(self, endpoint: str, weight: Optional[int] = None,
+                      priority: Priority = Priority.MARKET_DATA, orders: int = 0, **params):
+        """Wait until the call fits within the limits, then consume its weight"""
+        if weight is None:
+            weight = self.endpoint_weight(endpoint, **params)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._sequence), weight, orders, future))
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        self._pump()
+
+        started = time.monotonic()
+        if not future.done():
+            self.stats["waited"] += 1
+            try:
+                await future
+            except asyncio.CancelledError:
+                # The abandoned entry is skipped by _pump; let the next waiter through
+                if self._wakeup is None:
+                    self._pump()
+                raise
+            self.stats["total_wait_seconds"] += time.monotonic() - started
+        self.stats["acquired"] += 1
+
+    def update_from_headers(self, headers: Optional[Mapping[str, Any]]):
+        """Adapt to the exchange's used-weight and order-count headers"""
+        if not headers:
+            return
+        lowered = {str(k).lower(): v for k, v in headers.items()}
+        now = time.monotonic()
+        used_weight = lowered.get("x-mbx-used-weight-1m")
+        if used_weight is not None:
+            self.weight_bucket.sync_used(safe_float(used_weight), now)
+        for window, bucket in self.order_buckets.items():
+            used_orders = lowered.get(f"x-mbx-order-count-{window}")
+            if used_orders is not None:
+                bucket.sync_used(safe_float(used_orders), now)
+
+    def on_rate_limit_error(self, retry_after: Optional[float] = None):
+        """Pause all traffic after a 429/418 response"""
+        pause = retry_after if retry_after and retry_after > 0 else 60.0
+        self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+        self.stats["rate_limit_errors"] += 1
+        logger.warning(f"Exchange rate limit hit, pausing requests for {pause:.1f}s")
+
+    def get_status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self.weight_bucket._refill(now)
+        return {
+            "weight_available": self.weight_bucket.tokens,
+            "weight_capacity": self.weight_bucket.capacity,
+            "queued": sum(1 for w in self._waiters if not w[4].done()),
+            "blocked_for": max(0.0, self.blocked_until - now),
+            **self.stats
+        }
@@ -0,0 +1,279 @@
+import asyncio
+import copy
+import inspect
+import json
+import os
+import time
+from collections import defaultdict, deque
+from typing import Dict, Any, List, Optional, Tuple
+from .base_exchange import BaseExchange
+from .models import Ticker, Order, Position, Trade
+from ..utils.logger import setup_logger
+
+logger = setup_logger("recording_exchange")
+
+MODELS = {cls.__name__: cls for cls in (Ticker, Order, Position, Trade)}
+
+# What each call returns when replay has no recorded answer, mirroring how the live adapters fail
+EMPTY_RESULTS = {
+    "initialize": False, "get_balance": {}, "get_ticker": {}, "get_open_orders": [], "get_positions": [],
+    "get_ohlcv": [], "cancel_order": False, "cancel_all": {},
+}
+
+def encode(value: Any) -> Any:
+    """JSON-safe form of an exchange result; models are tagged so replay can rebuild them"""
+    if type(value).__name__ in MODELS:
+        return {"__model__": type(value).__name__, **MODELS[type(value).__name__].to_dict(value)}
+    if isinstance(value, dict):
+        return {k: encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode(v) for v in value]
+    return value
+
+def decode(value: Any) -> Any:
+    if isinstance(value, dict):
+        model = value.get("__model__")
+        if model:
+            fields = {k: v for k, v in value.items() if k != "__model__"}
+            return MODELS[model](**fields)
+        return {k: decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [decode(v) for v in value]
+    return value
+
+# Parameters added after recordings were first made; left out of the key while unset so those still replay
+LATE_PARAMETERS = ("since",)
+
+def call_key(method: str, args: Tuple, kwargs: Dict[str, Any]) -> str:
+    """Canonical key for a call: arguments bound to BaseExchange's signature, defaults applied"""
+    signature = inspect.signature(getattr(BaseExchange, method))
+    bound = signature.bind(None, *args, **kwargs)
+    bound.apply_defaults()
+    arguments = dict(bound.arguments)
+    arguments.pop("self", None)
+    for name in LATE_PARAMETERS:
+        if arguments.get(name) is None:
+            arguments.pop(name, None)
+    # Client order ids are made up per session; the same order placed in a replay carries a different one
+    arguments.pop("client_order_id", None)
+    return json.dumps([method, encode(arguments)], sort_keys=True, separators=(",", ":"), default=str)
+
+class RecordingExchange(BaseExchange):
+    """Pass-through adapter that appends every call and its result to a JSON-lines file.
+
+    One compact line per call: sequence number, wall-clock start (ms), latency
+    (ms), canonical call key and either the encoded result or the error text.
+    The file is only ever appended to, so a recording survives a crash up to
+    its last complete line.
+    """
+
+    def __init__(self, inner: BaseExchange, path: str):
+        super().__init__(inner.api_key, inner.api_secret, inner.testnet)
+        self.inner = inner
+        self.path = path
+        self.sequence = 0
+        record_dir = os.path.dirname(path)
+        if record_dir:
+            os.makedirs(record_dir, exist_ok=True)
+        self._file = open(path, "a", buffering=1)
+
+    @property
+    def connected(self) -> bool:
+        # The wrapped adapter owns the connection; it may connect, drop or reconnect at any time
+        return self.inner.connected
+
+    @connected.setter
+    def connected(self, value: bool):
+        # Assigned by BaseExchange.__init__; the wrapped adapter stays the only source of truth
+        pass
+
+    def __getattr__(self, name):
+        # Adapter-specific extras (rate limiter, metrics, ...) stay reachable
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    async def _call(self, method: str, *args, **kwargs):
+        started_ms = time.time() * 1000
+        started = time.perf_counter()
+        record = {"seq": self.sequence, "t": round(started_ms, 3), "key": call_key(method, args, kwargs)}
+        self.sequence += 1
+        try:
+            result = await getattr(self.inner, method)(*args, **kwargs)
+            record["result"] = encode(result)
+            return result
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["lat"] = round((time.perf_counter() - started) * 1000, 3)
+            self._file.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+
+    async def initialize(self) -> bool:
+        return await self._call("initialize")
+
+    async def get_balance(self):
+        return await self._call("get_balance")
+
+    async def get_ticker(self, symbol: str):
+        return await self._call("get_ticker", symbol)
+
+    async def place_order(self, symbol: str, side: str, order_type: str, amount: float, price: float = None,
+                          client_order_id: str = None):
+        return await self._call("place_order", symbol, side, order_type, amount, price, client_order_id)
+
+    async def find_order(self, client_order_id: str, symbol: str):
+        return await self._call("find_order", client_order_id, symbol)
+
+    async def place_orders(self, orders: List[Dict[str, Any]], max_concurrency: int = 5):
+        return await self._call("place_orders", orders, max_concurrency)
+
+    async def cancel_order(self, order_id: str, symbol: str) -> bool:
+        return await self._call("cancel_order", order_id, symbol)
+
+    async def cancel_orders(self, orders: List[Tuple[str, str]], max_concurrency: int = 5):
+        return await self._call("cancel_orders", [list(o) for o in orders], max_concurrency)
+
+    async def cancel_all(self, symbol: str = None):
+        return await self._call("cancel_all", symbol)
+
+    async def get_order_status(self, order_id: str, symbol: str):
+        return await self._call("get_order_status", order_id, symbol)
+
+    async def get_open_orders(self, symbol: str = None):
+        return await self._call("get_open_orders", symbol)
+
+    async def get_positions(self):
+        return await self._call("get_positions")
+
+    async def get_ohlcv(self, symbol: str, timeframe: str = "1m", limit: int = 100, since: Optional[int] = None):
+        return await self._call("get_ohlcv", symbol, timeframe, limit, since)
+
+    async def cleanup(self):
+        await self.inner.cleanup()
+        self._file.close()
+        logger.info(f"Recorded {self.sequence} exchange calls to {self.path}")
+
+class VirtualClock:
+    """Replay time: starts at the recording's first timestamp and advances at `speed`× wall time.
+
+    speed=None (or 0) runs as fast as possible: the clock only moves when a
+    replayed response is served, jumping straight to its completion time.
+    """
+
+    def __init__(self, start_ms: float, speed: Optional[float] = 1.0):
+        self.speed = speed or None
+        self.start_ms = start_ms
+        self._now_ms = start_ms
+        self._started = time.monotonic()
+
+    def time_ms(self) -> float:
+        if self.speed is None:
+            return self._now_ms
+        return max(self._now_ms, self.start_ms + (time.monotonic() - self._started) * 1000 * self.speed)
+
+    def time(self) -> float:
+        return self.time_ms() / 1000
+
+    async def sleep_until(self, t_ms: float):
+        if self.speed is None:
+            self._now_ms = max(self._now_ms, t_ms)
+            return
+        delay = (t_ms - self.time_ms()) / 1000 / self.speed
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._now_ms = max(self._now_ms, t_ms)
+
+class ReplayExchange(BaseExchange):
+    """Serves a RecordingExchange file back deterministically.
+
+    Each call is answered with the next unused recorded response for the same
+    canonical call key, released when the virtual clock reaches the time the
+    original response arrived (recorded start + latency). When a key's
+    recordings run out the last one is repeated, so polling loops that run
+    slightly longer than the recording keep working; calls never seen in the
+    recording get the adapter's usual empty/failed result and count as misses.
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = None):
+        super().__init__("", "", True)
+        self.path = path
+        self.records: Dict[str, deque] = defaultdict(deque)
+        self.last_records: Dict[str, Dict[str, Any]] = {}
+        first_t = None
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping unreadable recording line in {path}")
+                    continue
+                self.records[record["key"]].append(record)
+                first_t = record["t"] if first_t is None else min(first_t, record["t"])
+        self.clock = VirtualClock(first_t or 0.0, speed)
+        self.stats = {"served": 0, "repeated": 0, "misses": 0}
+
+    async def _call(self, method: str, *args, **kwargs):
+        key = call_key(method, args, kwargs)
+        queue = self.records.get(key)
+        if queue:
+            record = queue.popleft()
+            self.last_records[key] = record
+            self.stats["served"] += 1
+        elif key in self.last_records:
+            record = self.last_records[key]
+            self.stats["repeated"] += 1
+        else:
+            self.stats["misses"] += 1
+            logger.warning(f"No recorded response for {key}")
+            if method in EMPTY_RESULTS:
+                return copy.copy(EMPTY_RESULTS[method])
+            if method == "place_order":
+                return Order.rejected("Not in recording", kwargs.get("symbol", args[0] if args else None))
+            raise LookupError(f"No recorded response for {key}")
+
+        await self.clock.sleep_until(max(record["t"], self.clock.time_ms()) + record.get("lat", 0))
+        if "error" in record:
+            raise RuntimeError(record["error"])
+        return decode(record["result"])
+
+    async def initialize(self) -> bool:
+        self.connected = True
+        return True
+
+    async def get_balance(self):
+        return await self._call("get_balance")
+
+    async def get_ticker(self, symbol: str):
+        return await self._call("get_ticker", symbol)
+
+    async def place_order(self, symbol: str, side: str, order_type: str, amount: float, price: float = None,
+                          client_order_id: str = None):
+        return await self._call("place_order", symbol, side, order_type, amount, price, client_order_id)
+
+    async def find_order(self, client_order_id: str, symbol: str):
+        return await self._call("find_order", client_order_id, symbol)
+
+    async def place_orders(self, orders: List[Dict[str, Any]], max_concurrency: int = 5):
+        return await self._call("place_orders", orders, max_concurrency)
+
+    async def cancel_order(self, order_id: str, symbol: str) -> bool:
+        return await self._call("cancel_order", order_id, symbol)
+
+    async def cancel_orders(self, orders: List[Tuple[str, str]], max_concurrency: int = 5):
+        return await self._call("cancel_orders", [list(o) for o in orders], max_concurrency)
+
+    async def cancel_all(self, symbol: str = None):
+        return await self._call("cancel_all", symbol)
+
+    async def get_order_status(self, order_id: str, symbol: str):
+        return await self._call("get_order_status", order_id, symbol)
+
+    async def get_open_orders(self, symbol: str = None):
+        return await self._call("get_open_orders", symbol)
+
+    async def get_positions(self):
+        return await self._call("get_positions")
+
+    async def get_ohlcv(self, symbol: str, timeframe: str = "1m", limit: int = 100, since: Optional[int] = None):
+        return await self._call("get_ohlcv", symbol, timeframe, limit, since)
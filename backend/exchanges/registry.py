@@ -0,0 +1,47 @@
+from typing import Dict, Any, Type
+from .base_exchange import BaseExchange
+from .binance_testnet import BinanceTestnet
+from .ccxt_exchange import CcxtExchange
+from .simulated_exchange import SimulatedExchange
+from ..utils.logger import setup_logger
+
+logger = setup_logger("exchange_registry")
+
+# Adapter classes by the `type` key of an `exchanges.<name>` config section
+EXCHANGE_TYPES: Dict[str, Type[BaseExchange]] = {
+    "binance_testnet": BinanceTestnet,
+    "ccxt": CcxtExchange,
+    "simulated": SimulatedExchange,
+}
+
+# Config sections under `exchanges:` that are settings, not venues
+RESERVED_SECTIONS = {"primary", "recording", "markets_cache", "quotes"}
+
+def register_exchange(type_name: str, cls: Type[BaseExchange]):
+    """Make an adapter class available to `create_exchange` under `type: <type_name>`"""
+    if not issubclass(cls, BaseExchange):
+        raise TypeError(f"{cls.__name__} is not a BaseExchange")
+    EXCHANGE_TYPES[type_name] = cls
+
+def create_exchange(name: str, settings: Dict[str, Any]) -> BaseExchange:
+    """Build the adapter for one venue; `type` defaults to the Binance testnet adapter for
+    `binance` and to the generic ccxt adapter (ccxt id = section name) otherwise."""
+    type_name = settings.get("type") or ("binance_testnet" if name == "binance" else "ccxt")
+    cls = EXCHANGE_TYPES.get(type_name)
+    if cls is None:
+        raise ValueError(f"Unknown exchange type '{type_name}' for '{name}'")
+    exchange = cls.from_config(name, settings)
+    exchange.name = name
+    return exchange
+
+def create_exchanges(exchanges_config: Dict[str, Any]) -> Dict[str, BaseExchange]:
+    """Build every enabled venue in the `exchanges:` config section, keyed by section name"""
+    exchanges = {}
+    for name, settings in (exchanges_config or {}).items():
+        if name in RESERVED_SECTIONS or not isinstance(settings, dict) or not settings.get("enabled", False):
+            continue
+        try:
+            exchanges[name] = create_exchange(name, settings)
+        except Exception as e:
+            logger.error(f"Could not create exchange '{name}': {e}")
+    return exchanges
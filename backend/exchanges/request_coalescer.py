@@ -0,0 +1,65 @@
+import asyncio
+import time
+from typing import Dict, Any, Awaitable, Callable, Hashable, Optional, Tuple
+from ..utils.logger import setup_logger
+
+logger = setup_logger("request_coalescer")
+
+class RequestCoalescer:
+    """Single-flight deduplication plus per-endpoint micro-TTL caching for read-only calls.
+
+    Concurrent calls with the same (endpoint, key) share one in-flight request.
+    Successful results are kept for the endpoint's TTL (0 disables caching but
+    still coalesces). Failures are never cached.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None):
+        self.ttls = dict(ttls or {})
+        self._cache: Dict[Tuple[str, Hashable], Tuple[float, Any]] = {}
+        self._in_flight: Dict[Tuple[str, Hashable], asyncio.Task] = {}
+        self.stats = {"hits": 0, "coalesced": 0, "misses": 0}
+
+    async def call(self, endpoint: str, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Return a cached or in-flight result for (endpoint, key), otherwise run func once"""
+        cache_key = (endpoint, key)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            expires_at, value = cached
+            if time.monotonic() < expires_at:
+                self.stats["hits"] += 1
+                return value
+            del self._cache[cache_key]
+
+        task = self._in_flight.get(cache_key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["misses"] += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[cache_key] = task
+            task.add_done_callback(lambda t, k=cache_key: self._on_done(k, t))
+
+        # Shield so one cancelled caller does not cancel the request others are waiting on
+        return await asyncio.shield(task)
+
+    def _on_done(self, cache_key: Tuple[str, Hashable], task: asyncio.Task):
+        failed = task.cancelled() or task.exception() is not None
+        if self._in_flight.get(cache_key) is not task:
+            # Invalidated while in flight; its result may predate the invalidating write
+            return
+        del self._in_flight[cache_key]
+        if failed:
+            return
+        ttl = self.ttls.get(cache_key[0], 0)
+        if ttl > 0:
+            self._cache[cache_key] = (time.monotonic() + ttl, task.result())
+
+    def invalidate(self, *endpoints: str):
+        """Drop cached and in-flight results for the given endpoints (all if none given).
+
+        Callers already awaiting an in-flight request still get its result, but
+        later callers start a fresh request and the old result is not cached.
+        """
+        for store in (self._cache, self._in_flight):
+            for cache_key in [k for k in store if not endpoints or k[0] in endpoints]:
+                del store[cache_key]
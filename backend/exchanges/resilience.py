@@ -0,0 +1,241 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Dict, Any, Awaitable, Callable, Optional, Tuple, Type
+from ..utils.logger import setup_logger
+
+logger = setup_logger("resilience")
+
+class CircuitOpenError(Exception):
+    """Raised without calling the exchange while an endpoint's breaker is open"""
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open after `failure_threshold` failures,
+    half-open after `reset_timeout`, closed again after one successful probe"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self.state = self.CLOSED
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._probing:
+            # Exactly one probe request at a time while half-open
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.state = self.CLOSED
+        self._probing = False
+
+    def release_probe(self):
+        """End a half-open probe that finished without a verdict (cancelled, throttled) so another can run"""
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit opened after {self.failures} consecutive failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+class LatencyWindow:
+    """Rolling window of recent call latencies"""
+
+    def __init__(self, size: int = 200):
+        self.samples: deque = deque(maxlen=size)
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class ResilientCaller:
+    """Deadlines, jittered retries, hedged reads and per-endpoint circuit breakers for exchange calls.
+
+    Each call gets an overall deadline; attempts and backoff sleeps must fit
+    inside it. Backoff uses full jitter so clients that failed together do not
+    retry together. Idempotent calls may be hedged: if the first attempt has
+    not answered after the endpoint's recent p95 latency, a duplicate is sent
+    and whichever returns first wins. Only `retryable` errors count against
+    the breaker; an exchange rejecting a request is not the endpoint being down,
+    and neither is a `throttled` error or time spent in a call's `acquire`
+    (waiting on the client-side rate limiter).
+    """
+
+    def __init__(self, retryable: Tuple[Type[BaseException], ...] = (asyncio.TimeoutError, ConnectionError),
+                 deadline: float = 10.0, max_attempts: int = 3, base_delay: float = 0.2, max_delay: float = 2.0,
+                 hedge: bool = True, hedge_min_samples: int = 20, hedge_min_delay: float = 0.05,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0, deadlines: Optional[Dict[str, float]] = None,
+                 throttled: Tuple[Type[BaseException], ...] = ()):
+        self.retryable = tuple(retryable) + (asyncio.TimeoutError,)
+        self.throttled = tuple(throttled)
+        self.deadline = deadline
+        self.deadlines = dict(deadlines or {})
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.latencies: Dict[str, LatencyWindow] = {}
+        self.metrics: Dict[str, Dict[str, int]] = {}
+        self._random = random.Random()
+
+    def _endpoint_state(self, endpoint: str):
+        if endpoint not in self.breakers:
+            self.breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            self.latencies[endpoint] = LatencyWindow()
+            self.metrics[endpoint] = {"calls": 0, "failures": 0, "timeouts": 0, "retries": 0,
+                                      "hedges": 0, "hedge_wins": 0, "rejected_open": 0, "throttled": 0}
+        return self.breakers[endpoint], self.latencies[endpoint], self.metrics[endpoint]
+
+    def _backoff(self, attempt: int) -> float:
+        return self._random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def call(self, endpoint: str, func: Callable[[], Awaitable[Any]], idempotent: bool = True,
+                   deadline: Optional[float] = None, retry_on: Optional[Tuple[Type[BaseException], ...]] = None,
+                   acquire: Optional[Callable[[], Awaitable[Any]]] = None) -> Any:
+        """Run func under the endpoint's breaker within a deadline.
+
+        Non-idempotent calls are never hedged and are only retried on `retry_on`
+        errors (default: none), since a timed-out order may still have executed.
+        `acquire` is awaited before every attempt; it spends the deadline but a
+        timeout while waiting on it is not held against the endpoint.
+        """
+        breaker, latency, metrics = self._endpoint_state(endpoint)
+        metrics["calls"] += 1
+        if not breaker.allow():
+            metrics["rejected_open"] += 1
+            raise CircuitOpenError(f"Circuit open for {endpoint}")
+        probing = breaker.state == CircuitBreaker.HALF_OPEN
+
+        loop = asyncio.get_running_loop()
+        budget_end = loop.time() + (deadline or self.deadlines.get(endpoint, self.deadline))
+        retry_on = self.retryable if retry_on is None and idempotent else (retry_on or ())
+
+        attempt = 0
+        try:
+            while True:
+                if acquire is not None:
+                    try:
+                        await asyncio.wait_for(acquire(), timeout=budget_end - loop.time())
+                    except asyncio.TimeoutError:
+                        metrics["throttled"] += 1
+                        raise
+                remaining = budget_end - loop.time()
+                started = loop.time()
+                try:
+                    if idempotent and self.hedge:
+                        result = await asyncio.wait_for(self._hedged(func, latency, metrics, acquire), timeout=remaining)
+                    else:
+                        result = await asyncio.wait_for(func(), timeout=remaining)
+                except Exception as e:
+                    if isinstance(e, asyncio.TimeoutError):
+                        metrics["timeouts"] += 1
+                    if isinstance(e, self.throttled):
+                        # The endpoint is up and told us to slow down; the rate limiter handles that
+                        metrics["throttled"] += 1
+                    elif isinstance(e, self.retryable):
+                        breaker.record_failure()
+                    else:
+                        # The endpoint answered; its rejection says nothing about availability
+                        breaker.record_success()
+                    metrics["failures"] += 1
+
+                    attempt += 1
+                    wait = self._backoff(attempt - 1)
+                    out_of_budget = loop.time() + wait >= budget_end
+                    if (not isinstance(e, retry_on) or attempt >= self.max_attempts or out_of_budget
+                            or breaker.state == CircuitBreaker.OPEN):
+                        raise
+                    metrics["retries"] += 1
+                    logger.warning(f"{endpoint} attempt {attempt} failed: {e!r}. Retrying in {wait:.2f}s")
+                    await asyncio.sleep(wait)
+                    if not breaker.allow():
+                        raise CircuitOpenError(f"Circuit open for {endpoint}") from e
+                    probing = probing or breaker.state == CircuitBreaker.HALF_OPEN
+                    continue
+
+                latency.add(loop.time() - started)
+                breaker.record_success()
+                return result
+        finally:
+            # A probe cancelled or ended without a verdict must not keep the breaker half-open forever
+            if probing:
+                breaker.release_probe()
+
+    @staticmethod
+    async def _after(acquire: Optional[Callable[[], Awaitable[Any]]], func: Callable[[], Awaitable[Any]]) -> Any:
+        if acquire is not None:
+            await acquire()
+        return await func()
+
+    async def _hedged(self, func: Callable[[], Awaitable[Any]], latency: LatencyWindow, metrics: Dict[str, int],
+                      acquire: Optional[Callable[[], Awaitable[Any]]] = None) -> Any:
+        p95 = latency.percentile(0.95) if len(latency.samples) >= self.hedge_min_samples else None
+        primary = asyncio.ensure_future(func())
+        if p95 is None:
+            return await primary
+
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=max(p95, self.hedge_min_delay))
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done:
+            return primary.result()
+
+        metrics["hedges"] += 1
+        hedge = asyncio.ensure_future(self._after(acquire, func))
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            metrics["hedge_wins"] += 1
+                        return task.result()
+                if not pending:
+                    # Both failed; surface the primary's error
+                    return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            for task in (primary, hedge):
+                if task.done() and not task.cancelled():
+                    task.exception()  # Mark the loser's error as retrieved
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            endpoint: {
+                **self.metrics[endpoint],
+                "state": self.breakers[endpoint].state,
+                "p50": self.latencies[endpoint].percentile(0.5),
+                "p95": self.latencies[endpoint].percentile(0.95),
+            }
+            for endpoint in self.metrics
+        }
@@ -0,0 +1,446 @@
+import asyncio
+import heapq
+import itertools
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .base_exchange import BaseExchange, OrderType, OrderSide, OrderStatus
+from .models import Ticker, Order, Position
+from ..utils.logger import setup_logger
+
+logger = setup_logger("simulated_exchange")
+
+@dataclass
+class SimOrder:
+    id: str
+    symbol: str
+    side: str
+    type: str
+    amount: float
+    price: Optional[float]
+    stop_price: Optional[float]
+    timestamp: int
+    seq: int
+    filled: float = 0.0
+    cost: float = 0.0
+    fee: float = 0.0
+    status: str = OrderStatus.OPEN.value
+    resting: bool = False
+
+    @property
+    def remaining(self) -> float:
+        return max(self.amount - self.filled, 0.0)
+
+    @property
+    def average(self) -> Optional[float]:
+        return self.cost / self.filled if self.filled else None
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in (OrderStatus.PENDING.value, OrderStatus.OPEN.value)
+
+    def to_order(self) -> Order:
+        return Order(self.id, self.symbol, self.type, self.side, self.amount,
+                     self.average if self.average is not None else self.price, self.filled, self.remaining,
+                     self.status, self.timestamp)
+
+class OrderBook:
+    """Resting limit orders for one symbol with price-time priority"""
+
+    def __init__(self):
+        self._bids: List[Tuple[float, int, SimOrder]] = []  # (-price, seq, order): best price, then oldest
+        self._asks: List[Tuple[float, int, SimOrder]] = []  # (price, seq, order)
+
+    def add(self, order: SimOrder):
+        if order.side == OrderSide.BUY.value:
+            heapq.heappush(self._bids, (-order.price, order.seq, order))
+        else:
+            heapq.heappush(self._asks, (order.price, order.seq, order))
+
+    def _prune(self, heap):
+        # Cancelled and filled orders are removed lazily, keeping cancel O(1)
+        while heap and not heap[0][2].is_active:
+            heapq.heappop(heap)
+
+    def best(self, side: str) -> Optional[SimOrder]:
+        heap = self._bids if side == OrderSide.BUY.value else self._asks
+        self._prune(heap)
+        return heap[0][2] if heap else None
+
+    def pop_best(self, side: str):
+        heap = self._bids if side == OrderSide.BUY.value else self._asks
+        heapq.heappop(heap)
+
+    def orders(self) -> Iterator[SimOrder]:
+        for heap in (self._bids, self._asks):
+            for _, _, order in heap:
+                if order.is_active:
+                    yield order
+
+class SyntheticFeed:
+    """Geometric random walk price feed for benchmarks and soak tests"""
+
+    def __init__(self, symbol: str, start_price: float, volatility: float = 0.001, drift: float = 0.0,
+                 step_ms: int = 1000, start_ms: Optional[int] = None, seed: Optional[int] = None,
+                 volume: float = 1.0):
+        self.symbol = symbol
+        self.price = start_price
+        self.volatility = volatility
+        self.drift = drift
+        self.step_ms = step_ms
+        self.timestamp = start_ms if start_ms is not None else int(time.time() * 1000)
+        self.volume = volume
+        self._random = random.Random(seed)
+
+    def __iter__(self) -> Iterator[Tuple[str, List[float]]]:
+        while True:
+            open_price = self.price
+            self.price *= math.exp(self.drift + self.volatility * self._random.gauss(0, 1))
+            high, low = max(open_price, self.price), min(open_price, self.price)
+            yield self.symbol, [self.timestamp, open_price, high, low, self.price, self.volume]
+            self.timestamp += self.step_ms
+
+class ReplayFeed:
+    """Replays recorded OHLCV rows ([ts, o, h, l, c, v]) for one or more symbols in time order"""
+
+    def __init__(self, candles_by_symbol: Dict[str, Sequence[Sequence[float]]]):
+        self.candles_by_symbol = candles_by_symbol
+
+    @staticmethod
+    def _stream(symbol: str, candles: Sequence[Sequence[float]]):
+        for candle in candles:
+            yield float(candle[0]), symbol, list(candle)
+
+    def __iter__(self) -> Iterator[Tuple[str, List[float]]]:
+        streams = [self._stream(symbol, candles) for symbol, candles in self.candles_by_symbol.items()]
+        for _, symbol, candle in heapq.merge(*streams, key=lambda item: (item[0], item[1])):
+            yield symbol, candle
+
+class SimulatedExchange(BaseExchange):
+    """In-process exchange with its own order books and matching engine.
+
+    Liquidity is synthesised around the feed price on every tick: `depth_levels`
+    price levels per side, `spread` apart at the touch and `level_step` apart
+    beyond it, each holding `level_size` quote-currency worth of base asset.
+    Market orders walk that ladder (partially filling if it runs out), limit
+    orders that cross fill as taker and otherwise rest in the book, and stop
+    orders turn into market orders once the last price crosses their trigger.
+    Balances are spot-style: buys spend quote, sells need base inventory.
+    """
+
+    def __init__(self, api_key: str = "", api_secret: str = "", testnet: bool = True,
+                 initial_balances: Optional[Dict[str, float]] = None, quote_currency: str = "USDT",
+                 maker_fee: float = 0.0002, taker_fee: float = 0.0004, spread: float = 0.0002,
+                 level_step: float = 0.0005, depth_levels: int = 5, level_size: float = 10000.0,
+                 latency: float = 0.0, latency_jitter: float = 0.0, seed: Optional[int] = None):
+        super().__init__(api_key, api_secret, testnet)
+        self.quote_currency = quote_currency
+        self.balances: Dict[str, float] = dict(initial_balances or {quote_currency: 1000.0})
+        self.locked: Dict[str, float] = {}
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.spread = spread
+        self.level_step = level_step
+        self.depth_levels = depth_levels
+        self.level_size = level_size
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self._random = random.Random(seed)
+
+        self.books: Dict[str, OrderBook] = {}
+        self.orders: Dict[str, SimOrder] = {}
+        self.client_order_ids: Dict[str, str] = {}  # client order id -> order id
+        self.stop_orders: Dict[str, SimOrder] = {}
+        self.last_prices: Dict[str, float] = {}
+        self.candles: Dict[str, List[List[float]]] = {}
+        self.positions: Dict[str, Dict[str, float]] = {}
+        self.trades: List[Dict[str, Any]] = []
+        self.clock_ms = 0
+        self._ids = itertools.count(1)
+        self._feed_task: Optional[asyncio.Task] = None
+        self.max_candles = 1000
+
+    @classmethod
+    def from_config(cls, name: str, settings: Dict[str, Any]) -> "SimulatedExchange":
+        """Any constructor keyword may be set in the config section, e.g. fees, spread or latency"""
+        params = {k: v for k, v in settings.items() if k not in ('enabled', 'type')}
+        return cls(**params)
+
+    # --- Connection / clock -------------------------------------------------
+
+    async def initialize(self) -> bool:
+        self.connected = True
+        logger.info(f"Simulated exchange ready with balances {self.balances}")
+        return True
+
+    async def _simulate_latency(self):
+        if self.latency or self.latency_jitter:
+            await asyncio.sleep(max(0.0, self.latency + self._random.uniform(0, self.latency_jitter)))
+
+    @staticmethod
+    def _base_currency(symbol: str) -> str:
+        return symbol.split("/")[0]
+
+    # --- Price feed ---------------------------------------------------------
+
+    def on_candle(self, symbol: str, candle: Sequence[float]):
+        """Advance the market for symbol by one bar and run stops and resting orders against it"""
+        timestamp, close_price = int(candle[0]), float(candle[4])
+        self.clock_ms = max(self.clock_ms, timestamp)
+        self.last_prices[symbol] = close_price
+        history = self.candles.setdefault(symbol, [])
+        history.append([timestamp, float(candle[1]), float(candle[2]), float(candle[3]), close_price, float(candle[5])])
+        if len(history) > self.max_candles:
+            del history[:len(history) - self.max_candles]
+
+        self._trigger_stops(symbol, close_price)
+        self._match_resting(symbol)
+
+    def on_price(self, symbol: str, price: float, timestamp: Optional[int] = None, volume: float = 0.0):
+        """Convenience wrapper for tick-level feeds"""
+        timestamp = timestamp if timestamp is not None else self.clock_ms + 1
+        self.on_candle(symbol, [timestamp, price, price, price, price, volume])
+
+    def step(self, feed: Iterator[Tuple[str, Sequence[float]]], steps: int = 1) -> int:
+        """Synchronously consume up to `steps` bars from an iterator feed. Returns bars consumed."""
+        consumed = 0
+        for symbol, candle in itertools.islice(feed, steps):
+            self.on_candle(symbol, candle)
+            consumed += 1
+        return consumed
+
+    async def run_feed(self, feed: Iterable[Tuple[str, Sequence[float]]], interval: float = 0.0):
+        """Drive the exchange from a feed. interval=0 runs as fast as possible, yielding between bars."""
+        for symbol, candle in feed:
+            self.on_candle(symbol, candle)
+            await asyncio.sleep(interval)
+
+    def start_feed(self, feed: Iterable[Tuple[str, Sequence[float]]], interval: float = 0.0) -> asyncio.Task:
+        self._feed_task = asyncio.create_task(self.run_feed(feed, interval))
+        return self._feed_task
+
+    def _levels(self, symbol: str, side: str) -> List[List[float]]:
+        """Synthetic [price, base_amount] ladder a `side` order executes against"""
+        price = self.last_prices[symbol]
+        direction = 1 if side == OrderSide.BUY.value else -1
+        levels = []
+        for i in range(self.depth_levels):
+            level_price = price * (1 + direction * (self.spread / 2 + i * self.level_step))
+            levels.append([level_price, self.level_size / level_price])
+        return levels
+
+    # --- Matching -----------------------------------------------------------
+
+    def _next_order(self, symbol, side, order_type, amount, price=None, stop_price=None) -> SimOrder:
+        seq = next(self._ids)
+        return SimOrder(id=f"sim-{seq}", symbol=symbol, side=side, type=order_type, amount=amount, price=price,
+                        stop_price=stop_price, timestamp=self.clock_ms, seq=seq)
+
+    def _fill(self, order: SimOrder, amount: float, price: float, maker: bool):
+        base = self._base_currency(order.symbol)
+        cost = amount * price
+        fee = cost * (self.maker_fee if maker else self.taker_fee)
+        if order.side == OrderSide.BUY.value:
+            self._unlock(self.quote_currency, cost if order.resting else 0.0)
+            self.balances[self.quote_currency] = self.balances.get(self.quote_currency, 0.0) - cost - fee
+            self.balances[base] = self.balances.get(base, 0.0) + amount
+        else:
+            self._unlock(base, amount if order.resting else 0.0)
+            self.balances[base] = self.balances.get(base, 0.0) - amount
+            self.balances[self.quote_currency] = self.balances.get(self.quote_currency, 0.0) + cost - fee
+
+        order.filled += amount
+        order.cost += cost
+        order.fee += fee
+        if order.remaining <= 1e-12:
+            order.status = OrderStatus.FILLED.value
+        self._update_position(order.symbol, order.side, amount, price)
+        self.trades.append({'order_id': order.id, 'symbol': order.symbol, 'side': order.side, 'amount': amount,
+                            'price': price, 'fee': fee, 'maker': maker, 'timestamp': self.clock_ms})
+
+    def _update_position(self, symbol: str, side: str, amount: float, price: float):
+        position = self.positions.setdefault(symbol, {'amount': 0.0, 'entry_price': 0.0})
+        if side == OrderSide.BUY.value:
+            total = position['amount'] + amount
+            position['entry_price'] = (position['entry_price'] * position['amount'] + price * amount) / total
+            position['amount'] = total
+        else:
+            position['amount'] = max(position['amount'] - amount, 0.0)
+            if position['amount'] <= 1e-12:
+                del self.positions[symbol]
+
+    def _execute_taker(self, order: SimOrder, limit_price: Optional[float] = None):
+        """Walk the synthetic ladder, respecting an optional limit price"""
+        for level_price, level_amount in self._levels(order.symbol, order.side):
+            if order.remaining <= 1e-12:
+                break
+            if limit_price is not None:
+                crosses = level_price <= limit_price if order.side == OrderSide.BUY.value else level_price >= limit_price
+                if not crosses:
+                    break
+            self._fill(order, min(order.remaining, level_amount), level_price, maker=False)
+
+    def _match_resting(self, symbol: str):
+        """Fill resting limit orders the new market has moved through, best price then oldest first"""
+        book = self.books.get(symbol)
+        if not book:
+            return
+        for side in (OrderSide.BUY.value, OrderSide.SELL.value):
+            # Liquidity available to resting orders on this side is the opposite synthetic ladder
+            for level_price, level_amount in self._levels(symbol, side):
+                while level_amount > 1e-12:
+                    order = book.best(side)
+                    if order is None:
+                        break
+                    crosses = order.price >= level_price if side == OrderSide.BUY.value else order.price <= level_price
+                    if not crosses:
+                        break
+                    amount = min(order.remaining, level_amount)
+                    self._fill(order, amount, order.price, maker=True)
+                    level_amount -= amount
+                    if not order.is_active:
+                        book.pop_best(side)
+
+    def _trigger_stops(self, symbol: str, price: float):
+        for order in [o for o in self.stop_orders.values() if o.symbol == symbol]:
+            # A stop-loss fires when price moves against the position, a take-profit when it moves in its favour:
+            # a buy stop-loss (closing a short) above the market, a sell take-profit (closing a long) above it
+            rises_to_trigger = (order.side == OrderSide.BUY.value) == (order.type == OrderType.STOP_LOSS.value)
+            triggered = price >= order.stop_price if rises_to_trigger else price <= order.stop_price
+            if triggered:
+                del self.stop_orders[order.id]
+                if self._has_funds(symbol, order.side, order.amount, price):
+                    self._execute_taker(order)
+                if order.is_active:
+                    order.status = OrderStatus.CANCELLED.value
+
+    # --- Funds --------------------------------------------------------------
+
+    def _free(self, currency: str) -> float:
+        return self.balances.get(currency, 0.0) - self.locked.get(currency, 0.0)
+
+    def _lock(self, currency: str, amount: float):
+        self.locked[currency] = self.locked.get(currency, 0.0) + amount
+
+    def _unlock(self, currency: str, amount: float):
+        if amount:
+            self.locked[currency] = max(self.locked.get(currency, 0.0) - amount, 0.0)
+
+    def _has_funds(self, symbol: str, side: str, amount: float, price: float) -> bool:
+        if side == OrderSide.BUY.value:
+            return self._free(self.quote_currency) >= amount * price * (1 + self.taker_fee)
+        return self._free(self._base_currency(symbol)) >= amount - 1e-12
+
+    # --- BaseExchange API ---------------------------------------------------
+
+    async def get_balance(self) -> Dict[str, float]:
+        await self._simulate_latency()
+        free = self._free(self.quote_currency)
+        return {self.quote_currency: free, "total": self.balances.get(self.quote_currency, 0.0)}
+
+    async def get_ticker(self, symbol: str) -> Ticker:
+        await self._simulate_latency()
+        if symbol not in self.last_prices:
+            return {}
+        history = self.candles.get(symbol, [])
+        first_close = history[0][4] if history else self.last_prices[symbol]
+        price = self.last_prices[symbol]
+        return Ticker(symbol, price, self._levels(symbol, OrderSide.SELL.value)[0][0],
+                      self._levels(symbol, OrderSide.BUY.value)[0][0], sum(c[5] * c[4] for c in history),
+                      price - first_close, (price - first_close) / first_close * 100 if first_close else 0.0,
+                      self.clock_ms)
+
+    async def place_order(self, symbol: str, side: str, order_type: str,
+                          amount: float, price: float = None, stop_price: float = None,
+                          client_order_id: str = None) -> Order:
+        await self._simulate_latency()
+        if symbol not in self.last_prices:
+            return Order.rejected(f"No market for {symbol}", symbol)
+        reference_price = price or self.last_prices[symbol]
+        if amount <= 0 or not self.validate_order_size(amount * reference_price):
+            return Order.rejected("Order size validation failed", symbol)
+        if not self._has_funds(symbol, side, amount, reference_price):
+            return Order.rejected("Insufficient balance", symbol)
+
+        if order_type == OrderType.MARKET.value:
+            order = self._next_order(symbol, side, order_type, amount)
+            self._execute_taker(order)
+            if order.is_active:
+                # Market orders are IOC: an unfilled remainder is cancelled
+                order.status = OrderStatus.CANCELLED.value
+        elif order_type == OrderType.LIMIT.value and price:
+            order = self._next_order(symbol, side, order_type, amount, price)
+            self._execute_taker(order, limit_price=price)
+            if order.is_active:
+                if side == OrderSide.BUY.value:
+                    self._lock(self.quote_currency, order.remaining * price)
+                else:
+                    self._lock(self._base_currency(symbol), order.remaining)
+                order.resting = True
+                self.books.setdefault(symbol, OrderBook()).add(order)
+        elif order_type in (OrderType.STOP_LOSS.value, OrderType.TAKE_PROFIT.value) and (stop_price or price):
+            order = self._next_order(symbol, side, order_type, amount, stop_price=stop_price or price)
+            self.stop_orders[order.id] = order
+        else:
+            return Order.rejected("Unsupported order type", symbol)
+
+        self.orders[order.id] = order
+        if client_order_id:
+            self.client_order_ids[client_order_id] = order.id
+        return order.to_order()
+
+    async def find_order(self, client_order_id: str, symbol: str) -> Optional[Order]:
+        await self._simulate_latency()
+        order = self.orders.get(self.client_order_ids.get(client_order_id))
+        return order.to_order() if order else None
+
+    async def cancel_order(self, order_id: str, symbol: str) -> bool:
+        await self._simulate_latency()
+        order = self.orders.get(order_id)
+        if not order or not order.is_active:
+            return False
+        order.status = OrderStatus.CANCELLED.value
+        self.stop_orders.pop(order_id, None)
+        if order.resting:
+            if order.side == OrderSide.BUY.value:
+                self._unlock(self.quote_currency, order.remaining * order.price)
+            else:
+                self._unlock(self._base_currency(symbol), order.remaining)
+        return True
+
+    async def get_order_status(self, order_id: str, symbol: str) -> Order:
+        await self._simulate_latency()
+        order = self.orders.get(order_id)
+        if not order:
+            return Order.rejected(f"Unknown order {order_id}", symbol)
+        return order.to_order()
+
+    async def get_open_orders(self, symbol: str = None) -> List[Order]:
+        await self._simulate_latency()
+        return [o.to_order() for o in self.orders.values() if o.is_active and (symbol is None or o.symbol == symbol)]
+
+    async def get_positions(self) -> List[Position]:
+        await self._simulate_latency()
+        positions = []
+        for symbol, position in self.positions.items():
+            price = self.last_prices.get(symbol, position['entry_price'])
+            positions.append(Position(symbol, 'long', position['amount'], position['entry_price'], price,
+                                      (price - position['entry_price']) * position['amount'], timestamp=self.clock_ms))
+        return positions
+
+    async def get_ohlcv(self, symbol: str, timeframe: str = "1m", limit: int = 100,
+                        since: Optional[int] = None) -> List[List[float]]:
+        """Bars as fed to the exchange; the timeframe is whatever the feed produces"""
+        await self._simulate_latency()
+        candles = self.candles.get(symbol, [])
+        if since is not None:
+            return [list(c) for c in candles if c[0] >= since][:limit]
+        return [list(c) for c in candles[-limit:]]
+
+    async def cleanup(self):
+        if self._feed_task:
+            self._feed_task.cancel()
+        self.connected = False
+        logger.info("Simulated exchange stopped")
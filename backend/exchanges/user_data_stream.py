@@ -0,0 +1,269 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Any, Callable, List, Optional
+import websockets
+from .base_exchange import OrderStatus
+from .models import Order, Position
+from .rate_limiter import Priority
+from ..utils.logger import setup_logger
+from ..utils.config import config
+from ..utils.helpers import safe_float
+
+logger = setup_logger("user_data_stream")
+
+STREAM_URLS = {
+    True: "wss://stream.binancefuture.com/ws",
+    False: "wss://fstream.binance.com/ws",
+}
+
+ORDER_STATUSES = {
+    "NEW": OrderStatus.OPEN.value,
+    "PARTIALLY_FILLED": OrderStatus.OPEN.value,
+    "FILLED": OrderStatus.FILLED.value,
+    "CANCELED": OrderStatus.CANCELLED.value,
+    "EXPIRED": OrderStatus.CANCELLED.value,
+    "REJECTED": OrderStatus.REJECTED.value,
+}
+
+def plain_symbol(symbol: str) -> str:
+    """`BTC/USDT` for the perpetual's ccxt symbol `BTC/USDT:USDT`, the form the rest of the bot trades under"""
+    return symbol.split(':')[0] if symbol else symbol
+
+class UserDataStream:
+    """Listen-key user-data stream keeping local caches of orders, fills, balances and positions.
+
+    On every (re)connect the stream is opened first and a REST snapshot taken
+    second; events older than the snapshot are dropped so buffered updates
+    cannot roll state back. Until the first snapshot completes `is_synced` is
+    False and callers should fall back to REST.
+    """
+
+    def __init__(self, exchange, url: Optional[str] = None, keepalive_interval: float = None,
+                 reconnect_delay: float = None, max_closed_orders: int = 1000, max_fills: int = 1000):
+        self.exchange = exchange
+        self.url = url or STREAM_URLS[bool(exchange.testnet)]
+        self.keepalive_interval = keepalive_interval or config.get("exchanges.binance.user_stream.keepalive_interval", 1800)
+        self.reconnect_delay = reconnect_delay or config.get("exchanges.binance.user_stream.reconnect_delay", 1.0)
+        self.max_reconnect_delay = 60.0
+
+        self.open_orders: Dict[str, Order] = {}
+        self.closed_orders: "OrderedDict[str, Order]" = OrderedDict()
+        self.max_closed_orders = max_closed_orders
+        self.fills: deque = deque(maxlen=max_fills)
+        self.balances: Dict[str, Dict[str, float]] = {}
+        self.positions: Dict[str, Position] = {}
+        self.listeners: List[Callable[[str, Dict[str, Any]], Any]] = []
+
+        self.listen_key: Optional[str] = None
+        self.is_synced = False
+        self.snapshot_time = 0
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"events": 0, "stale_events": 0, "reconnects": 0, "resyncs": 0}
+
+    def add_listener(self, callback: Callable[[str, Dict[str, Any]], Any]):
+        """Register callback(event_type, payload) for 'order', 'fill', 'balance' and 'position' updates"""
+        self.listeners.append(callback)
+
+    async def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info("User data stream started")
+
+    async def stop(self):
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.listen_key:
+            try:
+                await self.exchange._limited('listen_key', lambda: self.exchange.exchange.fapiPrivateDeleteListenKey(),
+                                             Priority.ACCOUNT)
+            except Exception as e:
+                logger.warning(f"Could not close listen key: {e}")
+            self.listen_key = None
+        self.is_synced = False
+        logger.info(f"User data stream stopped: {self.stats}")
+
+    # --- Connection ---------------------------------------------------------
+
+    async def _create_listen_key(self) -> str:
+        response = await self.exchange._limited('listen_key', lambda: self.exchange.exchange.fapiPrivatePostListenKey(),
+                                                Priority.ACCOUNT)
+        return response['listenKey']
+
+    async def _keepalive_loop(self):
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            try:
+                await self.exchange._limited('listen_key', lambda: self.exchange.exchange.fapiPrivatePutListenKey(),
+                                             Priority.ACCOUNT)
+                logger.debug("User data stream listen key kept alive")
+            except Exception as e:
+                logger.warning(f"Listen key keep-alive failed: {e}")
+
+    async def _run(self):
+        delay = self.reconnect_delay
+        while self.running:
+            keepalive_task = None
+            try:
+                self.listen_key = await self._create_listen_key()
+                async with websockets.connect(f"{self.url}/{self.listen_key}") as ws:
+                    keepalive_task = asyncio.create_task(self._keepalive_loop())
+                    await self.resync()
+                    delay = self.reconnect_delay
+                    async for message in ws:
+                        if self.handle_message(json.loads(message)) == "listenKeyExpired":
+                            logger.warning("Listen key expired, reconnecting user data stream")
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"User data stream error: {e}. Reconnecting in {delay:.1f}s")
+            finally:
+                if keepalive_task:
+                    keepalive_task.cancel()
+            self.is_synced = False
+            if not self.running:
+                break
+            self.stats["reconnects"] += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _server_time_ms(self) -> int:
+        # Event times are exchange timestamps; apply ccxt's measured clock offset
+        options = getattr(self.exchange.exchange, 'options', None) or {}
+        return int(time.time() * 1000 - safe_float(options.get('timeDifference', 0)))
+
+    async def resync(self):
+        """Replace local state with a REST snapshot of open orders, balances and positions"""
+        # Events stamped before the snapshot started are already reflected in it
+        snapshot_time = self._server_time_ms()
+        balance = await self.exchange._limited('balance', lambda: self.exchange.exchange.fetch_balance(), Priority.ACCOUNT)
+        open_orders = await self.exchange._limited('open_orders', lambda: self.exchange.exchange.fetch_open_orders(),
+                                                   Priority.ACCOUNT, symbol=None)
+
+        self.open_orders = {}
+        for o in open_orders:
+            order = Order.from_ccxt(o)
+            order.symbol = plain_symbol(order.symbol)
+            self.open_orders[str(order.id)] = order
+        self.balances = {
+            asset: {"wallet": safe_float(data.get('total')), "free": safe_float(data.get('free'))}
+            for asset, data in balance.items()
+            if isinstance(data, dict) and 'total' in data
+        }
+        self.positions = {}
+        for position_data in (balance.get('info') or {}).get('positions', []):
+            self._apply_position(position_data.get('symbol'), safe_float(position_data.get('positionAmt')),
+                                 safe_float(position_data.get('entryPrice')),
+                                 safe_float(position_data.get('unrealizedProfit')), snapshot_time)
+        self.snapshot_time = snapshot_time
+        self.is_synced = True
+        self.stats["resyncs"] += 1
+        logger.info(f"User data stream synced: {len(self.open_orders)} open orders, {len(self.positions)} positions")
+
+    # --- Event handling -----------------------------------------------------
+
+    def handle_message(self, message: Dict[str, Any]) -> Optional[str]:
+        """Apply one user-data event to the local caches. Returns the event type."""
+        event_type = message.get('e')
+        event_time = message.get('E', 0)
+        self.stats["events"] += 1
+        if event_time and event_time < self.snapshot_time:
+            self.stats["stale_events"] += 1
+            return event_type
+        if event_type == 'ORDER_TRADE_UPDATE':
+            self._on_order_update(message['o'], event_time)
+        elif event_type == 'ACCOUNT_UPDATE':
+            self._on_account_update(message['a'], event_time)
+        return event_type
+
+    def _symbol(self, market_id: str) -> str:
+        try:
+            return plain_symbol(self.exchange.exchange.safe_symbol(market_id, None, None, 'swap'))
+        except Exception:
+            return market_id
+
+    def _notify(self, event_type: str, payload: Dict[str, Any]):
+        for callback in self.listeners:
+            try:
+                callback(event_type, payload)
+            except Exception as e:
+                logger.error(f"User data stream listener failed on {event_type}: {e}")
+
+    def _on_order_update(self, o: Dict[str, Any], event_time: int):
+        order_id = str(o['i'])
+        amount = safe_float(o.get('q'))
+        filled = safe_float(o.get('z'))
+        order = Order(order_id, self._symbol(o['s']), str(o.get('o', '')).lower(), str(o.get('S', '')).lower(),
+                      amount, safe_float(o.get('ap')) or safe_float(o.get('p')), filled, max(amount - filled, 0.0),
+                      ORDER_STATUSES.get(o.get('X'), str(o.get('X', '')).lower()), o.get('T', event_time))
+
+        if order.status == OrderStatus.OPEN.value:
+            self.open_orders[order_id] = order
+        else:
+            self.open_orders.pop(order_id, None)
+            self.closed_orders[order_id] = order
+            self.closed_orders.move_to_end(order_id)
+            while len(self.closed_orders) > self.max_closed_orders:
+                self.closed_orders.popitem(last=False)
+        self._notify('order', order)
+
+        if o.get('x') == 'TRADE':
+            fill = {
+                'order_id': order_id,
+                'trade_id': o.get('t'),
+                'symbol': order.symbol,
+                'side': order.side,
+                'amount': safe_float(o.get('l')),
+                'price': safe_float(o.get('L')),
+                'fee': safe_float(o.get('n')),
+                'fee_currency': o.get('N'),
+                'realized_pnl': safe_float(o.get('rp')),
+                'timestamp': order.timestamp
+            }
+            self.fills.append(fill)
+            self._notify('fill', fill)
+
+    def _on_account_update(self, a: Dict[str, Any], event_time: int):
+        for b in a.get('B', []):
+            balance = self.balances.setdefault(b['a'], {"wallet": 0.0, "free": 0.0})
+            balance["wallet"] = safe_float(b.get('wb'))
+            balance["free"] = safe_float(b.get('cw'))
+            self._notify('balance', {'asset': b['a'], **balance})
+        for p in a.get('P', []):
+            self._apply_position(p['s'], safe_float(p.get('pa')), safe_float(p.get('ep')), safe_float(p.get('up')), event_time)
+            symbol = self._symbol(p['s'])
+            self._notify('position', self.positions.get(symbol) or Position(symbol, 'flat', 0.0, 0.0, timestamp=event_time))
+
+    def _apply_position(self, market_id: str, amount: float, entry_price: float, unrealized_pnl: float, timestamp: int):
+        symbol = self._symbol(market_id)
+        if amount == 0:
+            self.positions.pop(symbol, None)
+            return
+        self.positions[symbol] = Position(symbol, 'long' if amount > 0 else 'short', amount, entry_price,
+                                          unrealized_pnl=unrealized_pnl, timestamp=timestamp)
+
+    # --- Local reads --------------------------------------------------------
+
+    def get_balance(self, asset: str = "USDT") -> Dict[str, float]:
+        balance = self.balances.get(asset, {})
+        return {asset: balance.get("free", 0.0), "total": balance.get("wallet", 0.0)}
+
+    def get_open_orders(self, symbol: str = None) -> List[Order]:
+        return [o for o in self.open_orders.values() if symbol is None or o.symbol == symbol]
+
+    def get_order(self, order_id: str) -> Optional[Order]:
+        return self.open_orders.get(str(order_id)) or self.closed_orders.get(str(order_id))
+
+    def get_positions(self) -> List[Position]:
+        return list(self.positions.values())
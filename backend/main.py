@@ -1,17 +1,33 @@
 import asyncio
+import json
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from datetime import datetime
+from typing import Dict, Optional
+from fastapi import FastAPI, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 import uvicorn
+from sqlalchemy.exc import SQLAlchemyError
 
 from .utils.logger import setup_logger
 from .utils.config import config
+from .utils.timing_wheel import TimerService
+from .utils.config_watcher import ConfigWatcher
+from .utils.profiler import Profiler
 from .data.storage_manager import StorageManager
 from .data.database_manager import DatabaseManager
 from .data.market_data_collector import MarketDataCollector
+from .data.candle_store import CandleStore
+from .data.trade_journal import TradeJournal
+from .exchanges.base_exchange import BaseExchange
 from .exchanges.binance_testnet import BinanceTestnet
+from .exchanges.registry import create_exchanges
+from .exchanges.quote_aggregator import QuoteAggregator
+from .exchanges.user_data_stream import UserDataStream
+from .exchanges.recording_exchange import RecordingExchange
 from .trading.portfolio_manager import PortfolioManager
 from .trading.risk_manager import RiskManager
 from .trading.strategy_manager import StrategyManager
+from .trading.order_manager import OrderManager
 from .api.rest_api import router as api_router
 
 logger = setup_logger("main")
@@ -19,15 +35,23 @@ logger = setup_logger("main")
 # Initialize components globally
 storage_manager: StorageManager = None
 database_manager: DatabaseManager = None
-exchange: BinanceTestnet = None
+trade_journal: TradeJournal = None
+timer_service: TimerService = None
+exchange: BaseExchange = None
+venues: Dict[str, BaseExchange] = {}
+quote_aggregator: QuoteAggregator = None
+user_stream: UserDataStream = None
 market_data_collector: MarketDataCollector = None
 portfolio_manager: PortfolioManager = None
 risk_manager: RiskManager = None
+order_manager: OrderManager = None
 strategy_manager: StrategyManager = None
+config_watcher: ConfigWatcher = None
+profiler = Profiler(config.get("profiling.enabled", True), config.get("profiling.capture_top", 40))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global storage_manager, database_manager, exchange, market_data_collector, portfolio_manager, risk_manager, strategy_manager
+    global storage_manager, database_manager, trade_journal, timer_service, exchange, venues, quote_aggregator, user_stream, market_data_collector, portfolio_manager, risk_manager, order_manager, strategy_manager, config_watcher
 
     logger.info("Starting up application...")
 
@@ -46,31 +70,85 @@ async def lifespan(app: FastAPI):
         logger.critical("Failed to initialize Database Manager. Exiting.")
         yield
         return
+    trade_journal = TradeJournal(database_manager)
+    await trade_journal.start()
 
-    # 3. Initialize Exchange (Binance Testnet)
-    api_key = config.get("exchanges.binance.api_key")
-    api_secret = config.get("exchanges.binance.api_secret")
-    testnet_enabled = config.get("exchanges.binance.testnet", True)
-    exchange = BinanceTestnet(api_key, api_secret, testnet=testnet_enabled)
-    if not await exchange.initialize():
+    # 3. Initialize Exchanges (every enabled venue under `exchanges:`; the primary one trades)
+    venues = create_exchanges(config.get("exchanges", {}))
+    primary = config.get("exchanges.primary", "binance")
+    if primary not in venues:
+        logger.critical(f"Primary exchange '{primary}' is not configured or not enabled. Exiting.")
+        yield
+        return
+    initialized = dict(zip(venues, await asyncio.gather(*(venue.initialize() for venue in venues.values()))))
+    for name, ok in initialized.items():
+        if not ok and name != primary:
+            logger.warning(f"Exchange '{name}' failed to initialize; leaving it out of quote aggregation")
+            venues.pop(name)
+    exchange = venues[primary]
+    if not initialized[primary]:
         logger.critical("Failed to initialize Exchange. Exiting.")
         yield
         return
 
-    # 4. Initialize Portfolio Manager
-    portfolio_manager = PortfolioManager(exchange, storage_manager, database_manager, config)
+    if isinstance(exchange, BinanceTestnet) and config.get("exchanges.binance.user_stream.enabled", True):
+        user_stream = UserDataStream(exchange)
+        await user_stream.start()
+
+    recording_path = config.get("exchanges.recording.path")
+    if recording_path:
+        # Every exchange call from here on is appended to the recording for offline replay
+        exchange = RecordingExchange(exchange, recording_path)
+        logger.info(f"Recording exchange calls to {recording_path}")
+
+    # Orders routed to the primary venue go through the same (possibly recording) adapter as everything else
+    quote_settings = dict(config.get("exchanges.quotes", {}) or {})
+    quote_refresh_interval = quote_settings.pop("refresh_interval", 1.0)
+    quote_aggregator = QuoteAggregator({**venues, primary: exchange}, **quote_settings)
+
+    # 4. Initialize Timer Service (order TTLs, cancel-replace and time stops share one timing wheel)
+    timer_service = TimerService(
+        tick=config.get("trading.timers.tick", 0.1),
+        wheel_size=config.get("trading.timers.wheel_size", 64),
+        levels=config.get("trading.timers.levels", 4)
+    )
+    timer_service.start()
+
+    # 5. Initialize Portfolio Manager
+    portfolio_manager = PortfolioManager(exchange, storage_manager, database_manager, config, trade_journal, user_stream,
+                                         timer_service)
     await portfolio_manager.initialize()
 
-    # 5. Initialize Risk Manager
+    # 6. Initialize Risk Manager
     risk_manager = RiskManager(portfolio_manager)
 
-    # 6. Initialize Market Data Collector
-    market_data_collector = MarketDataCollector(storage_manager, database_manager, exchange)
+    # 7. Initialize Market Data Collector
+    market_data_collector = MarketDataCollector(storage_manager, database_manager, exchange, CandleStore())
     await market_data_collector.initialize()
     asyncio.create_task(market_data_collector.start()) # Start data collection in background
+    routing = len(venues) > 1
+    if routing:
+        # Keep top-of-book fresh for every collected symbol so routed orders use current quotes
+        quote_aggregator.start(market_data_collector.symbols, quote_refresh_interval)
 
-    # 7. Initialize Strategy Manager
-    strategy_manager = StrategyManager(exchange, portfolio_manager, risk_manager, market_data_collector, config)
+    # 8. Initialize Order Manager (strategies queue order intents; workers place them, stops first)
+    order_manager = OrderManager(
+        exchange, portfolio_manager,
+        workers=config.get("trading.order_manager.workers", 4),
+        max_retries=config.get("trading.order_manager.max_retries", 2),
+        retry_delay=config.get("trading.order_manager.retry_delay", 0.5),
+        max_queue_size=config.get("trading.order_manager.max_queue_size", 1000),
+        order_timeout=config.get("trading.order_manager.order_timeout", 10.0),
+        timers=timer_service,
+        profiler=profiler,
+        router=quote_aggregator if routing else None
+    )
+    order_manager.start()
+    portfolio_manager.on_holding_expired = order_manager.close_expired_position
+
+    # 9. Initialize Strategy Manager
+    strategy_manager = StrategyManager(exchange, portfolio_manager, risk_manager, market_data_collector, config, order_manager,
+                                       profiler)
 
     # Start periodic strategy execution
     async def strategy_loop():
@@ -83,15 +161,31 @@ async def lifespan(app: FastAPI):
 
     asyncio.create_task(strategy_loop())
 
+    # Hot reload: edits to config.yaml retune, enable or disable strategies without a restart
+    reload_interval = config.get("trading.config_reload_interval", 5.0)
+    if reload_interval:
+        config_watcher = ConfigWatcher(config, reload_interval)
+        config_watcher.add_listener(strategy_manager.reload)
+        config_watcher.start()
+
     logger.info("Application startup complete.")
     yield
 
     logger.info("Shutting down application...")
     # Cleanup resources
+    if config_watcher:
+        await config_watcher.stop()
     await market_data_collector.cleanup()
     await strategy_manager.cleanup()
+    await order_manager.stop()
+    await quote_aggregator.stop()
+    await timer_service.stop()
     await portfolio_manager.cleanup()
-    await exchange.cleanup()
+    await trade_journal.stop()
+    if user_stream:
+        await user_stream.stop()
+    for venue in venues.values():
+        await venue.cleanup()
     await storage_manager.cleanup()
     database_manager.cleanup()
     logger.info("Application shutdown complete.")
@@ -111,29 +205,156 @@ async def get_portfolio():
         return portfolio_manager.get_portfolio_summary()
     return {"error": "Portfolio manager not initialized"}
 
+@app.get("/performance")
+async def get_performance(period: str = Query("daily", pattern="^(daily|weekly|monthly)$"), symbol: Optional[str] = None):
+    if portfolio_manager:
+        return portfolio_manager.get_performance(period, symbol)
+    return {"error": "Portfolio manager not initialized"}
+
+@app.get("/exchange/metrics")
+async def get_exchange_metrics():
+    if exchange:
+        if not hasattr(exchange, "resilience"):
+            return {"error": f"{exchange.name} does not report metrics"}
+        return {
+            "endpoints": exchange.resilience.get_metrics(),
+            "rate_limiter": exchange.rate_limiter.get_status() if exchange.rate_limiter else None,
+            "cache": exchange.coalescer.stats
+        }
+    return {"error": "Exchange not initialized"}
+
+@app.get("/quotes/{base}/{quote}")
+async def get_quotes(base: str, quote: str):
+    if quote_aggregator:
+        return await quote_aggregator.refresh(f"{base}/{quote}".upper())
+    return {"error": "Quote aggregator not initialized"}
+
+@app.get("/strategies/stats")
+async def get_strategy_stats():
+    if strategy_manager:
+        return strategy_manager.get_stats()
+    return {"error": "Strategy manager not initialized"}
+
+@app.get("/strategies/shadow")
+async def get_shadow_report(strategy: Optional[str] = None, top: int = Query(20, ge=1, le=1000)):
+    if strategy_manager:
+        return strategy_manager.get_shadow_report(strategy, top)
+    return {"error": "Strategy manager not initialized"}
+
+@app.get("/strategies/ranking")
+async def get_signal_ranking(strategy: Optional[str] = None, top: int = Query(50, ge=1, le=10000)):
+    if strategy_manager:
+        return strategy_manager.get_rankings(strategy, top)
+    return {"error": "Strategy manager not initialized"}
+
+@app.get("/profile")
+async def get_profile(strategy: Optional[str] = None, symbol: Optional[str] = None):
+    return profiler.report(strategy, symbol)
+
+@app.post("/profile/capture", status_code=status.HTTP_202_ACCEPTED)
+async def request_profile_capture():
+    profiler.request_capture()
+    return {"status": "cProfile capture requested for the next strategy cycle"}
+
+@app.get("/profile/capture")
+async def get_profile_capture():
+    if profiler.last_capture is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No capture yet")
+    return profiler.last_capture
+
+@app.delete("/profile")
+async def reset_profile():
+    profiler.reset()
+    return {"status": "reset"}
+
+@app.get("/orders")
+async def get_orders():
+    if order_manager:
+        return order_manager.get_status()
+    return {"error": "Order manager not initialized"}
+
+@app.get("/timers")
+async def get_timers():
+    if timer_service:
+        return timer_service.get_status()
+    return {"error": "Timer service not initialized"}
+
 @app.get("/market_data")
 async def get_market_data():
     if market_data_collector:
         return await market_data_collector.get_current_data()
     return {"error": "Market data collector not initialized"}
 
+def _stream_response(rows, fmt: str) -> StreamingResponse:
+    """Wrap a row iterator in a streaming NDJSON or JSON array response.
+
+    The status line is already sent when rows start flowing, so a stream that
+    fails part-way ends with an {"error": ...} element instead of looking complete.
+    """
+    def guarded():
+        try:
+            yield from rows
+        except SQLAlchemyError:
+            yield {"error": "Database error while streaming; results are incomplete"}
+
+    if fmt == "ndjson":
+        body = (json.dumps(row) + "\n" for row in guarded())
+        return StreamingResponse(body, media_type="application/x-ndjson")
+
+    def json_array():
+        yield "["
+        first = True
+        for row in guarded():
+            yield ("" if first else ",") + json.dumps(row)
+            first = False
+        yield "]"
+    return StreamingResponse(json_array(), media_type="application/json")
+
 @app.get("/trades")
-async def get_trades():
+async def get_trades(response: Response, symbol: Optional[str] = None, is_open: Optional[bool] = None,
+                     cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000)):
     if database_manager:
-        trades = database_manager.get_trades()
-        return [{
-            "id": trade.id,
-            "timestamp": trade.timestamp.isoformat(),
-            "symbol": trade.symbol,
-            "side": trade.side,
-            "entry_price": trade.entry_price,
-            "exit_price": trade.exit_price,
-            "amount": trade.amount,
-            "profit_loss_usd": trade.profit_loss_usd,
-            "is_open": trade.is_open
-        } for trade in trades]
+        try:
+            page = database_manager.get_trades_page(symbol, is_open, cursor, limit)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        if page["next_cursor"]:
+            response.headers["X-Next-Cursor"] = page["next_cursor"]
+        return page["items"]
     return {"error": "Database manager not initialized"}
 
+@app.get("/trades/stream")
+async def stream_trades(symbol: Optional[str] = None, is_open: Optional[bool] = None,
+                        cursor: Optional[str] = None, format: str = Query("ndjson", pattern="^(ndjson|json)$")):
+    if not database_manager:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database manager not initialized")
+    try:
+        rows = database_manager.stream_trades(symbol, is_open, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return _stream_response(rows, format)
+
+@app.get("/candles")
+async def get_candles(symbol: Optional[str] = None, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      cursor: Optional[str] = None, limit: int = Query(500, ge=1, le=5000)):
+    if not database_manager:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database manager not initialized")
+    try:
+        return database_manager.get_market_data_page(symbol, start, end, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@app.get("/candles/stream")
+async def stream_candles(symbol: Optional[str] = None, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                         cursor: Optional[str] = None, format: str = Query("ndjson", pattern="^(ndjson|json)$")):
+    if not database_manager:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database manager not initialized")
+    try:
+        rows = database_manager.stream_market_data(symbol, start, end, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return _stream_response(rows, format)
+
 if __name__ == "__main__":
     host = config.get("server.host", "0.0.0.0")
     port = config.get("server.port", 8000)
@@ -0,0 +1,440 @@
+import asyncio
+import itertools
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Dict, Any, List, Optional
+from ..exchanges.base_exchange import OrderSide
+from ..exchanges.base_exchange import OrderType, OrderStatus
+from ..exchanges.models import Order
+from ..utils.logger import setup_logger
+from ..utils.timing_wheel import TimerHandle
+
+logger = setup_logger("order_manager")
+
+class IntentPriority(IntEnum):
+    """Lower runs first: protective exits jump ahead of everything queued behind them."""
+    STOP_LOSS = 0
+    EXIT = 1
+    ENTRY = 2
+
+# Intent purposes and the priority each is queued at
+PURPOSE_ENTRY = "entry"
+PURPOSE_EXIT = "exit"
+PURPOSE_STOP_LOSS = "stop_loss"
+PURPOSE_TAKE_PROFIT = "take_profit"
+PURPOSE_TIME_EXIT = "time_exit"
+
+# Order statuses after which nothing more can fill
+FINAL_STATUSES = (OrderStatus.FILLED.value, OrderStatus.CANCELLED.value, OrderStatus.REJECTED.value)
+
+PURPOSE_PRIORITIES = {
+    PURPOSE_STOP_LOSS: IntentPriority.STOP_LOSS,
+    PURPOSE_TAKE_PROFIT: IntentPriority.EXIT,
+    PURPOSE_EXIT: IntentPriority.EXIT,
+    PURPOSE_TIME_EXIT: IntentPriority.EXIT,
+    PURPOSE_ENTRY: IntentPriority.ENTRY,
+}
+
+@dataclass(slots=True)
+class OrderIntent:
+    """What a strategy wants done; the OMS turns it into exchange orders and portfolio updates."""
+    symbol: str
+    side: str
+    amount: float
+    purpose: str = PURPOSE_ENTRY
+    order_type: str = OrderType.MARKET.value
+    price: Optional[float] = None
+    reference_price: Optional[float] = None  # Price the decision was made at; recorded as entry/exit price
+    reservation_id: Optional[str] = None  # Entry funds held in the portfolio ledger, owned by the OMS once submitted
+    strategy: Optional[str] = None
+    venue: Optional[str] = None  # Where the order was placed when orders are routed across venues
+    # Resting limit orders: cancelled after `ttl` seconds, then re-placed at the touch up to `replaces` more times
+    ttl: Optional[float] = None
+    replaces: int = 0
+    timer: Optional[TimerHandle] = None
+    id: Optional[str] = None
+    status: str = "pending"
+    attempts: int = 0
+    order: Optional[Order] = None
+    client_order_id: Optional[str] = None  # Tag of the latest placement, to find it again if its outcome is unknown
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.monotonic)
+    completed_at: Optional[float] = None
+
+    @property
+    def priority(self) -> int:
+        return PURPOSE_PRIORITIES[self.purpose]
+
+    @property
+    def is_exit(self) -> bool:
+        return self.purpose != PURPOSE_ENTRY
+
+    @property
+    def dedup_key(self) -> str:
+        # One live entry and one live exit per symbol: a stop and a sell signal for the same position are one order
+        return f"{self.symbol}:{'exit' if self.is_exit else 'entry'}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id, "symbol": self.symbol, "side": self.side, "amount": self.amount, "purpose": self.purpose,
+            "strategy": self.strategy, "status": self.status, "attempts": self.attempts, "error": self.error,
+            "order_id": self.order.id if self.order else None, "venue": self.venue,
+        }
+
+class OrderManager:
+    """Order management between strategies and the exchange.
+
+    Strategies `submit` intents and return immediately. A pool of workers
+    drains a priority queue (stop-losses, then exits, then entries; FIFO
+    within a priority), places the orders, retries transient failures and
+    applies fills to the portfolio: entries commit their reservation, exits
+    close the position. While an intent for a symbol/direction is pending or
+    in flight, further identical intents are folded into it.
+
+    Only attempts that left nothing working on the exchange (a rejection, a
+    cancelled order) are retried. A failure that may have happened after the
+    exchange accepted the order (a timeout) is first looked up by its client
+    order id: if the order exists it is followed, and if that cannot be told
+    the intent ends "unconfirmed" rather than risk a second order. An order
+    that was placed but has not filled is looked up once more and then
+    followed instead: it stays "open" with a deadline on the timer service
+    (its `ttl`, else `order_timeout`) rather than a task per order. When the deadline fires the
+    order is cancelled and, once the exchange confirms it is closed, either
+    its fill is applied or, while `replaces` remain, it is re-queued at the
+    current touch (cancel-replace). A partly filled exit closes that much of
+    the position and works the rest the same way. Until then nothing is
+    re-placed.
+
+    With a `router` (QuoteAggregator) entries go to the best-priced venue and
+    exits to the venue their entry filled on; every later call for an order
+    goes to its own venue.
+    """
+
+    def __init__(self, exchange, portfolio_manager, workers: int = 4, max_retries: int = 2,
+                 retry_delay: float = 0.5, max_queue_size: int = 1000, history_size: int = 200, timers=None,
+                 profiler=None, order_timeout: float = 10.0, router=None):
+        self.exchange = exchange
+        self.router = router
+        # Venue holding each position opened through the router; exits go back there
+        self.position_venues: Dict[str, str] = {}
+        # Seconds an unfilled order without its own ttl works before it is cancelled
+        self.order_timeout = order_timeout
+        self.profiler = profiler
+        self.portfolio_manager = portfolio_manager
+        self.timers = timers
+        self.num_workers = workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.history_size = history_size
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue(max_queue_size)
+        self.active: Dict[str, OrderIntent] = {}
+        self.completed: List[OrderIntent] = []
+        self.stats = {"submitted": 0, "deduplicated": 0, "filled": 0, "failed": 0, "retries": 0, "dropped": 0,
+                      "expired": 0, "replaced": 0}
+        self._sequence = itertools.count(1)
+        # Prefix of every client order id, so ids from an earlier run never match this run's orders
+        self.session = uuid.uuid4().hex[:8]
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.num_workers)]
+            logger.info(f"Order manager started with {self.num_workers} workers")
+
+    async def stop(self):
+        """Stop the workers; intents still queued are dropped and their reservations released"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for intent in list(self.active.values()):
+            if intent.status == "open":
+                # Resting orders stay on the exchange; only our deadline goes away
+                self.timers.cancel(intent.timer)
+                self._finish(intent, "cancelled", "Order manager stopped")
+        while not self.queue.empty():
+            _, _, intent = self.queue.get_nowait()
+            self.queue.task_done()
+            self._finish(intent, "cancelled", "Order manager stopped")
+        logger.info("Order manager stopped")
+
+    def submit(self, intent: OrderIntent) -> OrderIntent:
+        """Queue an intent without waiting for the exchange; returns the intent now tracking it.
+
+        If an equivalent intent is already pending or in flight, that one is
+        returned instead and the new intent's reservation is released.
+        """
+        existing = self.active.get(intent.dedup_key)
+        if existing is not None:
+            self.stats["deduplicated"] += 1
+            logger.debug(f"Intent for {intent.dedup_key} already {existing.status} as {existing.id}")
+            if intent.reservation_id and intent.reservation_id != existing.reservation_id:
+                self.portfolio_manager.release(intent.reservation_id)
+            return existing
+
+        sequence = next(self._sequence)
+        intent.id = intent.id or f"intent-{sequence}"
+        try:
+            self.queue.put_nowait((intent.priority, sequence, intent))
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            self._finish(intent, "rejected", "Order queue full")
+            return intent
+        self.active[intent.dedup_key] = intent
+        self.stats["submitted"] += 1
+        logger.info(f"Queued {intent.purpose} {intent.side} {intent.amount:.6f} {intent.symbol} ({intent.id})")
+        return intent
+
+    async def wait_idle(self):
+        """Wait until every queued intent has been processed"""
+        await self.queue.join()
+
+    async def _worker(self, index: int):
+        while True:
+            _, _, intent = await self.queue.get()
+            try:
+                await self._process(intent)
+            except Exception as e:
+                logger.error(f"Order worker {index} failed on {intent.id}: {e}")
+                self._finish(intent, "failed", str(e))
+            finally:
+                self.queue.task_done()
+
+    async def _process(self, intent: OrderIntent):
+        if intent.is_exit and intent.symbol not in self.portfolio_manager.portfolio["positions"]:
+            # Closed while this exit waited in the queue
+            self._finish(intent, "cancelled", "No open position")
+            return
+
+        intent.status = "submitting"
+        while True:
+            intent.attempts += 1
+            intent.client_order_id = f"{self.session}-{intent.id}-{intent.attempts}"
+            started = time.perf_counter()
+            try:
+                order = await self._place(intent)
+            except Exception as e:
+                order = Order.rejected(f"{type(e).__name__}: {e}", intent.symbol, outcome_unknown=True)
+            self._record(intent, "order", started)
+            if order.get("outcome_unknown"):
+                order = await self._reconcile(intent, order)
+                if order.get("outcome_unknown"):
+                    # It may have been placed (and filled); another attempt could buy or sell twice
+                    intent.order = order
+                    self._finish(intent, "unconfirmed", f"Outcome unknown: {order.get('info')}")
+                    return
+            resting = intent.ttl and order and order.get("status") == OrderStatus.OPEN.value
+            if self._is_live(order) and not resting:
+                # Placed but not filled (yet): look again before deciding anything
+                order = await self._confirm(intent, order)
+            if order and order.get("status") == OrderStatus.FILLED.value:
+                intent.order = order
+                started = time.perf_counter()
+                await self._apply_fill(intent, order)
+                self._record(intent, "portfolio", started)
+                self._finish(intent, "filled")
+                return
+            if self._is_live(order):
+                # Still working on the exchange; placing another could fill twice (an exit would sell twice)
+                self._watch(intent, order, intent.ttl or self.order_timeout)
+                return
+
+            error = order.get("info") or f"Order {order.get('status')}"
+            # Nothing is working on the exchange (a definite rejection or a dead order), so a new attempt is safe
+            if intent.attempts > self.max_retries:
+                intent.order = order
+                self._finish(intent, "failed", error)
+                return
+            self.stats["retries"] += 1
+            logger.warning(f"Retrying {intent.purpose} for {intent.symbol} after: {error}")
+            await asyncio.sleep(self.retry_delay * intent.attempts)
+
+    async def _place(self, intent: OrderIntent) -> Order:
+        if self.router is None:
+            return await self.exchange.place_order(intent.symbol, intent.side, intent.order_type, intent.amount,
+                                                   intent.price, client_order_id=intent.client_order_id)
+        if intent.is_exit:
+            # Only the venue holding the position can sell it
+            intent.venue = self.position_venues.get(intent.symbol)
+            return await self._exchange_for(intent).place_order(intent.symbol, intent.side, intent.order_type,
+                                                                intent.amount, intent.price,
+                                                                client_order_id=intent.client_order_id)
+        intent.venue, order = await self.router.route_order(intent.symbol, intent.side, intent.order_type,
+                                                            intent.amount, intent.price,
+                                                            client_order_id=intent.client_order_id)
+        return order
+
+    async def _reconcile(self, intent: OrderIntent, order: Order) -> Order:
+        """Settle a placement whose outcome is unknown by looking it up under its client order id.
+
+        Returns the order if the exchange has it, a plain rejection if it does
+        not, and `order` unchanged if the lookups keep failing.
+        """
+        exchange = self._exchange_for(intent)
+        for lookup in range(1, self.max_retries + 2):
+            # Give an order still in flight time to land before concluding it does not exist
+            await asyncio.sleep(self.retry_delay * lookup)
+            try:
+                found = await exchange.find_order(intent.client_order_id, intent.symbol)
+            except Exception as e:
+                logger.warning(f"Could not look up order {intent.client_order_id} for {intent.symbol}: {e}")
+                continue
+            if found is None:
+                logger.info(f"Order {intent.client_order_id} for {intent.symbol} never reached the exchange")
+                return Order.rejected(order.get("info"), intent.symbol)
+            if found.get("id"):
+                logger.warning(f"Order {intent.client_order_id} for {intent.symbol} was placed despite "
+                               f"{order.get('info')}; following it")
+                return found
+        return order
+
+    def _exchange_for(self, intent: OrderIntent):
+        """Adapter the intent's order lives on (the primary exchange unless routed elsewhere)"""
+        if self.router is None or intent.venue is None:
+            return self.exchange
+        return self.router.exchanges[intent.venue]
+
+    @staticmethod
+    def _is_live(order: Optional[Order]) -> bool:
+        """Order exists on the exchange and may still fill"""
+        return bool(order and order.get("id")) and order.get("status") not in FINAL_STATUSES
+
+    async def _confirm(self, intent: OrderIntent, order: Order) -> Order:
+        """Current state of a placed order; the placement response when the lookup fails"""
+        exchange = self._exchange_for(intent)
+        # The portfolio serves primary-venue orders from the user-data stream, using REST only while it is stale
+        source = self.portfolio_manager if exchange is self.exchange else exchange
+        try:
+            current = await source.get_order_status(order["id"], intent.symbol)
+        except Exception as e:
+            logger.warning(f"Could not look up order {order['id']} for {intent.symbol}: {e}")
+            return order
+        # A failed lookup comes back as a rejection without an id: it says nothing about the order
+        return current if current and current.get("id") else order
+
+    def _watch(self, intent: OrderIntent, order: Order, ttl: float):
+        """Follow a working order with a deadline on the timer service"""
+        intent.order = order
+        if self.timers is None:
+            # No way to follow it up: leave it to the exchange rather than risk a second order
+            self._finish(intent, "unconfirmed", f"Order {order['id']} still {order.get('status')}")
+            return
+        intent.status = "open"
+        intent.ttl = ttl
+        intent.timer = self.timers.schedule(ttl, self._on_deadline, intent)
+        if intent.reservation_id:
+            # Keep the funds held while the order works, plus the usual grace for the fill to be applied
+            self.portfolio_manager.extend_reservation(intent.reservation_id, ttl + self.portfolio_manager.reservation_ttl)
+        logger.debug(f"{intent.id} working as {order['id']} for {ttl}s")
+
+    def _record(self, intent: OrderIntent, phase: str, started: float):
+        if self.profiler:
+            self.profiler.record(intent.strategy or "orders", intent.symbol, phase, time.perf_counter() - started)
+
+    async def _on_deadline(self, intent: OrderIntent):
+        """TTL of a resting order ran out: cancel it, then take the fill, re-place it, or give up"""
+        intent.timer = None
+        if intent.status != "open":
+            return
+        order = intent.order
+        try:
+            cancelled = await self._exchange_for(intent).cancel_order(order["id"], intent.symbol)
+            # Whatever filled before the cancel landed is ours either way
+            current = await self._confirm(intent, order)
+        except Exception as e:
+            cancelled, current = False, order
+            logger.error(f"Could not cancel expired order {order['id']} for {intent.symbol}: {e}")
+        if current is order or current.get("status") not in FINAL_STATUSES:
+            # Cancel or lookup unconfirmed: the order may still be working, so neither re-place nor give up yet
+            logger.warning(f"Expired order {order['id']} for {intent.symbol} not confirmed closed "
+                           f"(cancel {'sent' if cancelled else 'failed'}); checking again in {intent.ttl}s")
+            intent.timer = self.timers.schedule(intent.ttl, self._on_deadline, intent)
+            return
+        order = current
+
+        filled = order.get("filled")
+        if filled and intent.is_exit and filled < intent.amount:
+            # Only part of the position is out: book that part and work the rest like an unfilled exit
+            intent.order = order
+            price = intent.reference_price or order.get("price") or intent.price
+            await self.portfolio_manager.close_position(intent.symbol, price, order["id"], amount=filled)
+            intent.amount -= filled
+            logger.info(f"{intent.purpose} for {intent.symbol} partly filled, {intent.amount:.6f} left to exit")
+        elif filled:
+            intent.order = order
+            intent.amount = filled
+            await self._apply_fill(intent, order)
+            self._finish(intent, "filled")
+            return
+
+        if intent.replaces > 0 and (not intent.is_exit or intent.symbol in self.portfolio_manager.portfolio["positions"]):
+            intent.replaces -= 1
+            intent.price = await self._touch_price(intent) or intent.price
+            intent.status = "pending"
+            self.stats["replaced"] += 1
+            logger.info(f"Replacing expired {intent.purpose} order for {intent.symbol} at {intent.price}")
+            self.queue.put_nowait((intent.priority, next(self._sequence), intent))
+        else:
+            self.stats["expired"] += 1
+            self._finish(intent, "expired", f"Not filled within {intent.ttl}s")
+
+    async def _touch_price(self, intent: OrderIntent) -> Optional[float]:
+        try:
+            ticker = await self._exchange_for(intent).get_ticker(intent.symbol)
+        except Exception as e:
+            logger.warning(f"No ticker to reprice {intent.symbol}: {e}")
+            return None
+        if not ticker:
+            return None
+        # Join the near side of the book: bid for buys, ask for sells
+        return ticker.get("bid" if intent.side == OrderSide.BUY.value else "ask") or ticker.get("last")
+
+    def close_expired_position(self, position) -> OrderIntent:
+        """Time stop: queue a market exit for a position held longer than allowed"""
+        side = OrderSide.SELL.value if position["side"] == OrderSide.BUY.value else OrderSide.BUY.value
+        logger.warning(f"Max holding time reached for {position['symbol']}; closing")
+        return self.submit(OrderIntent(position["symbol"], side, position["amount"], PURPOSE_TIME_EXIT,
+                                       reference_price=position["current_price"]))
+
+    async def _apply_fill(self, intent: OrderIntent, order: Order):
+        price = intent.reference_price or order.get("price") or intent.price
+        if intent.is_exit:
+            await self.portfolio_manager.close_position(intent.symbol, price, order["id"])
+            self.position_venues.pop(intent.symbol, None)
+        else:
+            await self.portfolio_manager.commit(intent.reservation_id, intent.side, intent.amount, price, order["id"],
+                                                intent.symbol)
+            if intent.venue:
+                self.position_venues[intent.symbol] = intent.venue
+        logger.info(f"{intent.purpose} {intent.side} for {intent.symbol} filled. Order ID: {order['id']}")
+
+    def _finish(self, intent: OrderIntent, status: str, error: Optional[str] = None):
+        intent.status = status
+        intent.error = error
+        intent.completed_at = time.monotonic()
+        if intent.timer is not None:
+            self.timers.cancel(intent.timer)
+            intent.timer = None
+        if self.active.get(intent.dedup_key) is intent:
+            del self.active[intent.dedup_key]
+        if intent.reservation_id and status != "filled":
+            # No-op if the fill already committed it
+            self.portfolio_manager.release(intent.reservation_id)
+        if status == "filled":
+            self.stats["filled"] += 1
+        elif status == "failed":
+            self.stats["failed"] += 1
+            logger.error(f"Failed {intent.purpose} {intent.side} for {intent.symbol}: {error}")
+        self.completed.append(intent)
+        del self.completed[:-self.history_size]
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queue.qsize(),
+            "active": [intent.to_dict() for intent in self.active.values()],
+            "recent": [intent.to_dict() for intent in self.completed[-20:]],
+            "stats": self.stats,
+            "workers": len(self._workers),
+        }
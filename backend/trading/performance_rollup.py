@@ -0,0 +1,132 @@
+import math
+from datetime import date, datetime
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+from ..utils.logger import setup_logger
+from ..utils.helpers import safe_float
+from ..data.database_models import BUCKET_FIELDS, trade_delta
+
+logger = setup_logger("performance_rollup")
+
+def _trade_day(timestamp: Any) -> date:
+    if isinstance(timestamp, datetime):
+        return timestamp.date()
+    if isinstance(timestamp, date):
+        return timestamp
+    if isinstance(timestamp, str) and timestamp:
+        try:
+            return datetime.fromisoformat(timestamp).date()
+        except ValueError:
+            pass
+    return datetime.utcnow().date()
+
+def _period_key(day: date, period: str) -> str:
+    if period == "daily":
+        return day.isoformat()
+    if period == "weekly":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == "monthly":
+        return f"{day.year}-{day.month:02d}"
+    raise ValueError(f"Unsupported period: {period}")
+
+class PerformanceRollup:
+    """Incrementally maintained realized PnL aggregates keyed by (day, symbol).
+
+    Every closed trade updates exactly one bucket and the running totals, so
+    summaries and charts cost O(number of buckets) regardless of trade history.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[Tuple[date, str], Dict[str, Any]] = {}
+        self.totals: Dict[str, Any] = self._empty_bucket()
+
+    @staticmethod
+    def _empty_bucket() -> Dict[str, Any]:
+        return {field: 0 if field.endswith("_count") else 0.0 for field in BUCKET_FIELDS}
+
+    def _apply(self, key: Tuple[date, str], delta: Dict[str, Any]):
+        bucket = self.buckets.setdefault(key, self._empty_bucket())
+        for field in BUCKET_FIELDS:
+            bucket[field] += delta.get(field, 0)
+            self.totals[field] += delta.get(field, 0)
+
+    def record_trade(self, trade_data: Dict[str, Any]) -> Tuple[date, str, Dict[str, Any]]:
+        """Fold a closed trade into its bucket. Returns (day, symbol, delta) for persistence."""
+        day = _trade_day(trade_data.get("timestamp"))
+        symbol = trade_data.get("symbol", "UNKNOWN")
+        delta = trade_delta(safe_float(trade_data.get("realized_pnl")))
+        self._apply((day, symbol), delta)
+        return day, symbol, delta
+
+    def load_buckets(self, rows: Iterable[Dict[str, Any]]):
+        """Replace state with persisted buckets (dicts with day, symbol and BUCKET_FIELDS)"""
+        self.buckets = {}
+        self.totals = self._empty_bucket()
+        for row in rows:
+            self._apply((_trade_day(row["day"]), row["symbol"]), row)
+
+    def rebuild_from_trades(self, trades: Iterable[Dict[str, Any]]):
+        """Recompute buckets from a trade list; only used when nothing is persisted"""
+        self.buckets = {}
+        self.totals = self._empty_bucket()
+        for trade in trades:
+            self.record_trade(trade)
+
+    @property
+    def total_realized_pnl(self) -> float:
+        return self.totals["realized_pnl"]
+
+    def get_pnl(self, period: str = "daily", symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Realized PnL per daily/weekly/monthly period, oldest first"""
+        grouped: Dict[str, Dict[str, Any]] = {}
+        for (day, bucket_symbol), bucket in self.buckets.items():
+            if symbol and bucket_symbol != symbol:
+                continue
+            key = _period_key(day, period)
+            target = grouped.setdefault(key, self._empty_bucket())
+            for field in BUCKET_FIELDS:
+                target[field] += bucket[field]
+
+        result = []
+        for key in sorted(grouped):
+            bucket = grouped[key]
+            result.append({
+                "period": key,
+                **bucket,
+                "win_rate": bucket["win_count"] / bucket["trade_count"] if bucket["trade_count"] else 0.0
+            })
+        return result
+
+    def get_metrics(self, symbol: Optional[str] = None) -> Dict[str, Any]:
+        """Win rate, profit factor, annualized Sharpe and max drawdown over daily buckets"""
+        daily = self.get_pnl("daily", symbol)
+        totals = self._empty_bucket()
+        for bucket in daily:
+            for field in BUCKET_FIELDS:
+                totals[field] += bucket[field]
+
+        daily_pnl = [bucket["realized_pnl"] for bucket in daily]
+        sharpe_ratio = 0.0
+        if len(daily_pnl) > 1:
+            mean = sum(daily_pnl) / len(daily_pnl)
+            variance = sum((p - mean) ** 2 for p in daily_pnl) / (len(daily_pnl) - 1)
+            if variance > 0:
+                sharpe_ratio = mean / math.sqrt(variance) * math.sqrt(365)
+
+        equity = 0.0
+        peak = 0.0
+        max_drawdown = 0.0
+        for pnl in daily_pnl:
+            equity += pnl
+            peak = max(peak, equity)
+            max_drawdown = max(max_drawdown, peak - equity)
+
+        return {
+            "realized_pnl": totals["realized_pnl"],
+            "trade_count": totals["trade_count"],
+            "win_rate": totals["win_count"] / totals["trade_count"] if totals["trade_count"] else 0.0,
+            "profit_factor": totals["gross_profit"] / totals["gross_loss"] if totals["gross_loss"] else None,
+            "sharpe_ratio": sharpe_ratio,
+            "max_drawdown_usd": max_drawdown,
+            "trading_days": len(daily_pnl)
+        }
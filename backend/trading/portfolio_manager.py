@@ -1,18 +1,34 @@
 import asyncio
-from typing import Dict, Any, List
-from datetime import datetime
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, List, Optional
 from ..utils.logger import setup_logger
 from ..utils.helpers import safe_float, calculate_pnl
+from .performance_rollup import PerformanceRollup
+from ..exchanges.models import Order, Position, Trade, now_ms
 
 logger = setup_logger("portfolio_manager")
 
+@dataclass(slots=True)
+class Reservation:
+    """Funds and a position slot held for an order that has not filled yet."""
+    id: str
+    symbol: str
+    amount_usd: float
+    expires_at: float  # time.monotonic()
+
 class PortfolioManager:
     """Manages the trading portfolio, balances, and positions."""
 
-    def __init__(self, exchange, storage_manager, database_manager, config):
+    def __init__(self, exchange, storage_manager, database_manager, config, trade_journal=None, user_stream=None,
+                 timers=None):
         self.exchange = exchange
+        self.user_stream = user_stream
         self.storage_manager = storage_manager
         self.database_manager = database_manager
+        self.trade_journal = trade_journal
         self.config = config
         self.portfolio = {
             "balance": {
@@ -26,6 +42,22 @@ class PortfolioManager:
         self.max_positions = config.get('trading.max_positions', 2)
         self.min_position_size = config.get('trading.min_position_size', 0.5)
         self.max_position_size = config.get("trading.max_position_size", 2.0)
+        self.performance = PerformanceRollup()
+        # Reservation ledger: reserve() takes a slot and funds atomically before an order is sent,
+        # commit() turns it into a position, release() gives it back; abandoned ones expire after the TTL
+        self.reservation_ttl = safe_float(config.get("trading.reservation_ttl", 30.0))
+        self.reservations: Dict[str, Reservation] = {}
+        self.reserved_usd = 0.0
+        self._reservation_ids = itertools.count(1)
+        self._reservation_lock = threading.Lock()
+        # Bumped whenever positions, reservations or balances change, so strategies can tell their inputs are stale
+        self.version = 0
+        # Time stop: with a timer service, positions older than max_holding_time (s, 0 = off) are handed
+        # to on_holding_expired(position), which is expected to close them (OrderManager.close_expired_position)
+        self.timers = timers
+        self.max_holding_time = safe_float(config.get("trading.max_holding_time", 0))
+        self.on_holding_expired: Optional[Callable[[Position], Any]] = None
+        self.holding_timers: Dict[str, Any] = {}
 
     async def initialize(self):
         """Initialize portfolio by fetching balances and positions from exchange."""
@@ -45,43 +77,98 @@ class PortfolioManager:
                 self.portfolio["trades"].extend(past_trades)
                 logger.info(f"Loaded {len(past_trades)} past trades from storage.")
 
+            self._load_performance_rollups(past_trades or [])
+
             logger.info("Portfolio manager initialized.")
         except Exception as e:
             logger.error(f"Error initializing portfolio manager: {e}")
 
+    def _load_performance_rollups(self, past_trades: List[Dict[str, Any]]):
+        """Restore PnL rollups from the database, falling back to the stored trade list."""
+        try:
+            rows = self.database_manager.get_pnl_rollups() if self.database_manager else []
+            if rows:
+                self.performance.load_buckets(rows)
+                logger.info(f"Loaded {len(rows)} PnL rollup buckets from database.")
+                return
+        except Exception as e:
+            logger.warning(f"Could not load PnL rollups from database: {e}")
+        self.performance.rebuild_from_trades(past_trades)
+
+    async def _persist_rollup(self, day, symbol: str, delta: Dict[str, Any]):
+        if not self.database_manager:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.database_manager.apply_trade_to_rollup, day, symbol, delta)
+        except Exception as e:
+            logger.error(f"Error persisting PnL rollup for {symbol}: {e}")
+
     async def update_balance(self):
         """Update account balance from exchange."""
         if not self.exchange.connected:
             logger.warning("Cannot update balance: Not connected to exchange.")
             return
 
+        self.expire_reservations()
         try:
-            exchange_balance = await self.exchange.get_balance()
+            if self._stream_synced:
+                # Kept current by execution reports; no REST round trip on the trading path
+                exchange_balance = self.user_stream.get_balance()
+            else:
+                exchange_balance = await self.exchange.get_balance()
             if exchange_balance:
+                previous = dict(self.portfolio["balance"])
                 self.portfolio["balance"]["total"] = safe_float(exchange_balance.get('USDT', 0.0))
                 # For simplicity, assuming available is total for now, refine with actual locked funds later
                 self.portfolio["balance"]["available"] = safe_float(exchange_balance.get('USDT', 0.0))
                 self.portfolio["balance"]["locked"] = 0.0 # Reset locked, will be recalculated from open orders/positions
+                if self.portfolio["balance"] != previous:
+                    self.version += 1
                 logger.debug(f"Balance updated: {self.portfolio['balance']['total']}")
         except Exception as e:
             logger.error(f"Error updating balance: {e}")
 
+    @property
+    def _stream_synced(self) -> bool:
+        """Whether the user-data stream's local state is current (connected and snapshotted)"""
+        return self.user_stream is not None and self.user_stream.is_synced
+
+    async def get_order_status(self, order_id: str, symbol: str) -> Order:
+        """Order state from the user-data stream; REST only while the stream is stale or has not seen the order."""
+        if self._stream_synced:
+            order = self.user_stream.get_order(order_id)
+            if order is not None:
+                return order
+        return await self.exchange.get_order_status(order_id, symbol)
+
+    async def get_open_orders(self, symbol: str = None) -> List[Order]:
+        """Open orders on the exchange, from the user-data stream unless it is stale."""
+        if self._stream_synced:
+            return self.user_stream.get_open_orders(symbol)
+        return await self.exchange.get_open_orders(symbol)
+
+    async def get_exchange_positions(self) -> List[Position]:
+        """Positions as the exchange sees them, from the user-data stream unless it is stale."""
+        if self._stream_synced:
+            return self.user_stream.get_positions()
+        return await self.exchange.get_positions()
+
     async def add_position(self, symbol: str, side: str, amount: float, entry_price: float, order_id: str):
         """Add a new position to the portfolio."""
         if symbol in self.portfolio["positions"]:
             logger.warning(f"Position for {symbol} already exists. Consider updating instead.")
             return
 
-        self.portfolio["positions"][symbol] = {
-            'symbol': symbol,
-            'side': side,
-            "amount": amount,
-            'entry_price': entry_price,
-            'current_price': entry_price, # Initialize with entry price
-            'unrealized_pnl': 0.0,
-            'order_id': order_id,
-            'timestamp': datetime.utcnow().isoformat()
-        }
+        self.portfolio["positions"][symbol] = Position(
+            symbol, side, amount, entry_price,
+            current_price=entry_price, # Initialize with entry price
+            order_id=order_id,
+            timestamp=now_ms()
+        )
+        self.version += 1
+        if self.timers and self.max_holding_time > 0:
+            self.holding_timers[symbol] = self.timers.schedule(self.max_holding_time, self._holding_expired, symbol)
         logger.info(f"Added new position: {side} {amount} {symbol} at {entry_price}")
         await self.update_balance() # Balance might change after opening a position
 
@@ -92,71 +179,184 @@ class PortfolioManager:
             return
 
         position = self.portfolio["positions"][symbol]
-        position['current_price'] = current_price
-        position['unrealized_pnl'] = calculate_pnl(
-            position['entry_price'], current_price, position["amount"], position['side']
+        position.current_price = current_price
+        position.unrealized_pnl = calculate_pnl(
+            position.entry_price, current_price, position.amount, position.side
         )
-        logger.debug(f"Updated position for {symbol}. PnL: {position['unrealized_pnl']:.2f}")
+        logger.debug(f"Updated position for {symbol}. PnL: {position.unrealized_pnl:.2f}")
 
-    async def close_position(self, symbol: str, exit_price: float, trade_id: str):
-        """Close a position and record the trade."""
+    async def close_position(self, symbol: str, exit_price: float, trade_id: str, amount: Optional[float] = None):
+        """Close a position, or only `amount` of it, and record the trade."""
         if symbol not in self.portfolio["positions"]:
             logger.warning(f"Cannot close position: {symbol} not found.")
             return
 
-        position = self.portfolio["positions"].pop(symbol)
+        position = self.portfolio["positions"][symbol]
+        closed = position.amount if amount is None else min(amount, position.amount)
+        if closed < position.amount:
+            # Partial exit: the rest stays open with its entry price and holding timer
+            position.unrealized_pnl *= (position.amount - closed) / position.amount
+            position.amount -= closed
+        else:
+            del self.portfolio["positions"][symbol]
+            if symbol in self.holding_timers:
+                self.timers.cancel(self.holding_timers.pop(symbol))
+        self.version += 1
         realized_pnl = calculate_pnl(
-            position['entry_price'], exit_price, position["amount"], position['side']
+            position.entry_price, exit_price, closed, position.side
         )
 
-        trade_data = {
-           "id": trade_id,
-            'symbol': symbol,
-            'side': position['side'],
-            "amount": position["amount"],
-            'entry_price': position['entry_price'],
-            'exit_price': exit_price,
-            'realized_pnl': realized_pnl,
-            'timestamp': datetime.utcnow().isoformat()
-        }
+        # Serialized once here: the trade list, journal and storage all take the persisted form
+        trade_data = Trade(
+            trade_id, symbol, position.side, closed, position.entry_price, exit_price, realized_pnl, now_ms()
+        ).to_dict()
         self.portfolio["trades"].append(trade_data)
+        day, _, delta = self.performance.record_trade(trade_data)
+        if self.trade_journal:
+            # The journal writes the trade and its rollup increment in one transaction, off the order path
+            self.trade_journal.submit(trade_data)
+        else:
+            await self._persist_rollup(day, symbol, delta)
         await self.storage_manager.save_trade(trade_data)
 
         logger.info(f"Closed position for {symbol}. Realized PnL: {realized_pnl:.2f}")
         await self.update_balance() # Balance might change after closing a position
 
+    def _holding_expired(self, symbol: str):
+        self.holding_timers.pop(symbol, None)
+        position = self.portfolio["positions"].get(symbol)
+        if position is None:
+            return None
+        if self.on_holding_expired is None:
+            logger.warning(f"Position for {symbol} exceeded max holding time but no handler is set.")
+            return None
+        return self.on_holding_expired(position)
+
     def get_portfolio_summary(self) -> Dict[str, Any]:
         """Get a summary of the current portfolio."""
-        total_unrealized_pnl = sum(p['unrealized_pnl'] for p in self.portfolio["positions"].values())
+        total_unrealized_pnl = sum(p.unrealized_pnl for p in self.portfolio["positions"].values())
         return {
-            "balance": self.portfolio["balance"],
+            "balance": {**self.portfolio["balance"], "reserved": self.reserved_usd},
             'open_positions_count': len(self.portfolio["positions"]),
+            'reservations_count': len(self.reservations),
             'total_unrealized_pnl': total_unrealized_pnl,
-            'total_realized_pnl': sum(t['realized_pnl'] for t in self.portfolio["trades"]),
-            "positions": list(self.portfolio["positions"].values())
+            'total_realized_pnl': self.performance.total_realized_pnl,
+            "positions": [p.to_dict() for p in self.portfolio["positions"].values()]
         }
 
+    def get_performance(self, period: str = "daily", symbol: str = None) -> Dict[str, Any]:
+        """Get bucketed realized PnL and summary metrics from the incremental rollups."""
+        return {
+            "period": period,
+            "buckets": self.performance.get_pnl(period, symbol),
+            "metrics": self.performance.get_metrics(symbol)
+        }
+
+    @property
+    def available_balance(self) -> float:
+        """Available balance not yet promised to a pending order (lock-free read)."""
+        return self.portfolio["balance"]["available"] - self.reserved_usd
+
+    def _check_open(self, amount_usd: float, symbol: Optional[str] = None) -> Optional[str]:
+        """Reason a new position cannot be opened, or None; pending reservations count as taken."""
+        if len(self.portfolio["positions"]) + len(self.reservations) >= self.max_positions:
+            return "Max positions limit reached."
+        if symbol is not None and (symbol in self.portfolio["positions"] or
+                                   any(r.symbol == symbol for r in self.reservations.values())):
+            return f"A position for {symbol} is already open or pending."
+        if amount_usd < self.min_position_size:
+            return f"Amount ${amount_usd:.2f} is below minimum position size ${self.min_position_size:.2f}."
+        if amount_usd > self.max_position_size:
+            return f"Amount ${amount_usd:.2f} exceeds maximum position size ${self.max_position_size:.2f}."
+        if amount_usd > self.available_balance:
+            return f"Insufficient available balance. Needed: ${amount_usd:.2f}, Available: ${self.available_balance:.2f}."
+        return None
+
     def can_open_position(self, amount_usd: float) -> bool:
         """Check if a new position can be opened based on limits."""
-        if len(self.portfolio["positions"]) >= self.max_positions:
-            logger.warning("Cannot open new position: Max positions limit reached.")
+        reason = self._check_open(amount_usd)
+        if reason:
+            logger.warning(f"Cannot open new position: {reason}")
             return False
+        return True
 
-        if amount_usd < self.min_position_size:
-            logger.warning(f"Cannot open new position: Amount ${amount_usd:.2f} is below minimum position size ${self.min_position_size:.2f}.")
-            return False
+    def reserve(self, symbol: str, amount_usd: float, ttl: Optional[float] = None) -> Optional[str]:
+        """Atomically check the limits and hold funds plus a position slot; returns a reservation id or None."""
+        with self._reservation_lock:
+            self._expire_locked(time.monotonic())
+            reason = self._check_open(amount_usd, symbol)
+            if reason:
+                logger.warning(f"Cannot reserve for {symbol}: {reason}")
+                return None
+            reservation_id = f"res-{next(self._reservation_ids)}"
+            self.reservations[reservation_id] = Reservation(
+                reservation_id, symbol, amount_usd, time.monotonic() + (self.reservation_ttl if ttl is None else ttl))
+            self.reserved_usd += amount_usd
+            self.version += 1
+        logger.debug(f"Reserved ${amount_usd:.2f} for {symbol} ({reservation_id})")
+        return reservation_id
 
-        if amount_usd > self.max_position_size:
-            logger.warning(f"Cannot open new position: Amount ${amount_usd:.2f} exceeds maximum position size ${self.max_position_size:.2f}.")
-            return False
+    def release(self, reservation_id: str) -> bool:
+        """Give a reservation back; a no-op if it was already committed, released or expired."""
+        with self._reservation_lock:
+            reservation = self.reservations.pop(reservation_id, None)
+            if reservation is None:
+                return False
+            self.reserved_usd = max(0.0, self.reserved_usd - reservation.amount_usd)
+            self.version += 1
+        logger.debug(f"Released ${reservation.amount_usd:.2f} for {reservation.symbol} ({reservation_id})")
+        return True
 
-        # Check if enough available balance
-        if amount_usd > self.portfolio["balance"]["available"]:
-            logger.warning(f"Cannot open new position: Insufficient available balance. Needed: ${amount_usd:.2f}, Available: ${self.portfolio['balance']['available']:.2f}.")
-            return False
+    def extend_reservation(self, reservation_id: str, seconds: float) -> bool:
+        """Keep a reservation alive for at least `seconds` more, e.g. while its limit order rests."""
+        with self._reservation_lock:
+            reservation = self.reservations.get(reservation_id)
+            if reservation is None:
+                return False
+            reservation.expires_at = max(reservation.expires_at, time.monotonic() + seconds)
+        return True
 
+    async def commit(self, reservation_id: str, side: str, amount: float, entry_price: float, order_id: str,
+                     symbol: Optional[str] = None) -> bool:
+        """Turn a reservation into an open position once its order has filled.
+
+        A fill is real even if its reservation expired first: the position is
+        still recorded (for `symbol`) and its cost debited directly. Returns
+        whether the reservation was still held.
+        """
+        with self._reservation_lock:
+            reservation = self.reservations.pop(reservation_id, None)
+            if reservation is not None:
+                self.reserved_usd = max(0.0, self.reserved_usd - reservation.amount_usd)
+                self.version += 1
+        if reservation is None:
+            if symbol is None:
+                logger.error(f"Reservation {reservation_id} expired or was released before commit; "
+                             f"fill of order {order_id} cannot be recorded without its symbol.")
+                return False
+            cost = amount * entry_price
+            logger.warning(f"Reservation {reservation_id} expired or was released before commit; recording the "
+                           f"{symbol} fill of order {order_id} anyway and debiting ${cost:.2f} directly.")
+            self.portfolio["balance"]["available"] -= cost
+            await self.add_position(symbol, side, amount, entry_price, order_id)
+            return False
+        # The funds move from the ledger into the position and, after the balance refresh, out of `available`
+        self.portfolio["balance"]["available"] -= reservation.amount_usd
+        await self.add_position(reservation.symbol, side, amount, entry_price, order_id)
         return True
 
+    def _expire_locked(self, now: float):
+        for reservation_id in [r.id for r in self.reservations.values() if r.expires_at <= now]:
+            reservation = self.reservations.pop(reservation_id)
+            self.reserved_usd = max(0.0, self.reserved_usd - reservation.amount_usd)
+            self.version += 1
+            logger.warning(f"Reservation {reservation_id} for {reservation.symbol} expired unused.")
+
+    def expire_reservations(self):
+        """Drop reservations whose TTL has passed (abandoned by a cancelled or crashed order path)."""
+        with self._reservation_lock:
+            self._expire_locked(time.monotonic())
+
     async def cleanup(self):
         """Cleanup resources."""
         logger.info("Portfolio manager cleanup completed.")
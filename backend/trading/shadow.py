@@ -0,0 +1,162 @@
+import dataclasses
+import itertools
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+import numpy as np
+from .strategies.base_strategy import BaseStrategy, StrategyParams, SIGNAL_BUY, SIGNAL_SELL
+from ..utils.logger import setup_logger
+
+logger = setup_logger("shadow")
+
+@dataclass(slots=True)
+class VirtualBooks:
+    """Long-only paper positions of every variant on one symbol, as parallel arrays (index = variant)."""
+    quantity: np.ndarray  # 0 while flat
+    entry_price: np.ndarray
+    realized_pnl: np.ndarray  # before fees
+    fees: np.ndarray
+    trades: np.ndarray
+    wins: np.ndarray
+    last_price: float = np.nan
+
+    @classmethod
+    def empty(cls, size: int) -> "VirtualBooks":
+        return cls(np.zeros(size), np.zeros(size), np.zeros(size), np.zeros(size),
+                   np.zeros(size, dtype=np.int64), np.zeros(size, dtype=np.int64))
+
+    def unrealized_pnl(self) -> np.ndarray:
+        if np.isnan(self.last_price):
+            return np.zeros(len(self.quantity))
+        return self.quantity * (self.last_price - self.entry_price)
+
+class ShadowBank:
+    """Paper-trades many parameter variants of one strategy on the live feed.
+
+    Variants share the strategy's price history: each new tick of a symbol is
+    read once and all variants are evaluated by one `batch_signals` call.
+    Every variant trades a fixed `amount_usd`, long-only and one position per
+    symbol like the live rules, with market fills at the last price moved by
+    `slippage_bps` against it and `fee_rate` charged on both legs. Nothing
+    reaches the exchange or the real portfolio.
+    """
+
+    def __init__(self, strategy: BaseStrategy, variants: List[StrategyParams], overrides: List[Dict[str, Any]],
+                 amount_usd: float = 5.0, fee_rate: float = 0.001, slippage_bps: float = 5.0,
+                 settings: Optional[Dict[str, Any]] = None):
+        self.strategy = strategy
+        self.variants = variants
+        self.overrides = overrides
+        self.amount_usd = amount_usd
+        self.fee_rate = fee_rate
+        self.slippage = slippage_bps / 10000.0
+        self.settings = settings
+        # Enough bars for the most demanding variant
+        self.lookback = max(strategy.with_params(params).signal_lookback() for params in variants)
+        self.books: Dict[str, VirtualBooks] = {}
+        self.last_sequence: Dict[str, int] = {}
+        self.stats = {"evaluations": 0, "skipped": 0, "fills": 0}
+
+    @classmethod
+    def from_config(cls, strategy: BaseStrategy, settings: Dict[str, Any]) -> Optional["ShadowBank"]:
+        """Variants from `grid` (every combination of the listed values) plus explicit `variants`,
+        each applied on top of the strategy's current parameters; invalid ones are skipped."""
+        grid = settings.get("grid") or {}
+        overrides = [dict(zip(grid, values)) for values in itertools.product(*grid.values())] if grid else []
+        overrides += [dict(variant) for variant in settings.get("variants") or []]
+
+        variants, kept = [], []
+        for override in overrides[:settings.get("max_variants", 1000)]:
+            try:
+                params = dataclasses.replace(strategy.params, **override)
+            except (TypeError, ValueError) as e:
+                logger.debug(f"Skipping shadow variant {override} of {strategy.name}: {e}")
+                continue
+            if params not in variants:
+                variants.append(params)
+                kept.append(override)
+        if not variants:
+            logger.warning(f"No valid shadow variants configured for {strategy.name}")
+            return None
+        return cls(strategy, variants, kept, settings.get("amount_usd", 5.0), settings.get("fee_rate", 0.001),
+                   settings.get("slippage_bps", 5.0), settings)
+
+    def step(self, symbol: str, close: np.ndarray):
+        """Evaluate every variant on the newest bar of close and fill their paper orders"""
+        signals = self.strategy.batch_signals(close, self.variants)
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = VirtualBooks.empty(len(self.variants))
+        price = float(close[-1])
+        flat = book.quantity == 0
+        buys = (signals == SIGNAL_BUY) & flat
+        sells = (signals == SIGNAL_SELL) & ~flat
+
+        if sells.any():
+            fill = price * (1 - self.slippage)
+            quantity = book.quantity[sells]
+            gross = quantity * (fill - book.entry_price[sells])
+            fees = quantity * fill * self.fee_rate
+            book.realized_pnl[sells] += gross
+            book.fees[sells] += fees
+            book.trades[sells] += 1
+            # Net of both legs' fees
+            book.wins[sells] += (gross - fees - quantity * book.entry_price[sells] * self.fee_rate) > 0
+            book.quantity[sells] = 0.0
+            book.entry_price[sells] = 0.0
+        if buys.any():
+            fill = price * (1 + self.slippage)
+            book.quantity[buys] = self.amount_usd / fill
+            book.entry_price[buys] = fill
+            book.fees[buys] += self.amount_usd * self.fee_rate
+        book.last_price = price
+        self.stats["fills"] += int(buys.sum() + sells.sum())
+
+    async def evaluate(self, collector, symbol: str) -> bool:
+        """Step symbol if it has a new tick since the last evaluation"""
+        sequence = collector.get_sequence(symbol)
+        if self.last_sequence.get(symbol) == sequence:
+            self.stats["skipped"] += 1
+            return False
+        history = await collector.get_price_history(symbol, self.lookback)
+        if not history:
+            return False
+        close = np.fromiter((item["price"] for item in history), dtype=float, count=len(history))
+        self.step(symbol, close)
+        self.last_sequence[symbol] = sequence
+        self.stats["evaluations"] += 1
+        return True
+
+    async def run(self, collector):
+        for symbol in self.strategy.symbols:
+            await self.evaluate(collector, symbol)
+
+    def report(self, top: Optional[int] = None) -> Dict[str, Any]:
+        """Per-variant PnL across all symbols, best net PnL first"""
+        size = len(self.variants)
+        realized, unrealized, fees = np.zeros(size), np.zeros(size), np.zeros(size)
+        trades, wins, open_positions = np.zeros(size, dtype=np.int64), np.zeros(size, dtype=np.int64), np.zeros(size, dtype=np.int64)
+        for book in self.books.values():
+            realized += book.realized_pnl
+            unrealized += book.unrealized_pnl()
+            fees += book.fees
+            trades += book.trades
+            wins += book.wins
+            open_positions += book.quantity > 0
+        net = realized + unrealized - fees
+        order = np.argsort(-net, kind="stable")[:top]
+        return {
+            "variants": size,
+            "amount_usd": self.amount_usd,
+            "stats": self.stats,
+            "ranking": [{
+                "variant": int(i),
+                "params": self.overrides[i],
+                "net_pnl": float(net[i]),
+                "realized_pnl": float(realized[i]),
+                "unrealized_pnl": float(unrealized[i]),
+                "fees": float(fees[i]),
+                "trades": int(trades[i]),
+                "win_rate": float(wins[i] / trades[i]) if trades[i] else 0.0,
+                "open_positions": int(open_positions[i]),
+            } for i in order],
+        }
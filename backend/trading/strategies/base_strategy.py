@@ -1,26 +1,220 @@
+import asyncio
+import copy
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from collections import defaultdict
+from contextlib import nullcontext
+from dataclasses import dataclass, fields
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Type
+import numpy as np
+from ...data.indicators import IndicatorSpec
+from ...exchanges.base_exchange import OrderType
+from ..order_manager import OrderIntent, PURPOSE_ENTRY
 from ...utils.logger import setup_logger
 
 logger = setup_logger('base_strategy')
 
+# Values of the array returned by generate_signals
+SIGNAL_BUY = 1
+SIGNAL_SELL = -1
+SIGNAL_HOLD = 0
+
+@dataclass(frozen=True)
+class StrategyParams:
+    """Tunable parameters of a strategy, read from its `strategies.<name>` config section.
+
+    Immutable: a reload builds a new object and swaps the reference, so an
+    evaluation that captured `self.params` never sees half-applied values.
+    Subclasses add fields and validate them in __post_init__ (ValueError).
+    """
+    symbols: Tuple[str, ...] = ()
+    min_volume: float = 1000000
+
+    @classmethod
+    def from_config(cls, settings: Dict[str, Any]) -> "StrategyParams":
+        """Params from a config section; keys that are not fields (enabled, type, timeout, ...) are ignored"""
+        known = {f.name for f in fields(cls) if f.init}
+        values = {key: value for key, value in (settings or {}).items() if key in known}
+        if "symbols" in values:
+            values["symbols"] = tuple(values["symbols"] or ())
+        return cls(**values)
+
 class BaseStrategy(ABC):
     """Base class for all trading strategies."""
 
-    def __init__(self, exchange, portfolio_manager, risk_manager, market_data_collector, config):
+    params_class: Type[StrategyParams] = StrategyParams
+    # Config section read when no instance name is given
+    config_section: Optional[str] = None
+
+    def __init__(self, exchange, portfolio_manager, risk_manager, market_data_collector, config,
+                 name: Optional[str] = None):
         self.exchange = exchange
         self.portfolio_manager = portfolio_manager
         self.risk_manager = risk_manager
         self.market_data_collector = market_data_collector
         self.config = config
+        self.symbols: List[str] = []
+        # Set by StrategyManager: a semaphore bounding concurrent symbol evaluations across all
+        # strategies, and per-symbol locks so two strategies never act on the same symbol at once
+        self.concurrency: Optional[asyncio.Semaphore] = None
+        # Set by StrategyManager when an OrderManager runs; orders are then queued instead of placed inline
+        self.order_manager = None
+        # Set by StrategyManager: per-phase decision latency histograms
+        self.profiler = None
+        self.name = name or self.config_section or type(self).__name__
+        self.symbol_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # Inputs each symbol was last evaluated with; a symbol is skipped until they change
+        self.last_inputs: Dict[str, Tuple[int, int]] = {}
+        self.evaluation_stats = {"evaluated": 0, "skipped": 0}
+        self.params = self.params_class()
+        if config is not None and (name or self.config_section):
+            self.update_params(config.get(f"strategies.{self.name}", {}))
+
+    def update_params(self, settings: Dict[str, Any]) -> bool:
+        """Swap in parameters from a config section; False if nothing changed.
+
+        Raises ValueError for invalid settings, leaving the current parameters
+        in place. Symbols whose decision may depend on the old values are
+        re-evaluated on the next run.
+        """
+        params = self.params_class.from_config(settings)
+        if params == self.params:
+            return False
+        self.params = params
+        self.symbols = list(params.symbols)
+        self.invalidate()
+        return True
+
+    def required_indicators(self) -> List[IndicatorSpec]:
+        """Indicators this strategy reads from market data; the collector computes them for its symbols."""
+        return []
+
+    def generate_signals(self, frame) -> np.ndarray:
+        """Signal for every bar of frame (anything with a "close" column: DataFrame or dict of arrays).
+
+        Pure and vectorized: returns an int8 array of SIGNAL_BUY / SIGNAL_SELL /
+        SIGNAL_HOLD, one per bar, so a backtest evaluates a whole history in one
+        call and live trading takes the last element over the recent tail.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not implement generate_signals")
+
+    def batch_signals(self, close: np.ndarray, variants: Sequence[StrategyParams]) -> np.ndarray:
+        """Newest-bar signal of each parameter variant over the same prices (int8, one per variant).
+
+        The default runs generate_signals once per variant; strategies override
+        it to evaluate every variant in one vectorized pass.
+        """
+        signals = np.zeros(len(variants), dtype=np.int8)
+        for i, params in enumerate(variants):
+            signals[i] = self.with_params(params).generate_signals({"close": close})[-1]
+        return signals
+
+    def phase(self, symbol: str, name: str):
+        """Time the enclosed block as phase `name` of this strategy on symbol (no-op without a profiler)"""
+        return self.profiler.phase(self.name, symbol, name) if self.profiler else nullcontext()
+
+    def with_params(self, params: StrategyParams) -> "BaseStrategy":
+        """Shallow copy running on other parameters, for pure calls (signals, lookback) only"""
+        variant = copy.copy(self)
+        variant.params = params
+        return variant
+
+    def signal_lookback(self) -> int:
+        """Bars of history live trading passes to generate_signals"""
+        return max((spec.lookback for spec in self.required_indicators()), default=1)
+
+    async def latest_signal(self, symbol: str) -> int:
+        """Signal for the newest bar, from generate_signals over the tail of the collector's price history"""
+        history = await self.market_data_collector.get_price_history(symbol, self.signal_lookback())
+        if not history:
+            return SIGNAL_HOLD
+        close = np.fromiter((item["price"] for item in history), dtype=float, count=len(history))
+        return int(self.generate_signals({"close": close})[-1])
+
+    async def submit_order(self, symbol: str, side: str, amount: float, reference_price: float,
+                           purpose: str = PURPOSE_ENTRY, reservation_id: Optional[str] = None,
+                           order_type: str = OrderType.MARKET.value, price: Optional[float] = None,
+                           ttl: Optional[float] = None, replaces: int = 0) -> bool:
+        """Send an order intent; True once the order is owned by the OMS (or filled, when inline).
+
+        With an OrderManager this only queues the intent; a limit order with a
+        `ttl` is then cancelled (and re-placed up to `replaces` times) if it has
+        not filled in time. Without one the order is placed and applied to the
+        portfolio here, as strategies always did. On True the reservation
+        belongs to whoever completes the order.
+        """
+        intent = OrderIntent(symbol, side, amount, purpose, order_type, price, reference_price=reference_price,
+                             reservation_id=reservation_id, strategy=self.name, ttl=ttl, replaces=replaces)
+        if self.order_manager is not None:
+            return self.order_manager.submit(intent).status not in ("rejected", "failed", "cancelled")
+
+        with self.phase(symbol, "order"):
+            order_result = await self.exchange.place_order(symbol, side, order_type, amount, price)
+        if order_result and order_result.get("status") == "filled":
+            with self.phase(symbol, "portfolio"):
+                if intent.is_exit:
+                    await self.portfolio_manager.close_position(symbol, reference_price, order_result["id"])
+                else:
+                    await self.portfolio_manager.commit(reservation_id, side, amount, reference_price, order_result["id"],
+                                                        symbol)
+            logger.info(f"{purpose} {side} order for {symbol} filled. Order ID: {order_result['id']}")
+            return True
+        logger.error(f"Failed to fill {purpose} {side} order for {symbol}: "
+                     f"{order_result.get('info', 'Unknown error') if order_result else 'No response'}")
+        return False
+
+    async def execute(self, symbols: Optional[Sequence[str]] = None):
+        """Execute the trading strategy logic for all symbols (or `symbols`, in that order) concurrently.
+
+        A failing symbol is logged and does not affect the others; cancelling
+        execute (e.g. on timeout) cancels every symbol still running.
+        """
+        symbols = self.symbols if symbols is None else symbols
+        results = await asyncio.gather(*(self._execute_guarded(symbol) for symbol in symbols),
+                                       return_exceptions=True)
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.error(f"{type(self).__name__} failed for {symbol}: {type(result).__name__}: {result}")
+
+    def input_version(self, symbol: str) -> Optional[Tuple[int, int]]:
+        """(market data sequence, portfolio version) this symbol's decision depends on, or None if untracked"""
+        get_sequence = getattr(self.market_data_collector, "get_sequence", None)
+        portfolio_version = getattr(self.portfolio_manager, "version", None)
+        if get_sequence is None or portfolio_version is None:
+            return None
+        return get_sequence(symbol), portfolio_version
+
+    def has_new_inputs(self, symbol: str, inputs: Optional[Tuple[int, int]] = None) -> bool:
+        """False if symbol was already evaluated with its current inputs (untracked inputs are always new)"""
+        inputs = self.input_version(symbol) if inputs is None else inputs
+        return inputs is None or self.last_inputs.get(symbol) != inputs
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """Force re-evaluation of symbol (or all symbols) on the next run, e.g. after a parameter change"""
+        if symbol is None:
+            self.last_inputs.clear()
+        else:
+            self.last_inputs.pop(symbol, None)
+
+    async def _execute_guarded(self, symbol: str):
+        async with self.concurrency or nullcontext():
+            async with self.symbol_locks[symbol]:
+                # Read under the symbol lock so another strategy's trade on this symbol is seen
+                inputs = self.input_version(symbol)
+                if not self.has_new_inputs(symbol, inputs):
+                    self.evaluation_stats["skipped"] += 1
+                    return
+                with self.phase(symbol, "total"):
+                    await self.execute_symbol(symbol)
+                self.evaluation_stats["evaluated"] += 1
+                if inputs is not None:
+                    # Only after a clean run: a failed evaluation is retried next cycle
+                    self.last_inputs[symbol] = inputs
 
     @abstractmethod
-    async def execute(self):
-        """Execute the trading strategy logic."""
+    async def execute_symbol(self, symbol: str):
+        """Execute the trading strategy logic for one symbol."""
         pass
 
     async def cleanup(self):
         """Cleanup resources specific to the strategy."""
         pass
-
-
@@ -0,0 +1,330 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Sequence
+import numpy as np
+from .base_strategy import BaseStrategy, StrategyParams, SIGNAL_BUY, SIGNAL_SELL
+from ...data.indicators import (ema_matrix, macd_matrix, rma_matrix, rsi_matrix, sma_matrix, rolling_max_matrix,
+                                rolling_min_matrix, rolling_std_matrix)
+from ...utils.logger import setup_logger
+from ...exchanges.base_exchange import OrderSide
+from ..order_manager import PURPOSE_ENTRY, PURPOSE_EXIT, PURPOSE_STOP_LOSS, PURPOSE_TAKE_PROFIT
+
+logger = setup_logger("ensemble_strategy")
+
+# Columns of the vote matrix and rows of the weight matrix
+VOTERS = ("rsi", "macd", "bbands", "stochastic", "ema", "atr", "divergence")
+REGIMES = ("trend", "range", "volatile")
+REGIME_TREND, REGIME_RANGE, REGIME_VOLATILE = range(len(REGIMES))
+
+# Trend followers lead in a trend, oscillators in a range, breakouts and reversals when volatile
+DEFAULT_WEIGHTS = {
+    "trend": {"rsi": 0.5, "macd": 2.0, "bbands": 0.5, "stochastic": 0.5, "ema": 2.0, "atr": 1.0, "divergence": 1.0},
+    "range": {"rsi": 2.0, "macd": 0.5, "bbands": 2.0, "stochastic": 1.5, "ema": 0.5, "atr": 0.5, "divergence": 1.0},
+    "volatile": {"rsi": 1.0, "macd": 1.0, "bbands": 1.0, "stochastic": 0.5, "ema": 1.0, "atr": 2.0, "divergence": 1.5},
+}
+
+@dataclass(frozen=True)
+class EnsembleParams(StrategyParams):
+    rsi_period: int = 14
+    oversold_threshold: float = 30
+    overbought_threshold: float = 70
+    macd_fast: int = 12
+    macd_slow: int = 26
+    macd_signal: int = 9
+    bb_period: int = 20
+    bb_std: float = 2.0
+    stoch_period: int = 14
+    stoch_oversold: float = 20
+    stoch_overbought: float = 80
+    ema_fast: int = 9
+    ema_slow: int = 21
+    atr_period: int = 14
+    atr_multiplier: float = 1.0
+    divergence_window: int = 14
+    # Regime: volatile when ATR / price exceeds volatile_threshold, else trend when |EMA fast - slow| / slow exceeds trend_threshold
+    trend_threshold: float = 0.02
+    volatile_threshold: float = 0.025
+    # Weighted score is in [-1, 1]: buy at or above buy_score, sell at or below -sell_score
+    buy_score: float = 0.3
+    sell_score: float = 0.3
+    # {regime: {voter: weight}} on top of DEFAULT_WEIGHTS
+    weights: Optional[Dict[str, Dict[str, float]]] = None
+    weight_matrix: np.ndarray = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        periods = ("rsi_period", "macd_fast", "macd_signal", "bb_period", "stoch_period", "ema_fast", "atr_period",
+                   "divergence_window")
+        for name in periods:
+            if getattr(self, name) < 1:
+                raise ValueError(f"{name} must be positive, got {getattr(self, name)}")
+        if self.macd_fast >= self.macd_slow or self.ema_fast >= self.ema_slow:
+            raise ValueError("Fast periods must be below slow periods (macd_fast < macd_slow, ema_fast < ema_slow)")
+        if not 0 <= self.oversold_threshold < self.overbought_threshold <= 100:
+            raise ValueError(f"RSI thresholds must satisfy 0 <= oversold ({self.oversold_threshold}) "
+                             f"< overbought ({self.overbought_threshold}) <= 100")
+        if not 0 <= self.stoch_oversold < self.stoch_overbought <= 100:
+            raise ValueError(f"Stochastic thresholds must satisfy 0 <= oversold ({self.stoch_oversold}) "
+                             f"< overbought ({self.stoch_overbought}) <= 100")
+        if not (0 < self.buy_score <= 1 and 0 < self.sell_score <= 1):
+            raise ValueError("buy_score and sell_score must be in (0, 1]")
+
+        matrix = np.array([[DEFAULT_WEIGHTS[regime][voter] for voter in VOTERS] for regime in REGIMES])
+        for regime, overrides in (self.weights or {}).items():
+            if regime not in REGIMES:
+                raise ValueError(f"Unknown regime '{regime}' in weights (expected one of {REGIMES})")
+            for voter, weight in (overrides or {}).items():
+                if voter not in VOTERS:
+                    raise ValueError(f"Unknown indicator '{voter}' in {regime} weights (expected one of {VOTERS})")
+                matrix[REGIMES.index(regime), VOTERS.index(voter)] = float(weight)
+        totals = np.abs(matrix).sum(axis=1, keepdims=True)
+        if (totals == 0).any():
+            raise ValueError("Every regime needs at least one non-zero weight")
+        # Normalized rows keep every regime's score in [-1, 1], so one pair of thresholds fits all
+        object.__setattr__(self, "weight_matrix", matrix / totals)
+
+    @property
+    def warmup(self) -> int:
+        """Bars before every indicator has a value"""
+        return max(self.macd_slow + self.macd_signal - 1, self.ema_slow, self.bb_period, self.stoch_period,
+                   self.rsi_period + self.divergence_window, self.atr_period + 1)
+
+@dataclass(slots=True)
+class EnsembleScores:
+    """Ensemble state of every symbol (row) at every bar (column)."""
+    votes: np.ndarray  # int8, (symbols, bars, voters)
+    regimes: np.ndarray  # index into REGIMES, (symbols, bars)
+    scores: np.ndarray  # (symbols, bars), NaN during warm-up
+    signals: np.ndarray  # int8, (symbols, bars)
+
+def _vote(up: np.ndarray, down: np.ndarray) -> np.ndarray:
+    # NaN comparisons are False, so warm-up bars abstain
+    return up.astype(np.int8) - down.astype(np.int8)
+
+def score_matrix(close: np.ndarray, params: EnsembleParams) -> EnsembleScores:
+    """Votes, regimes and weighted scores for a (symbols, bars) close matrix in whole-array operations.
+
+    Only close prices are available for every symbol, so the Stochastic
+    oscillator uses the close range and ATR the mean absolute close-to-close
+    change.
+    """
+    close = np.asarray(close, dtype=float)
+    symbols, bars = close.shape
+    votes = np.zeros((symbols, bars, len(VOTERS)), dtype=np.int8)
+
+    rsi = rsi_matrix(close, params.rsi_period)
+    votes[..., 0] = _vote(rsi < params.oversold_threshold, rsi > params.overbought_threshold)
+
+    line, signal_line = macd_matrix(close, params.macd_fast, params.macd_slow, params.macd_signal)
+    votes[..., 1] = _vote(line > signal_line, line < signal_line)
+
+    middle = sma_matrix(close, params.bb_period)
+    deviation = params.bb_std * rolling_std_matrix(close, params.bb_period)
+    votes[..., 2] = _vote(close < middle - deviation, close > middle + deviation)
+
+    low, high = rolling_min_matrix(close, params.stoch_period), rolling_max_matrix(close, params.stoch_period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stochastic = np.where(high > low, 100 * (close - low) / (high - low), 50.0)
+    stochastic[np.isnan(high)] = np.nan
+    votes[..., 3] = _vote(stochastic < params.stoch_oversold, stochastic > params.stoch_overbought)
+
+    fast, slow = ema_matrix(close, params.ema_fast), ema_matrix(close, params.ema_slow)
+    votes[..., 4] = _vote(fast > slow, fast < slow)
+
+    atr = np.full((symbols, bars), np.nan)
+    if bars > 1:
+        atr[:, 1:] = rma_matrix(np.abs(np.diff(close, axis=1)), params.atr_period)
+    # Volatility breakout out of an ATR channel around the slow EMA
+    votes[..., 5] = _vote(close > slow + params.atr_multiplier * atr, close < slow - params.atr_multiplier * atr)
+
+    # Price at a new window extreme that RSI does not confirm
+    window = params.divergence_window
+    at_high = close >= rolling_max_matrix(close, window)
+    at_low = close <= rolling_min_matrix(close, window)
+    votes[..., 6] = _vote(at_low & (rsi > rolling_min_matrix(rsi, window)),
+                          at_high & (rsi < rolling_max_matrix(rsi, window)))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volatile = atr / close > params.volatile_threshold
+        trending = np.abs(fast - slow) / slow > params.trend_threshold
+    regimes = np.where(volatile, REGIME_VOLATILE, np.where(trending, REGIME_TREND, REGIME_RANGE))
+
+    # Score under every regime's weights in one product, then keep each bar's own regime
+    by_regime = votes @ params.weight_matrix.T
+    scores = np.take_along_axis(by_regime, regimes[..., None], axis=-1)[..., 0]
+    scores[:, :min(params.warmup - 1, bars)] = np.nan
+    signals = _vote(scores >= params.buy_score, scores <= -params.sell_score)
+    return EnsembleScores(votes, regimes, scores, signals)
+
+class EnsembleStrategy(BaseStrategy):
+    """Regime-weighted vote of seven indicators, scored for all symbols in one matrix pass."""
+
+    params_class = EnsembleParams
+    config_section = "ensemble"
+
+    def __init__(self, exchange, portfolio_manager, risk_manager, market_data_collector, config,
+                 name: Optional[str] = None):
+        super().__init__(exchange, portfolio_manager, risk_manager, market_data_collector, config, name)
+        # Latest decision per symbol: signal, score, regime and the individual votes
+        self.decisions: Dict[str, Dict[str, Any]] = {}
+
+    def signal_lookback(self) -> int:
+        # EMA and Wilder smoothing depend on where they start; a long tail makes live match the full-history backtest
+        params = self.params
+        return max(10 * params.rsi_period, 10 * params.atr_period, 5 * params.macd_slow + params.macd_signal,
+                   5 * params.ema_slow, params.warmup)
+
+    def generate_signals(self, frame) -> np.ndarray:
+        """Buy when the regime-weighted vote reaches buy_score, sell when it falls to -sell_score."""
+        close = np.asarray(frame["close"], dtype=float)
+        return score_matrix(close[None, :], self.params).signals[0]
+
+    async def score_symbols(self, symbols: Sequence[str]):
+        """Refresh the decisions of symbols from their price history, one matrix pass per history length.
+
+        Once warmed up every symbol has the full lookback, so a cycle is
+        normally a single pass however many symbols there are.
+        """
+        params = self.params
+        lookback = self.signal_lookback()
+        groups: Dict[int, List[tuple]] = defaultdict(list)
+        for symbol in symbols:
+            history = await self.market_data_collector.get_price_history(symbol, lookback)
+            if len(history) < params.warmup:
+                self.decisions.pop(symbol, None)
+                continue
+            groups[len(history)].append(
+                (symbol, np.fromiter((item["price"] for item in history), dtype=float, count=len(history))))
+
+        for rows in groups.values():
+            result = score_matrix(np.vstack([prices for _, prices in rows]), params)
+            votes, regimes = result.votes[:, -1], result.regimes[:, -1]
+            scores, signals = result.scores[:, -1], result.signals[:, -1]
+            for i, (symbol, _) in enumerate(rows):
+                self.decisions[symbol] = {
+                    "signal": int(signals[i]),
+                    "score": float(scores[i]),
+                    "regime": REGIMES[regimes[i]],
+                    "votes": dict(zip(VOTERS, votes[i].tolist())),
+                }
+
+    def get_ranking(self, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Scored symbols from the strongest buy to the strongest sell"""
+        ranking = sorted(self.decisions.items(), key=lambda item: -item[1]["score"])
+        return [{"symbol": symbol, **decision} for symbol, decision in ranking[:top]]
+
+    async def execute(self, symbols: Optional[Sequence[str]] = None):
+        """Score the symbols with new inputs together, then act on all symbols strongest signal first."""
+        symbols = self.symbols if symbols is None else symbols
+        changed = [symbol for symbol in symbols if self.has_new_inputs(symbol)]
+        if changed:
+            with self.phase("batch", "signal"):
+                await self.score_symbols(changed)
+        # Evaluations start in this order, so the strongest entries reserve funds first
+        ranked = sorted(symbols, key=lambda symbol: -abs(self.decisions.get(symbol, {}).get("score", 0.0)))
+        await super().execute(ranked)
+
+    async def execute_symbol(self, symbol: str):
+        """Execute the ensemble strategy logic for one symbol."""
+        logger.debug(f"Executing Ensemble Strategy for {symbol}")
+        decision = self.decisions.get(symbol)
+        if decision is None:
+            logger.debug(f"Not enough price history for {symbol} yet. Skipping.")
+            return
+
+        with self.phase(symbol, "data"):
+            market_data = await self.market_data_collector.get_current_data(symbol)
+
+        if not market_data:
+            logger.warning(f"No market data for {symbol}. Skipping strategy execution.")
+            return
+
+        # Check if suitable for small account (based on price threshold)
+        if not market_data.get("small_account_info", {}).get("suitable_for_small_account", False):
+            logger.debug(f"{symbol} not suitable for small account based on price. Skipping.")
+            return
+
+        # Check if it's a good time to trade based on general market conditions
+        with self.phase(symbol, "readiness"):
+            trade_readiness = await self.market_data_collector.is_good_time_to_trade(symbol)
+        if not trade_readiness.get("good_time", False):
+            logger.debug(f"Not a good time to trade {symbol}: {trade_readiness.get('reason')}. Skipping.")
+            return
+
+        current_price = market_data.get("price")
+        volume = market_data.get("volume")
+
+        if not all([current_price, volume]):
+            logger.warning(f"Missing required data for {symbol}. Skipping strategy execution.")
+            return
+
+        if volume < self.params.min_volume:
+            logger.debug(f"Volume for {symbol} ({volume}) is below minimum ({self.params.min_volume}). Skipping.")
+            return
+
+        # Determine position size based on recommended size for small accounts
+        recommended_position_size_usd = market_data.get("small_account_info", {}).get("recommended_position_size", 1.0)
+        # Convert USD amount to asset quantity
+        amount_to_trade = recommended_position_size_usd / current_price
+
+        # Check if we have an open position for this symbol
+        open_positions = self.portfolio_manager.portfolio["positions"]
+        has_open_position = symbol in open_positions
+
+        signal, score, regime = decision["signal"], decision["score"], decision["regime"]
+
+        if signal == SIGNAL_BUY and not has_open_position:
+            logger.info(f"BUY signal for {symbol}. Ensemble score {score:+.2f} ({regime} regime)")
+            # Holds the funds and position slot so concurrent strategies cannot over-allocate
+            reservation_id = self.portfolio_manager.reserve(symbol, recommended_position_size_usd)
+            if reservation_id:
+                handed_off = False
+                try:
+                    with self.phase(symbol, "risk"):
+                        # Calculate stop loss and take profit
+                        stop_loss_price = self.risk_manager.get_stop_loss_price(current_price, OrderSide.BUY.value)
+                        take_profit_price = self.risk_manager.get_take_profit_price(current_price, OrderSide.BUY.value)
+
+                        # Check risk before placing order
+                        risk_check = self.risk_manager.check_trade_risk(symbol, current_price, stop_loss_price, amount_to_trade)
+                    if risk_check["allowed"]:
+                        logger.info(f"Placing BUY order for {amount_to_trade:.4f} {symbol} at {current_price:.4f}")
+                        handed_off = await self.submit_order(symbol, OrderSide.BUY.value, amount_to_trade, current_price,
+                                                             PURPOSE_ENTRY, reservation_id)
+                    else:
+                        logger.warning(f"BUY order for {symbol} rejected due to risk: {risk_check['reason']}")
+                finally:
+                    # Once handed off, the order's completion commits or releases the reservation
+                    if not handed_off:
+                        self.portfolio_manager.release(reservation_id)
+            else:
+                logger.warning(f"Cannot open BUY position for {symbol}: Portfolio manager rules.")
+
+        elif signal == SIGNAL_SELL and has_open_position and open_positions[symbol]["side"] == OrderSide.BUY.value:
+            logger.info(f"SELL signal for {symbol}. Ensemble score {score:+.2f} ({regime} regime)")
+            position = open_positions[symbol]
+            # For simplicity, we close the entire position
+            amount_to_close = position["amount"]
+
+            logger.info(f"Placing SELL order for {amount_to_close:.4f} {symbol} at {current_price:.4f}")
+            await self.submit_order(symbol, OrderSide.SELL.value, amount_to_close, current_price, PURPOSE_EXIT)
+
+        # Check for Stop Loss / Take Profit on existing positions
+        if has_open_position:
+            position = open_positions[symbol]
+            if position["side"] == OrderSide.BUY.value:
+                stop_loss_price = self.risk_manager.get_stop_loss_price(position["entry_price"], OrderSide.BUY.value)
+                take_profit_price = self.risk_manager.get_take_profit_price(position["entry_price"], OrderSide.BUY.value)
+
+                if current_price <= stop_loss_price:
+                    logger.warning(f"STOP LOSS triggered for {symbol} at {current_price:.4f}")
+                    # Market sell to close the position; queued ahead of any pending entries
+                    await self.submit_order(symbol, OrderSide.SELL.value, position["amount"], current_price, PURPOSE_STOP_LOSS)
+
+                elif current_price >= take_profit_price:
+                    logger.warning(f"TAKE PROFIT triggered for {symbol} at {current_price:.4f}")
+                    # Market sell to close the position; queued ahead of any pending entries
+                    await self.submit_order(symbol, OrderSide.SELL.value, position["amount"], current_price, PURPOSE_TAKE_PROFIT)
+
+    async def cleanup(self):
+        """Cleanup resources specific to the strategy."""
+        logger.info("Ensemble Strategy cleanup completed.")
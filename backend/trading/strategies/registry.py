@@ -0,0 +1,61 @@
+import importlib
+from importlib.metadata import entry_points
+from typing import Dict, Any, Type, Union
+from .base_strategy import BaseStrategy
+from ...utils.logger import setup_logger
+
+logger = setup_logger("strategy_registry")
+
+# Packages can ship strategies by declaring entry points in this group, e.g. in pyproject.toml:
+#   [project.entry-points."crypto_trading_bot.strategies"]
+#   breakout = "my_package.breakout:BreakoutStrategy"
+ENTRY_POINT_GROUP = "crypto_trading_bot.strategies"
+
+# Strategy classes by the `type` key of a `strategies.<name>` config section (defaulting to the
+# section name). Built-ins are "module:Class" paths, imported only once a config enables them.
+STRATEGY_TYPES: Dict[str, Union[str, Type[BaseStrategy]]] = {
+    "simple_ma": f"{__package__}.simple_ma_strategy:SimpleMAStrategy",
+    "rsi": f"{__package__}.rsi_strategy:RSIStrategy",
+    "ensemble": f"{__package__}.ensemble_strategy:EnsembleStrategy",
+}
+
+def register_strategy(type_name: str, target: Union[str, Type[BaseStrategy]]):
+    """Make a strategy class (or a "module:Class" path to import on first use) available as `type: <type_name>`"""
+    if not isinstance(target, str) and not issubclass(target, BaseStrategy):
+        raise TypeError(f"{target.__name__} is not a BaseStrategy")
+    STRATEGY_TYPES[type_name] = target
+
+def load_class(path: str) -> type:
+    """Import "package.module:Class" (or "package.module.Class")"""
+    module_name, _, class_name = path.partition(":") if ":" in path else path.rpartition(".")
+    if not module_name or not class_name:
+        raise ValueError(f"'{path}' is not a module:Class path")
+    return getattr(importlib.import_module(module_name), class_name)
+
+def _entry_point(type_name: str):
+    matches = entry_points(group=ENTRY_POINT_GROUP, name=type_name)
+    return next(iter(matches), None)
+
+def resolve_strategy(type_name: str) -> Type[BaseStrategy]:
+    """Strategy class for a registered name, an installed entry point or a module:Class path"""
+    target = STRATEGY_TYPES.get(type_name)
+    if target is None:
+        entry_point = _entry_point(type_name)
+        if entry_point is not None:
+            target = entry_point.load()
+        elif ":" in type_name or "." in type_name:
+            target = type_name
+        else:
+            raise ValueError(f"Unknown strategy type '{type_name}'")
+    cls = load_class(target) if isinstance(target, str) else target
+    if not (isinstance(cls, type) and issubclass(cls, BaseStrategy)):
+        raise TypeError(f"'{type_name}' does not resolve to a BaseStrategy")
+    # Later lookups skip the import machinery
+    STRATEGY_TYPES[type_name] = cls
+    return cls
+
+def create_strategy(name: str, settings: Dict[str, Any], exchange, portfolio_manager, risk_manager,
+                    market_data_collector, config) -> BaseStrategy:
+    """Build the strategy configured in `strategies.<name>`; it reads its parameters from that section"""
+    cls = resolve_strategy(settings.get("type") or name)
+    return cls(exchange, portfolio_manager, risk_manager, market_data_collector, config, name=name)
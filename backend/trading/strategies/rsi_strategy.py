@@ -1,135 +1,167 @@
 import asyncio
-from typing import Dict, Any
-from .base_strategy import BaseStrategy
+from dataclasses import dataclass, field
+from typing import Dict, Any, Sequence
+import numpy as np
+from .base_strategy import BaseStrategy, StrategyParams, SIGNAL_BUY, SIGNAL_SELL
+from ...data.indicators import IndicatorSpec, indicator, rsi_series
 from ...utils.logger import setup_logger
-from ...exchanges.base_exchange import OrderSide, OrderType
+from ...exchanges.base_exchange import OrderSide
+from ..order_manager import PURPOSE_ENTRY, PURPOSE_EXIT, PURPOSE_STOP_LOSS, PURPOSE_TAKE_PROFIT
 
 logger = setup_logger("rsi_strategy")
 
+@dataclass(frozen=True)
+class RSIParams(StrategyParams):
+    rsi_period: int = 14
+    overbought_threshold: float = 70
+    oversold_threshold: float = 30
+    rsi: IndicatorSpec = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        if self.rsi_period < 1:
+            raise ValueError(f"rsi_period must be positive, got {self.rsi_period}")
+        if not 0 <= self.oversold_threshold < self.overbought_threshold <= 100:
+            raise ValueError(f"Thresholds must satisfy 0 <= oversold ({self.oversold_threshold}) "
+                             f"< overbought ({self.overbought_threshold}) <= 100")
+        object.__setattr__(self, "rsi", indicator("rsi", length=self.rsi_period))
+
 class RSIStrategy(BaseStrategy):
     """Relative Strength Index (RSI) Strategy."""
 
-    def __init__(self, exchange, portfolio_manager, risk_manager, market_data_collector, config):
-        super().__init__(exchange, portfolio_manager, risk_manager, market_data_collector, config)
-        self.strategy_config = config.get("strategies.rsi", {})
-        self.symbols = self.strategy_config.get("symbols", [])
-        self.rsi_period = self.strategy_config.get("rsi_period", 14)
-        self.overbought_threshold = self.strategy_config.get("overbought_threshold", 70)
-        self.oversold_threshold = self.strategy_config.get("oversold_threshold", 30)
-        self.min_volume = self.strategy_config.get("min_volume", 1000000)
-
-    async def execute(self):
-        """Execute the RSI strategy logic."""
-        for symbol in self.symbols:
-            logger.info(f"Executing RSI Strategy for {symbol}")
+    params_class = RSIParams
+    config_section = "rsi"
+
+    def required_indicators(self):
+        return [self.params.rsi]
+
+    def signal_lookback(self) -> int:
+        # Wilder smoothing depends on where it starts; a long tail makes live match the full-history backtest
+        return 10 * self.params.rsi_period
+
+    def generate_signals(self, frame) -> np.ndarray:
+        """Buy below the oversold threshold, sell above the overbought threshold."""
+        params = self.params
+        close = np.asarray(frame["close"], dtype=float)
+        rsi = rsi_series(close, params.rsi_period)
+        signals = np.zeros(len(close), dtype=np.int8)
+        signals[rsi < params.oversold_threshold] = SIGNAL_BUY
+        signals[rsi > params.overbought_threshold] = SIGNAL_SELL
+        return signals
+
+    def batch_signals(self, close: np.ndarray, variants: Sequence[RSIParams]) -> np.ndarray:
+        """One RSI series per distinct period, then every variant's thresholds as array comparisons."""
+        close = np.asarray(close, dtype=float)
+        periods, index = np.unique([p.rsi_period for p in variants], return_inverse=True)
+        rsi = np.array([rsi_series(close, int(period))[-1] if len(close) else np.nan for period in periods])[index]
+        signals = np.zeros(len(variants), dtype=np.int8)
+        signals[rsi < np.array([p.oversold_threshold for p in variants])] = SIGNAL_BUY
+        signals[rsi > np.array([p.overbought_threshold for p in variants])] = SIGNAL_SELL
+        return signals
+
+    async def execute_symbol(self, symbol: str):
+        """Execute the RSI strategy logic for one symbol."""
+        logger.debug(f"Executing RSI Strategy for {symbol}")
+        params = self.params  # one consistent set for the whole evaluation, even if a reload lands meanwhile
+        with self.phase(symbol, "data"):
             market_data = await self.market_data_collector.get_current_data(symbol)
 
-            if not market_data:
-                logger.warning(f"No market data for {symbol}. Skipping strategy execution.")
-                continue
+        if not market_data:
+            logger.warning(f"No market data for {symbol}. Skipping strategy execution.")
+            return
 
-            # Check if suitable for small account (based on price threshold)
-            if not market_data.get("small_account_info", {}).get("suitable_for_small_account", False):
-                logger.info(f"{symbol} not suitable for small account based on price. Skipping.")
-                continue
+        # Check if suitable for small account (based on price threshold)
+        if not market_data.get("small_account_info", {}).get("suitable_for_small_account", False):
+            logger.debug(f"{symbol} not suitable for small account based on price. Skipping.")
+            return
 
-            # Check if it's a good time to trade based on general market conditions
+        # Check if it's a good time to trade based on general market conditions
+        with self.phase(symbol, "readiness"):
             trade_readiness = await self.market_data_collector.is_good_time_to_trade(symbol)
-            if not trade_readiness.get("good_time", False):
-                logger.info(f"Not a good time to trade {symbol}: {trade_readiness.get('reason')}. Skipping.")
-                continue
-
-            current_price = market_data.get("price")
-            rsi = market_data.get(f"rsi_{self.rsi_period}")
-            volume = market_data.get("volume")
-
-            if not all([current_price, rsi, volume]):
-                logger.warning(f"Missing required data for {symbol}. Skipping strategy execution.")
-                continue
-
-            if volume < self.min_volume:
-                logger.info(f"Volume for {symbol} ({volume}) is below minimum ({self.min_volume}). Skipping.")
-                continue
-
-            # Determine position size based on recommended size for small accounts
-            recommended_position_size_usd = market_data.get("small_account_info", {}).get("recommended_position_size", 1.0)
-            # Convert USD amount to asset quantity
-            amount_to_trade = recommended_position_size_usd / current_price
-
-            # Check if we have an open position for this symbol
-            open_positions = self.portfolio_manager.portfolio["positions"]
-            has_open_position = symbol in open_positions
-
-            # Buy signal: RSI crosses below oversold threshold
-            if rsi < self.oversold_threshold and not has_open_position:
-                logger.info(f"BUY signal for {symbol}. RSI ({rsi:.2f}) < Oversold ({self.oversold_threshold})")
-                if self.portfolio_manager.can_open_position(recommended_position_size_usd):
-                    # Calculate stop loss and take profit
-                    stop_loss_price = self.risk_manager.get_stop_loss_price(current_price, OrderSide.BUY.value)
-                    take_profit_price = self.risk_manager.get_take_profit_price(current_price, OrderSide.BUY.value)
-
-                    # Check risk before placing order
-                    risk_check = self.risk_manager.check_trade_risk(symbol, current_price, stop_loss_price, amount_to_trade)
+        if not trade_readiness.get("good_time", False):
+            logger.debug(f"Not a good time to trade {symbol}: {trade_readiness.get('reason')}. Skipping.")
+            return
+
+        current_price = market_data.get("price")
+        rsi = market_data.get(params.rsi.key)
+        volume = market_data.get("volume")
+
+        if not all([current_price, rsi, volume]):
+            logger.warning(f"Missing required data for {symbol}. Skipping strategy execution.")
+            return
+
+        if volume < params.min_volume:
+            logger.debug(f"Volume for {symbol} ({volume}) is below minimum ({params.min_volume}). Skipping.")
+            return
+
+        # Determine position size based on recommended size for small accounts
+        recommended_position_size_usd = market_data.get("small_account_info", {}).get("recommended_position_size", 1.0)
+        # Convert USD amount to asset quantity
+        amount_to_trade = recommended_position_size_usd / current_price
+
+        # Check if we have an open position for this symbol
+        open_positions = self.portfolio_manager.portfolio["positions"]
+        has_open_position = symbol in open_positions
+
+        # Same vectorized logic the backtester runs, over the recent price tail
+        with self.phase(symbol, "signal"):
+            signal = await self.latest_signal(symbol)
+
+        # Buy signal: RSI crosses below oversold threshold
+        if signal == SIGNAL_BUY and not has_open_position:
+            logger.info(f"BUY signal for {symbol}. RSI ({rsi:.2f}) < Oversold ({params.oversold_threshold})")
+            # Holds the funds and position slot so concurrent strategies cannot over-allocate
+            reservation_id = self.portfolio_manager.reserve(symbol, recommended_position_size_usd)
+            if reservation_id:
+                handed_off = False
+                try:
+                    with self.phase(symbol, "risk"):
+                        # Calculate stop loss and take profit
+                        stop_loss_price = self.risk_manager.get_stop_loss_price(current_price, OrderSide.BUY.value)
+                        take_profit_price = self.risk_manager.get_take_profit_price(current_price, OrderSide.BUY.value)
+
+                        # Check risk before placing order
+                        risk_check = self.risk_manager.check_trade_risk(symbol, current_price, stop_loss_price, amount_to_trade)
                     if risk_check["allowed"]:
                         logger.info(f"Placing BUY order for {amount_to_trade:.4f} {symbol} at {current_price:.4f}")
-                        order_result = await self.exchange.place_order(symbol, OrderSide.BUY.value, OrderType.MARKET.value, amount_to_trade)
-                        if order_result and order_result.get("status") == "filled":
-                            await self.portfolio_manager.add_position(
-                                symbol, OrderSide.BUY.value, amount_to_trade, current_price, order_result["id"]
-                            )
-                            logger.info(f"BUY order for {symbol} filled. Order ID: {order_result['id']}")
-                        else:
-                            logger.error(f"Failed to fill BUY order for {symbol}: {order_result.get('info', 'Unknown error')}")
+                        handed_off = await self.submit_order(symbol, OrderSide.BUY.value, amount_to_trade, current_price,
+                                                             PURPOSE_ENTRY, reservation_id)
                     else:
-                        logger.warning(f"BUY order for {symbol} rejected due to risk: {risk_check['reason']}")
-                else:
-                    logger.warning(f"Cannot open BUY position for {symbol}: Portfolio manager rules.")
-
-            # Sell signal: RSI crosses above overbought threshold
-            elif rsi > self.overbought_threshold and has_open_position and open_positions[symbol]["side"] == OrderSide.BUY.value:
-                logger.info(f"SELL signal for {symbol}. RSI ({rsi:.2f}) > Overbought ({self.overbought_threshold})")
-                position = open_positions[symbol]
-                # For simplicity, we close the entire position
-                amount_to_close = position["amount"]
-
-                logger.info(f"Placing SELL order for {amount_to_close:.4f} {symbol} at {current_price:.4f}")
-                order_result = await self.exchange.place_order(symbol, OrderSide.SELL.value, OrderType.MARKET.value, amount_to_close)
-                if order_result and order_result.get("status") == "filled":
-                    await self.portfolio_manager.close_position(
-                        symbol, current_price, order_result["id"]
-                    )
-                    logger.info(f"SELL order for {symbol} filled. Order ID: {order_result['id']}")
-                else:
-                    logger.error(f"Failed to fill SELL order for {symbol}: {order_result.get('info', 'Unknown error')}")
-
-            # Check for Stop Loss / Take Profit on existing positions
-            if has_open_position:
-                position = open_positions[symbol]
-                if position["side"] == OrderSide.BUY.value:
-                    stop_loss_price = self.risk_manager.get_stop_loss_price(position["entry_price"], OrderSide.BUY.value)
-                    take_profit_price = self.risk_manager.get_take_profit_price(position["entry_price"], OrderSide.BUY.value)
-
-                    if current_price <= stop_loss_price:
-                        logger.warning(f"STOP LOSS triggered for {symbol} at {current_price:.4f}")
-                        # Place market sell order to close position
-                        order_result = await self.exchange.place_order(symbol, OrderSide.SELL.value, OrderType.MARKET.value, position["amount"])
-                        if order_result and order_result.get("status") == "filled":
-                            await self.portfolio_manager.close_position(symbol, current_price, order_result["id"])
-                            logger.info(f"Position for {symbol} closed by SL. Order ID: {order_result['id']}")
-                        else:
-                            logger.error(f"Failed to close {symbol} position by SL: {order_result.get('info', 'Unknown error')}")
-
-                    elif current_price >= take_profit_price:
-                        logger.warning(f"TAKE PROFIT triggered for {symbol} at {current_price:.4f}")
-                        # Place market sell order to close position
-                        order_result = await self.exchange.place_order(symbol, OrderSide.SELL.value, OrderType.MARKET.value, position["amount"])
-                        if order_result and order_result.get("status") == "filled":
-                            await self.portfolio_manager.close_position(symbol, current_price, order_result["id"])
-                            logger.info(f"Position for {symbol} closed by TP. Order ID: {order_result['id']}")
-                        else:
-                            logger.error(f"Failed to close {symbol} position by TP: {order_result.get('info', 'Unknown error')}")
-
-                # Add logic for SELL positions if your strategy supports shorting
+                         logger.warning(f"BUY order for {symbol} rejected due to risk: {risk_check['reason']}")
+                finally:
+                    # Once handed off, the order's completion commits or releases the reservation
+                    if not handed_off:
+                        self.portfolio_manager.release(reservation_id)
+            else:
+                logger.warning(f"Cannot open BUY position for {symbol}: Portfolio manager rules.")
+
+        # Sell signal: RSI crosses above overbought threshold
+        elif signal == SIGNAL_SELL and has_open_position and open_positions[symbol]["side"] == OrderSide.BUY.value:
+            logger.info(f"SELL signal for {symbol}. RSI ({rsi:.2f}) > Overbought ({params.overbought_threshold})")
+            position = open_positions[symbol]
+            # For simplicity, we close the entire position
+            amount_to_close = position["amount"]
+
+            logger.info(f"Placing SELL order for {amount_to_close:.4f} {symbol} at {current_price:.4f}")
+            await self.submit_order(symbol, OrderSide.SELL.value, amount_to_close, current_price, PURPOSE_EXIT)
+
+        # Check for Stop Loss / Take Profit on existing positions
+        if has_open_position:
+            position = open_positions[symbol]
+            if position["side"] == OrderSide.BUY.value:
+                stop_loss_price = self.risk_manager.get_stop_loss_price(position["entry_price"], OrderSide.BUY.value)
+                take_profit_price = self.risk_manager.get_take_profit_price(position["entry_price"], OrderSide.BUY.value)
+
+                if current_price <= stop_loss_price:
+                    logger.warning(f"STOP LOSS triggered for {symbol} at {current_price:.4f}")
+                    # Market sell to close the position; queued ahead of any pending entries
+                    await self.submit_order(symbol, OrderSide.SELL.value, position["amount"], current_price, PURPOSE_STOP_LOSS)
+
+                elif current_price >= take_profit_price:
+                    logger.warning(f"TAKE PROFIT triggered for {symbol} at {current_price:.4f}")
+                    # Market sell to close the position; queued ahead of any pending entries
+                    await self.submit_order(symbol, OrderSide.SELL.value, position["amount"], current_price, PURPOSE_TAKE_PROFIT)
+
+            # Add logic for SELL positions if your strategy supports shorting
 
     async def cleanup(self):
         """Cleanup resources specific to the strategy."""
@@ -1,58 +1,241 @@
-from typing import Dict, Any
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, Any, Optional
 from ..utils.logger import setup_logger
 from ..utils.config import config as global_config
-from .strategies.simple_ma_strategy import SimpleMAStrategy
-from .strategies.rsi_strategy import RSIStrategy # Import now
+from .strategies.registry import create_strategy, resolve_strategy
+from .shadow import ShadowBank
 
 logger = setup_logger("strategy_manager")
 
+OUTCOME_COUNTERS = {"ok": "ok", "timeout": "timeouts", "error": "errors"}
+
 class StrategyManager:
     """Zarządza i uruchamia strategie handlowe."""
 
-    def __init__(self, exchange, portfolio_manager, risk_manager, market_data_collector, config=None):
+    def __init__(self, exchange, portfolio_manager, risk_manager, market_data_collector, config=None, order_manager=None,
+                 profiler=None):
         self.exchange = exchange
+        # Histogramy opóźnień faz decyzji (dane, gotowość, sygnał, ryzyko, zlecenie, portfel) per strategia i symbol
+        self.profiler = profiler
+        # Gdy ustawiony, strategie kolejkują zlecenia w OMS zamiast składać je bezpośrednio
+        self.order_manager = order_manager
         self.portfolio_manager = portfolio_manager
         self.risk_manager = risk_manager
         self.market_data_collector = market_data_collector
         self.config: Any = config or global_config
         self.strategies: Dict[str, Any] = {}
+        # Warianty parametrów handlujące "na papierze" na żywych danych (strategies.<nazwa>.shadow)
+        self.shadows: Dict[str, ShadowBank] = {}
+        # Wspólny limit współbieżnych ocen symboli (wszystkie strategie) i domyślny limit czasu strategii (s)
+        self.max_concurrency = self.config.get("trading.strategy_concurrency", 4)
+        self.default_timeout = self.config.get("trading.strategy_timeout", 30.0)
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.symbol_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self.last_cycle: Dict[str, Any] = {}
+        self._running: Dict[str, asyncio.Task] = {}
         self._load_strategies()
 
     def _load_strategies(self):
-        """Ładowanie włączonych strategii z konfiguracji."""
-        strategy_configs = self.config.get("strategies", {})
-        simple_ma_enabled = self.config.get("strategies.simple_ma.enabled", False)
-        if simple_ma_enabled:
-            self.strategies["simple_ma"] = SimpleMAStrategy(
-                exchange=self.exchange,
-                portfolio_manager=self.portfolio_manager,
-                risk_manager=self.risk_manager,
-                market_data_collector=self.market_data_collector,
-                config=self.config
-            )
-            logger.info("Załadowano strategię Simple MA.")
-        
-        rsi_enabled = self.config.get("strategies.rsi.enabled", False)
-        if rsi_enabled:
-            self.strategies["rsi"] = RSIStrategy(
-                exchange=self.exchange,
-                portfolio_manager=self.portfolio_manager,
-                risk_manager=self.risk_manager,
-                market_data_collector=self.market_data_collector,
-                config=self.config
-            )
-            logger.info("Załadowano strategię RSI.")
-
-    async def run_strategies(self):
-        """Uruchom wszystkie włączone strategie."""
+        """Ładowanie włączonych strategii z konfiguracji (klasy importowane dopiero tutaj, przez rejestr)."""
+        for name, settings in (self.config.get("strategies", {}) or {}).items():
+            if isinstance(settings, dict) and settings.get("enabled", False):
+                self._create_strategy(name, settings)
+
+    def _create_strategy(self, name: str, settings: Dict[str, Any]) -> bool:
+        try:
+            strategy = create_strategy(name, settings, self.exchange, self.portfolio_manager, self.risk_manager,
+                                       self.market_data_collector, self.config)
+        except Exception as e:
+            logger.error(f"Nie udało się utworzyć strategii {name}: {e}")
+            return False
+        self.add_strategy(name, strategy)
+        logger.info(f"Załadowano strategię {name} ({type(strategy).__name__}).")
+        return True
+
+    def add_strategy(self, name: str, strategy):
+        """Dodaj strategię, dzieląc z nią limit współbieżności i blokady symboli."""
+        strategy.concurrency = self.semaphore
+        strategy.symbol_locks = self.symbol_locks
+        strategy.order_manager = self.order_manager
+        strategy.profiler = self.profiler
+        strategy.name = name
+        self.strategies[name] = strategy
+        self._subscribe(name, strategy)
+        self._build_shadow(name, strategy)
+        self.stats[name] = {"runs": 0, "ok": 0, "errors": 0, "timeouts": 0, "cancelled": 0,
+                            "last_duration": None, "avg_duration": None, "max_duration": 0.0,
+                            "last_error": None}
+
+    def _subscribe(self, name: str, strategy):
+        if self.market_data_collector is not None:
+            # Kolektor liczy tylko zadeklarowane wskaźniki, każdy raz na tick, wspólnie dla wszystkich strategii
+            self.market_data_collector.subscribe(name, strategy.symbols, strategy.required_indicators(),
+                                                 history=strategy.signal_lookback())
+
+    def _build_shadow(self, name: str, strategy):
+        """(Od)twórz bank wariantów strategii; wyniki poprzedniego banku są porzucane."""
+        settings = self.config.get(f"strategies.{name}.shadow")
+        bank = ShadowBank.from_config(strategy, settings) if settings and settings.get("enabled", True) else None
+        if self.market_data_collector is not None:
+            if bank is not None:
+                # Bez własnych wskaźników: wspólna historia cen, wystarczająco długa dla każdego wariantu
+                self.market_data_collector.subscribe(f"{name}:shadow", strategy.symbols, [], history=bank.lookback)
+            elif name in self.shadows:
+                self.market_data_collector.unsubscribe(f"{name}:shadow")
+        if bank is None:
+            self.shadows.pop(name, None)
+        else:
+            self.shadows[name] = bank
+            logger.info(f"Strategia {name}: {len(bank.variants)} wariantów w trybie cienia.")
+
+    async def run_shadows(self):
+        """Jeden krok wszystkich banków wariantów (tylko symbole z nowym tickiem)."""
+        if self.market_data_collector is None:
+            return
+        for name, bank in list(self.shadows.items()):
+            try:
+                await bank.run(self.market_data_collector)
+            except Exception as e:
+                logger.error(f"Błąd wariantów cienia strategii {name}: {e}")
+
+    def get_shadow_report(self, name: Optional[str] = None, top: Optional[int] = None) -> Dict[str, Any]:
+        """Ranking PnL wariantów (dla jednej strategii lub wszystkich)."""
+        names = [name] if name else list(self.shadows)
+        return {n: self.shadows[n].report(top) for n in names if n in self.shadows}
+
+    def get_rankings(self, name: Optional[str] = None, top: Optional[int] = None) -> Dict[str, Any]:
+        """Sygnały uszeregowane od najsilniejszego kupna, dla strategii, które je udostępniają (np. ensemble)."""
+        return {n: strategy.get_ranking(top) for n, strategy in self.strategies.items()
+                if hasattr(strategy, "get_ranking") and (name is None or n == name)}
+
+    async def remove_strategy(self, name: str):
+        """Usuń strategię; bieżące wykonanie kończy się normalnie."""
+        strategy = self.strategies.pop(name, None)
+        if strategy is None:
+            return
+        self.stats.pop(name, None)
+        if self.market_data_collector is not None:
+            self.market_data_collector.unsubscribe(name)
+            if self.shadows.pop(name, None) is not None:
+                self.market_data_collector.unsubscribe(f"{name}:shadow")
+        await strategy.cleanup()
+        logger.info(f"Usunięto strategię {name}.")
+
+    async def reload(self) -> Dict[str, str]:
+        """Zastosuj bieżącą konfigurację bez restartu: nowe parametry, włączenie i wyłączenie strategii.
+
+        Parametry są podmieniane atomowo (nowy obiekt), więc trwająca ocena
+        kończy się na starych wartościach. Wskaźniki i historia w kolektorze
+        pozostają ciepłe; przeliczane są tylko nowo zadeklarowane.
+        """
+        changes = {}
+        sections = self.config.get("strategies", {}) or {}
+        for name in list(self.strategies):
+            settings = sections.get(name)
+            if not isinstance(settings, dict) or not settings.get("enabled", False):
+                await self.remove_strategy(name)
+                changes[name] = "removed"
+        for name, settings in sections.items():
+            if not isinstance(settings, dict) or not settings.get("enabled", False):
+                continue
+            strategy = self.strategies.get(name)
+            if strategy is None:
+                if self._create_strategy(name, settings):
+                    changes[name] = "added"
+                continue
+            try:
+                if resolve_strategy(settings.get("type") or name) is not type(strategy):
+                    # Inna klasa: odtwórz strategię zamiast podmieniać parametry
+                    await self.remove_strategy(name)
+                    changes[name] = "replaced" if self._create_strategy(name, settings) else "removed"
+                    continue
+                updated = strategy.update_params(settings)
+            except (TypeError, ValueError, ImportError) as e:
+                logger.error(f"Odrzucono nowe parametry strategii {name}, pozostają poprzednie: {e}")
+                changes[name] = "invalid"
+                continue
+            if updated:
+                self._subscribe(name, strategy)
+                changes[name] = "updated"
+                logger.info(f"Zaktualizowano parametry strategii {name}: {strategy.params}")
+            shadow = self.shadows.get(name)
+            if updated or settings.get("shadow") != (shadow.settings if shadow else None):
+                # Warianty są nakładkami na parametry bazowe, więc zmiana którychkolwiek resetuje bank
+                self._build_shadow(name, strategy)
+        return changes
+
+    def _timeout(self, name: str) -> Optional[float]:
+        return self.config.get(f"strategies.{name}.timeout", self.default_timeout)
+
+    async def _run_strategy(self, name: str, strategy) -> str:
+        """Uruchom jedną strategię z limitem czasu; błąd strategii nie przerywa pozostałych."""
+        stats = self.stats[name]
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(strategy.execute(), self._timeout(name))
+            outcome = "ok"
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            logger.warning(f"Strategia {name} przekroczyła limit czasu {self._timeout(name)}s i została anulowana.")
+        except asyncio.CancelledError:
+            stats["cancelled"] += 1
+            raise
+        except Exception as e:
+            outcome = "error"
+            stats["last_error"] = f"{type(e).__name__}: {e}"
+            logger.error(f"Błąd strategii {name}: {e}")
+        finally:
+            duration = time.perf_counter() - started
+            stats["runs"] += 1
+            stats["last_duration"] = duration
+            stats["max_duration"] = max(stats["max_duration"], duration)
+            previous = stats["avg_duration"]
+            stats["avg_duration"] = duration if previous is None else previous + (duration - previous) / stats["runs"]
+        stats[OUTCOME_COUNTERS[outcome]] += 1
+        return outcome
+
+    async def run_strategies(self) -> Dict[str, str]:
+        """Uruchom wszystkie włączone strategie współbieżnie; czas cyklu ≈ najwolniejsza strategia."""
+        started = time.perf_counter()
+        # Na żądanie cały cykl (wszystko, co pętla zdarzeń wykona w tym czasie) trafia do cProfile
+        capture = self.profiler.start_capture() if self.profiler and self.profiler.capture_requested else None
         for name, strategy in self.strategies.items():
-            logger.info(f"Uruchamianie strategii: {name}")
-            await strategy.execute()
+            logger.debug(f"Uruchamianie strategii: {name}")
+            self._running[name] = asyncio.create_task(self._run_strategy(name, strategy))
+        try:
+            outcomes = await asyncio.gather(*self._running.values(), return_exceptions=True)
+        finally:
+            names = list(self._running)
+            self._running.clear()
+            if capture is not None:
+                self.profiler.finish_capture(capture, time.perf_counter() - started)
+        results = {name: "cancelled" if isinstance(outcome, BaseException) else outcome
+                   for name, outcome in zip(names, outcomes)}
+        self.last_cycle = {"duration": time.perf_counter() - started, "results": results}
+        # Po cyklu na żywo, żeby warianty nie opóźniały prawdziwych zleceń
+        await self.run_shadows()
+        return results
+
+    async def cancel_running(self):
+        """Anuluj strategie, które jeszcze się wykonują."""
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statystyki czasu wykonania strategii i ostatniego cyklu."""
+        return {
+            "last_cycle": self.last_cycle,
+            "strategies": {name: {**stats, **self.strategies[name].evaluation_stats} for name, stats in self.stats.items()}
+        }
 
     async def cleanup(self):
         """Sprzątanie zasobów strategii."""
+        await self.cancel_running()
         for strategy in self.strategies.values():
             await strategy.cleanup()
         logger.info("Zakończono sprzątanie StrategyManager.")
-
-
@@ -13,10 +13,14 @@ class Config:
         self._config = {}
         self.load_config()
     
+    @property
+    def path(self) -> str:
+        return os.path.join(os.path.dirname(__file__), '..', self.config_file)
+
     def load_config(self):
         """Load configuration from YAML file"""
         try:
-            config_path = os.path.join(os.path.dirname(__file__), '..', self.config_file)
+            config_path = self.path
             
             with open(config_path, 'r') as file:
                 self._config = yaml.safe_load(file)
@@ -30,6 +34,20 @@ class Config:
             print(f"Error loading config: {e}")
             self._config = self._get_default_config()
     
+    def reload(self) -> bool:
+        """Re-read the YAML file and swap it in as a whole; on any error the current config stays"""
+        with open(self.path, 'r') as file:
+            new_config = yaml.safe_load(file)
+        if not isinstance(new_config, dict):
+            raise ValueError(f"{self.config_file} does not contain a mapping")
+        previous, self._config = self._config, new_config
+        try:
+            self._override_with_env()
+        except Exception:
+            self._config = previous
+            raise
+        return True
+
     def _override_with_env(self):
         """Override config with environment variables"""
         if os.getenv('SERVER_HOST'):
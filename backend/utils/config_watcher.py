@@ -0,0 +1,75 @@
+import asyncio
+import inspect
+import os
+from typing import Any, Callable, List, Optional
+from .logger import setup_logger
+
+logger = setup_logger("config_watcher")
+
+class ConfigWatcher:
+    """Polls the config file and reloads it when it changes, then notifies listeners.
+
+    Polling the modification time (and size) keeps this free of platform file
+    event APIs; a check is one `os.stat`. A file that fails to parse is
+    logged and ignored, so a half-saved edit never replaces a working config.
+    """
+
+    def __init__(self, config, interval: float = 2.0):
+        self.config = config
+        self.interval = interval
+        self.listeners: List[Callable[[], Any]] = []
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        self._signature = self._stat()
+        self._task: Optional[asyncio.Task] = None
+
+    def add_listener(self, listener: Callable[[], Any]):
+        """Called (or awaited) after every successful reload"""
+        self.listeners.append(listener)
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.config.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    async def check(self) -> bool:
+        """Reload if the file changed since the last check; True if a new config was applied"""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            self.config.reload()
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Config reload failed, keeping the current config: {e}")
+            return False
+        self.reloads += 1
+        self.last_error = None
+        logger.info(f"Reloaded {self.config.path}")
+        for listener in self.listeners:
+            try:
+                result = listener()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Config reload listener failed: {e}")
+        return True
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Watching {self.config.path} every {self.interval}s")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
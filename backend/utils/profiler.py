@@ -0,0 +1,167 @@
+import cProfile
+import io
+import pstats
+import time
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
+from .logger import setup_logger
+
+logger = setup_logger("profiler")
+
+class HdrHistogram:
+    """Latency histogram with bounded relative error over a wide range (HdrHistogram layout).
+
+    Values (integer microseconds) below `2 * half` are counted exactly; above
+    that each power-of-two range is split into `half` linear sub-buckets, so
+    every recorded value is within 1/half of its bucket (about 0.8% with the
+    default 2 significant digits). Recording is O(1) and the memory is fixed
+    regardless of how many samples arrive.
+    """
+
+    def __init__(self, highest_us: int = 60_000_000, significant_figures: int = 2):
+        sub_bucket_count = 1 << int(np.ceil(np.log2(2 * 10 ** significant_figures)))
+        self.sub_bits = sub_bucket_count.bit_length() - 1
+        self.half = sub_bucket_count // 2
+        self.highest_us = highest_us
+        self.counts = np.zeros(self._index(highest_us) + 1, dtype=np.int64)
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self.sub_bits
+        if shift <= 0:
+            return value
+        return 2 * self.half + (shift - 1) * self.half + ((value >> shift) - self.half)
+
+    def _lowest_in(self, index: int) -> int:
+        if index < 2 * self.half:
+            return index
+        shift, offset = divmod(index - 2 * self.half, self.half)
+        return (self.half + offset) << (shift + 1)
+
+    def record(self, seconds: float):
+        value = max(0, int(seconds * 1_000_000))
+        self.count += 1
+        self.total_us += value
+        self.min_us = value if self.min_us is None else min(self.min_us, value)
+        self.max_us = max(self.max_us, value)
+        # Beyond the tracked range the sample still counts, in the top bucket
+        self.counts[self._index(min(value, self.highest_us))] += 1
+
+    def merge(self, other: "HdrHistogram"):
+        self.counts += other.counts
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+
+    def _value_at(self, cumulative: np.ndarray, q: float) -> float:
+        rank = max(1, int(np.ceil(q * self.count)))
+        return min(self._lowest_in(int(np.searchsorted(cumulative, rank))), self.max_us) / 1000.0
+
+    def percentile(self, q: float) -> float:
+        """Value at quantile q (0-1) in milliseconds"""
+        if not self.count:
+            return 0.0
+        return self._value_at(np.cumsum(self.counts), q)
+
+    def snapshot(self) -> Dict[str, Any]:
+        if not self.count:
+            return {"count": 0}
+        cumulative = np.cumsum(self.counts)
+        at = lambda q: self._value_at(cumulative, q)
+        return {
+            "count": self.count,
+            "mean_ms": self.total_us / self.count / 1000.0,
+            "min_ms": self.min_us / 1000.0,
+            "p50_ms": at(0.5),
+            "p90_ms": at(0.9),
+            "p99_ms": at(0.99),
+            "p999_ms": at(0.999),
+            "max_ms": self.max_us / 1000.0,
+            "total_ms": self.total_us / 1000.0,
+        }
+
+class _Phase:
+    __slots__ = ("profiler", "key", "started")
+
+    def __init__(self, profiler: "Profiler", key: Tuple[str, str, str]):
+        self.profiler = profiler
+        self.key = key
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(*self.key, time.perf_counter() - self.started)
+        return False
+
+class Profiler:
+    """Decision latency by strategy, symbol and phase (data, readiness, signal, risk, order, portfolio, total).
+
+    Each phase is timed wall-clock, so time spent waiting on the exchange or on
+    the shared concurrency limit shows up where it happens. A cProfile capture
+    of one whole strategy cycle can be requested on demand.
+    """
+
+    def __init__(self, enabled: bool = True, capture_top: int = 40):
+        self.enabled = enabled
+        self.capture_top = capture_top
+        self.histograms: Dict[Tuple[str, str, str], HdrHistogram] = {}
+        self.capture_requested = False
+        self.last_capture: Optional[Dict[str, Any]] = None
+
+    def phase(self, strategy: str, symbol: str, phase: str) -> _Phase:
+        """Context manager timing the enclosed block (may contain awaits)"""
+        return _Phase(self, (strategy, symbol, phase))
+
+    def record(self, strategy: str, symbol: str, phase: str, seconds: float):
+        if not self.enabled:
+            return
+        key = (strategy, symbol, phase)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = HdrHistogram()
+        histogram.record(seconds)
+
+    def report(self, strategy: Optional[str] = None, symbol: Optional[str] = None) -> Dict[str, Any]:
+        """{strategy: {symbol: {phase: stats}}}, with each strategy's symbols also merged under "*" """
+        result: Dict[str, Any] = {}
+        merged: Dict[Tuple[str, str], HdrHistogram] = {}
+        for (name, sym, phase), histogram in self.histograms.items():
+            if (strategy and name != strategy) or (symbol and sym != symbol):
+                continue
+            result.setdefault(name, {}).setdefault(sym, {})[phase] = histogram.snapshot()
+            total = merged.get((name, phase))
+            if total is None:
+                total = merged[(name, phase)] = HdrHistogram()
+            total.merge(histogram)
+        for (name, phase), histogram in merged.items():
+            result[name].setdefault("*", {})[phase] = histogram.snapshot()
+        return result
+
+    def reset(self):
+        self.histograms.clear()
+
+    def request_capture(self):
+        """Profile the next strategy cycle with cProfile"""
+        self.capture_requested = True
+
+    def start_capture(self) -> cProfile.Profile:
+        self.capture_requested = False
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def finish_capture(self, profile: cProfile.Profile, duration: float):
+        """Keep the top functions by cumulative time; everything the event loop ran meanwhile is included"""
+        profile.disable()
+        stream = io.StringIO()
+        stats = pstats.Stats(profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.capture_top)
+        self.last_capture = {"captured_at": time.time(), "duration_ms": duration * 1000.0, "stats": stream.getvalue()}
+        logger.info(f"Captured cProfile of one strategy cycle ({duration * 1000.0:.1f} ms)")
@@ -0,0 +1,186 @@
+import asyncio
+import inspect
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from .logger import setup_logger
+
+logger = setup_logger("timing_wheel")
+
+@dataclass(slots=True, eq=False)
+class TimerHandle:
+    """A scheduled deadline; `cancel()` removes it from its wheel slot in O(1)."""
+    deadline: int  # in ticks
+    callback: Callable[..., Any]
+    args: Tuple[Any, ...] = ()
+    wheel: Optional["TimingWheel"] = None
+    bucket: Optional[Dict["TimerHandle", None]] = field(default=None, repr=False)
+    fired: bool = False
+
+    @property
+    def active(self) -> bool:
+        return self.bucket is not None
+
+    def cancel(self) -> bool:
+        """False if the timer already fired or was cancelled"""
+        if self.bucket is None:
+            return False
+        del self.bucket[self]
+        self.bucket = None
+        self.wheel.count -= 1
+        return True
+
+class TimingWheel:
+    """Hierarchical timing wheel (Varghese & Lauck) on an injectable monotonic clock.
+
+    `levels` wheels of `wheel_size` slots each; a slot on level L spans
+    wheel_size**L ticks. A timer goes to the lowest level whose span contains
+    its deadline and moves down a level each time its slot comes round
+    (cascading), reaching level 0 exactly on its deadline tick. Deadlines
+    beyond the top level wait in an overflow slot. Insert and cancel are O(1);
+    `advance` returns everything that came due as one batch.
+    """
+
+    def __init__(self, tick: float = 0.1, wheel_size: int = 64, levels: int = 4,
+                 clock: Callable[[], float] = time.monotonic):
+        self.tick = tick
+        self.wheel_size = wheel_size
+        self.levels = levels
+        self.clock = clock
+        self.started_at = clock()
+        self.current = 0  # ticks processed so far
+        self.count = 0
+        # Slots are insertion-ordered dicts used as sets, so removal is O(1) and expiry stays FIFO
+        self.wheels: List[List[Dict[TimerHandle, None]]] = [
+            [{} for _ in range(wheel_size)] for _ in range(levels)]
+        self.overflow: Dict[TimerHandle, None] = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _now_ticks(self) -> float:
+        return (self.clock() - self.started_at) / self.tick
+
+    def schedule(self, delay: float, callback: Callable[..., Any], *args) -> TimerHandle:
+        """Fire callback(*args) `delay` seconds from now (rounded up to the next tick)"""
+        deadline = max(self.current + 1, math.ceil(self._now_ticks() + delay / self.tick))
+        handle = TimerHandle(deadline, callback, args, self)
+        self._insert(handle)
+        self.count += 1
+        return handle
+
+    def _insert(self, handle: TimerHandle):
+        span = 1
+        for wheel in self.wheels:
+            # Same block of the level above: the slot on this level comes round before the deadline passes
+            if handle.deadline // (span * self.wheel_size) == self.current // (span * self.wheel_size):
+                bucket = wheel[(handle.deadline // span) % self.wheel_size]
+                break
+            span *= self.wheel_size
+        else:
+            bucket = self.overflow
+        bucket[handle] = None
+        handle.bucket = bucket
+
+    def _cascade(self, bucket: Dict[TimerHandle, None]):
+        handles = list(bucket)
+        bucket.clear()
+        for handle in handles:
+            self._insert(handle)
+
+    def advance(self, now: Optional[float] = None) -> List[TimerHandle]:
+        """Move the wheel up to `now` (default: the clock) and return the timers that came due, in order"""
+        target = int(((self.clock() if now is None else now) - self.started_at) / self.tick)
+        due: List[TimerHandle] = []
+        while self.current < target:
+            if self.count == 0:
+                # Nothing scheduled: jump straight there instead of walking empty slots
+                self.current = target
+                break
+            self.current += 1
+            # Higher levels first, so a timer cascading all the way down expires on this same tick
+            span = self.wheel_size ** self.levels
+            if self.current % span == 0:
+                self._cascade(self.overflow)
+            for level in range(self.levels - 1, 0, -1):
+                span //= self.wheel_size
+                if self.current % span == 0:
+                    self._cascade(self.wheels[level][(self.current // span) % self.wheel_size])
+            bucket = self.wheels[0][self.current % self.wheel_size]
+            if bucket:
+                for handle in bucket:
+                    handle.bucket = None
+                    handle.fired = True
+                due.extend(bucket)
+                self.count -= len(bucket)
+                bucket.clear()
+        return due
+
+class TimerService:
+    """Runs a TimingWheel on the event loop: one task ticks the wheel and fires due callbacks in batches.
+
+    Callbacks may be plain functions or coroutines; coroutines run as tasks so
+    a slow one (e.g. an exchange call) never delays the other deadlines.
+    """
+
+    def __init__(self, tick: float = 0.1, wheel_size: int = 64, levels: int = 4):
+        self.wheel = TimingWheel(tick, wheel_size, levels)
+        self.stats = {"scheduled": 0, "fired": 0, "cancelled": 0, "errors": 0}
+        self._task: Optional[asyncio.Task] = None
+        self._callbacks: Set[asyncio.Task] = set()
+
+    def schedule(self, delay: float, callback: Callable[..., Any], *args) -> TimerHandle:
+        self.stats["scheduled"] += 1
+        return self.wheel.schedule(delay, callback, *args)
+
+    def cancel(self, handle: Optional[TimerHandle]) -> bool:
+        if handle is not None and handle.cancel():
+            self.stats["cancelled"] += 1
+            return True
+        return False
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Timer service started (tick {self.wheel.tick}s)")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for task in list(self._callbacks):
+            task.cancel()
+        await asyncio.gather(*self._callbacks, return_exceptions=True)
+        logger.info("Timer service stopped")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.wheel.tick)
+            self.fire_due()
+
+    def fire_due(self, now: Optional[float] = None) -> int:
+        """Advance the wheel and run what came due; returns how many timers fired"""
+        due = self.wheel.advance(now)
+        for handle in due:
+            try:
+                result = handle.callback(*handle.args)
+                if inspect.isawaitable(result):
+                    task = asyncio.ensure_future(result)
+                    self._callbacks.add(task)
+                    task.add_done_callback(self._callback_done)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Timer callback {getattr(handle.callback, '__name__', handle.callback)} failed: {e}")
+        self.stats["fired"] += len(due)
+        return len(due)
+
+    def _callback_done(self, task: asyncio.Task):
+        self._callbacks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["errors"] += 1
+            logger.error(f"Timer callback failed: {task.exception()}")
+
+    def get_status(self) -> Dict[str, Any]:
+        return {**self.stats, "pending": len(self.wheel), "running_callbacks": len(self._callbacks)}
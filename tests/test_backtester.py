@@ -0,0 +1,74 @@
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import Mock
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.backtesting.backtester import Backtester
+from backend.trading.strategies.base_strategy import SIGNAL_BUY, SIGNAL_SELL, SIGNAL_HOLD
+from backend.trading.strategies.simple_ma_strategy import SimpleMAStrategy
+from backend.trading.strategies.rsi_strategy import RSIStrategy
+
+CLOSE = 100 + 10 * np.sin(np.arange(300) / 15)
+
+def make_strategy(cls, settings):
+    config = Mock()
+    config.get.side_effect = lambda key, default=None: settings if key.startswith("strategies.") else default
+    return cls(None, None, None, None, config)
+
+def frame(close):
+    return pd.DataFrame({"timestamp": pd.date_range("2025-01-01", periods=len(close), freq="min"), "close": close})
+
+class TestGenerateSignals:
+
+    def test_simple_ma_signals_follow_the_averages(self):
+        strategy = make_strategy(SimpleMAStrategy, {"short_period": 5, "long_period": 20})
+        signals = strategy.generate_signals({"close": CLOSE})
+
+        assert signals.dtype == np.int8 and len(signals) == len(CLOSE)
+        assert (signals[:19] == SIGNAL_HOLD).all()
+        assert {SIGNAL_BUY, SIGNAL_SELL} <= set(signals.tolist())
+
+    @pytest.mark.parametrize("cls, settings", [
+        (SimpleMAStrategy, {"short_period": 5, "long_period": 20}),
+        (RSIStrategy, {"rsi_period": 14, "overbought_threshold": 60, "oversold_threshold": 40}),
+    ])
+    def test_live_tail_matches_full_history(self, cls, settings):
+        strategy = make_strategy(cls, settings)
+        full = strategy.generate_signals({"close": CLOSE})
+        lookback = strategy.signal_lookback()
+
+        for i in range(lookback, len(CLOSE)):
+            assert strategy.generate_signals({"close": CLOSE[i + 1 - lookback:i + 1]})[-1] == full[i]
+
+class TestBacktester:
+
+    def test_positions_carry_the_last_signal(self):
+        signals = np.array([0, 1, 0, 1, -1, 0, 1])
+        assert Backtester.positions_from_signals(signals).tolist() == [False, True, True, True, False, False, True]
+
+    def test_round_trips_from_vectorized_signals(self):
+        strategy = make_strategy(SimpleMAStrategy, {"short_period": 5, "long_period": 20})
+        backtester = Backtester(1000.0, strategy, None, frame(CLOSE))
+
+        trades, final_capital = backtester.run_backtest()
+
+        assert [t["type"] for t in trades[:4]] == ["buy", "sell", "buy", "sell"]
+        realized = sum(t["profit_loss_usd"] for t in trades if t["type"] == "sell")
+        open_pnl = 0.0 if trades[-1]["type"] == "sell" else trades[-1]["amount_crypto"] * CLOSE[-1] - 5.0
+        assert final_capital == pytest.approx(1000.0 + realized + open_pnl)
+
+    def test_stops_trading_when_capital_runs_out(self):
+        close = np.array([100.0, 50.0, 50.0, 25.0, 25.0, 25.0])
+        strategy = Mock()
+        strategy.generate_signals.return_value = np.array([1, -1, 1, -1, 1, -1])
+        backtester = Backtester(6.0, strategy, None, frame(close))
+
+        trades, final_capital = backtester.run_backtest()
+
+        # First round trip loses 2.5 USD, leaving too little for another 5 USD position
+        assert [t["type"] for t in trades] == ["buy", "sell"]
+        assert final_capital == pytest.approx(3.5)
@@ -0,0 +1,179 @@
+import pytest
+from urllib.parse import urlsplit
+from unittest.mock import AsyncMock, Mock
+import ccxt.async_support as ccxt
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.exchanges.base_exchange import ALL_SYMBOLS
+from backend.exchanges.binance_testnet import BinanceTestnet
+from backend.exchanges.simulated_exchange import SimulatedExchange
+
+SYMBOL = "BTC/USDT"
+
+def ccxt_order(order_id, request):
+    return {"id": order_id, "symbol": request["symbol"], "type": request["type"], "side": request["side"],
+            "amount": request["amount"], "price": request["price"], "filled": 0.0,
+            "remaining": request["amount"], "status": "open", "timestamp": 1}
+
+class TestDefaultBatchOrders:
+
+    @pytest.fixture
+    def exchange(self):
+        exchange = SimulatedExchange(initial_balances={"USDT": 1000.0})
+        exchange.on_price(SYMBOL, 100.0, timestamp=1)
+        return exchange
+
+    @pytest.mark.asyncio
+    async def test_place_orders_returns_results_in_input_order(self, exchange):
+        results = await exchange.place_orders([
+            {"symbol": SYMBOL, "side": "buy", "order_type": "limit", "amount": 1.0, "price": 90.0},
+            {"symbol": SYMBOL, "side": "sell", "order_type": "market", "amount": 5.0},
+            {"symbol": SYMBOL, "side": "buy", "order_type": "limit", "amount": 1.0, "price": 80.0},
+        ])
+
+        assert [r["status"] for r in results] == ["open", "rejected", "open"]
+        assert results[0]["price"] == 90.0 and results[2]["price"] == 80.0
+
+    @pytest.mark.asyncio
+    async def test_place_orders_turns_exceptions_into_rejections(self, exchange):
+        exchange.place_order = AsyncMock(side_effect=RuntimeError("boom"))
+
+        results = await exchange.place_orders([{"symbol": SYMBOL, "side": "buy", "order_type": "market", "amount": 1.0}])
+
+        assert results[0]["status"] == "rejected" and results[0]["symbol"] == SYMBOL and results[0]["info"] == "boom"
+
+    @pytest.mark.asyncio
+    async def test_cancel_all_cancels_every_open_order(self, exchange):
+        await exchange.place_orders([
+            {"symbol": SYMBOL, "side": "buy", "order_type": "limit", "amount": 1.0, "price": price}
+            for price in (90.0, 85.0, 80.0)
+        ])
+
+        assert await exchange.cancel_all() == {SYMBOL: True}
+        assert await exchange.get_open_orders() == []
+        assert (await exchange.get_balance())["USDT"] == pytest.approx(1000.0)
+
+class TestBinanceBatchOrders:
+
+    @pytest.fixture
+    def exchange(self, tmp_path):
+        fake = Mock()
+        fake.has = {"createOrders": True, "cancelOrders": True, "cancelAllOrders": True}
+        fake.last_response_headers = {}
+        fake.create_orders = AsyncMock(side_effect=lambda requests: [
+            ccxt_order(f"{id(requests)}-{i}", r) for i, r in enumerate(requests)])
+        fake.cancel_orders = AsyncMock(side_effect=lambda ids, symbol: [{"id": i} for i in ids])
+        fake.cancel_all_orders = AsyncMock(return_value={"code": 200})
+
+        exchange = BinanceTestnet("key", "secret", markets_cache=Mock())
+        exchange.exchange = fake
+        exchange.connected = True
+        return exchange
+
+    @pytest.mark.asyncio
+    async def test_place_orders_chunks_into_batch_requests(self, exchange):
+        specs = [{"symbol": SYMBOL, "side": "buy", "order_type": "limit", "amount": 0.01, "price": 100.0 + i}
+                 for i in range(7)]
+        specs.append({"symbol": SYMBOL, "side": "buy", "order_type": "limit", "amount": 0.001, "price": 100.0})
+
+        results = await exchange.place_orders(specs)
+
+        assert exchange.exchange.create_orders.await_count == 2
+        assert [len(call.args[0]) for call in exchange.exchange.create_orders.await_args_list] == [5, 2]
+        assert [r["price"] for r in results[:7]] == [100.0 + i for i in range(7)]
+        assert results[7]["status"] == "rejected"
+
+    @pytest.mark.asyncio
+    async def test_rejected_legs_are_reported_per_order(self, exchange):
+        exchange.exchange.create_orders = AsyncMock(return_value=[
+            {"id": "1", "symbol": SYMBOL, "type": "limit", "side": "buy", "amount": 0.01, "price": 100.0,
+             "filled": 0.0, "remaining": 0.01, "status": "open", "timestamp": 1},
+            {"id": None, "info": {"code": -2019, "msg": "Margin is insufficient."}},
+        ])
+        specs = [{"symbol": SYMBOL, "side": "buy", "order_type": "limit", "amount": 0.01, "price": 100.0}] * 2
+
+        results = await exchange.place_orders(specs)
+
+        assert results[0]["status"] == "open"
+        assert results[1]["status"] == "rejected"
+        assert "Margin is insufficient" in results[1]["info"]
+
+    @pytest.mark.asyncio
+    async def test_cancel_orders_groups_by_symbol(self, exchange):
+        results = await exchange.cancel_orders([("1", SYMBOL), ("2", "ETH/USDT"), ("3", SYMBOL)])
+
+        assert results == [True, True, True]
+        calls = {call.args[1]: call.args[0] for call in exchange.exchange.cancel_orders.await_args_list}
+        assert calls == {SYMBOL: ["1", "3"], "ETH/USDT": ["2"]}
+
+    @pytest.mark.asyncio
+    async def test_cancel_all_for_symbol_is_one_request(self, exchange):
+        assert await exchange.cancel_all(SYMBOL) == {SYMBOL: True}
+        exchange.exchange.cancel_all_orders.assert_awaited_once_with(SYMBOL)
+
+    @pytest.mark.asyncio
+    async def test_timed_out_order_is_flagged_as_unknown_outcome(self, exchange):
+        exchange.exchange.create_limit_order = AsyncMock(side_effect=ccxt.RequestTimeout("binance POST /fapi/v1/order"))
+
+        order = await exchange.place_order(SYMBOL, "buy", "limit", 0.01, 100.0, client_order_id="s-1-1")
+
+        assert order["status"] == "rejected" and order["outcome_unknown"]
+        assert exchange.exchange.create_limit_order.await_args.kwargs["params"] == {"clientOrderId": "s-1-1"}
+
+    @pytest.mark.asyncio
+    async def test_refused_order_is_a_definite_rejection(self, exchange):
+        exchange.exchange.create_limit_order = AsyncMock(side_effect=ccxt.InsufficientFunds("binance -2019"))
+
+        order = await exchange.place_order(SYMBOL, "buy", "limit", 0.01, 100.0, client_order_id="s-1-1")
+
+        assert order["status"] == "rejected" and not order["outcome_unknown"]
+
+    @pytest.mark.asyncio
+    async def test_find_order_looks_up_by_client_order_id(self, exchange):
+        exchange.exchange.fetch_order = AsyncMock(side_effect=ccxt.OrderNotFound("binance -2013"))
+
+        assert await exchange.find_order("s-1-1", SYMBOL) is None
+        exchange.exchange.fetch_order.assert_awaited_once_with(None, SYMBOL, {"clientOrderId": "s-1-1"})
+
+class TestBinanceCancelAllWithoutSymbol:
+
+    @pytest.fixture
+    def exchange(self):
+        """BinanceTestnet on a real ccxt client with only its HTTP layer stubbed"""
+        exchange = BinanceTestnet("key", "secret", markets_cache=Mock())
+        exchange.exchange = ccxt.binance(exchange._ccxt_config())
+        exchange.exchange.set_markets([{
+            "id": "BTCUSDT", "symbol": "BTC/USDT:USDT", "base": "BTC", "quote": "USDT", "settle": "USDT",
+            "baseId": "BTC", "quoteId": "USDT", "settleId": "USDT", "type": "swap", "spot": False, "margin": False,
+            "swap": True, "future": False, "option": False, "contract": True, "linear": True, "inverse": False,
+            "contractSize": 1, "active": True, "precision": {"amount": 0.001, "price": 0.1},
+            "limits": {"amount": {}, "price": {}, "cost": {}}, "info": {}}])
+        exchange.connected = True
+
+        async def fetch(url, method="GET", headers=None, body=None):
+            if "/openOrders" in url:
+                return [{"orderId": order_id, "symbol": "BTCUSDT", "status": "NEW", "price": "90", "origQty": "0.01",
+                         "executedQty": "0", "type": "LIMIT", "side": "BUY", "time": 1} for order_id in (1, 2)]
+            return {"code": 200, "msg": "The operation of cancel all open order is done."}
+        exchange.exchange.fetch = AsyncMock(side_effect=fetch)
+        return exchange
+
+    def requests(self, exchange):
+        return [(call.args[1], urlsplit(call.args[0]).path) for call in exchange.exchange.fetch.await_args_list]
+
+    @pytest.mark.asyncio
+    async def test_cancel_all_lists_every_symbol_then_cancels_each(self, exchange):
+        assert await exchange.cancel_all() == {"BTC/USDT:USDT": True}
+        assert self.requests(exchange) == [
+            ("GET", "/fapi/v1/openOrders"),
+            ("DELETE", "/fapi/v1/allOpenOrders"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_failed_listing_is_reported_as_failure(self, exchange):
+        exchange.exchange.fetch.side_effect = ccxt.RequestTimeout("binance GET /fapi/v1/openOrders")
+
+        assert await exchange.cancel_all() == {ALL_SYMBOLS: False}
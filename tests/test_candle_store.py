@@ -0,0 +1,66 @@
+import pytest
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.data.candle_store import CandleStore, CANDLE_DTYPE
+
+def make_candles(start_ms, count, step_ms=60_000):
+    return [[start_ms + i * step_ms, 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 10.0 * i] for i in range(count)]
+
+class TestCandleStore:
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return CandleStore(base_dir=str(tmp_path))
+
+    def test_append_and_read_all(self, store):
+        assert store.append_many("BTC/USDT", "1m", make_candles(0, 5)) == 5
+        bars = store.read("BTC/USDT", "1m")
+        assert len(bars) == 5
+        assert bars.dtype == CANDLE_DTYPE
+        assert list(bars["close"]) == [100.5, 101.5, 102.5, 103.5, 104.5]
+
+    def test_append_ignores_stale_and_duplicate_bars(self, store):
+        store.append_many("BTC/USDT", "1m", make_candles(0, 3))
+        assert store.append("BTC/USDT", "1m", make_candles(60_000, 1)[0]) is False
+        assert store.append("BTC/USDT", "1m", make_candles(180_000, 1)[0]) is True
+        assert store.last_timestamp("BTC/USDT", "1m") == 180_000
+
+    def test_range_lookup_is_inclusive(self, store):
+        store.append_many("ETH/USDT", "1m", make_candles(0, 10))
+        bars = store.read("ETH/USDT", "1m", start_ms=120_000, end_ms=300_000)
+        assert list(bars["timestamp"]) == [120_000, 180_000, 240_000, 300_000]
+        assert len(store.read("ETH/USDT", "1m", start_ms=10_000_000)) == 0
+
+    def test_reads_are_memory_mapped_views(self, store):
+        store.append_many("BTC/USDT", "1m", make_candles(0, 4))
+        bars = store.read("BTC/USDT", "1m", start_ms=60_000)
+        assert isinstance(bars, np.memmap)
+        assert not bars.flags.owndata
+
+    def test_remaps_after_growth_and_tail(self, store):
+        store.append_many("BTC/USDT", "1m", make_candles(0, 3))
+        assert len(store.read("BTC/USDT", "1m")) == 3
+        store.append_many("BTC/USDT", "1m", make_candles(180_000, 2))
+        assert len(store.read("BTC/USDT", "1m")) == 5
+        assert list(store.tail("BTC/USDT", "1m", 2)["timestamp"]) == [180_000, 240_000]
+
+    def test_recovers_from_torn_write(self, tmp_path):
+        store = CandleStore(base_dir=str(tmp_path))
+        store.append_many("BTC/USDT", "1m", make_candles(0, 2))
+        with open(store._path("BTC/USDT", "1m"), "ab") as f:
+            f.write(b"\x00" * 7)
+
+        reopened = CandleStore(base_dir=str(tmp_path))
+        assert reopened.last_timestamp("BTC/USDT", "1m") == 60_000
+        assert len(reopened.read("BTC/USDT", "1m")) == 2
+
+    def test_missing_series_reads_empty(self, store):
+        assert len(store.read("XRP/USDT", "1m")) == 0
+        assert store.last_timestamp("XRP/USDT", "1m") is None
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,155 @@
+import pytest
+import sqlite3
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from datetime import datetime, timedelta
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.data.database_manager import DatabaseManager, encode_cursor, decode_cursor
+from backend.utils.config import config
+
+class TestDatabaseManager:
+
+    @pytest.fixture
+    def database_manager(self, tmp_path):
+        original_url = config.get("database.url")
+        config.set("database.url", f"sqlite:///{tmp_path / 'test.db'}")
+        manager = DatabaseManager()
+        yield manager
+        manager.cleanup()
+        config.set("database.url", original_url)
+
+    @pytest.fixture
+    def seeded_manager(self, database_manager):
+        start = datetime(2025, 1, 1)
+        for i in range(25):
+            database_manager.add_trade({
+                "timestamp": start + timedelta(minutes=i),
+                "symbol": "BTC/USDT" if i % 2 == 0 else "ETH/USDT",
+                "side": "buy",
+                "entry_price": 100.0 + i,
+                "exit_price": 101.0 + i,
+                "amount": 0.01,
+                "profit_loss_usd": 0.01,
+                "is_open": False
+            })
+        # Two candles share a timestamp to exercise the (timestamp, id) tie-break
+        for i in range(10):
+            database_manager.add_market_data({
+                "timestamp": start + timedelta(minutes=i // 2),
+                "symbol": "BTC/USDT",
+                "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5 + i, "volume": 10.0
+            })
+        return database_manager
+
+    def test_cursor_round_trip(self):
+        ts = datetime(2025, 1, 1, 12, 30)
+        assert decode_cursor(encode_cursor(ts.isoformat(), 42)) == [ts.isoformat(), 42]
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor!")
+
+    def test_trades_pages_cover_all_rows_once(self, seeded_manager):
+        seen = []
+        cursor = None
+        while True:
+            page = seeded_manager.get_trades_page(cursor=cursor, limit=10)
+            seen.extend(item["id"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        assert seen == sorted(seen)
+        assert len(seen) == len(set(seen)) == 25
+
+    def test_trades_page_filters_by_symbol(self, seeded_manager):
+        page = seeded_manager.get_trades_page(symbol="ETH/USDT", limit=100)
+        assert len(page["items"]) == 12
+        assert page["next_cursor"] is None
+        assert all(item["symbol"] == "ETH/USDT" for item in page["items"])
+
+    def test_stream_trades_resumes_from_cursor(self, seeded_manager):
+        first_page = seeded_manager.get_trades_page(limit=5)
+        streamed = list(seeded_manager.stream_trades(cursor=first_page["next_cursor"], batch_size=4))
+        assert len(streamed) == 20
+        assert streamed[0]["id"] == first_page["items"][-1]["id"] + 1
+
+    def test_stream_trades_rejects_bad_cursor_eagerly(self, seeded_manager):
+        with pytest.raises(ValueError):
+            seeded_manager.stream_trades(cursor="garbage")
+
+    @pytest.mark.parametrize("cursor", ["garbage", "e30", encode_cursor(), encode_cursor({"id": 1}), encode_cursor(None)])
+    def test_malformed_cursors_raise_value_error(self, seeded_manager, cursor):
+        with pytest.raises(ValueError):
+            seeded_manager.get_trades_page(cursor=cursor)
+        with pytest.raises(ValueError):
+            seeded_manager.get_market_data_page(cursor=cursor)
+
+    def test_stream_error_is_raised_not_ended_quietly(self, seeded_manager):
+        with seeded_manager.engine.begin() as conn:
+            conn.execute(text("DROP TABLE trades"))
+        with pytest.raises(SQLAlchemyError):
+            list(seeded_manager.stream_trades())
+
+    def test_market_data_pages_break_timestamp_ties(self, seeded_manager):
+        first = seeded_manager.get_market_data_page(symbol="BTC/USDT", limit=3)
+        second = seeded_manager.get_market_data_page(symbol="BTC/USDT", cursor=first["next_cursor"], limit=100)
+        closes = [item["close"] for item in first["items"] + second["items"]]
+        assert closes == [1.5 + i for i in range(10)]
+        assert list(seeded_manager.stream_market_data(symbol="BTC/USDT")) == first["items"] + second["items"]
+
+    def test_apply_trade_to_rollup_increments_bucket(self, database_manager):
+        day = datetime(2025, 1, 1).date()
+        database_manager.apply_trade_to_rollup(day, "BTC/USDT", {"trade_count": 1, "win_count": 1, "gross_profit": 2.0, "realized_pnl": 2.0})
+        database_manager.apply_trade_to_rollup(day, "BTC/USDT", {"trade_count": 1, "loss_count": 1, "gross_loss": 0.5, "realized_pnl": -0.5})
+
+        rows = database_manager.get_pnl_rollups()
+        assert len(rows) == 1
+        assert rows[0]["trade_count"] == 2
+        assert rows[0]["realized_pnl"] == 1.5
+
+    def test_add_trades_is_idempotent_and_updates_rollups(self, database_manager):
+        trades = [
+            {"id": "order_1", "symbol": "BTC/USDT", "side": "buy", "amount": 0.001, "entry_price": 50000.0,
+             "exit_price": 51000.0, "realized_pnl": 1.0, "timestamp": "2025-01-01T10:00:00"},
+            {"id": "order_2", "symbol": "BTC/USDT", "side": "buy", "amount": 0.001, "entry_price": 50000.0,
+             "exit_price": 49000.0, "realized_pnl": -1.0, "timestamp": "2025-01-01T11:00:00"},
+        ]
+        database_manager.add_trades(trades)
+        database_manager.add_trades(trades)  # Replayed batch
+
+        page = database_manager.get_trades_page()
+        assert [item["profit_loss_usd"] for item in page["items"]] == [1.0, -1.0]
+        assert all(item["is_open"] is False for item in page["items"])
+
+        rows = database_manager.get_pnl_rollups()
+        assert len(rows) == 1
+        assert rows[0]["trade_count"] == 2
+        assert rows[0]["win_count"] == 1
+        assert rows[0]["loss_count"] == 1
+
+    def test_existing_trades_table_is_migrated(self, tmp_path):
+        path = tmp_path / "legacy.db"
+        with sqlite3.connect(path) as conn:  # trades as created before trade_ref existed
+            conn.execute("CREATE TABLE trades (id INTEGER PRIMARY KEY, timestamp DATETIME, symbol VARCHAR NOT NULL, "
+                         "side VARCHAR NOT NULL, entry_price FLOAT NOT NULL, exit_price FLOAT, amount FLOAT NOT NULL, "
+                         "profit_loss_usd FLOAT, is_open BOOLEAN)")
+        original_url = config.get("database.url")
+        config.set("database.url", f"sqlite:///{path}")
+        try:
+            manager = DatabaseManager()
+            trade = {"id": "order_1", "symbol": "BTC/USDT", "side": "buy", "amount": 0.001, "entry_price": 50000.0,
+                     "exit_price": 51000.0, "realized_pnl": 1.0, "timestamp": "2025-01-01T10:00:00"}
+            manager.add_trades([trade])
+            manager.add_trades([trade])
+
+            assert len(manager.get_trades_page()["items"]) == 1
+            assert manager.get_pnl_rollups()[0]["trade_count"] == 1
+            manager.cleanup()
+            DatabaseManager().cleanup()  # already migrated: a second startup is a no-op
+        finally:
+            config.set("database.url", original_url)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,104 @@
+import pytest
+import numpy as np
+from unittest.mock import Mock, AsyncMock
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.trading.strategies.ensemble_strategy import (EnsembleStrategy, EnsembleParams, score_matrix, VOTERS,
+                                                           REGIMES, REGIME_TREND)
+from backend.trading.strategies.base_strategy import SIGNAL_BUY, SIGNAL_SELL
+from backend.trading.strategies.registry import resolve_strategy
+
+BARS = np.arange(200)
+UPTREND = 100 * 1.004 ** BARS + np.sin(BARS)
+DOWNTREND = 100 * 0.996 ** BARS + np.sin(BARS)
+RANGING = 100 + 2 * np.sin(BARS / 5)
+
+def make_strategy(settings):
+    config = Mock()
+    config.get.side_effect = lambda key, default=None: settings if key.startswith("strategies.") else default
+    return EnsembleStrategy(None, None, None, None, config)
+
+def make_collector(histories):
+    collector = Mock()
+    collector.get_sequence.side_effect = lambda symbol: 1
+    collector.get_price_history = AsyncMock(
+        side_effect=lambda symbol, limit: [{"price": float(p)} for p in histories[symbol][-limit:]])
+    return collector
+
+class TestScoreMatrix:
+
+    def test_each_row_matches_a_single_symbol_pass(self):
+        rng = np.random.default_rng(7)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (20, 150)), axis=1))
+        params = EnsembleParams()
+
+        batch = score_matrix(close, params)
+
+        for row in range(len(close)):
+            single = score_matrix(close[row:row + 1], params)
+            np.testing.assert_array_equal(single.signals[0], batch.signals[row])
+            np.testing.assert_allclose(single.scores[0], batch.scores[row])
+        assert np.isnan(batch.scores[:, :params.warmup - 1]).all() and not np.isnan(batch.scores[:, -1]).any()
+
+    def test_score_is_the_votes_weighted_by_the_regime(self):
+        params = EnsembleParams()
+        result = score_matrix(np.vstack([UPTREND, DOWNTREND, RANGING]), params)
+
+        regimes = result.regimes[:, -1]
+        expected = [result.votes[i, -1] @ params.weight_matrix[regimes[i]] for i in range(3)]
+        np.testing.assert_allclose(result.scores[:, -1], expected)
+        assert regimes[0] == REGIME_TREND and result.votes[0, -1, VOTERS.index("ema")] == 1
+        assert result.votes[1, -1, VOTERS.index("ema")] == -1
+        assert np.abs(params.weight_matrix).sum(axis=1) == pytest.approx(np.ones(len(REGIMES)))
+
+class TestEnsembleParams:
+
+    def test_weights_override_the_defaults(self):
+        only_ema = {"trend": {voter: 0 for voter in VOTERS} | {"ema": 1}}
+        strategy = make_strategy({"weights": only_ema})
+
+        assert strategy.generate_signals({"close": UPTREND})[-1] == SIGNAL_BUY
+        assert strategy.generate_signals({"close": DOWNTREND})[-1] == SIGNAL_SELL
+
+    @pytest.mark.parametrize("settings", [
+        {"weights": {"sideways": {"rsi": 1}}},
+        {"weights": {"trend": {"volume": 1}}},
+        {"weights": {"range": {voter: 0 for voter in VOTERS}}},
+        {"ema_fast": 30},
+        {"buy_score": 0},
+    ])
+    def test_invalid_settings_are_rejected(self, settings):
+        with pytest.raises(ValueError):
+            EnsembleParams.from_config(settings)
+
+    def test_registered_as_ensemble(self):
+        assert resolve_strategy("ensemble") is EnsembleStrategy
+
+class TestEnsembleExecution:
+
+    @pytest.mark.asyncio
+    async def test_symbols_are_scored_together_and_acted_on_strongest_first(self):
+        strategy = make_strategy({"symbols": ["RANGE/USDT", "UP/USDT", "DOWN/USDT", "NEW/USDT"]})
+        strategy.market_data_collector = make_collector({"UP/USDT": UPTREND, "DOWN/USDT": DOWNTREND,
+                                                         "RANGE/USDT": RANGING, "NEW/USDT": UPTREND[:10]})
+        strategy.portfolio_manager = Mock(version=0)
+        started = []
+        strategy.execute_symbol = AsyncMock(side_effect=started.append)
+
+        await strategy.execute()
+
+        ranking = strategy.get_ranking()
+        assert [row["symbol"] for row in ranking][0] == "UP/USDT" and ranking[-1]["symbol"] == "DOWN/USDT"
+        assert "NEW/USDT" not in strategy.decisions  # not enough history yet
+        scores = {row["symbol"]: abs(row["score"]) for row in ranking}
+        assert started[:3] == sorted(scores, key=lambda symbol: -scores[symbol])
+        assert ranking[0]["regime"] == "trend" and set(ranking[0]["votes"]) == set(VOTERS)
+
+        strategy.market_data_collector.get_price_history.reset_mock()
+        await strategy.execute()  # unchanged inputs: nothing is rescored or re-evaluated
+
+        strategy.market_data_collector.get_price_history.assert_not_called()
+        assert strategy.evaluation_stats == {"evaluated": 4, "skipped": 4}
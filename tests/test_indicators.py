@@ -0,0 +1,111 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.data.indicators import (IndicatorGraph, indicator, parse_specs, sma, rsi, macd, bbands, ema,
+                                     sma_series, ema_series, rsi_series, sma_matrix, ema_matrix, rsi_matrix, macd_matrix,
+                                     rolling_max_matrix, rolling_std_matrix)
+from backend.data.market_data_collector import MarketDataCollector
+
+PRICES = np.array([100 + 5 * np.sin(i / 4) + i * 0.1 for i in range(60)])
+
+class TestIndicatorFunctions:
+
+    def test_sma_and_bbands_match_pandas(self):
+        series = pd.Series(PRICES)
+        assert sma(PRICES, 7) == pytest.approx(series.rolling(7).mean().iloc[-1])
+        lower, middle, upper = bbands(PRICES, 20, 2.0)
+        assert middle == pytest.approx(series.rolling(20).mean().iloc[-1])
+        assert upper - middle == pytest.approx(2 * series.rolling(20).std(ddof=0).iloc[-1])
+        assert middle - lower == pytest.approx(upper - middle)
+
+    def test_rsi_bounds(self):
+        assert rsi(np.arange(1.0, 30.0), 14) == 100.0
+        assert rsi(np.arange(30.0, 1.0, -1), 14) == 0.0
+        assert 0 < rsi(PRICES, 14) < 100
+
+    def test_macd_line_is_fast_minus_slow_ema(self):
+        line, signal, hist = macd(PRICES, 12, 26, 9)
+        assert line == pytest.approx(ema(PRICES, 12) - ema(PRICES, 26))
+        assert hist == pytest.approx(line - signal)
+
+    def test_not_enough_history_gives_nothing(self):
+        assert sma(PRICES[:4], 5) is None
+        assert indicator("macd").compute(PRICES[:30]) == {}
+
+    def test_matrix_rows_match_series(self):
+        matrix = np.vstack([PRICES, PRICES[::-1], np.full(len(PRICES), 50.0)])
+        for row in range(len(matrix)):
+            for length in (5, 14, 61):
+                np.testing.assert_allclose(sma_matrix(matrix, length)[row], sma_series(matrix[row], length))
+                np.testing.assert_allclose(ema_matrix(matrix, length)[row], ema_series(matrix[row], length))
+                np.testing.assert_allclose(rsi_matrix(matrix, length)[row], rsi_series(matrix[row], length))
+        line, signal = macd_matrix(matrix, 12, 26, 9)
+        assert (line[0, -1], signal[0, -1]) == pytest.approx(macd(PRICES, 12, 26, 9)[:2])
+        single = PRICES[None, :].copy()
+        rsi_matrix(single, 14), ema_matrix(single, 14)
+        np.testing.assert_array_equal(single[0], PRICES)  # inputs are never modified
+        np.testing.assert_allclose(rolling_std_matrix(matrix, 20)[0], pd.Series(PRICES).rolling(20).std(ddof=0))
+        np.testing.assert_array_equal(rolling_max_matrix(matrix, 7)[1], pd.Series(PRICES[::-1]).rolling(7).max())
+
+class TestIndicatorSpecs:
+
+    def test_keys_keep_legacy_names_at_default_params(self):
+        assert indicator("sma", length=7).key == "sma_7"
+        assert indicator("macd").keys == ("macd", "macd_signal", "macd_hist")
+        assert indicator("bbands", length=10).keys == ("bb_lower_10_2", "bb_middle_10_2", "bb_upper_10_2")
+
+    def test_equal_params_are_one_spec(self):
+        assert indicator("sma", length=20) == indicator("sma") == parse_specs([{"name": "sma", "length": 20.0}])[0]
+
+    def test_unknown_indicator_or_param_raises(self):
+        with pytest.raises(ValueError):
+            indicator("vwap")
+        with pytest.raises(ValueError):
+            indicator("sma", period=5)
+
+class TestIndicatorGraph:
+
+    def test_shared_specs_are_computed_once_per_tick(self):
+        graph = IndicatorGraph()
+        graph.subscribe("ma", ["BTC/USDT"], [indicator("sma", length=7), indicator("rsi")])
+        graph.subscribe("rsi", ["BTC/USDT", "ETH/USDT"], [indicator("rsi", length=14)])
+
+        first = graph.values("BTC/USDT", PRICES, tick=1)
+        again = graph.values("BTC/USDT", PRICES, tick=1)
+
+        assert set(first) == {"sma_7", "rsi_14"} and again == first
+        assert graph.stats == {"computed": 2, "cached": 2}
+
+        graph.values("BTC/USDT", PRICES, tick=2)
+        assert graph.stats["computed"] == 4
+
+    def test_unsubscribed_symbols_compute_nothing(self):
+        graph = IndicatorGraph()
+        graph.subscribe("ma", ["BTC/USDT"], [indicator("sma")])
+
+        assert graph.values("SOL/USDT", PRICES, tick=1) == {}
+        assert graph.stats["computed"] == 0
+
+        graph.unsubscribe("ma")
+        assert graph.symbols == []
+
+class TestCollectorSubscriptions:
+
+    def test_strategy_parameters_reach_market_data(self):
+        collector = MarketDataCollector(None, None, None)
+        collector.subscribe("simple_ma", ["SOL/USDT"], [indicator("sma", length=7), indicator("sma", length=60)])
+        for price in PRICES:
+            collector._update_price_history("SOL/USDT", float(price))
+
+        processed = collector._process_ticker_data("SOL/USDT", {"price": PRICES[-1]})
+
+        assert "SOL/USDT" in collector.symbols
+        assert collector.history_length == 60
+        assert processed["sma_7"] == pytest.approx(PRICES[-7:].mean())
+        assert processed["sma_60"] == pytest.approx(PRICES.mean())
+        assert "rsi_14" not in processed  # defaults are only published for the collector's own symbols
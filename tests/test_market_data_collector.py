@@ -0,0 +1,42 @@
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.data.market_data_collector import MarketDataCollector
+from backend.data.candle_store import CandleStore
+from backend.exchanges.simulated_exchange import SimulatedExchange
+
+def make_candles(start_ms, count, step_ms=60_000):
+    return [[start_ms + i * step_ms, 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 10.0] for i in range(count)]
+
+class TestOhlcvCollection:
+
+    @pytest.fixture
+    def collector(self, tmp_path):
+        exchange = SimulatedExchange()
+        exchange.get_ohlcv = AsyncMock(wraps=exchange.get_ohlcv)
+        collector = MarketDataCollector(Mock(), Mock(), exchange, CandleStore(base_dir=str(tmp_path)))
+        collector.symbols = ["BTC/USDT"]
+        return collector
+
+    @pytest.mark.asyncio
+    async def test_missed_bars_are_backfilled_from_the_last_stored_one(self, collector):
+        candles = make_candles(0, 10)
+        collector.exchange.candles["BTC/USDT"] = candles[:3]
+        await collector._collect_ohlcv_data()  # empty store: only the latest closed bar
+        assert collector.candle_store.last_timestamp("BTC/USDT", "1m") == 60_000
+
+        collector.exchange.candles["BTC/USDT"] = candles  # several polls were missed
+        await collector._collect_ohlcv_data()
+
+        assert collector.exchange.get_ohlcv.await_args.kwargs["since"] == 60_001
+        stored = collector.candle_store.read("BTC/USDT", "1m")
+        assert list(stored["timestamp"]) == [c[0] for c in candles[1:9]]  # the forming bar waits for the next poll
+        saved = [call.args[0]["close"] for call in collector.database_manager.add_market_data.call_args_list]
+        assert saved == [c[4] for c in candles[1:9]]
+
+        await collector._collect_ohlcv_data()  # nothing new has closed
+        assert collector.database_manager.add_market_data.call_count == 8
@@ -0,0 +1,91 @@
+import pytest
+import json
+import time
+from unittest.mock import AsyncMock, Mock
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.exchanges.markets_cache import MarketsCache, markets_etag
+from backend.exchanges.binance_testnet import BinanceTestnet
+
+MARKETS = {
+    "BTC/USDT": {"symbol": "BTC/USDT", "precision": {"amount": 3, "price": 1},
+                 "limits": {"amount": {"min": 0.001}, "cost": {"min": 5.0}}}
+}
+VERSION = MarketsCache.version_key("binance", "4.0.77", True)
+
+class TestMarketsCache:
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return MarketsCache(path=str(tmp_path / "markets.json"), ttl=60)
+
+    def test_save_and_load_round_trip(self, cache):
+        etag = cache.save(VERSION, MARKETS, {"BTC": {}})
+        entry = cache.load(VERSION)
+        assert entry["markets"] == MARKETS
+        assert entry["etag"] == etag == markets_etag(MARKETS)
+        assert entry["is_fresh"] is True
+
+    def test_version_mismatch_is_ignored(self, cache):
+        cache.save(VERSION, MARKETS)
+        assert cache.load(MarketsCache.version_key("binance", "4.1.0", True)) is None
+
+    def test_stale_entry_is_returned_but_flagged(self, cache):
+        cache.save(VERSION, MARKETS)
+        with open(cache.path) as f:
+            entry = json.load(f)
+        entry["saved_at"] = time.time() - 120
+        with open(cache.path, "w") as f:
+            json.dump(entry, f)
+        assert cache.load(VERSION)["is_fresh"] is False
+
+    def test_corrupt_or_missing_file(self, cache):
+        assert cache.load(VERSION) is None
+        with open(cache.path, "w") as f:
+            f.write("{not json")
+        assert cache.load(VERSION) is None
+
+class TestBinanceMarketsStartup:
+
+    def make_exchange(self, tmp_path):
+        fake = Mock()
+        fake.id = "binance"
+        fake.markets = None
+        fake.last_response_headers = {}
+        fake.load_markets = AsyncMock(return_value=MARKETS)
+        fake.close = AsyncMock()
+
+        def set_markets(markets, currencies=None):
+            fake.markets = markets
+        fake.set_markets = Mock(side_effect=set_markets)
+
+        exchange = BinanceTestnet("key", "secret", testnet=True,
+                                  markets_cache=MarketsCache(path=str(tmp_path / "markets.json"), ttl=3600))
+        exchange.exchange_class = Mock(return_value=fake)
+        return exchange, fake
+
+    @pytest.mark.asyncio
+    async def test_cold_start_downloads_and_caches(self, tmp_path):
+        exchange, fake = self.make_exchange(tmp_path)
+        assert await exchange.initialize() is True
+        fake.load_markets.assert_awaited_once()
+        assert exchange.markets_cache.load(exchange._markets_version_key()) is not None
+        await exchange.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_warm_start_uses_cache_without_download(self, tmp_path):
+        exchange, fake = self.make_exchange(tmp_path)
+        exchange.markets_cache.save(exchange._markets_version_key(), MARKETS)
+
+        assert await exchange.initialize() is True
+        fake.load_markets.assert_not_awaited()
+        assert exchange.get_market_precision("BTC/USDT") == {"amount": 3, "price": 1}
+        assert exchange.get_market_limits("BTC/USDT")["cost"]["min"] == 5.0
+        assert exchange.get_market_limits("XRP/USDT") == {}
+        await exchange.cleanup()
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,47 @@
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.exchanges.models import Ticker, Order, Position, Trade
+
+CCXT_ORDER = {"id": "1", "symbol": "BTC/USDT", "type": "market", "side": "buy", "amount": "0.001",
+              "price": "50000", "filled": "0.001", "remaining": "0", "status": "closed", "timestamp": 1700000000000}
+
+class TestModels:
+
+    def test_order_from_ccxt_maps_status_and_numbers(self):
+        order = Order.from_ccxt(CCXT_ORDER)
+
+        assert order.status == "filled"
+        assert order.price == 50000.0
+        assert order.timestamp == 1700000000000
+
+    def test_dict_style_access_for_existing_call_sites(self):
+        order = Order.from_ccxt(CCXT_ORDER)
+
+        assert order["id"] == "1"
+        assert order.get("info", "Unknown error") == "Unknown error"
+        assert "filled" in order
+        with pytest.raises(KeyError):
+            order["missing"]
+
+        position = Position("BTC/USDT", "buy", 0.001, 50000.0)
+        position["current_price"] = 51000.0
+        assert position.current_price == 51000.0
+
+    def test_models_have_no_instance_dict(self):
+        ticker = Ticker("BTC/USDT", 1.0, 1.0, 1.0, 0.0, 0.0, 0.0, 0)
+        assert not hasattr(ticker, "__dict__")
+        with pytest.raises(AttributeError):
+            ticker.extra = 1
+
+    def test_rejected_order(self):
+        order = Order.rejected("Insufficient balance", "BTC/USDT")
+        assert order["status"] == "rejected"
+        assert order.get("info") == "Insufficient balance"
+
+    def test_trade_serializes_iso_timestamp_at_the_edge(self):
+        trade = Trade("t1", "BTC/USDT", "buy", 0.001, 50000.0, 51000.0, 1.0, 1700000000000)
+        assert trade.to_dict()["timestamp"] == "2023-11-14T22:13:20"
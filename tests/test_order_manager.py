@@ -0,0 +1,386 @@
+import pytest
+import asyncio
+from unittest.mock import Mock, AsyncMock
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.trading.order_manager import (
+    OrderManager, OrderIntent, PURPOSE_ENTRY, PURPOSE_EXIT, PURPOSE_STOP_LOSS
+)
+from backend.trading.portfolio_manager import PortfolioManager
+from backend.exchanges.models import Order, Position
+from backend.exchanges.quote_aggregator import QuoteAggregator
+from backend.utils.timing_wheel import TimerService, TimingWheel
+
+def make_exchange(*outcomes, statuses=()):
+    """Exchange whose place_order records the call and returns/raises the next scripted outcome ("filled" by default).
+
+    "rejected" is a definite exchange rejection; "timeout" is a failure whose outcome is unknown, reported the way
+    the ccxt adapter does, and "filled_timeout" the same for an order that reached the exchange and filled.
+    get_order_status returns the next of `statuses` (an Order, or a status for the last placed order), then
+    "cancelled". find_order knows every order placed successfully, by client order id.
+    """
+    exchange = Mock()
+    exchange.connected = True
+    exchange.get_balance = AsyncMock(return_value={'USDT': 5.0})
+    exchange.calls = []
+    script = list(outcomes)
+    lookups = list(statuses)
+    exchange.placed = {}
+
+    async def place_order(symbol, side, order_type, amount, price=None, client_order_id=None):
+        exchange.calls.append((symbol, side))
+        outcome = script.pop(0) if script else "filled"
+        if isinstance(outcome, Exception):
+            raise outcome
+        if outcome == "rejected":
+            return Order.rejected("InsufficientFunds: binance Account has insufficient balance", symbol)
+        timeout = Order.rejected("RequestTimeout: binance POST /fapi/v1/order", symbol, outcome_unknown=True)
+        if outcome == "timeout":
+            return timeout
+        status = "filled" if outcome == "filled_timeout" else outcome
+        filled = amount if status == "filled" else 0.0
+        order = Order(f"o{len(exchange.calls)}", symbol, order_type, side, amount, price or 1.0, filled,
+                      amount - filled, status, 0)
+        exchange.placed[client_order_id] = order
+        return timeout if outcome == "filled_timeout" else order
+
+    async def get_order_status(order_id, symbol):
+        status = lookups.pop(0) if lookups else "cancelled"
+        if isinstance(status, Order):
+            return status
+        filled = 1.0 if status == "filled" else 0.0
+        return Order(order_id, symbol, "limit", "buy", 1.0, 1.0, filled, 1.0 - filled, status, 0)
+
+    exchange.place_order = place_order
+    exchange.cancel_order = AsyncMock(return_value=True)
+    exchange.get_order_status = AsyncMock(side_effect=get_order_status)
+    exchange.find_order = AsyncMock(side_effect=lambda client_order_id, symbol: exchange.placed.get(client_order_id))
+    exchange.get_ticker = AsyncMock(return_value={"bid": 0.99, "ask": 1.01, "last": 1.0})
+    return exchange
+
+def make_timers():
+    """Timer service on a manual clock: tests move time and fire deadlines explicitly"""
+    clock = [0.0]
+    timers = TimerService(tick=1.0)
+    timers.wheel = TimingWheel(tick=1.0, clock=lambda: clock[0])
+    return timers, clock
+
+def make_portfolio(exchange):
+    storage = Mock()
+    storage.save_trade = AsyncMock(return_value=True)
+    return PortfolioManager(exchange, storage, None, {})
+
+def open_position(portfolio, symbol):
+    portfolio.portfolio["positions"][symbol] = Mock(side="buy", amount=1.0, entry_price=1.0)
+
+class TestOrderManager:
+
+    @pytest.mark.asyncio
+    async def test_stops_and_exits_run_before_entries(self):
+        exchange = make_exchange()
+        portfolio = make_portfolio(exchange)
+        open_position(portfolio, "ETH/USDT")
+        open_position(portfolio, "SOL/USDT")
+        manager = OrderManager(exchange, portfolio, workers=1)
+
+        manager.submit(OrderIntent("BTC/USDT", "buy", 1.0, PURPOSE_ENTRY, reference_price=1.0))
+        manager.submit(OrderIntent("ETH/USDT", "sell", 1.0, PURPOSE_EXIT, reference_price=1.0))
+        manager.submit(OrderIntent("SOL/USDT", "sell", 1.0, PURPOSE_STOP_LOSS, reference_price=1.0))
+        manager.start()
+        await manager.wait_idle()
+        await manager.stop()
+
+        assert [symbol for symbol, _ in exchange.calls] == ["SOL/USDT", "ETH/USDT", "BTC/USDT"]
+
+    @pytest.mark.asyncio
+    async def test_duplicate_intents_are_folded_and_release_their_reservation(self):
+        exchange = make_exchange()
+        portfolio = make_portfolio(exchange)
+        manager = OrderManager(exchange, portfolio, workers=1)
+        first = manager.submit(OrderIntent("BTC/USDT", "buy", 1.0, reservation_id=portfolio.reserve("BTC/USDT", 1.0),
+                                           reference_price=1.0))
+        # The ledger refuses a second reservation for the symbol, so a racing strategy's one is stood in for here
+        second_res = portfolio.reserve("ETH/USDT", 1.0)
+
+        duplicate = manager.submit(OrderIntent("BTC/USDT", "buy", 1.0, reservation_id=second_res, reference_price=1.0))
+
+        assert duplicate is first
+        assert second_res not in portfolio.reservations
+        assert manager.stats["deduplicated"] == 1
+        manager.start()
+        await manager.wait_idle()
+        await manager.stop()
+        assert len(exchange.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_filled_entry_commits_its_reservation(self):
+        exchange = make_exchange()
+        portfolio = make_portfolio(exchange)
+        manager = OrderManager(exchange, portfolio)
+        reservation_id = portfolio.reserve("BTC/USDT", 1.0)
+
+        manager.submit(OrderIntent("BTC/USDT", "buy", 0.5, reservation_id=reservation_id, reference_price=2.0))
+        manager.start()
+        await manager.wait_idle()
+        await manager.stop()
+
+        assert portfolio.reservations == {}
+        assert portfolio.portfolio["positions"]["BTC/USDT"].entry_price == 2.0
+        assert manager.completed[-1].status == "filled"
+
+    @pytest.mark.asyncio
+    async def test_exchange_errors_are_retried(self):
+        exchange = make_exchange("rejected", "filled")
+        portfolio = make_portfolio(exchange)
+        open_position(portfolio, "BTC/USDT")
+        manager = OrderManager(exchange, portfolio, retry_delay=0)
+
+        intent = manager.submit(OrderIntent("BTC/USDT", "sell", 1.0, PURPOSE_STOP_LOSS, reference_price=1.0))
+        manager.start()
+        await manager.wait_idle()
+        await manager.stop()
+
+        assert intent.status == "filled" and intent.attempts == 2
+        assert "BTC/USDT" not in portfolio.portfolio["positions"]
+        assert manager.stats["retries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rejected_entry_fails_after_retries_and_releases_funds(self):
+        exchange = make_exchange("rejected", "rejected", "rejected")
+        portfolio = make_portfolio(exchange)
+        manager = OrderManager(exchange, portfolio, retry_delay=0)
+        reservation_id = portfolio.reserve("BTC/USDT", 1.0)
+
+        intent = manager.submit(OrderIntent("BTC/USDT", "buy", 1.0, reservation_id=reservation_id, reference_price=1.0))
+        manager.start()
+        await manager.wait_idle()
+        await manager.stop()
+
+        assert intent.status == "failed" and intent.attempts == 3
+        assert intent.error.startswith("InsufficientFunds")
+        assert portfolio.reservations == {} and portfolio.reserved_usd == 0.0
+        assert manager.active == {}
+
+    @pytest.mark.asyncio
+    async def test_timed_out_exit_that_filled_is_not_sent_again(self):
+        exchange = make_exchange("filled_timeout")
+        portfolio = make_portfolio(exchange)
+        open_position(portfolio, "BTC/USDT")
+        manager = OrderManager(exchange, portfolio, retry_delay=0)
+
+        intent = manager.submit(OrderIntent("BTC/USDT", "sell", 1.0, PURPOSE_STOP_LOSS, reference_price=1.0))
+        manager.start()
+        await manager.wait_idle()
+        await manager.stop()
+
+        assert len(exchange.calls) == 1 and intent.status == "filled" and intent.order.id == "o1"
+        exchange.find_order.assert_awaited_once_with(intent.client_order_id, "BTC/USDT")
+        assert "BTC/USDT" not in portfolio.portfolio["positions"]
+
+    @pytest.mark.asyncio
+    async def test_timed_out_order_missing_from_the_exchange_is_placed_again(self):
+        exchange = make_exchange("timeout", "filled")
+        portfolio = make_portfolio(exchange)
+        manager = OrderManager(exchange, portfolio, retry_delay=0)
+
+        intent = manager.submit(OrderIntent("BTC/USDT", "buy", 1.0, reservation_id=portfolio.reserve("BTC/USDT", 1.0),
+                                            reference_price=1.0))
+        manager.start()
+        await manager.wait_idle()
+        await manager.stop()
+
+        assert len(exchange.calls) == 2 and intent.status == "filled"
+        assert [call.args[0] for call in exchange.find_order.await_args_list] == [f"{manager.session}-{intent.id}-1"]
+
+    @pytest.mark.asyncio
+    async def test_timeout_that_cannot_be_looked_up_is_not_sent_again(self):
+        exchange = make_exchange("timeout")
+        exchange.find_order.side_effect = ConnectionError("reset")
+        portfolio = make_portfolio(exchange)
+        manager = OrderManager(exchange, portfolio, retry_delay=0)
+
+        intent = manager.submit(OrderIntent("BTC/USDT", "buy", 1.0, reservation_id=portfolio.reserve("BTC/USDT", 1.0),
+                                            reference_price=1.0))
+        manager.start()
+        await manager.wait_idle()
+        await manager.stop()
+
+        assert len(exchange.calls) == 1 and intent.status == "unconfirmed"
+        assert exchange.find_order.await_count == manager.max_retries + 1
+        assert manager.active == {}
+
+    @pytest.mark.asyncio
+    async def test_unfilled_exit_is_followed_instead_of_placed_again(self):
+        exchange = make_exchange("open", statuses=["open", "filled"])
+        portfolio = make_portfolio(exchange)
+        portfolio.portfolio["positions"]["BTC/USDT"] = Mock(side="buy", amount=1.0, entry_price=1.0)
+        portfolio.close_position = AsyncMock()
+        timers, clock = make_timers()
+        manager = OrderManager(exchange, portfolio, retry_delay=0, timers=timers, order_timeout=3)
+        manager.start()
+
+        intent = manager.submit(OrderIntent("BTC/USDT", "sell", 1.0, PURPOSE_STOP_LOSS, reference_price=1.0))
+        await manager.wait_idle()
+        assert intent.status == "open" and exchange.calls == [("BTC/USDT", "sell")]
+
+        # The cancel lands after the order filled: the fill is applied, nothing is sold again
+        exchange.cancel_order.return_value = False
+        clock[0] = 3
+        timers.fire_due()
+        await asyncio.sleep(0)
+        await manager.stop()
+
+        assert intent.status == "filled" and exchange.calls == [("BTC/USDT", "sell")]
+        portfolio.close_position.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_unfilled_order_without_timers_is_not_placed_again(self):
+        exchange = make_exchange("pending", statuses=["open"])
+        portfolio = make_portfolio(exchange)
+        open_position(portfolio, "BTC/USDT")
+        manager = OrderManager(exchange, portfolio, retry_delay=0)
+
+        intent = manager.submit(OrderIntent("BTC/USDT", "sell", 1.0, PURPOSE_EXIT, reference_price=1.0))
+        manager.start()
+        await manager.wait_idle()
+        await manager.stop()
+
+        assert intent.status == "unconfirmed" and len(exchange.calls) == 1
+        assert manager.stats["retries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_exit_for_a_closed_position_is_cancelled(self):
+        exchange = make_exchange()
+        manager = OrderManager(exchange, make_portfolio(exchange))
+
+        intent = manager.submit(OrderIntent("BTC/USDT", "sell", 1.0, PURPOSE_EXIT, reference_price=1.0))
+        manager.start()
+        await manager.wait_idle()
+        await manager.stop()
+
+        assert intent.status == "cancelled"
+        assert exchange.calls == []
+
+    @pytest.mark.asyncio
+    async def test_stop_releases_reservations_of_queued_intents(self):
+        exchange = make_exchange()
+        portfolio = make_portfolio(exchange)
+        manager = OrderManager(exchange, portfolio)
+        reservation_id = portfolio.reserve("BTC/USDT", 1.0)
+        intent = manager.submit(OrderIntent("BTC/USDT", "buy", 1.0, reservation_id=reservation_id))
+
+        await manager.stop()
+
+        assert intent.status == "cancelled"
+        assert portfolio.reservations == {}
+
+    @pytest.mark.asyncio
+    async def test_resting_limit_order_is_cancel_replaced_then_expires(self):
+        exchange = make_exchange("open", "open")
+        portfolio = make_portfolio(exchange)
+        timers, clock = make_timers()
+        manager = OrderManager(exchange, portfolio, timers=timers)
+        reservation_id = portfolio.reserve("BTC/USDT", 1.0)
+        manager.start()
+
+        intent = manager.submit(OrderIntent("BTC/USDT", "buy", 1.0, order_type="limit", price=0.95,
+                                            reservation_id=reservation_id, ttl=5, replaces=1))
+        await manager.wait_idle()
+        assert intent.status == "open" and len(timers.wheel) == 1
+
+        clock[0] = 5
+        timers.fire_due()
+        await asyncio.sleep(0)
+        await manager.wait_idle()
+        assert exchange.calls == [("BTC/USDT", "buy")] * 2
+        assert intent.price == 0.99 and intent.status == "open"
+
+        clock[0] = 10
+        timers.fire_due()
+        await asyncio.sleep(0)
+        await manager.stop()
+        assert intent.status == "expired"
+        assert manager.stats == {**manager.stats, "replaced": 1, "expired": 1}
+        assert exchange.cancel_order.await_count == 2
+        assert portfolio.reservations == {}
+
+    @pytest.mark.asyncio
+    async def test_unconfirmed_cancel_keeps_the_order_working(self):
+        exchange = make_exchange("open", statuses=[Order.rejected("RequestTimeout", "BTC/USDT"), "cancelled"])
+        portfolio = make_portfolio(exchange)
+        timers, clock = make_timers()
+        manager = OrderManager(exchange, portfolio, timers=timers)
+        manager.start()
+        intent = manager.submit(OrderIntent("BTC/USDT", "buy", 1.0, order_type="limit", price=0.95,
+                                            reservation_id=portfolio.reserve("BTC/USDT", 1.0), ttl=5, replaces=1))
+        await manager.wait_idle()
+
+        exchange.cancel_order.return_value = False
+        clock[0] = 5
+        timers.fire_due()
+        await asyncio.sleep(0)
+        await manager.wait_idle()
+        assert intent.status == "open" and len(exchange.calls) == 1 and len(timers.wheel) == 1
+
+        exchange.cancel_order.return_value = True
+        clock[0] = 10
+        timers.fire_due()
+        await asyncio.sleep(0)
+        await manager.wait_idle()
+        await manager.stop()
+        assert manager.stats["replaced"] == 1 and len(exchange.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_partly_filled_exit_closes_that_part_and_replaces_the_rest(self):
+        exchange = make_exchange("open", "open", statuses=[
+            Order("o1", "BTC/USDT", "limit", "sell", 1.0, 1.02, 0.4, 0.6, "cancelled", 0),
+            Order("o2", "BTC/USDT", "limit", "sell", 0.6, 1.01, 0.6, 0.0, "filled", 0)])
+        portfolio = make_portfolio(exchange)
+        portfolio.portfolio["positions"]["BTC/USDT"] = Position("BTC/USDT", "buy", 1.0, 1.0)
+        timers, clock = make_timers()
+        manager = OrderManager(exchange, portfolio, timers=timers)
+        manager.start()
+        intent = manager.submit(OrderIntent("BTC/USDT", "sell", 1.0, PURPOSE_EXIT, order_type="limit", price=1.02,
+                                            reference_price=1.0, ttl=5, replaces=1))
+        await manager.wait_idle()
+
+        clock[0] = 5
+        timers.fire_due()
+        await asyncio.sleep(0)
+        await manager.wait_idle()
+        assert portfolio.portfolio["positions"]["BTC/USDT"].amount == pytest.approx(0.6)
+        assert [trade["amount"] for trade in portfolio.portfolio["trades"]] == [0.4]
+        assert intent.status == "open" and intent.amount == pytest.approx(0.6)
+        assert exchange.placed[intent.client_order_id]["amount"] == pytest.approx(0.6)
+
+        clock[0] = 10
+        timers.fire_due()
+        await asyncio.sleep(0)
+        await manager.stop()
+        assert intent.status == "filled"
+        assert "BTC/USDT" not in portfolio.portfolio["positions"]
+        assert [trade["amount"] for trade in portfolio.portfolio["trades"]] == [0.4, pytest.approx(0.6)]
+
+    @pytest.mark.asyncio
+    async def test_routed_entry_is_exited_on_the_venue_it_filled_on(self):
+        primary, cheaper = make_exchange(), make_exchange()
+        cheaper.get_ticker.return_value = {"bid": 0.98, "ask": 1.0, "last": 0.99}
+        portfolio = make_portfolio(primary)
+        manager = OrderManager(primary, portfolio, router=QuoteAggregator({"primary": primary, "cheaper": cheaper},
+                                                                       fee_rates={"primary": 0.001, "cheaper": 0.001}))
+        manager.start()
+
+        entry = manager.submit(OrderIntent("BTC/USDT", "buy", 1.0, reservation_id=portfolio.reserve("BTC/USDT", 1.0),
+                                           reference_price=1.0))
+        await manager.wait_idle()
+        primary.get_ticker.return_value = {"bid": 1.1, "ask": 1.11, "last": 1.1}  # primary now pays more for the exit
+        exit_intent = manager.submit(OrderIntent("BTC/USDT", "sell", 1.0, PURPOSE_EXIT, reference_price=1.0))
+        await manager.wait_idle()
+        await manager.stop()
+
+        assert entry.venue == exit_intent.venue == "cheaper"
+        assert len(cheaper.calls) == 2 and primary.calls == []
+        assert manager.position_venues == {}
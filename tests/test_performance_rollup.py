@@ -0,0 +1,70 @@
+import pytest
+from datetime import date
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.trading.performance_rollup import PerformanceRollup
+
+class TestPerformanceRollup:
+
+    @pytest.fixture
+    def rollup(self):
+        rollup = PerformanceRollup()
+        trades = [
+            ("2025-01-06T10:00:00", "BTC/USDT", 2.0),
+            ("2025-01-06T11:00:00", "ETH/USDT", -1.0),
+            ("2025-01-07T10:00:00", "BTC/USDT", -3.0),
+            ("2025-01-13T10:00:00", "BTC/USDT", 1.5),
+            ("2025-02-01T10:00:00", "ETH/USDT", 0.5),
+        ]
+        for timestamp, symbol, pnl in trades:
+            rollup.record_trade({"timestamp": timestamp, "symbol": symbol, "realized_pnl": pnl})
+        return rollup
+
+    def test_record_trade_updates_single_bucket(self, rollup):
+        assert len(rollup.buckets) == 5
+        bucket = rollup.buckets[(date(2025, 1, 6), "BTC/USDT")]
+        assert bucket["trade_count"] == 1
+        assert bucket["win_count"] == 1
+        assert bucket["gross_profit"] == 2.0
+        assert rollup.total_realized_pnl == pytest.approx(0.0)
+
+    def test_get_pnl_periods(self, rollup):
+        daily = rollup.get_pnl("daily")
+        assert [b["period"] for b in daily] == ["2025-01-06", "2025-01-07", "2025-01-13", "2025-02-01"]
+        assert daily[0]["realized_pnl"] == pytest.approx(1.0)
+        assert daily[0]["win_rate"] == 0.5
+
+        weekly = rollup.get_pnl("weekly")
+        assert [b["period"] for b in weekly] == ["2025-W02", "2025-W03", "2025-W05"]
+
+        monthly = rollup.get_pnl("monthly", symbol="BTC/USDT")
+        assert monthly == [{
+            "period": "2025-01", "trade_count": 3, "win_count": 2, "loss_count": 1,
+            "gross_profit": 3.5, "gross_loss": 3.0, "realized_pnl": 0.5, "win_rate": 2 / 3
+        }]
+
+    def test_get_pnl_rejects_unknown_period(self, rollup):
+        with pytest.raises(ValueError):
+            rollup.get_pnl("hourly")
+
+    def test_get_metrics(self, rollup):
+        metrics = rollup.get_metrics()
+        assert metrics["trade_count"] == 5
+        assert metrics["win_rate"] == pytest.approx(0.6)
+        assert metrics["profit_factor"] == pytest.approx(4.0 / 4.0)
+        # Daily equity: 1.0, -2.0, -0.5, 0.0 -> drawdown from peak 1.0 to -2.0
+        assert metrics["max_drawdown_usd"] == pytest.approx(3.0)
+        assert metrics["trading_days"] == 4
+
+    def test_load_buckets_restores_totals(self, rollup):
+        rows = [{"day": day, "symbol": symbol, **bucket} for (day, symbol), bucket in rollup.buckets.items()]
+        restored = PerformanceRollup()
+        restored.load_buckets(rows)
+        assert restored.buckets == rollup.buckets
+        assert restored.totals == rollup.totals
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -8,7 +8,10 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
 from backend.trading.portfolio_manager import PortfolioManager
+from backend.exchanges.user_data_stream import UserDataStream
+from backend.exchanges.models import Order
 from backend.utils.config import config
+from backend.utils.timing_wheel import TimerService, TimingWheel
 
 class TestPortfolioManager:
     
@@ -147,6 +150,12 @@ class TestPortfolioManager:
         
         # Storage manager should be called
         mock_storage_manager.save_trade.assert_called_once()
+
+        # Rollups should reflect the trade without re-summing the trade list
+        assert portfolio_manager.get_portfolio_summary()["total_realized_pnl"] == 1.0
+        daily = portfolio_manager.get_performance("daily")["buckets"]
+        assert len(daily) == 1
+        assert daily[0]["trade_count"] == 1
     
     def test_get_portfolio_summary(self, portfolio_manager):
         summary = portfolio_manager.get_portfolio_summary()
@@ -172,6 +181,132 @@ class TestPortfolioManager:
         # Should not be able to open more positions
         assert portfolio_manager.can_open_position(1.0) == False
 
+    @pytest.mark.asyncio
+    async def test_update_balance_reads_synced_user_stream(self, portfolio_manager, mock_exchange):
+        portfolio_manager.user_stream = Mock(is_synced=True)
+        portfolio_manager.user_stream.get_balance.return_value = {'USDT': 7.5, 'total': 8.0}
+
+        await portfolio_manager.update_balance()
+
+        assert portfolio_manager.portfolio['balance']['total'] == 7.5
+        mock_exchange.get_balance.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_orders_and_positions_come_from_the_stream_until_it_goes_stale(self, portfolio_manager, mock_exchange):
+        stream = UserDataStream(Mock(testnet=True))
+        stream.exchange.exchange.safe_symbol.side_effect = lambda market_id, *args: "BTC/USDT"
+        stream.is_synced = True
+        stream.handle_message({"e": "ORDER_TRADE_UPDATE", "E": 1, "o": {"i": 7, "s": "BTCUSDT", "o": "LIMIT", "S": "BUY",
+                                                                      "q": "1", "p": "100", "z": "0", "X": "NEW"}})
+        stream.handle_message({"e": "ACCOUNT_UPDATE", "E": 2, "a": {"P": [{"s": "BTCUSDT", "pa": "1", "ep": "100"}]}})
+        portfolio_manager.user_stream = stream
+        mock_exchange.get_order_status = AsyncMock(return_value=Order("8", "BTC/USDT", "limit", "buy", 1.0, 100.0, 1.0,
+                                                                      0.0, "filled", 0))
+        mock_exchange.get_open_orders = AsyncMock(return_value=[])
+        mock_exchange.get_positions = AsyncMock(return_value=[])
+
+        assert (await portfolio_manager.get_order_status("7", "BTC/USDT")).status == "open"
+        assert [o.id for o in await portfolio_manager.get_open_orders("BTC/USDT")] == ["7"]
+        assert [p.symbol for p in await portfolio_manager.get_exchange_positions()] == ["BTC/USDT"]
+        mock_exchange.get_order_status.assert_not_called()
+        # An order the stream has not seen yet is looked up over REST
+        assert (await portfolio_manager.get_order_status("8", "BTC/USDT")).status == "filled"
+
+        stream.is_synced = False  # reconnecting: the local state may be behind
+        assert await portfolio_manager.get_open_orders() == []
+        assert await portfolio_manager.get_exchange_positions() == []
+        mock_exchange.get_open_orders.assert_awaited_once()
+        mock_exchange.get_positions.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_reservations_prevent_over_allocation(self, portfolio_manager):
+        await portfolio_manager.initialize()
+
+        first = portfolio_manager.reserve("BTC/USDT", 2.0)
+        second = portfolio_manager.reserve("ETH/USDT", 2.0)
+
+        assert first and second
+        assert portfolio_manager.available_balance == pytest.approx(1.0)
+        # Both position slots are held even though neither order has filled yet
+        assert portfolio_manager.reserve("SOL/USDT", 0.5) is None
+        assert portfolio_manager.can_open_position(0.5) == False
+
+    @pytest.mark.asyncio
+    async def test_one_reservation_per_symbol(self, portfolio_manager):
+        await portfolio_manager.initialize()
+
+        assert portfolio_manager.reserve("BTC/USDT", 1.0)
+        assert portfolio_manager.reserve("BTC/USDT", 1.0) is None
+
+    @pytest.mark.asyncio
+    async def test_commit_opens_position_and_release_is_then_a_noop(self, portfolio_manager):
+        await portfolio_manager.initialize()
+        reservation_id = portfolio_manager.reserve("BTC/USDT", 1.0)
+
+        assert await portfolio_manager.commit(reservation_id, "buy", 0.00002, 50000.0, "order1")
+        assert "BTC/USDT" in portfolio_manager.portfolio['positions']
+        assert portfolio_manager.reserved_usd == 0.0
+        assert portfolio_manager.release(reservation_id) == False
+
+    @pytest.mark.asyncio
+    async def test_release_and_expiry_return_funds(self, portfolio_manager):
+        await portfolio_manager.initialize()
+        released = portfolio_manager.reserve("BTC/USDT", 2.0)
+        abandoned = portfolio_manager.reserve("ETH/USDT", 2.0, ttl=0.0)
+
+        assert portfolio_manager.release(released)
+        portfolio_manager.expire_reservations()
+
+        assert portfolio_manager.reservations == {}
+        assert portfolio_manager.available_balance == pytest.approx(5.0)
+        assert await portfolio_manager.commit(abandoned, "buy", 0.001, 2000.0, "order2") == False
+
+    @pytest.mark.asyncio
+    async def test_fill_after_its_reservation_expired_is_still_recorded(self, portfolio_manager):
+        await portfolio_manager.initialize()
+        abandoned = portfolio_manager.reserve("ETH/USDT", 2.0, ttl=0.0)
+        portfolio_manager.expire_reservations()
+
+        assert await portfolio_manager.commit(abandoned, "buy", 0.001, 2000.0, "order2", "ETH/USDT") == False
+        assert portfolio_manager.portfolio["positions"]["ETH/USDT"].amount == 0.001
+        assert portfolio_manager.reserved_usd == 0.0
+
+    @pytest.mark.asyncio
+    async def test_version_changes_only_when_positions_or_funds_do(self, portfolio_manager):
+        await portfolio_manager.initialize()
+        version = portfolio_manager.version
+
+        await portfolio_manager.update_balance()  # same balance as before
+        assert portfolio_manager.version == version
+
+        reservation_id = portfolio_manager.reserve("BTC/USDT", 1.0)
+        await portfolio_manager.commit(reservation_id, "buy", 0.00002, 50000.0, "order1")
+        await portfolio_manager.update_position("BTC/USDT", 51000.0)  # mark-to-market only
+        after_open = portfolio_manager.version
+        assert after_open > version
+
+        await portfolio_manager.close_position("BTC/USDT", 51000.0, "trade1")
+        assert portfolio_manager.version > after_open
+
+    @pytest.mark.asyncio
+    async def test_positions_past_max_holding_time_are_handed_to_the_exit_handler(self, portfolio_manager):
+        await portfolio_manager.initialize()
+        clock = [0.0]
+        portfolio_manager.timers = TimerService(tick=1.0)
+        portfolio_manager.timers.wheel = TimingWheel(tick=1.0, clock=lambda: clock[0])
+        portfolio_manager.max_holding_time = 60
+        expired = []
+        portfolio_manager.on_holding_expired = lambda position: expired.append(position.symbol)
+
+        await portfolio_manager.add_position("BTC/USDT", "buy", 0.00002, 50000.0, "order1")
+        await portfolio_manager.add_position("ETH/USDT", "buy", 0.0005, 2000.0, "order2")
+        await portfolio_manager.close_position("ETH/USDT", 2100.0, "trade1")  # cancels its time stop
+        clock[0] = 60
+        portfolio_manager.timers.fire_due()
+
+        assert expired == ["BTC/USDT"]
+        assert portfolio_manager.holding_timers == {}
+
 if __name__ == "__main__":
     pytest.main([__file__])
 
@@ -0,0 +1,89 @@
+import pytest
+import asyncio
+import numpy as np
+from unittest.mock import Mock
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.utils.profiler import HdrHistogram, Profiler
+from backend.trading.strategy_manager import StrategyManager
+from backend.trading.strategies.base_strategy import BaseStrategy
+
+class PhasedStrategy(BaseStrategy):
+    def __init__(self, symbols):
+        super().__init__(None, None, None, None, None)
+        self.symbols = symbols
+
+    async def execute_symbol(self, symbol):
+        with self.phase(symbol, "data"):
+            await asyncio.sleep(0.01)
+        with self.phase(symbol, "signal"):
+            sum(range(1000))
+
+class TestHdrHistogram:
+
+    def test_percentiles_stay_within_relative_precision(self):
+        rng = np.random.default_rng(3)
+        samples = rng.lognormal(mean=-6, sigma=1.5, size=20000)  # seconds, ~10 us to seconds
+        histogram = HdrHistogram()
+        for value in samples:
+            histogram.record(value)
+
+        for q in (0.5, 0.9, 0.99, 0.999):
+            exact = np.quantile(samples * 1000, q, method="inverted_cdf")
+            assert histogram.percentile(q) == pytest.approx(exact, rel=0.01, abs=0.001)
+        assert histogram.snapshot()["max_ms"] == pytest.approx(samples.max() * 1000, abs=0.001)
+
+    def test_out_of_range_values_are_counted_and_merge_adds_up(self):
+        first, second = HdrHistogram(highest_us=1_000_000), HdrHistogram(highest_us=1_000_000)
+        first.record(0.001)
+        second.record(120.0)  # beyond the tracked range
+
+        first.merge(second)
+
+        assert first.count == 2 and first.snapshot()["max_ms"] == 120000.0
+        assert first.percentile(0.5) == pytest.approx(1.0, rel=0.01)
+        assert first.percentile(1.0) >= 990.0
+
+class TestProfiler:
+
+    @pytest.mark.asyncio
+    async def test_phases_are_recorded_per_strategy_and_symbol(self):
+        profiler = Profiler()
+        config = Mock()
+        config.get.side_effect = lambda key, default=None: default
+        manager = StrategyManager(None, None, None, None, config, profiler=profiler)
+        manager.add_strategy("phased", PhasedStrategy(["BTC/USDT", "ETH/USDT"]))
+
+        await manager.run_strategies()
+
+        report = profiler.report("phased")["phased"]
+        assert set(report) == {"BTC/USDT", "ETH/USDT", "*"}
+        assert set(report["BTC/USDT"]) == {"data", "signal", "total"}
+        assert report["*"]["data"]["count"] == 2
+        assert report["BTC/USDT"]["data"]["p50_ms"] >= 9
+        assert report["BTC/USDT"]["total"]["max_ms"] >= report["BTC/USDT"]["data"]["max_ms"]
+
+    @pytest.mark.asyncio
+    async def test_capture_profiles_exactly_one_cycle(self):
+        profiler = Profiler(capture_top=10)
+        config = Mock()
+        config.get.side_effect = lambda key, default=None: default
+        manager = StrategyManager(None, None, None, None, config, profiler=profiler)
+        manager.add_strategy("phased", PhasedStrategy(["BTC/USDT"]))
+
+        profiler.request_capture()
+        await manager.run_strategies()
+        first = profiler.last_capture
+        await manager.run_strategies()
+
+        assert "execute_symbol" in first["stats"]
+        assert profiler.last_capture is first and not profiler.capture_requested
+
+    def test_disabled_profiler_records_nothing(self):
+        profiler = Profiler(enabled=False)
+        with profiler.phase("s", "BTC/USDT", "data"):
+            pass
+        assert profiler.report() == {}
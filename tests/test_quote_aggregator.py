@@ -0,0 +1,99 @@
+import pytest
+import asyncio
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.exchanges.quote_aggregator import QuoteAggregator
+from backend.exchanges.registry import create_exchange, create_exchanges
+from backend.exchanges.ccxt_exchange import CcxtExchange
+from backend.exchanges.simulated_exchange import SimulatedExchange
+
+SYMBOL = "BTC/USDT"
+
+def venue(price, taker_fee=0.0004, latency=0.0):
+    exchange = SimulatedExchange(initial_balances={"USDT": 10000.0}, taker_fee=taker_fee, latency=latency)
+    exchange.on_price(SYMBOL, price, timestamp=1)
+    return exchange
+
+class SlowVenue(SimulatedExchange):
+    async def get_ticker(self, symbol):
+        await asyncio.sleep(1)
+
+class TestQuoteAggregator:
+
+    @pytest.mark.asyncio
+    async def test_consolidated_top_of_book(self):
+        aggregator = QuoteAggregator({"a": venue(100.0), "b": venue(101.0)})
+
+        book = await aggregator.refresh(SYMBOL)
+
+        assert book["ask_venue"] == "a"
+        assert book["bid_venue"] == "b"
+        assert book["ask"] < book["bid"]  # crossed across venues: an arbitrage the book makes visible
+        assert set(book["venues"]) == {"a", "b"}
+
+    @pytest.mark.asyncio
+    async def test_slow_venue_times_out_without_blocking_others(self):
+        aggregator = QuoteAggregator({"fast": venue(100.0), "slow": SlowVenue()}, timeout=0.05)
+
+        book = await aggregator.refresh(SYMBOL)
+
+        assert set(book["venues"]) == {"fast"}
+        assert aggregator.errors["slow"] == 1
+        assert aggregator.latency_ms["slow"] == pytest.approx(50.0)
+
+    @pytest.mark.asyncio
+    async def test_best_venue_uses_fee_adjusted_price(self):
+        # "cheap" has the lower ask but its fee more than eats the difference
+        aggregator = QuoteAggregator({"cheap": venue(100.0, taker_fee=0.01), "fair": venue(100.1, taker_fee=0.0004)})
+        await aggregator.refresh(SYMBOL)
+
+        assert aggregator.best_venue(SYMBOL, "buy") == "fair"
+
+    @pytest.mark.asyncio
+    async def test_price_ties_go_to_the_faster_venue(self):
+        aggregator = QuoteAggregator({"slow": venue(100.0), "fast": venue(100.0)}, price_tolerance_bps=1.0)
+        await aggregator.refresh(SYMBOL)
+        aggregator.latency_ms.update({"slow": 80.0, "fast": 5.0})
+
+        assert [name for name, _ in aggregator.rank_venues(SYMBOL, "sell")] == ["fast", "slow"]
+
+    @pytest.mark.asyncio
+    async def test_route_order_places_on_best_venue(self):
+        venues = {"a": venue(100.0), "b": venue(99.0)}
+        aggregator = QuoteAggregator(venues)
+
+        name, order = await aggregator.route_order(SYMBOL, "buy", "market", 1.0)
+
+        assert name == "b"
+        assert order["status"] == "filled"
+        assert await venues["a"].get_positions() == []
+
+    @pytest.mark.asyncio
+    async def test_route_order_without_quotes_is_rejected(self):
+        name, order = await QuoteAggregator({"a": venue(100.0)}).route_order("ETH/USDT", "buy", "market", 1.0)
+
+        assert name is None
+        assert order["status"] == "rejected"
+
+class TestExchangeRegistry:
+
+    def test_create_exchanges_builds_enabled_venues_only(self):
+        exchanges = create_exchanges({
+            "primary": "sim",
+            "sim": {"enabled": True, "type": "simulated", "taker_fee": 0.001},
+            "kraken": {"enabled": True, "testnet": False},
+            "okx": {"enabled": False},
+            "recording": {"path": ""},
+        })
+
+        assert set(exchanges) == {"sim", "kraken"}
+        assert isinstance(exchanges["sim"], SimulatedExchange) and exchanges["sim"].taker_fee == 0.001
+        assert isinstance(exchanges["kraken"], CcxtExchange) and exchanges["kraken"].exchange_id == "kraken"
+        assert exchanges["kraken"].name == "kraken"
+
+    def test_unknown_type_raises(self):
+        with pytest.raises(ValueError):
+            create_exchange("x", {"type": "nope"})
@@ -0,0 +1,90 @@
+import pytest
+import asyncio
+import time
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.exchanges.rate_limiter import WeightedRateLimiter, TokenBucket, Priority
+
+class TestTokenBucket:
+
+    def test_refill_and_wait_time(self):
+        bucket = TokenBucket(capacity=10, period=1)
+        now = bucket.updated_at
+        bucket.take(10, now)
+        assert bucket.time_until(5, now) == pytest.approx(0.5)
+        assert bucket.time_until(5, now + 0.5) == 0.0
+
+    def test_sync_used_only_lowers_allowance(self):
+        bucket = TokenBucket(capacity=100, period=60)
+        now = bucket.updated_at
+        bucket.sync_used(80, now)
+        assert bucket.tokens == pytest.approx(20)
+        bucket.sync_used(10, now)
+        assert bucket.tokens == pytest.approx(20)
+
+class TestWeightedRateLimiter:
+
+    def test_endpoint_weights(self):
+        assert WeightedRateLimiter.endpoint_weight("ticker") == 1
+        assert WeightedRateLimiter.endpoint_weight("ohlcv", limit=2) == 1
+        assert WeightedRateLimiter.endpoint_weight("ohlcv", limit=1000) == 5
+        assert WeightedRateLimiter.endpoint_weight("open_orders", symbol=None) == 40
+        assert WeightedRateLimiter.endpoint_weight("open_orders", symbol="BTC/USDT") == 1
+
+    @pytest.mark.asyncio
+    async def test_acquire_within_capacity_does_not_wait(self):
+        limiter = WeightedRateLimiter(request_weight_per_minute=600, safety_margin=1.0)
+        for _ in range(10):
+            await limiter.acquire("balance")
+        assert limiter.stats["waited"] == 0
+        assert limiter.weight_bucket.tokens == pytest.approx(550, abs=1)
+
+    @pytest.mark.asyncio
+    async def test_orders_overtake_queued_market_data(self):
+        # 60 weight/second: each weight-30 call waits ~0.5s once the bucket is drained
+        limiter = WeightedRateLimiter(request_weight_per_minute=3600, safety_margin=1.0)
+        await limiter.acquire("bulk", weight=3600)
+        served = []
+
+        async def call(name, priority):
+            await limiter.acquire(name, weight=30, priority=priority)
+            served.append(name)
+
+        tasks = [asyncio.create_task(call(f"poll_{i}", Priority.MARKET_DATA)) for i in range(2)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(call("order", Priority.ORDER)))
+        await asyncio.gather(*tasks)
+        assert served[0] == "order"
+
+    @pytest.mark.asyncio
+    async def test_used_weight_header_tightens_bucket(self):
+        limiter = WeightedRateLimiter(request_weight_per_minute=1000, safety_margin=1.0)
+        limiter.update_from_headers({"X-MBX-USED-WEIGHT-1M": "990", "x-mbx-order-count-10s": "5"})
+        assert limiter.weight_bucket.tokens == pytest.approx(10, abs=1)
+        assert limiter.order_buckets["10s"].tokens == pytest.approx(295, abs=1)
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_error_pauses_requests(self):
+        limiter = WeightedRateLimiter()
+        limiter.on_rate_limit_error(retry_after=0.2)
+        started = time.monotonic()
+        await limiter.acquire("ticker")
+        assert time.monotonic() - started >= 0.15
+        assert limiter.get_status()["rate_limit_errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_block_queue(self):
+        limiter = WeightedRateLimiter(request_weight_per_minute=600, safety_margin=1.0)
+        await limiter.acquire("bulk", weight=600)
+        blocked = asyncio.create_task(limiter.acquire("big", weight=600))
+        await asyncio.sleep(0)
+        blocked.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await blocked
+        await asyncio.wait_for(limiter.acquire("small", weight=1), timeout=1)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,95 @@
+import pytest
+import json
+import time
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.exchanges.recording_exchange import RecordingExchange, ReplayExchange, VirtualClock, call_key
+from backend.exchanges.simulated_exchange import SimulatedExchange
+
+SYMBOL = "BTC/USDT"
+
+async def record_session(path):
+    inner = SimulatedExchange(initial_balances={"USDT": 1000.0})
+    inner.on_price(SYMBOL, 100.0, timestamp=1)
+    exchange = RecordingExchange(inner, path)
+    await exchange.initialize()
+    await exchange.get_ticker(SYMBOL)
+    order = await exchange.place_order(SYMBOL, "buy", "market", 1.0)
+    inner.on_price(SYMBOL, 110.0)
+    await exchange.get_ticker(SYMBOL)
+    await exchange.get_positions()
+    await exchange.cleanup()
+    return order
+
+class TestRecordAndReplay:
+
+    @pytest.mark.asyncio
+    async def test_recording_is_compact_append_only_jsonl(self, tmp_path):
+        path = str(tmp_path / "session.jsonl")
+        await record_session(path)
+
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        assert [r["seq"] for r in records] == list(range(5))
+        assert all({"t", "lat", "key", "result"} <= set(r) for r in records)
+
+    def test_connection_state_reads_through_to_the_wrapped_adapter(self, tmp_path):
+        inner = SimulatedExchange()
+        exchange = RecordingExchange(inner, str(tmp_path / "session.jsonl"))
+
+        inner.connected = True
+        assert exchange.connected
+        inner.connected = False
+        assert not exchange.connected
+        exchange._file.close()
+
+    @pytest.mark.asyncio
+    async def test_replay_serves_identical_responses_in_order(self, tmp_path):
+        path = str(tmp_path / "session.jsonl")
+        recorded_order = await record_session(path)
+
+        replay = ReplayExchange(path, speed=None)
+        await replay.initialize()
+        first = await replay.get_ticker(SYMBOL)
+        order = await replay.place_order(SYMBOL, "buy", "market", 1.0)
+        second = await replay.get_ticker(SYMBOL)
+        positions = await replay.get_positions()
+
+        assert first.price == 100.0 and second.price == 110.0
+        assert order == recorded_order
+        assert positions[0]["amount"] == pytest.approx(1.0)
+        # Polling past the end of the recording repeats the last answer
+        assert (await replay.get_ticker(SYMBOL)).price == 110.0
+        assert replay.stats == {"served": 4, "repeated": 1, "misses": 0}
+
+    @pytest.mark.asyncio
+    async def test_unrecorded_calls_fail_like_the_live_adapter(self, tmp_path):
+        path = str(tmp_path / "session.jsonl")
+        await record_session(path)
+        replay = ReplayExchange(path, speed=None)
+
+        assert await replay.get_ticker("ETH/USDT") == {}
+        assert (await replay.place_order(SYMBOL, "sell", "market", 2.0))["status"] == "rejected"
+        assert replay.stats["misses"] == 2
+
+    def test_unset_late_parameters_keep_the_original_call_key(self):
+        original = '["get_ohlcv",{"limit":2,"symbol":"BTC/USDT","timeframe":"1m"}]'  # recorded before `since`
+
+        assert call_key("get_ohlcv", ("BTC/USDT", "1m", 2), {}) == original
+        assert call_key("get_ohlcv", ("BTC/USDT", "1m", 2, None), {}) == original
+        assert '"since":60001' in call_key("get_ohlcv", ("BTC/USDT", "1m", 2), {"since": 60001})
+
+    @pytest.mark.asyncio
+    async def test_virtual_clock_asap_and_accelerated(self):
+        asap = VirtualClock(1_000_000.0, speed=None)
+        await asap.sleep_until(1_060_000.0)
+        assert asap.time_ms() == 1_060_000.0
+
+        fast = VirtualClock(0.0, speed=1000.0)
+        started = time.monotonic()
+        await fast.sleep_until(50_000.0)  # 50 virtual seconds
+        assert time.monotonic() - started < 1.0
+        assert fast.time_ms() >= 50_000.0
@@ -0,0 +1,84 @@
+import pytest
+import asyncio
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.exchanges.request_coalescer import RequestCoalescer
+
+class TestRequestCoalescer:
+
+    @pytest.fixture
+    def counter(self):
+        state = {"calls": 0}
+
+        async def fetch():
+            state["calls"] += 1
+            await asyncio.sleep(0.02)
+            return {"price": state["calls"]}
+        state["fetch"] = fetch
+        return state
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_request(self, counter):
+        coalescer = RequestCoalescer()
+        results = await asyncio.gather(*[coalescer.call("ticker", "BTC/USDT", counter["fetch"]) for _ in range(5)])
+        assert counter["calls"] == 1
+        assert all(r == {"price": 1} for r in results)
+        assert coalescer.stats["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_different_keys_are_not_shared(self, counter):
+        coalescer = RequestCoalescer()
+        await asyncio.gather(coalescer.call("ticker", "BTC/USDT", counter["fetch"]),
+                             coalescer.call("ticker", "ETH/USDT", counter["fetch"]))
+        assert counter["calls"] == 2
+
+    @pytest.mark.asyncio
+    async def test_ttl_cache_and_invalidate(self, counter):
+        coalescer = RequestCoalescer({"balance": 60})
+        await coalescer.call("balance", None, counter["fetch"])
+        assert await coalescer.call("balance", None, counter["fetch"]) == {"price": 1}
+        assert coalescer.stats["hits"] == 1
+
+        coalescer.invalidate("balance")
+        assert await coalescer.call("balance", None, counter["fetch"]) == {"price": 2}
+
+    @pytest.mark.asyncio
+    async def test_zero_ttl_does_not_cache(self, counter):
+        coalescer = RequestCoalescer({"ticker": 0})
+        await coalescer.call("ticker", "BTC/USDT", counter["fetch"])
+        await coalescer.call("ticker", "BTC/USDT", counter["fetch"])
+        assert counter["calls"] == 2
+
+    @pytest.mark.asyncio
+    async def test_failures_are_shared_but_not_cached(self):
+        coalescer = RequestCoalescer({"ticker": 60})
+        calls = 0
+
+        async def failing():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(*[coalescer.call("ticker", "X", failing) for _ in range(3)],
+                                       return_exceptions=True)
+        assert calls == 1
+        assert all(isinstance(r, RuntimeError) for r in results)
+        with pytest.raises(RuntimeError):
+            await coalescer.call("ticker", "X", failing)
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_during_flight_skips_caching(self, counter):
+        coalescer = RequestCoalescer({"balance": 60})
+        pending = asyncio.ensure_future(coalescer.call("balance", None, counter["fetch"]))
+        await asyncio.sleep(0)
+        coalescer.invalidate("balance")
+        assert await pending == {"price": 1}
+        assert await coalescer.call("balance", None, counter["fetch"]) == {"price": 2}
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,130 @@
+import pytest
+import asyncio
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.exchanges.resilience import ResilientCaller, CircuitBreaker, CircuitOpenError
+
+class Flaky:
+    """Fails the first `failures` calls with error, then returns 'ok'"""
+
+    def __init__(self, failures: int, error=ConnectionError("reset")):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return "ok"
+
+class TestResilientCaller:
+
+    @pytest.fixture
+    def caller(self):
+        return ResilientCaller(base_delay=0.001, max_delay=0.001, deadline=1.0, failure_threshold=3, reset_timeout=0.05)
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self, caller):
+        func = Flaky(2)
+        assert await caller.call("ticker", func) == "ok"
+        assert func.calls == 3
+        assert caller.get_metrics()["ticker"]["retries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_non_retryable_errors_fail_immediately_and_do_not_trip_breaker(self, caller):
+        func = Flaky(5, error=ValueError("bad symbol"))
+        for _ in range(5):
+            with pytest.raises(ValueError):
+                await caller.call("ticker", func)
+        assert func.calls == 5
+        assert caller.breakers["ticker"].state == CircuitBreaker.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_writes_are_not_retried_by_default(self, caller):
+        func = Flaky(1)
+        with pytest.raises(ConnectionError):
+            await caller.call("create_order", func, idempotent=False)
+        assert func.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_deadline_bounds_the_whole_call(self, caller):
+        async def slow():
+            await asyncio.sleep(1)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await caller.call("ohlcv", slow, deadline=0.05)
+        assert caller.get_metrics()["ohlcv"]["timeouts"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_breaker_opens_fails_fast_and_recovers(self, caller):
+        caller.max_attempts = 1
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                await caller.call("balance", Flaky(1))
+        assert caller.breakers["balance"].state == CircuitBreaker.OPEN
+
+        func = Flaky(0)
+        with pytest.raises(CircuitOpenError):
+            await caller.call("balance", func)
+        assert func.calls == 0
+        assert caller.get_metrics()["balance"]["rejected_open"] == 1
+
+        await asyncio.sleep(0.06)
+        assert await caller.call("balance", func) == "ok"
+        assert caller.breakers["balance"].state == CircuitBreaker.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_lets_the_next_call_probe(self, caller):
+        caller.max_attempts = 1
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                await caller.call("balance", Flaky(1))
+        await asyncio.sleep(0.06)
+
+        probe = asyncio.create_task(caller.call("balance", lambda: asyncio.sleep(1)))
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        assert await caller.call("balance", Flaky(0)) == "ok"
+        assert caller.breakers["balance"].state == CircuitBreaker.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_waits_and_throttling_do_not_trip_breaker(self, caller):
+        caller.max_attempts = 1
+        caller.throttled = (PermissionError,)
+
+        for _ in range(3):
+            with pytest.raises(asyncio.TimeoutError):
+                await caller.call("ticker", Flaky(0), deadline=0.02, acquire=lambda: asyncio.sleep(1))
+            with pytest.raises(PermissionError):
+                await caller.call("ticker", Flaky(1, error=PermissionError("429")))
+
+        assert caller.breakers["ticker"].state == CircuitBreaker.CLOSED
+        assert caller.get_metrics()["ticker"]["throttled"] == 6
+
+    @pytest.mark.asyncio
+    async def test_slow_read_is_hedged_after_p95(self, caller):
+        caller.hedge_min_samples = 5
+        caller.hedge_min_delay = 0.01
+        for _ in range(5):
+            await caller.call("ticker", Flaky(0))
+
+        calls = 0
+
+        async def first_call_hangs():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(1)
+            return calls
+
+        assert await caller.call("ticker", first_call_hangs) == 2
+        metrics = caller.get_metrics()["ticker"]
+        assert metrics["hedges"] == 1
+        assert metrics["hedge_wins"] == 1
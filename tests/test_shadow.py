@@ -0,0 +1,120 @@
+import pytest
+import numpy as np
+from unittest.mock import Mock, AsyncMock
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.trading.shadow import ShadowBank
+from backend.trading.strategy_manager import StrategyManager
+from backend.trading.strategies.base_strategy import BaseStrategy, StrategyParams, SIGNAL_BUY, SIGNAL_SELL, SIGNAL_HOLD
+from backend.trading.strategies.simple_ma_strategy import SimpleMAStrategy
+from backend.trading.strategies.rsi_strategy import RSIStrategy
+
+CLOSE = 100 + 10 * np.sin(np.arange(300) / 15)
+
+def make_strategy(cls, settings):
+    config = Mock()
+    config.get.side_effect = lambda key, default=None: settings if key.startswith("strategies.") else default
+    return cls(None, None, None, None, config)
+
+class ScriptedStrategy(BaseStrategy):
+    """Variant i signals script[step][i]"""
+
+    def __init__(self, script):
+        super().__init__(None, None, None, None, None)
+        self.script = iter(script)
+        self.symbols = ["BTC/USDT"]
+
+    def batch_signals(self, close, variants):
+        return np.array(next(self.script), dtype=np.int8)
+
+    async def execute_symbol(self, symbol):
+        pass
+
+def scripted_bank(script, **settings):
+    strategy = ScriptedStrategy(script)
+    return ShadowBank(strategy, [StrategyParams(min_volume=i) for i in range(len(script[0]))],
+                      [{"variant": i} for i in range(len(script[0]))], **settings)
+
+class TestBatchSignals:
+
+    @pytest.mark.parametrize("cls, grid", [
+        (SimpleMAStrategy, {"short_period": [3, 5, 8], "long_period": [10, 20, 40]}),
+        (RSIStrategy, {"rsi_period": [7, 14], "oversold_threshold": [30, 45], "overbought_threshold": [55, 70]}),
+    ])
+    def test_matches_generate_signals_per_variant(self, cls, grid):
+        strategy = make_strategy(cls, {})
+        bank = ShadowBank.from_config(strategy, {"grid": grid})
+        for end in (5, 25, 120, 300):
+            close = CLOSE[:end]
+            expected = [strategy.with_params(p).generate_signals({"close": close})[-1] for p in bank.variants]
+            assert strategy.batch_signals(close, bank.variants).tolist() == expected
+
+    def test_invalid_and_duplicate_variants_are_skipped(self):
+        strategy = make_strategy(SimpleMAStrategy, {"short_period": 5, "long_period": 10})
+        bank = ShadowBank.from_config(strategy, {"grid": {"short_period": [5, 20], "long_period": [10, 30]},
+                                                 "variants": [{"long_period": 10}, {"unknown": 1}]})
+
+        assert bank.overrides == [{"short_period": 5, "long_period": 10}, {"short_period": 5, "long_period": 30},
+                                  {"short_period": 20, "long_period": 30}]
+        assert bank.lookback == 30
+
+class TestShadowBank:
+
+    def test_paper_fills_and_pnl_per_variant(self):
+        bank = scripted_bank([
+            [SIGNAL_BUY, SIGNAL_HOLD],
+            [SIGNAL_BUY, SIGNAL_BUY],    # already long: no second entry
+            [SIGNAL_SELL, SIGNAL_HOLD],
+        ], amount_usd=10.0, fee_rate=0.0, slippage_bps=0.0)
+
+        for price in (100.0, 105.0, 110.0):
+            bank.step("BTC/USDT", np.array([price]))
+
+        report = bank.report()
+        first, second = sorted(report["ranking"], key=lambda row: row["variant"])
+        assert first["realized_pnl"] == pytest.approx(1.0) and first["trades"] == 1 and first["win_rate"] == 1.0
+        assert second["unrealized_pnl"] == pytest.approx(10.0 / 105 * 5) and second["open_positions"] == 1
+        assert [row["variant"] for row in report["ranking"]] == [0, 1]  # best net PnL first
+        assert report["stats"]["fills"] == 3
+
+    def test_fees_and_slippage_work_against_the_variant(self):
+        bank = scripted_bank([[SIGNAL_BUY], [SIGNAL_SELL]], amount_usd=10.0, fee_rate=0.001, slippage_bps=10)
+
+        bank.step("BTC/USDT", np.array([100.0]))
+        bank.step("BTC/USDT", np.array([100.0]))
+
+        row = bank.report()["ranking"][0]
+        assert row["net_pnl"] < 0 and row["win_rate"] == 0.0
+        assert row["fees"] == pytest.approx(0.01 + 10.0 / 100.1 * 99.9 * 0.001)
+
+class TestShadowMode:
+
+    @pytest.mark.asyncio
+    async def test_manager_steps_variants_once_per_tick(self):
+        collector = Mock()
+        collector.get_sequence.return_value = 1
+        collector.get_price_history = AsyncMock(return_value=[{"price": float(p)} for p in CLOSE])
+        settings = {"strategies": {"simple_ma": {"enabled": True, "symbols": ["BTC/USDT"],
+                                                 "shadow": {"grid": {"short_period": [3, 5], "long_period": [20, 40]}}}}}
+        config = Mock()
+
+        def get(key, default=None):
+            value = settings
+            for part in key.split("."):
+                if not isinstance(value, dict) or part not in value:
+                    return default
+                value = value[part]
+            return value
+        config.get.side_effect = get
+        manager = StrategyManager(None, None, None, collector, config)
+        manager.strategies["simple_ma"].execute = AsyncMock()  # live path is not under test
+
+        await manager.run_strategies()
+        await manager.run_strategies()
+
+        report = manager.get_shadow_report("simple_ma")["simple_ma"]
+        assert report["variants"] == 4 and report["stats"]["evaluations"] == 1 and report["stats"]["skipped"] == 1
+        collector.subscribe.assert_any_call("simple_ma:shadow", ["BTC/USDT"], [], history=40)
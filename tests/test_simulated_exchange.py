@@ -0,0 +1,135 @@
+import pytest
+import asyncio
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.exchanges.simulated_exchange import SimulatedExchange, SyntheticFeed, ReplayFeed
+
+SYMBOL = "BTC/USDT"
+
+@pytest.fixture
+def exchange():
+    exchange = SimulatedExchange(initial_balances={"USDT": 1000.0}, maker_fee=0.001, taker_fee=0.002,
+                                 spread=0.0, level_step=0.01, depth_levels=3, level_size=100.0)
+    exchange.on_price(SYMBOL, 100.0, timestamp=1)
+    return exchange
+
+class TestSimulatedExchange:
+
+    @pytest.mark.asyncio
+    async def test_market_buy_walks_the_ladder(self, exchange):
+        # Each level holds $100 of depth: 1 BTC at 100, ~0.99 at 101
+        order = await exchange.place_order(SYMBOL, "buy", "market", 1.5)
+
+        assert order["status"] == "filled"
+        assert order["filled"] == pytest.approx(1.5)
+        assert 100 < order["price"] < 101
+        assert exchange.balances["BTC"] == pytest.approx(1.5)
+        expected_cost = 100.0 + 0.5 * 101.0
+        assert exchange.balances["USDT"] == pytest.approx(1000.0 - expected_cost * 1.002)
+
+    @pytest.mark.asyncio
+    async def test_market_order_partially_fills_when_depth_runs_out(self, exchange):
+        exchange.balances["USDT"] = 10000.0
+        order = await exchange.place_order(SYMBOL, "buy", "market", 5.0)
+
+        assert order["status"] == "cancelled"
+        assert 2.9 < order["filled"] < 3.0
+        assert order["remaining"] == pytest.approx(5.0 - order["filled"])
+
+    @pytest.mark.asyncio
+    async def test_resting_limit_orders_fill_by_price_then_time(self, exchange):
+        first = await exchange.place_order(SYMBOL, "buy", "limit", 0.5, price=95.0)
+        second = await exchange.place_order(SYMBOL, "buy", "limit", 0.5, price=95.0)
+        better = await exchange.place_order(SYMBOL, "buy", "limit", 0.5, price=96.0)
+        assert all(o["status"] == "open" for o in (first, second, better))
+        assert (await exchange.get_balance())["USDT"] == pytest.approx(1000.0 - 0.5 * (95 + 95 + 96))
+
+        # $100 at the touch is ~1.04 BTC: enough for the better-priced order and the older one at 95
+        exchange.on_price(SYMBOL, 95.0)
+
+        assert (await exchange.get_order_status(better["id"], SYMBOL))["status"] == "filled"
+        assert (await exchange.get_order_status(first["id"], SYMBOL))["status"] == "filled"
+        assert (await exchange.get_order_status(second["id"], SYMBOL))["filled"] > 0
+
+    @pytest.mark.asyncio
+    async def test_crossing_limit_order_fills_as_taker(self, exchange):
+        order = await exchange.place_order(SYMBOL, "buy", "limit", 0.5, price=100.5)
+
+        assert order["status"] == "filled"
+        assert exchange.trades[-1]["maker"] is False
+
+    @pytest.mark.asyncio
+    async def test_cancel_releases_locked_funds(self, exchange):
+        order = await exchange.place_order(SYMBOL, "buy", "limit", 1.0, price=90.0)
+        assert (await exchange.get_balance())["USDT"] == pytest.approx(910.0)
+
+        assert await exchange.cancel_order(order["id"], SYMBOL) is True
+        assert (await exchange.get_balance())["USDT"] == pytest.approx(1000.0)
+        assert await exchange.get_open_orders() == []
+        exchange.on_price(SYMBOL, 80.0)
+        assert (await exchange.get_order_status(order["id"], SYMBOL))["filled"] == 0
+
+    @pytest.mark.asyncio
+    async def test_stop_order_triggers_on_cross(self, exchange):
+        await exchange.place_order(SYMBOL, "buy", "market", 1.0)
+        stop = await exchange.place_order(SYMBOL, "sell", "stop_loss", 1.0, stop_price=95.0)
+        assert stop["status"] == "open"
+
+        exchange.on_price(SYMBOL, 97.0)
+        assert (await exchange.get_order_status(stop["id"], SYMBOL))["status"] == "open"
+        exchange.on_price(SYMBOL, 94.0)
+        assert (await exchange.get_order_status(stop["id"], SYMBOL))["status"] == "filled"
+        assert await exchange.get_positions() == []
+
+    @pytest.mark.asyncio
+    async def test_take_profit_triggers_when_price_rises_to_it(self, exchange):
+        await exchange.place_order(SYMBOL, "buy", "market", 1.0)
+        take_profit = await exchange.place_order(SYMBOL, "sell", "take_profit", 1.0, stop_price=110.0)
+
+        exchange.on_price(SYMBOL, 94.0)
+        assert (await exchange.get_order_status(take_profit["id"], SYMBOL))["status"] == "open"
+        exchange.on_price(SYMBOL, 111.0)
+        filled = await exchange.get_order_status(take_profit["id"], SYMBOL)
+        assert filled["status"] == "filled" and filled["price"] >= 110.0
+
+    @pytest.mark.asyncio
+    async def test_rejects_unfunded_sell_and_tiny_orders(self, exchange):
+        assert (await exchange.place_order(SYMBOL, "sell", "market", 1.0))["status"] == "rejected"
+        assert (await exchange.place_order(SYMBOL, "buy", "market", 0.001))["status"] == "rejected"
+
+    @pytest.mark.asyncio
+    async def test_positions_track_entry_and_unrealized_pnl(self, exchange):
+        await exchange.place_order(SYMBOL, "buy", "market", 0.5)
+        exchange.on_price(SYMBOL, 110.0)
+
+        positions = await exchange.get_positions()
+        assert len(positions) == 1
+        assert positions[0]["amount"] == pytest.approx(0.5)
+        assert positions[0]["unrealized_pnl"] == pytest.approx((110.0 - 100.0) * 0.5)
+
+class TestFeeds:
+
+    def test_synthetic_feed_is_reproducible(self):
+        a = SimulatedExchange(seed=1)
+        b = SimulatedExchange(seed=1)
+        a.step(iter(SyntheticFeed(SYMBOL, 100.0, seed=7, start_ms=0)), steps=50)
+        b.step(iter(SyntheticFeed(SYMBOL, 100.0, seed=7, start_ms=0)), steps=50)
+
+        assert a.last_prices[SYMBOL] == b.last_prices[SYMBOL]
+        assert len(a.candles[SYMBOL]) == 50
+
+    @pytest.mark.asyncio
+    async def test_replay_feed_interleaves_symbols_in_time_order(self):
+        exchange = SimulatedExchange()
+        feed = ReplayFeed({
+            "BTC/USDT": [[1000, 1, 1, 1, 100.0, 1], [3000, 1, 1, 1, 101.0, 1]],
+            "ETH/USDT": [[2000, 1, 1, 1, 10.0, 1]],
+        })
+        await exchange.run_feed(feed)
+
+        assert exchange.clock_ms == 3000
+        assert exchange.last_prices == {"BTC/USDT": 101.0, "ETH/USDT": 10.0}
+        assert (await exchange.get_ohlcv("BTC/USDT", limit=1)) == [[3000, 1.0, 1.0, 1.0, 101.0, 1.0]]
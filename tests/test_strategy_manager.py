@@ -0,0 +1,148 @@
+import pytest
+import asyncio
+import time
+from unittest.mock import Mock
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.trading.strategy_manager import StrategyManager
+from backend.trading.strategies.base_strategy import BaseStrategy
+
+class SleepyStrategy(BaseStrategy):
+    """Spends `delays[symbol]` seconds per symbol (raising for 'fail') and records what overlapped"""
+
+    def __init__(self, delays, active=None, market_data_collector=None, portfolio_manager=None):
+        super().__init__(None, portfolio_manager, None, market_data_collector, None)
+        self.delays = delays
+        self.symbols = list(delays)
+        self.active = active if active is not None else {"now": 0, "peak": 0}
+        self.done = []
+
+    async def execute_symbol(self, symbol):
+        self.active["now"] += 1
+        self.active["peak"] = max(self.active["peak"], self.active["now"])
+        try:
+            delay = self.delays[symbol]
+            if delay == "fail":
+                raise RuntimeError("exchange hiccup")
+            await asyncio.sleep(delay)
+            self.done.append(symbol)
+        finally:
+            self.active["now"] -= 1
+
+def make_manager(settings):
+    config = Mock()
+    config.get.side_effect = lambda key, default=None: settings.get(key, default)
+    return StrategyManager(None, None, None, None, config)
+
+class TestStrategyManager:
+
+    @pytest.mark.asyncio
+    async def test_cycle_time_is_the_slowest_strategy_not_the_sum(self):
+        manager = make_manager({"trading.strategy_concurrency": 10})
+        manager.add_strategy("a", SleepyStrategy({"BTC/USDT": 0.1, "ETH/USDT": 0.1}))
+        manager.add_strategy("b", SleepyStrategy({"SOL/USDT": 0.1}))
+
+        started = time.perf_counter()
+        results = await manager.run_strategies()
+
+        assert time.perf_counter() - started < 0.2
+        assert results == {"a": "ok", "b": "ok"}
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded_across_strategies(self):
+        manager = make_manager({"trading.strategy_concurrency": 2})
+        active = {"now": 0, "peak": 0}
+        manager.add_strategy("a", SleepyStrategy({s: 0.02 for s in ("A", "B", "C")}, active))
+        manager.add_strategy("b", SleepyStrategy({s: 0.02 for s in ("D", "E")}, active))
+
+        await manager.run_strategies()
+
+        assert active["peak"] == 2
+
+    @pytest.mark.asyncio
+    async def test_timeout_cancels_only_the_slow_strategy(self):
+        manager = make_manager({"strategies.slow.timeout": 0.05})
+        slow = SleepyStrategy({"BTC/USDT": 5})
+        fast = SleepyStrategy({"ETH/USDT": 0.01})
+        manager.add_strategy("slow", slow)
+        manager.add_strategy("fast", fast)
+
+        results = await manager.run_strategies()
+
+        assert results == {"slow": "timeout", "fast": "ok"}
+        assert fast.done == ["ETH/USDT"] and slow.done == []
+        assert manager.get_stats()["strategies"]["slow"]["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failing_symbol_does_not_stop_the_others(self):
+        manager = make_manager({})
+        strategy = SleepyStrategy({"BTC/USDT": "fail", "ETH/USDT": 0.0})
+        manager.add_strategy("a", strategy)
+
+        assert await manager.run_strategies() == {"a": "ok"}
+        assert strategy.done == ["ETH/USDT"]
+
+    @pytest.mark.asyncio
+    async def test_strategies_take_turns_on_the_same_symbol(self):
+        manager = make_manager({"trading.strategy_concurrency": 10})
+        active = {"now": 0, "peak": 0}
+        manager.add_strategy("a", SleepyStrategy({"BTC/USDT": 0.02}, active))
+        manager.add_strategy("b", SleepyStrategy({"BTC/USDT": 0.02}, active))
+
+        await manager.run_strategies()
+
+        assert active["peak"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cleanup_cancels_a_running_cycle(self):
+        manager = make_manager({})
+        manager.add_strategy("a", SleepyStrategy({"BTC/USDT": 5}))
+        cycle = asyncio.create_task(manager.run_strategies())
+        await asyncio.sleep(0.01)
+
+        await manager.cleanup()
+
+        assert await cycle == {"a": "cancelled"}
+        assert manager.stats["a"]["cancelled"] == 1
+        assert manager.last_cycle["duration"] < 1
+
+class TestIncrementalEvaluation:
+
+    @pytest.mark.asyncio
+    async def test_unchanged_symbols_are_skipped(self):
+        collector = Mock()
+        sequences = {"BTC/USDT": 1, "ETH/USDT": 2}
+        collector.get_sequence.side_effect = lambda symbol: sequences[symbol]
+        portfolio = Mock(version=0)
+        strategy = SleepyStrategy({"BTC/USDT": 0.0, "ETH/USDT": 0.0}, market_data_collector=collector,
+                                  portfolio_manager=portfolio)
+        manager = make_manager({})
+        manager.add_strategy("a", strategy)
+
+        await manager.run_strategies()
+        await manager.run_strategies()
+        assert strategy.done == ["BTC/USDT", "ETH/USDT"]
+
+        sequences["ETH/USDT"] = 3  # new tick for one symbol
+        await manager.run_strategies()
+        assert strategy.done[2:] == ["ETH/USDT"]
+
+        portfolio.version = 1  # a position changed: every symbol's decision may differ
+        await manager.run_strategies()
+        assert sorted(strategy.done[3:]) == ["BTC/USDT", "ETH/USDT"]
+        assert manager.get_stats()["strategies"]["a"]["skipped"] == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_evaluation_is_retried(self):
+        collector = Mock()
+        collector.get_sequence.return_value = 1
+        strategy = SleepyStrategy({"BTC/USDT": "fail"}, market_data_collector=collector, portfolio_manager=Mock(version=0))
+
+        await strategy.execute()
+        await strategy.execute()
+
+        assert strategy.evaluation_stats == {"evaluated": 0, "skipped": 0}
+        assert strategy.last_inputs == {}
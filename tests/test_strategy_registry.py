@@ -0,0 +1,119 @@
+import pytest
+import os
+import time
+from unittest.mock import Mock
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.trading.strategies.registry import STRATEGY_TYPES, resolve_strategy, create_strategy, register_strategy
+from backend.trading.strategies.simple_ma_strategy import SimpleMAStrategy, SimpleMAParams
+from backend.trading.strategies.rsi_strategy import RSIStrategy
+from backend.trading.strategy_manager import StrategyManager
+from backend.utils.config import Config
+from backend.utils.config_watcher import ConfigWatcher
+
+class DictConfig:
+    """Just the `get` of Config over a nested dict that tests can edit in place"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def get(self, key, default=None):
+        value = self.data
+        for part in key.split("."):
+            if not isinstance(value, dict) or part not in value:
+                return default
+            value = value[part]
+        return value
+
+def make_manager(strategies):
+    config = DictConfig({"strategies": strategies})
+    collector = Mock()
+    return StrategyManager(None, None, None, collector, config), config, collector
+
+class TestStrategyRegistry:
+
+    def test_builtins_and_module_paths_resolve(self):
+        assert resolve_strategy("simple_ma") is SimpleMAStrategy
+        assert resolve_strategy("backend.trading.strategies.rsi_strategy:RSIStrategy") is RSIStrategy
+
+    def test_unknown_or_foreign_types_are_rejected(self):
+        with pytest.raises(ValueError):
+            resolve_strategy("no_such_strategy")
+        with pytest.raises(TypeError):
+            resolve_strategy("backend.utils.config:Config")
+
+    def test_instances_read_their_own_section(self):
+        STRATEGY_TYPES.pop("fast_ma", None)
+        register_strategy("fast_ma", "backend.trading.strategies.simple_ma_strategy:SimpleMAStrategy")
+        config = DictConfig({"strategies": {"fast": {"type": "fast_ma", "symbols": ["BTC/USDT"], "short_period": 2,
+                                                     "long_period": 4}}})
+
+        strategy = create_strategy("fast", config.get("strategies.fast"), None, None, None, None, config)
+
+        assert isinstance(strategy, SimpleMAStrategy) and strategy.name == "fast"
+        assert strategy.params == SimpleMAParams(symbols=("BTC/USDT",), short_period=2, long_period=4)
+        assert strategy.symbols == ["BTC/USDT"]
+
+class TestHotReload:
+
+    @pytest.mark.asyncio
+    async def test_parameters_are_swapped_and_indicators_resubscribed(self):
+        manager, config, collector = make_manager({"simple_ma": {"enabled": True, "symbols": ["BTC/USDT"]}})
+        strategy = manager.strategies["simple_ma"]
+        before = strategy.params
+        strategy.last_inputs["BTC/USDT"] = (1, 1)
+
+        config.data["strategies"]["simple_ma"]["long_period"] = 30
+        assert await manager.reload() == {"simple_ma": "updated"}
+
+        assert manager.strategies["simple_ma"] is strategy
+        assert before.long_period == 10 and strategy.params.long_period == 30
+        assert strategy.last_inputs == {}
+        specs = collector.subscribe.call_args.args[2]
+        assert strategy.params.sma_long in specs
+        assert await manager.reload() == {}
+
+    @pytest.mark.asyncio
+    async def test_invalid_parameters_keep_the_current_ones(self):
+        manager, config, _ = make_manager({"rsi": {"enabled": True, "overbought_threshold": 70}})
+        params = manager.strategies["rsi"].params
+
+        config.data["strategies"]["rsi"]["overbought_threshold"] = 10  # below oversold
+        assert await manager.reload() == {"rsi": "invalid"}
+        assert manager.strategies["rsi"].params is params
+
+    @pytest.mark.asyncio
+    async def test_strategies_are_enabled_and_disabled_live(self):
+        manager, config, collector = make_manager({"simple_ma": {"enabled": True}, "rsi": {"enabled": False}})
+
+        config.data["strategies"]["simple_ma"]["enabled"] = False
+        config.data["strategies"]["rsi"]["enabled"] = True
+        assert await manager.reload() == {"simple_ma": "removed", "rsi": "added"}
+
+        assert list(manager.strategies) == ["rsi"]
+        collector.unsubscribe.assert_called_once_with("simple_ma")
+
+class TestConfigWatcher:
+
+    @pytest.mark.asyncio
+    async def test_changed_file_is_reloaded_and_broken_edits_ignored(self, tmp_path):
+        path = tmp_path / "config.yaml"
+        path.write_text("strategies:\n  rsi:\n    rsi_period: 14\n")
+        config = Config(config_file=str(path))
+        watcher = ConfigWatcher(config)
+        calls = []
+        watcher.add_listener(lambda: calls.append(config.get("strategies.rsi.rsi_period")))
+
+        assert await watcher.check() is False
+        path.write_text("strategies:\n  rsi:\n    rsi_period: 21\n")
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+        assert await watcher.check() is True
+        assert calls == [21]
+
+        path.write_text("strategies: [unclosed\n")
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 2 * 10 ** 9))
+        assert await watcher.check() is False
+        assert config.get("strategies.rsi.rsi_period") == 21
+        assert watcher.last_error
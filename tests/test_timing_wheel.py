@@ -0,0 +1,100 @@
+import pytest
+import asyncio
+import random
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.utils.timing_wheel import TimingWheel, TimerService
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def make_wheel(wheel_size=4, levels=2):
+    clock = FakeClock()
+    return TimingWheel(tick=1.0, wheel_size=wheel_size, levels=levels, clock=clock), clock
+
+class TestTimingWheel:
+
+    def test_timers_fire_on_their_tick(self):
+        wheel, clock = make_wheel()
+        wheel.schedule(1, "a")
+        wheel.schedule(3, "b")
+        wheel.schedule(3, "c")
+
+        assert [h.callback for h in wheel.advance(2)] == ["a"]
+        assert [h.callback for h in wheel.advance(3)] == ["b", "c"]
+        assert len(wheel) == 0
+
+    def test_deadlines_cascade_through_levels_and_overflow(self):
+        # Levels span 4 and 16 ticks; anything past that waits in the overflow slot
+        wheel, clock = make_wheel()
+        delays = [1, 3, 4, 5, 15, 16, 17, 40, 63, 64, 100]
+        for delay in delays:
+            wheel.schedule(delay, delay)
+
+        fired = {}
+        for now in range(1, 101):
+            for handle in wheel.advance(now):
+                fired[handle.callback] = now
+
+        assert fired == {delay: delay for delay in delays}
+
+    def test_randomized_deadlines_fire_exactly_once_at_their_tick(self):
+        wheel, clock = make_wheel(wheel_size=8, levels=3)
+        rng = random.Random(7)
+        expected = {}
+        for now in range(0, 2000):
+            clock.now = now
+            for handle in wheel.advance(now):
+                assert expected.pop(handle) == now
+            for _ in range(rng.randint(0, 3)):
+                handle = wheel.schedule(rng.randint(1, 800), None)
+                expected[handle] = handle.deadline
+        assert all(deadline >= 2000 for deadline in expected.values())
+
+    def test_cancel_is_immediate(self):
+        wheel, clock = make_wheel()
+        keep = wheel.schedule(20, "keep")
+        drop = wheel.schedule(20, "drop")
+
+        assert drop.cancel() is True
+        assert drop.cancel() is False
+        assert len(wheel) == 1
+        assert wheel.advance(20) == [keep]
+        assert keep.fired and not keep.cancel()
+
+    def test_idle_wheel_jumps_ahead(self):
+        wheel, clock = make_wheel()
+        wheel.advance(10 ** 9)
+        clock.now = 10 ** 9
+
+        wheel.schedule(2, "late")
+
+        assert wheel.advance(10 ** 9 + 2)[0].callback == "late"
+
+class TestTimerService:
+
+    @pytest.mark.asyncio
+    async def test_runs_sync_and_async_callbacks(self):
+        service = TimerService(tick=0.01)
+        fired = []
+
+        async def later(name):
+            fired.append(name)
+
+        service.schedule(0.02, fired.append, "sync")
+        service.schedule(0.03, later, "async")
+        service.cancel(service.schedule(0.02, fired.append, "cancelled"))
+        service.start()
+        await asyncio.sleep(0.1)
+        await service.stop()
+
+        assert fired == ["sync", "async"]
+        assert service.get_status()["pending"] == 0
+        assert service.stats["cancelled"] == 1
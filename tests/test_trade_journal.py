@@ -0,0 +1,93 @@
+import pytest
+import asyncio
+import threading
+from unittest.mock import Mock
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.data.trade_journal import TradeJournal
+
+def make_trade(i):
+    return {
+        "id": f"order_{i}", "symbol": "BTC/USDT", "side": "buy", "amount": 0.001,
+        "entry_price": 50000.0, "exit_price": 51000.0, "realized_pnl": 1.0,
+        "timestamp": "2025-01-01T10:00:00"
+    }
+
+class TestTradeJournal:
+
+    @pytest.fixture
+    def database_manager(self):
+        database = Mock()
+        database.add_trades = Mock(return_value=True)
+        return database
+
+    @pytest.fixture
+    def journal(self, database_manager, tmp_path):
+        journal = TradeJournal(database_manager, spool_path=str(tmp_path / "journal.spool"),
+                               max_queue_size=10, batch_size=5, flush_interval=0.05, max_retries=2)
+        journal.retry_delay = 0.01
+        return journal
+
+    @pytest.mark.asyncio
+    async def test_trades_are_written_in_batches(self, journal, database_manager):
+        await journal.start()
+        for i in range(7):
+            assert journal.submit(make_trade(i)) is True
+        await asyncio.sleep(0.3)
+        await journal.stop()
+
+        written = [trade["id"] for call in database_manager.add_trades.call_args_list for trade in call.args[0]]
+        assert written == [f"order_{i}" for i in range(7)]
+        assert all(len(call.args[0]) <= 5 for call in database_manager.add_trades.call_args_list)
+        assert journal.stats["written"] == 7
+
+    @pytest.mark.asyncio
+    async def test_failed_writes_are_spooled_then_replayed(self, journal, database_manager):
+        database_manager.add_trades.side_effect = Exception("database down")
+        await journal.start()
+        journal.submit(make_trade(1))
+        await asyncio.sleep(0.2)
+
+        assert journal.stats["spooled"] >= 1
+        assert journal._has_spool()
+
+        database_manager.add_trades.side_effect = None
+        await asyncio.sleep(0.3)
+        await journal.stop()
+
+        assert not journal._has_spool()
+        assert journal.stats["replayed"] == 1
+        assert database_manager.add_trades.call_args.args[0][0]["id"] == "order_1"
+
+    @pytest.mark.asyncio
+    async def test_full_queue_spools_without_blocking(self, journal):
+        for i in range(10):
+            journal.submit(make_trade(i))
+        spooled = threading.Event()
+        journal._spool_executor.submit(spooled.wait)  # Hold the spool thread as a slow disk would
+
+        assert journal.submit(make_trade(10)) is False
+        assert not os.path.exists(journal.spool_path)  # Returned before the write
+
+        spooled.set()
+        await journal.stop()
+        assert journal._read_spool_file(journal.spool_path)[0]["id"] == "order_10"
+
+    @pytest.mark.asyncio
+    async def test_leftover_spool_is_replayed_on_start(self, journal, database_manager):
+        journal._spool([make_trade(1), make_trade(2)])
+        with open(journal.spool_path, "a") as f:
+            f.write('{"id": "torn')  # Simulated crash mid-write
+
+        await journal.start()
+        await asyncio.sleep(0.2)
+        await journal.stop()
+
+        replayed = database_manager.add_trades.call_args.args[0]
+        assert [trade["id"] for trade in replayed] == ["order_1", "order_2"]
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,128 @@
+import pytest
+from unittest.mock import AsyncMock, Mock
+import ccxt.async_support as ccxt
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.exchanges.binance_testnet import BinanceTestnet
+from backend.exchanges.user_data_stream import UserDataStream
+
+def order_event(status, filled, execution="TRADE", event_time=2000, order_id=42):
+    return {"e": "ORDER_TRADE_UPDATE", "E": event_time, "o": {
+        "s": "BTCUSDT", "i": order_id, "S": "BUY", "o": "MARKET", "q": "0.01", "p": "0", "ap": "100.0",
+        "X": status, "x": execution, "z": str(filled), "l": "0.005", "L": "100.0",
+        "n": "0.0002", "N": "USDT", "T": event_time, "t": 7, "rp": "0"}}
+
+def market(symbol, market_type):
+    swap = market_type == "swap"
+    return {"id": "BTCUSDT", "symbol": symbol, "base": "BTC", "quote": "USDT", "settle": "USDT" if swap else None,
+            "baseId": "BTC", "quoteId": "USDT", "settleId": "USDT" if swap else None, "type": market_type,
+            "spot": not swap, "margin": False, "swap": swap, "future": False, "option": False, "contract": swap,
+            "linear": True if swap else None, "inverse": False if swap else None, "contractSize": 1 if swap else None,
+            "active": True, "precision": {"amount": 0.001, "price": 0.1}, "limits": {"amount": {}, "price": {}, "cost": {}},
+            "info": {}}
+
+@pytest.fixture
+def binance():
+    """BinanceTestnet on a real ccxt client whose HTTP layer answers from canned futures payloads"""
+    exchange = BinanceTestnet("key", "secret", markets_cache=Mock())
+    exchange.exchange = ccxt.binance(exchange._ccxt_config())
+    exchange.exchange.set_markets([market("BTC/USDT", "spot"), market("BTC/USDT:USDT", "swap")])
+    exchange.connected = True
+
+    async def fetch(url, method="GET", headers=None, body=None):
+        if "/openOrders" in url:
+            return [{"orderId": 42, "symbol": "BTCUSDT", "status": "NEW", "clientOrderId": "c42", "price": "90",
+                     "avgPrice": "0", "origQty": "0.01", "executedQty": "0", "type": "LIMIT", "side": "BUY",
+                     "time": 1, "updateTime": 1}]
+        return {"assets": [{"asset": "USDT", "walletBalance": "5", "availableBalance": "4"}],
+                "positions": [{"symbol": "BTCUSDT", "positionAmt": "0.01", "entryPrice": "100",
+                               "unrealizedProfit": "0"}]}
+    exchange.exchange.fetch = AsyncMock(side_effect=fetch)
+    return exchange
+
+@pytest.fixture
+def stream():
+    fake = Mock()
+    fake.options = {}
+    fake.last_response_headers = {}
+    fake.safe_symbol = Mock(side_effect=lambda market_id, *args: market_id.replace("USDT", "/USDT"))
+    fake.fetch_balance = AsyncMock(return_value={
+        "USDT": {"free": 4.0, "total": 5.0},
+        "info": {"positions": [{"symbol": "ETHUSDT", "positionAmt": "0.1", "entryPrice": "10",
+                                "unrealizedProfit": "0.5"}]},
+    })
+    fake.fetch_open_orders = AsyncMock(return_value=[])
+
+    exchange = BinanceTestnet("key", "secret", markets_cache=Mock())
+    exchange.exchange = fake
+    exchange.connected = True
+    return UserDataStream(exchange)
+
+class TestUserDataStream:
+
+    @pytest.mark.asyncio
+    async def test_resync_loads_snapshot(self, stream):
+        assert stream.is_synced is False
+        await stream.resync()
+
+        assert stream.is_synced is True
+        assert stream.get_balance() == {"USDT": 4.0, "total": 5.0}
+        assert stream.get_positions()[0]["symbol"] == "ETH/USDT"
+        assert stream.get_positions()[0]["side"] == "long"
+
+    def test_order_updates_track_lifecycle_and_fills(self, stream):
+        stream.handle_message(order_event("PARTIALLY_FILLED", 0.005))
+        assert stream.get_open_orders("BTC/USDT")[0]["filled"] == 0.005
+        assert len(stream.fills) == 1
+
+        stream.handle_message(order_event("FILLED", 0.01, event_time=2001))
+        assert stream.get_open_orders() == []
+        assert stream.get_order("42")["status"] == "filled"
+        assert stream.fills[-1]["price"] == 100.0
+        assert len(stream.fills) == 2
+
+    def test_account_update_sets_balances_and_positions(self, stream):
+        updates = []
+        stream.add_listener(lambda event_type, payload: updates.append(event_type))
+        stream.handle_message({"e": "ACCOUNT_UPDATE", "E": 3000, "a": {
+            "B": [{"a": "USDT", "wb": "6.0", "cw": "5.5"}],
+            "P": [{"s": "BTCUSDT", "pa": "-0.01", "ep": "100", "up": "-0.1"}]}})
+
+        assert stream.get_balance() == {"USDT": 5.5, "total": 6.0}
+        assert stream.get_positions()[0]["side"] == "short"
+        assert updates == ["balance", "position"]
+
+        stream.handle_message({"e": "ACCOUNT_UPDATE", "E": 3001, "a": {
+            "B": [], "P": [{"s": "BTCUSDT", "pa": "0", "ep": "0", "up": "0"}]}})
+        assert stream.get_positions() == []
+
+    @pytest.mark.asyncio
+    async def test_events_older_than_snapshot_are_ignored(self, stream):
+        await stream.resync()
+        stream.handle_message(order_event("NEW", 0, execution="NEW", event_time=stream.snapshot_time - 1))
+
+        assert stream.get_open_orders() == []
+        assert stream.stats["stale_events"] == 1
+
+    def test_closed_orders_are_bounded(self, stream):
+        stream.max_closed_orders = 3
+        for order_id in range(5):
+            stream.handle_message(order_event("CANCELED", 0, execution="CANCELED", order_id=order_id))
+
+        assert list(stream.closed_orders) == ["2", "3", "4"]
+
+@pytest.mark.asyncio
+async def test_resync_on_binance_lists_open_orders_across_symbols(binance):
+    stream = UserDataStream(binance)
+    await stream.resync()
+
+    assert any("/openOrders" in call.args[0] and "symbol=" not in call.args[0]
+               for call in binance.exchange.fetch.await_args_list)
+    assert [o["id"] for o in stream.get_open_orders("BTC/USDT")] == ["42"]
+    assert stream.get_positions()[0]["symbol"] == "BTC/USDT"
+
+    stream.handle_message(order_event("FILLED", 0.01, event_time=stream.snapshot_time + 1))
+    assert stream.get_open_orders() == [] and stream.get_order("42")["symbol"] == "BTC/USDT"